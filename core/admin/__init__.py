@@ -5,14 +5,18 @@ Admin package - Import tất cả admin classes
 # Import tất cả admin classes
 from .user_admin import UserProfileAdmin, UserRoleAdmin, UserAdmin
 from .auth_admin import LoginHistoryAdmin, PasswordResetAdmin, AccountLockoutAdmin
-from .study_admin import CourseAdmin, CourseEnrollmentAdmin, GradeAdmin, NoteAdmin, TagAdmin
+from .study_admin import CourseAdmin, CourseEnrollmentAdmin, GradeAdmin, NoteAdmin, StudentRiskScoreAdmin, TagAdmin
 from .assignment_admin import AssignmentAdmin, AssignmentFileAdmin, AssignmentSubmissionAdmin, AssignmentGradeAdmin
 from .requests_admin import StudentAccountRequestAdmin
+from .notification_admin import AssignmentReminderAdmin, NotificationAdmin
+from .outbox_admin import OutboundEmailAdmin
 
 __all__ = [
     'UserAdmin', 'UserProfileAdmin', 'UserRoleAdmin',
     'LoginHistoryAdmin', 'PasswordResetAdmin', 'AccountLockoutAdmin',
-    'CourseAdmin', 'CourseEnrollmentAdmin', 'GradeAdmin', 'NoteAdmin', 'TagAdmin',
+    'CourseAdmin', 'CourseEnrollmentAdmin', 'GradeAdmin', 'NoteAdmin', 'StudentRiskScoreAdmin', 'TagAdmin',
     'AssignmentAdmin', 'AssignmentFileAdmin', 'AssignmentSubmissionAdmin', 'AssignmentGradeAdmin',
     'StudentAccountRequestAdmin',
+    'NotificationAdmin', 'AssignmentReminderAdmin',
+    'OutboundEmailAdmin',
 ] 
\ No newline at end of file
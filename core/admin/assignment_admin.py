@@ -5,10 +5,10 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from django.db.models import Count, Q
 from django.utils import timezone
 
 from ..models.assignment import Assignment, AssignmentFile, AssignmentSubmission, AssignmentGrade
+from .mixins import LargeTableAdminMixin, count_subquery
 
 
 @admin.register(Assignment)
@@ -20,7 +20,7 @@ class AssignmentAdmin(admin.ModelAdmin):
         'submission_count', 'graded_count', 'is_overdue_display'
     ]
     list_filter = [
-        'status', 'course', 'created_by', 'allow_late_submission',
+        'status', 'course', ('created_by', admin.RelatedOnlyFieldListFilter), 'allow_late_submission',
         'is_visible_to_students', 'created_at', 'due_date'
     ]
     search_fields = ['title', 'description', 'course__name', 'created_by__username']
@@ -46,22 +46,23 @@ class AssignmentAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         """Override queryset để thêm annotations"""
         qs = super().get_queryset(request)
+        # Tên annotation không được trùng property submission_count / graded_count của model
         return qs.select_related('course', 'created_by').annotate(
-            submission_count=Count('submissions'),
-            graded_count=Count('submissions', filter=Q(submissions__status='graded'))
+            submission_total=count_subquery(AssignmentSubmission.objects.all(), 'assignment'),
+            graded_total=count_subquery(AssignmentSubmission.objects.filter(status='graded'), 'assignment')
         )
     
     def submission_count(self, obj):
         """Hiển thị số lượng bài nộp"""
-        return obj.submission_count
+        return obj.submission_total
     submission_count.short_description = 'Số bài nộp'
-    submission_count.admin_order_field = 'submission_count'
+    submission_count.admin_order_field = 'submission_total'
     
     def graded_count(self, obj):
         """Hiển thị số lượng bài đã chấm"""
-        return obj.graded_count
+        return obj.graded_total
     graded_count.short_description = 'Đã chấm'
-    graded_count.admin_order_field = 'graded_count'
+    graded_count.admin_order_field = 'graded_total'
     
     def is_overdue_display(self, obj):
         """Hiển thị trạng thái quá hạn"""
@@ -92,13 +93,14 @@ class AssignmentFileAdmin(admin.ModelAdmin):
         'file_size_mb', 'is_submission_file', 'uploaded_at'
     ]
     list_filter = [
-        'file_type', 'is_submission_file', 'uploaded_by', 
+        'file_type', 'is_submission_file', ('uploaded_by', admin.RelatedOnlyFieldListFilter), 
         'assignment__course', 'uploaded_at'
     ]
     search_fields = [
         'file_name', 'assignment__title', 'uploaded_by__username'
     ]
     readonly_fields = ['file_size', 'uploaded_at', 'file_size_mb']
+    raw_id_fields = ['submission']
     date_hierarchy = 'uploaded_at'
     
     fieldsets = (
@@ -106,7 +108,7 @@ class AssignmentFileAdmin(admin.ModelAdmin):
             'fields': ('assignment', 'file', 'file_name', 'description')
         }),
         ('Thông tin hệ thống', {
-            'fields': ('file_type', 'file_size', 'file_size_mb', 'is_submission_file')
+            'fields': ('file_type', 'file_size', 'file_size_mb', 'is_submission_file', 'submission')
         }),
         ('Thông tin upload', {
             'fields': ('uploaded_by', 'uploaded_at'),
@@ -117,7 +119,7 @@ class AssignmentFileAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         """Override queryset để thêm select_related"""
         return super().get_queryset(request).select_related(
-            'assignment', 'uploaded_by'
+            'assignment__course', 'uploaded_by'
         )
     
     def file_size_mb(self, obj):
@@ -139,15 +141,17 @@ class AssignmentFileAdmin(admin.ModelAdmin):
 
 
 @admin.register(AssignmentSubmission)
-class AssignmentSubmissionAdmin(admin.ModelAdmin):
+class AssignmentSubmissionAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """Admin cho AssignmentSubmission model"""
     
     list_display = [
         'student', 'assignment', 'status', 'submitted_at', 
         'grade', 'grade_percentage', 'is_late_display'
     ]
+    # Không lọc theo từng bài tập (hàng nghìn lựa chọn) và không dùng date_hierarchy
+    # (SELECT DISTINCT ngày trên cả bảng); tìm theo tên bài tập qua search_fields
     list_filter = [
-        'status', 'assignment__course', 'assignment', 
+        'status', 'assignment__course',
         'submitted_at', 'graded_at'
     ]
     search_fields = [
@@ -155,7 +159,7 @@ class AssignmentSubmissionAdmin(admin.ModelAdmin):
         'assignment__title'
     ]
     readonly_fields = ['submitted_at', 'grade_percentage', 'is_late']
-    date_hierarchy = 'submitted_at'
+    ordering = ['-submitted_at', '-pk']
     
     fieldsets = (
         ('Thông tin bài nộp', {
@@ -173,7 +177,7 @@ class AssignmentSubmissionAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         """Override queryset để thêm select_related"""
         return super().get_queryset(request).select_related(
-            'assignment', 'student', 'graded_by'
+            'assignment__course', 'student', 'graded_by'
         )
     
     def grade_percentage(self, obj):
@@ -204,7 +208,7 @@ class AssignmentSubmissionAdmin(admin.ModelAdmin):
 
 
 @admin.register(AssignmentGrade)
-class AssignmentGradeAdmin(admin.ModelAdmin):
+class AssignmentGradeAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """Admin cho AssignmentGrade model"""
     
     list_display = [
@@ -212,7 +216,7 @@ class AssignmentGradeAdmin(admin.ModelAdmin):
         'graded_by', 'graded_at', 'is_final'
     ]
     list_filter = [
-        'is_final', 'graded_by', 'graded_at',
+        'is_final', ('graded_by', admin.RelatedOnlyFieldListFilter), 'graded_at',
         'submission__assignment__course'
     ]
     search_fields = [
@@ -221,7 +225,7 @@ class AssignmentGradeAdmin(admin.ModelAdmin):
         'graded_by__username'
     ]
     readonly_fields = ['graded_at', 'grade_percentage', 'grade_letter']
-    date_hierarchy = 'graded_at'
+    ordering = ['-graded_at', '-pk']
     
     fieldsets = (
         ('Thông tin điểm', {
@@ -4,15 +4,17 @@ from django.utils import timezone
 from django.db.models import Count
 
 from ..models import LoginHistory, PasswordReset, AccountLockout
+from .mixins import LargeTableAdminMixin
 
 
 @admin.register(LoginHistory)
-class LoginHistoryAdmin(admin.ModelAdmin):
+class LoginHistoryAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """Admin cho LoginHistory"""
     list_display = ('user', 'login_time', 'logout_time', 'ip_address', 'success', 'session_duration')
-    list_filter = ('success', 'login_time', 'ip_address')
+    # Không lọc theo ip_address (SELECT DISTINCT cả bảng), tìm IP qua search_fields
+    list_filter = ('success', 'login_time')
     search_fields = ('user__username', 'user__first_name', 'user__last_name', 'ip_address')
-    ordering = ('-login_time',)
+    ordering = ('-login_time', '-pk')
     readonly_fields = ('user', 'login_time', 'logout_time', 'ip_address', 'user_agent', 'success', 'failure_reason')
     
     fieldsets = (
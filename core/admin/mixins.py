@@ -0,0 +1,98 @@
+"""
+Mixin cho changelist admin của các bảng lớn (bài nộp, điểm, đăng ký, lịch sử đăng nhập...)
+
+- EstimatedCountPaginator: khi changelist không lọc/tìm kiếm, lấy số dòng ước lượng từ
+  thống kê của database (pg_class.reltuples, sqlite_stat1, information_schema) thay vì
+  COUNT(*) quét cả bảng. Có lọc thì vẫn đếm chính xác.
+- LargeTableAdminMixin: dùng paginator trên và tắt COUNT(*) thứ hai của "tổng số" khi lọc.
+- count_subquery: cột đếm (số SV, số bài nộp...) bằng subquery tương quan, sort được qua
+  admin_order_field mà không JOIN + GROUP BY cả bảng con như annotate(Count(...)).
+
+Số dòng ước lượng có thể lệch so với thực tế (trang cuối thiếu hoặc dư vài dòng), bù lại
+mở changelist không còn phụ thuộc kích thước bảng. Ordering của các admin này nên theo
+cột có index + pk để LIMIT/OFFSET đi theo index thay vì sort cả bảng.
+"""
+import logging
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Count, IntegerField, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.functional import cached_property
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_row_count(model, using='default'):
+    """
+    Số dòng ước lượng của bảng theo thống kê của database
+
+    Returns:
+        Số dòng, hoặc None nếu backend không hỗ trợ / bảng chưa được ANALYZE
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)', [table])
+                row = cursor.fetchone()
+                # reltuples = -1 khi bảng chưa từng được VACUUM/ANALYZE (PostgreSQL 14+)
+                return int(row[0]) if row and row[0] is not None and row[0] >= 0 else None
+            if connection.vendor == 'sqlite':
+                # sqlite_stat1 chỉ có sau ANALYZE; số đầu tiên của cột stat là số dòng của bảng
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+                row = cursor.fetchone()
+                return int(row[0].split()[0]) if row else None
+            if connection.vendor == 'mysql':
+                cursor.execute(
+                    'SELECT table_rows FROM information_schema.tables '
+                    'WHERE table_schema = DATABASE() AND table_name = %s',
+                    [table]
+                )
+                row = cursor.fetchone()
+                return int(row[0]) if row and row[0] is not None else None
+    except DatabaseError as e:
+        logger.debug(f"Cannot estimate row count of {table}: {e}")
+    return None
+
+
+def count_subquery(queryset, field):
+    """
+    Annotation đếm số dòng của queryset trỏ tới object ngoài
+
+        Course.objects.annotate(enrolled_total=count_subquery(
+            CourseEnrollment.objects.filter(status='enrolled'), 'course'))
+
+    Args:
+        queryset: queryset của bảng con (có thể đã filter)
+        field: tên FK của bảng con trỏ tới model ngoài
+    """
+    counted = (
+        queryset.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator dùng số dòng ước lượng cho queryset không lọc của bảng lớn"""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where and not queryset.query.distinct:
+            estimate = estimate_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class LargeTableAdminMixin:
+    """Mixin cho ModelAdmin của bảng lớn: không COUNT(*) cả bảng khi phân trang"""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,38 @@
+"""
+Admin for notification models
+"""
+from django.contrib import admin
+
+from core.models import AssignmentReminder, Notification
+
+from .mixins import LargeTableAdminMixin
+
+
+@admin.register(Notification)
+class NotificationAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    """Admin cho Notification (thông báo gửi môn học hoặc từng user)"""
+    list_display = ('title', 'kind', 'course', 'recipient', 'created_at')
+    list_filter = ('kind',)
+    search_fields = ('title', 'course__code', 'recipient__username')
+    ordering = ('-id',)
+    raw_id_fields = ('course', 'recipient', 'assignment', 'actor')
+    list_per_page = 50
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('course', 'recipient')
+
+
+@admin.register(AssignmentReminder)
+class AssignmentReminderAdmin(admin.ModelAdmin):
+    """Admin cho AssignmentReminder (chỉ xem các lần nhắc hạn nộp đã gửi)"""
+    list_display = ('assignment', 'hours_before', 'recipient_count', 'sent_at')
+    list_filter = ('hours_before',)
+    search_fields = ('assignment__title', 'assignment__course__code')
+    raw_id_fields = ('assignment',)
+    list_select_related = ('assignment',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,36 @@
+"""
+Admin for outbox models
+"""
+from django.contrib import admin
+from django.utils import timezone
+
+from core.models import OutboundEmail
+
+from .mixins import LargeTableAdminMixin
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    """Admin cho OutboundEmail (hàng đợi email gửi đi)"""
+    list_display = ('to_email', 'kind', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at')
+    list_filter = ('status', 'kind')
+    search_fields = ('to_email',)
+    ordering = ('-id',)
+    # Context có thể chứa mật khẩu tạm nên không hiển thị
+    fields = ('kind', 'to_email', 'from_email', 'subject', 'status', 'attempts', 'next_attempt_at',
+              'last_error', 'created_at', 'sent_at')
+    readonly_fields = fields
+    list_per_page = 50
+
+    actions = ['retry_emails']
+
+    def has_add_permission(self, request):
+        return False
+
+    def retry_emails(self, request, queryset):
+        """Gửi lại các email thất bại / đang chờ ngay ở lần chạy kế tiếp của send_outbox"""
+        updated = queryset.filter(status__in=('pending', 'failed')).update(
+            status='pending', attempts=0, next_attempt_at=timezone.now(), claim_token=''
+        )
+        self.message_user(request, f'Đã xếp lại {updated} email để gửi.')
+    retry_emails.short_description = 'Gửi lại các email đã chọn'
@@ -6,7 +6,13 @@ from django.utils.html import format_html
 from django.utils import timezone
 from django.db.models import Count, Avg
 
-from core.models import Course, CourseEnrollment, Assignment, AssignmentSubmission, Grade, Tag, Note
+from core.models import (
+    Course, CourseEnrollment, Assignment, AssignmentSubmission, Grade, Tag, Note, StudentRiskScore
+)
+
+from core.utils.gradebook import build_gradebook, gradebook_response
+
+from .mixins import LargeTableAdminMixin, count_subquery
 
 
 class CourseEnrollmentInline(admin.TabularInline):
@@ -60,9 +66,10 @@ class CourseAdmin(admin.ModelAdmin):
     actions = ['activate_courses', 'complete_courses']
     
     def student_count(self, obj):
-        """Số lượng sinh viên đăng ký"""
-        return obj.enrolled_student_count
+        """Số lượng sinh viên đăng ký (annotate trong get_queryset)"""
+        return obj.enrolled_total
     student_count.short_description = 'Số SV'
+    student_count.admin_order_field = 'enrolled_total'
     
     def is_active(self, obj):
         """Kiểm tra môn học có đang diễn ra không"""
@@ -83,16 +90,18 @@ class CourseAdmin(admin.ModelAdmin):
     complete_courses.short_description = 'Hoàn thành khóa học đã chọn'
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('teacher').prefetch_related('students')
+        return super().get_queryset(request).select_related('teacher').annotate(
+            enrolled_total=count_subquery(CourseEnrollment.objects.filter(status='enrolled'), 'course')
+        )
 
 
 @admin.register(Grade)
-class GradeAdmin(admin.ModelAdmin):
+class GradeAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """Admin cho Grade với chức năng quản lý nâng cao"""
     list_display = ('student', 'course', 'grade_type', 'score', 'max_score', 'percentage', 'letter_grade', 'created_by', 'date')
     list_filter = ('grade_type', 'is_final', 'course__semester', 'course__academic_year', 'date')
     search_fields = ('student__username', 'student__first_name', 'student__last_name', 'course__name', 'course__code')
-    ordering = ('-date', 'course__name', 'student__username')
+    ordering = ('-date', '-pk')
     readonly_fields = ('percentage', 'letter_grade', 'created_at', 'updated_at')
     list_per_page = 25
     
@@ -131,8 +140,11 @@ class GradeAdmin(admin.ModelAdmin):
     mark_as_final.short_description = 'Đánh dấu là điểm cuối kỳ'
     
     def export_grades(self, request, queryset):
-        """Export điểm ra Excel (placeholder)"""
-        self.message_user(request, f'Export {queryset.count()} điểm (chức năng sẽ phát triển sau).')
+        """Export điểm đã chọn ra Excel: mỗi môn học một sheet sinh viên × đầu điểm"""
+        courses = Course.objects.filter(pk__in=queryset.values('course_id')).order_by('code')
+        gradebooks = [build_gradebook(course, grades=queryset) for course in courses]
+        filename = f"grades_export_{timezone.localdate():%Y%m%d}"
+        return gradebook_response(gradebooks, 'xlsx', filename)
     export_grades.short_description = 'Export điểm đã chọn'
     
     def get_queryset(self, request):
@@ -143,7 +155,7 @@ class GradeAdmin(admin.ModelAdmin):
 class TagAdmin(admin.ModelAdmin):
     """Admin cho Tag"""
     list_display = ('name', 'color_display', 'note_count', 'created_by', 'created_at')
-    list_filter = ('created_at', 'created_by')
+    list_filter = ('created_at', ('created_by', admin.RelatedOnlyFieldListFilter))
     search_fields = ('name', 'description')
     ordering = ('name',)
     readonly_fields = ('created_at', 'updated_at', 'note_count')
@@ -171,16 +183,19 @@ class TagAdmin(admin.ModelAdmin):
     color_display.short_description = 'Màu sắc'
     
     def note_count(self, obj):
-        """Số lượng note sử dụng tag này"""
-        return obj.notes.count()
+        """Số lượng note sử dụng tag này (annotate trong get_queryset)"""
+        return obj.note_total
     note_count.short_description = 'Số note'
+    note_count.admin_order_field = 'note_total'
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('created_by').prefetch_related('notes')
+        return super().get_queryset(request).select_related('created_by').annotate(
+            note_total=count_subquery(Note.tags.through.objects.all(), 'tag')
+        )
 
 
 @admin.register(Note)
-class NoteAdmin(admin.ModelAdmin):
+class NoteAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """Admin cho Note với chức năng quản lý nâng cao"""
     list_display = ('title', 'user', 'priority', 'is_important', 'is_pinned', 'is_public', 'course', 'tag_display', 'created_at')
     list_filter = ('priority', 'is_important', 'is_pinned', 'is_public', 'course', 'created_at')
@@ -247,12 +262,13 @@ class NoteAdmin(admin.ModelAdmin):
 
 
 @admin.register(CourseEnrollment)
-class CourseEnrollmentAdmin(admin.ModelAdmin):
+class CourseEnrollmentAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """Admin cho CourseEnrollment"""
     list_display = ('student', 'course', 'status', 'enrolled_at', 'final_grade', 'dropped_at')
     list_filter = ('status', 'enrolled_at', 'course__semester', 'course__academic_year')
     search_fields = ('student__username', 'student__first_name', 'student__last_name', 'course__name', 'course__code')
-    ordering = ('-enrolled_at',)
+    # enrolled_at là auto_now_add, không có index: pk tăng cùng thời gian đăng ký
+    ordering = ('-pk',)
     readonly_fields = ('enrolled_at', 'dropped_at')
     list_per_page = 25
     
@@ -293,4 +309,26 @@ class CourseEnrollmentAdmin(admin.ModelAdmin):
     fail_enrollments.short_description = 'Đánh dấu trượt cho đăng ký đã chọn'
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('student', 'course') 
\ No newline at end of file
+        return super().get_queryset(request).select_related('student', 'course') 
+
+
+@admin.register(StudentRiskScore)
+class StudentRiskScoreAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    """Admin (chỉ đọc) cho StudentRiskScore - dữ liệu do lệnh compute_risk_scores ghi"""
+    list_display = (
+        'student', 'course', 'score', 'level', 'grade_average', 'missing_ratio', 'late_ratio',
+        'days_inactive', 'computed_at',
+    )
+    list_filter = ('level', 'course__semester', 'course__academic_year')
+    search_fields = ('student__username', 'student__first_name', 'student__last_name', 'course__code')
+    ordering = ('-score',)
+    list_per_page = 50
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('student', 'course')
@@ -8,6 +8,8 @@ from django.utils.html import format_html
 
 from core.models import UserProfile, UserRole
 
+from .mixins import LargeTableAdminMixin
+
 
 class UserProfileInline(admin.StackedInline):
     """Inline cho UserProfile trong User admin"""
@@ -25,7 +27,7 @@ class UserRoleInline(admin.TabularInline):
     verbose_name_plural = 'Vai trò'
 
 
-class UserAdmin(BaseUserAdmin):
+class UserAdmin(LargeTableAdminMixin, BaseUserAdmin):
     """Custom User Admin với chức năng quản lý nâng cao"""
     inlines = [UserProfileInline, UserRoleInline]
     list_display = ('username', 'email', 'full_name', 'role', 'student_id', 'is_active', 'date_joined', 'last_login')
@@ -99,7 +101,7 @@ class UserAdmin(BaseUserAdmin):
 
 
 @admin.register(UserProfile)
-class UserProfileAdmin(admin.ModelAdmin):
+class UserProfileAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """Admin cho UserProfile"""
     list_display = ('user', 'role', 'student_id', 'department', 'year_of_study', 'is_verified', 'created_by', 'created_at')
     list_filter = ('role', 'department', 'is_verified', 'created_at')
@@ -4,8 +4,6 @@ from django.contrib import messages
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate, login, logout
 from django.utils.crypto import get_random_string
-from django.core.mail import send_mail
-from django.conf import settings
 from django.db import transaction
 from django.http import JsonResponse
 from django.core.paginator import Paginator
@@ -16,6 +14,7 @@ from django.utils import timezone
 import logging
 
 from .models import UserProfile
+from .utils.outbox import enqueue_email
 # Import forms directly from core.forms
 from core.forms import StudentAccountForm, TeacherAccountForm, BulkStudentAccountForm, UserSearchForm, BulkTeacherAccountForm
 
@@ -255,11 +254,9 @@ def create_student_account(request):
                     # Assign to class if selected
                     class_enrolled = form.cleaned_data.get('class_enrolled')
                     if class_enrolled:
+                        # Sĩ số lớp được cập nhật trong signal của UserProfile
                         profile.class_enrolled = class_enrolled
                         profile.save()
-                        # Cập nhật sĩ số lớp
-                        class_enrolled.update_student_count()
-                        class_enrolled.save()
                     
                     # Gửi email
                     if form.cleaned_data.get('send_welcome_email'):
@@ -380,7 +377,7 @@ def bulk_create_student_accounts(request):
                 csv_file = request.FILES['csv_file']
                 password_option = form.cleaned_data.get('password_option')
                 custom_password = form.cleaned_data.get('custom_password')
-                send_welcome_email = form.cleaned_data.get('send_welcome_email')
+                should_send_email = form.cleaned_data.get('send_welcome_email')
                 skip_errors = form.cleaned_data.get('skip_errors')
                 
                 # Xác định mật khẩu sẽ sử dụng
@@ -442,7 +439,7 @@ def bulk_create_student_accounts(request):
                             profile.save()
                             
                             # Gửi email
-                            if send_welcome_email:
+                            if should_send_email:
                                 send_welcome_email(user, password)
                             
                             success_count += 1
@@ -490,7 +487,7 @@ def bulk_create_teacher_accounts(request):
                 csv_file = request.FILES['csv_file']
                 password_option = form.cleaned_data.get('password_option')
                 custom_password = form.cleaned_data.get('custom_password')
-                send_welcome_email = form.cleaned_data.get('send_welcome_email')
+                should_send_email = form.cleaned_data.get('send_welcome_email')
                 skip_errors = form.cleaned_data.get('skip_errors')
                 
                 # Xác định mật khẩu sẽ sử dụng
@@ -546,7 +543,7 @@ def bulk_create_teacher_accounts(request):
                             profile.save()
                             
                             # Gửi email
-                            if send_welcome_email:
+                            if should_send_email:
                                 send_welcome_email(user, password)
                             
                             success_count += 1
@@ -677,34 +674,13 @@ def delete_user(request, user_id):
 
 
 def send_welcome_email(user, password):
-    """Gửi email chào mừng"""
-    try:
-        subject = 'Chào mừng đến với Hệ thống Quản lý Học tập'
-        message = f"""
-        Xin chào {user.get_full_name()}!
-        
-        Tài khoản của bạn đã được tạo thành công.
-        
-        Thông tin đăng nhập:
-        - Username: {user.username}
-        - Email: {user.email}
-        - Mật khẩu: {password}
-        
-        Vui lòng đăng nhập và đổi mật khẩu để bảo mật tài khoản.
-        
-        Trân trọng,
-        Đội ngũ quản trị
-        """
-        
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=True,
-        )
-    except Exception as e:
-        print(f"Lỗi gửi email: {str(e)}")
+    """Xếp email chào mừng vào outbox (gửi bởi lệnh send_outbox)"""
+    enqueue_email('welcome', user.email, {
+        'full_name': user.get_full_name(),
+        'username': user.username,
+        'email': user.email,
+        'password': password,
+    })
 
 
 # API Views cho AJAX
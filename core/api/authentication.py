@@ -0,0 +1,141 @@
+"""
+JWT authentication cho API
+Access token mang sẵn vai trò và phạm vi môn học của user (claims), nên phần
+xác thực và kiểm tra quyền của một request API không cần query database:
+
+- ClaimsRefreshToken: mỗi khi cấp access token (đăng nhập hoặc refresh) claims
+  được đọc mới từ database
+- ClaimsJWTAuthentication: xác thực không trạng thái, kiểm tra thu hồi qua cache
+- TokenClaimsUser: request.user dạng lazy, chỉ load User từ database khi view
+  thực sự cần model (ví dụ dùng trong filter của ORM hoặc gọi save())
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.utils.functional import SimpleLazyObject
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.utils.role_context import role_course_ids
+from core.utils.token_revocation import is_token_revoked
+
+ROLE_CLAIM = 'role'
+COURSES_CLAIM = 'courses'
+
+
+def build_user_claims(user_id):
+    """
+    Claims gắn vào access token: vai trò, quyền staff và danh sách môn học
+
+    Danh sách môn học chỉ có khi số môn không vượt JWT_COURSE_CLAIM_LIMIT, nếu
+    vượt thì permission sẽ kiểm tra bằng database như khi dùng session.
+    """
+    user = User.objects.select_related('profile').filter(pk=user_id).first()
+    if user is None:
+        return {}
+    profile = getattr(user, 'profile', None)
+    role = profile.role if profile else ''
+    claims = {
+        ROLE_CLAIM: role,
+        'username': user.username,
+        'is_staff': user.is_staff,
+        'is_superuser': user.is_superuser,
+    }
+
+    course_ids = role_course_ids(user_id, role)
+    if course_ids is None:
+        return claims
+
+    limit = getattr(settings, 'JWT_COURSE_CLAIM_LIMIT', 200)
+    course_ids = list(course_ids.order_by()[:limit + 1])
+    if len(course_ids) <= limit:
+        claims[COURSES_CLAIM] = sorted(set(course_ids))
+    return claims
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token cấp access token có claims mới nhất và tôn trọng danh sách thu hồi"""
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        user_id = self.payload.get(api_settings.USER_ID_CLAIM)
+        if user_id is not None:
+            access.payload.update(build_user_claims(user_id))
+        return access
+
+    def verify(self):
+        super().verify()
+        if is_token_revoked(self.payload, api_settings.USER_ID_CLAIM):
+            raise TokenError('Token đã bị thu hồi.')
+
+
+class TokenClaimsUser(SimpleLazyObject):
+    """
+    request.user cho request xác thực bằng JWT
+
+    Các thuộc tính id, pk, username, is_staff, is_superuser, role, course_ids lấy
+    từ token; truy cập thuộc tính khác (profile, email, save()...) sẽ load User.
+    """
+    is_active = True
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token):
+        # simplejwt lưu user_id dạng chuỗi, chuyển về kiểu của khóa chính để so sánh với *_id
+        user_id = User._meta.pk.to_python(token[api_settings.USER_ID_CLAIM])
+        super().__init__(lambda: User.objects.get(pk=user_id))
+        self.__dict__['token'] = token
+        self.__dict__['user_id'] = user_id
+
+    @property
+    def id(self):
+        return self.__dict__['user_id']
+
+    pk = id
+
+    @property
+    def username(self):
+        return self.token.get('username', '')
+
+    @property
+    def is_staff(self):
+        return self.token.get('is_staff', False)
+
+    @property
+    def is_superuser(self):
+        return self.token.get('is_superuser', False)
+
+    @property
+    def role(self):
+        return self.token.get(ROLE_CLAIM)
+
+    @property
+    def course_ids(self):
+        """Tập id môn học trong token, None nếu token không có claim này"""
+        courses = self.token.get(COURSES_CLAIM)
+        return set(courses) if courses is not None else None
+
+    def __bool__(self):
+        # Không load User khi DRF kiểm tra "request.user and request.user.is_authenticated"
+        return True
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __str__(self):
+        return self.username or f"TokenUser {self.id}"
+
+
+class ClaimsJWTAuthentication(JWTStatelessUserAuthentication):
+    """Xác thực JWT không query database; token bị thu hồi được kiểm tra trong cache"""
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if is_token_revoked(validated_token.payload, api_settings.USER_ID_CLAIM):
+            raise InvalidToken({
+                'detail': 'Token đã bị thu hồi.',
+                'code': 'token_revoked',
+            })
+        return validated_token
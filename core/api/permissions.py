@@ -1,8 +1,88 @@
 """
 Custom permissions for API
+
+Với request dùng JWT, vai trò và danh sách môn học được đọc từ claims của access
+token (request.user là TokenClaimsUser) nên không cần load profile; với session
+thì đọc từ request.role_context (core/utils/role_context.py).
 """
 from rest_framework.permissions import BasePermission
 
+from core.api.authentication import TokenClaimsUser
+from core.utils.role_context import get_request_role_context
+
+
+def get_user_role(request):
+    """Vai trò của user hiện tại ('admin', 'teacher', 'student') hoặc None"""
+    user = request.user
+    if not user or not user.is_authenticated:
+        return None
+    role = getattr(user, 'role', None)
+    if role is None:
+        role = get_request_role_context(request).role
+    return role
+
+
+def is_admin_request(request):
+    """Superuser hoặc user có vai trò admin"""
+    user = request.user
+    if not user or not user.is_authenticated:
+        return False
+    return user.is_superuser or get_user_role(request) == 'admin'
+
+
+def get_course_scope(request):
+    """Tập id môn học (môn đang dạy / đã đăng ký) trong token hoặc role context, None nếu không có"""
+    if isinstance(request.user, TokenClaimsUser):
+        return request.user.course_ids
+    return get_request_role_context(request).course_ids
+
+
+def in_course_scope(request, course_id, db_check):
+    """
+    Kiểm tra quyền với một môn học: dùng claims nếu môn có trong token, nếu không
+    thì hỏi database (môn được gán sau khi token được cấp)
+    """
+    course_ids = get_course_scope(request)
+    if course_ids is not None and course_id in course_ids:
+        return True
+    return db_check()
+
+
+def _course_id_of(obj):
+    """Id môn học của Course hoặc của object có trường course (Assignment, Grade...)"""
+    if hasattr(obj, 'teacher'):  # Course
+        return obj.pk
+    return obj.course_id
+
+
+def _teaches(request, obj):
+    user_id = request.user.id
+    if hasattr(obj, 'teacher'):  # Course
+        return obj.teacher_id == user_id
+    return in_course_scope(request, obj.course_id, lambda: obj.course.teacher_id == user_id)
+
+
+def _teaches_or_assists(request, obj):
+    """
+    Giảng viên chính hoặc trợ giảng (assistant_teachers) của môn, giống các view dashboard
+    giảng viên; claims chỉ chứa môn dạy chính nên trợ giảng được kiểm tra bằng database
+    """
+    user_id = request.user.id
+
+    def db_check():
+        course = obj if hasattr(obj, 'teacher') else obj.course  # Course
+        return course.teacher_id == user_id or course.assistant_teachers.filter(id=user_id).exists()
+
+    return in_course_scope(request, _course_id_of(obj), db_check)
+
+
+def _is_enrolled(request, obj):
+    course_id = _course_id_of(obj)
+    course = obj if hasattr(obj, 'teacher') else obj.course
+    return in_course_scope(
+        request, course_id, lambda: course.students.filter(id=request.user.id).exists()
+    )
+
 
 class IsOwnerOrReadOnly(BasePermission):
     """
@@ -12,9 +92,9 @@ class IsOwnerOrReadOnly(BasePermission):
         # Read permissions cho tất cả requests
         if request.method in ['GET', 'HEAD', 'OPTIONS']:
             return True
-        
+
         # Write permissions chỉ cho owner
-        return obj.user == request.user
+        return obj.user_id == request.user.id
 
 
 class IsTeacherOrAdmin(BasePermission):
@@ -22,28 +102,13 @@ class IsTeacherOrAdmin(BasePermission):
     Permission chỉ cho Teacher hoặc Admin
     """
     def has_permission(self, request, view):
-        if not request.user.is_authenticated:
-            return False
-        
-        try:
-            profile = request.user.profile
-            return profile.role in ['teacher', 'admin']
-        except:
-            return False
+        return get_user_role(request) in ['teacher', 'admin']
 
 
 class IsAdminOnly(BasePermission):
     """Chỉ cho phép admin (hoặc superuser)"""
     def has_permission(self, request, view):
-        if not request.user or not request.user.is_authenticated:
-            return False
-        # Allow Django superuser
-        if request.user.is_superuser:
-            return True
-        try:
-            return hasattr(request.user, 'profile') and request.user.profile.role == 'admin'
-        except Exception:
-            return False
+        return is_admin_request(request)
 
 
 class IsStudentOnly(BasePermission):
@@ -51,14 +116,7 @@ class IsStudentOnly(BasePermission):
     Permission chỉ cho Student
     """
     def has_permission(self, request, view):
-        if not request.user.is_authenticated:
-            return False
-        
-        try:
-            profile = request.user.profile
-            return profile.role == 'student'
-        except:
-            return False
+        return get_user_role(request) == 'student'
 
 
 class IsCourseTeacherOrAdmin(BasePermission):
@@ -66,27 +124,35 @@ class IsCourseTeacherOrAdmin(BasePermission):
     Permission cho Teacher của course hoặc Admin
     """
     def has_object_permission(self, request, view, obj):
-        if not request.user.is_authenticated:
-            return False
-        
-        try:
-            profile = request.user.profile
-            
-            # Admin có full quyền
-            if profile.role == 'admin':
-                return True
-            
-            # Teacher chỉ có quyền với course của mình
-            if profile.role == 'teacher':
-                # Xử lý các model khác nhau
-                if hasattr(obj, 'teacher'):  # Course
-                    return obj.teacher == request.user
-                elif hasattr(obj, 'course'):  # Assignment, Grade, etc
-                    return obj.course.teacher == request.user
-                
-            return False
-        except:
-            return False
+        role = get_user_role(request)
+
+        # Admin có full quyền
+        if role == 'admin':
+            return True
+
+        # Teacher chỉ có quyền với course của mình
+        if role == 'teacher':
+            return _teaches(request, obj)
+
+        return False
+
+
+class IsCourseStaffOrAdmin(BasePermission):
+    """
+    Permission cho giảng viên chính, trợ giảng của course hoặc Admin (gradebook);
+    sửa / xóa course và assignment vẫn chỉ dành cho giảng viên chính (IsCourseTeacherOrAdmin,
+    CanManageAssignment)
+    """
+    def has_object_permission(self, request, view, obj):
+        role = get_user_role(request)
+
+        if role == 'admin':
+            return True
+
+        if role == 'teacher':
+            return _teaches_or_assists(request, obj)
+
+        return False
 
 
 class IsEnrolledStudentOrTeacherOrAdmin(BasePermission):
@@ -94,33 +160,21 @@ class IsEnrolledStudentOrTeacherOrAdmin(BasePermission):
     Permission cho sinh viên đã đăng ký course, teacher của course, hoặc admin
     """
     def has_object_permission(self, request, view, obj):
-        if not request.user.is_authenticated:
-            return False
-        
-        try:
-            profile = request.user.profile
-            
-            # Admin có full quyền
-            if profile.role == 'admin':
-                return True
-            
-            # Teacher có quyền với course của mình
-            if profile.role == 'teacher':
-                if hasattr(obj, 'teacher'):  # Course
-                    return obj.teacher == request.user
-                elif hasattr(obj, 'course'):  # Assignment, Grade, etc
-                    return obj.course.teacher == request.user
-            
-            # Student chỉ có quyền với course đã đăng ký
-            if profile.role == 'student':
-                if hasattr(obj, 'students'):  # Course
-                    return obj.students.filter(id=request.user.id).exists()
-                elif hasattr(obj, 'course'):  # Assignment, Grade, etc
-                    return obj.course.students.filter(id=request.user.id).exists()
-            
-            return False
-        except:
-            return False
+        role = get_user_role(request)
+
+        # Admin có full quyền
+        if role == 'admin':
+            return True
+
+        # Teacher có quyền với course của mình
+        if role == 'teacher':
+            return _teaches(request, obj)
+
+        # Student chỉ có quyền với course đã đăng ký
+        if role == 'student':
+            return _is_enrolled(request, obj)
+
+        return False
 
 
 class CanManageAssignment(BasePermission):
@@ -128,28 +182,21 @@ class CanManageAssignment(BasePermission):
     Permission cho việc quản lý assignment
     """
     def has_object_permission(self, request, view, obj):
-        if not request.user.is_authenticated:
-            return False
-        
-        try:
-            profile = request.user.profile
-            
-            # Admin có full quyền
-            if profile.role == 'admin':
-                return True
-            
-            # Teacher có quyền với assignment của course mình dạy
-            if profile.role == 'teacher':
-                return obj.course.teacher == request.user
-            
-            # Student chỉ có quyền xem (không edit/delete)
-            if profile.role == 'student':
-                if request.method in ['GET', 'HEAD', 'OPTIONS']:
-                    return obj.course.students.filter(id=request.user.id).exists()
-            
-            return False
-        except:
-            return False
+        role = get_user_role(request)
+
+        # Admin có full quyền
+        if role == 'admin':
+            return True
+
+        # Teacher có quyền với assignment của course mình dạy
+        if role == 'teacher':
+            return _teaches(request, obj)
+
+        # Student chỉ có quyền xem (không edit/delete)
+        if role == 'student' and request.method in ['GET', 'HEAD', 'OPTIONS']:
+            return _is_enrolled(request, obj)
+
+        return False
 
 
 class CanSubmitAssignment(BasePermission):
@@ -157,18 +204,11 @@ class CanSubmitAssignment(BasePermission):
     Permission cho việc nộp bài
     """
     def has_permission(self, request, view):
-        if not request.user.is_authenticated:
-            return False
-        
-        try:
-            profile = request.user.profile
-            return profile.role == 'student'
-        except:
-            return False
-    
+        return get_user_role(request) == 'student'
+
     def has_object_permission(self, request, view, obj):
         # Student chỉ có thể edit/delete submission của mình
-        return obj.student == request.user
+        return obj.student_id == request.user.id
 
 
 class CanGradeAssignment(BasePermission):
@@ -176,11 +216,4 @@ class CanGradeAssignment(BasePermission):
     Permission cho việc chấm điểm
     """
     def has_permission(self, request, view):
-        if not request.user.is_authenticated:
-            return False
-        
-        try:
-            profile = request.user.profile
-            return profile.role in ['teacher', 'admin']
-        except:
-            return False 
\ No newline at end of file
+        return get_user_role(request) in ['teacher', 'admin']
@@ -6,14 +6,16 @@ Serializers package - DRF serializers
 from .user_serializers import (
     UserProfileSerializer, UserSerializer, UserCreateSerializer,
     UserRoleSerializer, StudentAccountRequestSerializer,
-    StudentAccountRequestCreateSerializer, PasswordChangeSerializer
+    StudentAccountRequestCreateSerializer, PasswordChangeSerializer,
+    ClaimsTokenObtainPairSerializer, ClaimsTokenRefreshSerializer
 )
 
 # Study serializers
 from .study_serializers import (
     TagSerializer, CourseSerializer, CourseEnrollmentSerializer,
     AssignmentSerializer, AssignmentSubmissionSerializer, GradeSerializer,
-    NoteSerializer, NoteCreateSerializer, BulkEnrollmentSerializer,
+    GradebookCellEditSerializer, GradebookPatchSerializer,
+    NoteSerializer, NoteCreateSerializer, BulkEnrollmentSerializer, ClassRosterSerializer,
     CourseAnalyticsSerializer, StudentPerformanceSerializer
 )
 
@@ -22,10 +24,12 @@ __all__ = [
     'UserProfileSerializer', 'UserSerializer', 'UserCreateSerializer',
     'UserRoleSerializer', 'StudentAccountRequestSerializer',
     'StudentAccountRequestCreateSerializer', 'PasswordChangeSerializer',
+    'ClaimsTokenObtainPairSerializer', 'ClaimsTokenRefreshSerializer',
     
     # Study serializers
     'TagSerializer', 'CourseSerializer', 'CourseEnrollmentSerializer',
     'AssignmentSerializer', 'AssignmentSubmissionSerializer', 'GradeSerializer',
-    'NoteSerializer', 'NoteCreateSerializer', 'BulkEnrollmentSerializer',
+    'GradebookCellEditSerializer', 'GradebookPatchSerializer',
+    'NoteSerializer', 'NoteCreateSerializer', 'BulkEnrollmentSerializer', 'ClassRosterSerializer',
     'CourseAnalyticsSerializer', 'StudentPerformanceSerializer',
 ] 
\ No newline at end of file
@@ -3,6 +3,7 @@ Study Management API Serializers
 """
 from rest_framework import serializers
 from core.models import Course, CourseEnrollment, Assignment, AssignmentSubmission, Grade, Tag, Note
+from core.utils.gradebook import MAX_EDITS_PER_REQUEST, parse_assessment_id
 from .user_serializers import UserSerializer
 from django.contrib.auth.models import User
 
@@ -159,6 +160,37 @@ class GradeSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class GradebookCellEditSerializer(serializers.Serializer):
+    """
+    Một ô sửa trong PATCH gradebook grid: grade + version để sửa điểm đã có,
+    hoặc student + assessment ('assignment:<id>' / 'type:<grade_type>') để nhập ô trống
+    """
+    grade = serializers.IntegerField(required=False)
+    version = serializers.IntegerField(required=False, min_value=1)
+    student = serializers.IntegerField(required=False)
+    assessment = serializers.CharField(required=False)
+    score = serializers.DecimalField(max_digits=5, decimal_places=2)
+    max_score = serializers.DecimalField(max_digits=5, decimal_places=2, required=False)
+    weight = serializers.DecimalField(max_digits=3, decimal_places=2, required=False)
+    comment = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    
+    def validate(self, attrs):
+        if attrs.get('grade') is not None:
+            if attrs.get('version') is None:
+                raise serializers.ValidationError({'version': 'Bắt buộc khi sửa điểm đã có.'})
+            return attrs
+        if attrs.get('student') is None or not attrs.get('assessment'):
+            raise serializers.ValidationError('Cần grade + version (sửa điểm) hoặc student + assessment (nhập ô trống).')
+        if parse_assessment_id(attrs['assessment']) is None:
+            raise serializers.ValidationError({'assessment': "Dạng 'assignment:<id>' hoặc 'type:<loại điểm>'."})
+        return attrs
+
+
+class GradebookPatchSerializer(serializers.Serializer):
+    """Lô ô sửa của gradebook grid"""
+    cells = GradebookCellEditSerializer(many=True, allow_empty=False, max_length=MAX_EDITS_PER_REQUEST)
+
+
 class NoteSerializer(serializers.ModelSerializer):
     """Serializer cho Note"""
     user_name = serializers.CharField(source='user.get_full_name', read_only=True)
@@ -223,13 +255,28 @@ class BulkEnrollmentSerializer(serializers.Serializer):
     )
 
 
+class ClassRosterSerializer(serializers.Serializer):
+    """Lô sinh viên thêm vào / xóa khỏi một lớp (Class)"""
+    action = serializers.ChoiceField(choices=['add', 'remove'])
+    student_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        min_length=1
+    )
+
+
 class CourseAnalyticsSerializer(serializers.Serializer):
     """Serializer cho analytics môn học"""
     total_students = serializers.IntegerField()
     active_students = serializers.IntegerField()
     completed_students = serializers.IntegerField()
     dropped_students = serializers.IntegerField()
+    # Điểm hệ 10, trung bình có trọng số (core/utils/analytics.py)
     average_grade = serializers.DecimalField(max_digits=5, decimal_places=2)
+    median_grade = serializers.DecimalField(max_digits=5, decimal_places=2)
+    grade_std_dev = serializers.DecimalField(max_digits=5, decimal_places=2)
+    pass_rate = serializers.DecimalField(max_digits=5, decimal_places=2)
+    quantiles = serializers.DictField(child=serializers.FloatField())
+    grade_distribution = serializers.ListField(child=serializers.DictField())
     assignment_count = serializers.IntegerField()
     completion_rate = serializers.DecimalField(max_digits=5, decimal_places=2)
 
@@ -2,8 +2,10 @@
 User API Serializers
 """
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
 from django.contrib.auth.models import User
 from core.models import UserProfile, UserRole, StudentAccountRequest
+from ..authentication import ClaimsRefreshToken
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
@@ -136,4 +138,14 @@ class PasswordChangeSerializer(serializers.Serializer):
         if not user.check_password(attrs['old_password']):
             raise serializers.ValidationError("Mật khẩu cũ không đúng.")
         
-        return attrs 
\ No newline at end of file
+        return attrs 
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Cấp cặp token, access token có claims vai trò và môn học"""
+    token_class = ClaimsRefreshToken
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh token, claims của access token mới được đọc lại từ database"""
+    token_class = ClaimsRefreshToken
@@ -10,7 +10,7 @@ from rest_framework_simplejwt.views import (
 )
 
 from .views.user_views import (
-    CustomTokenObtainPairView, UserListCreateView, UserDetailView,
+    CustomTokenObtainPairView, TokenLogoutView, UserListCreateView, UserDetailView,
     CurrentUserView, UserProfileUpdateView, PasswordChangeView,
     UserRoleListCreateView, UserRoleDetailView,
     StudentAccountRequestListCreateView, StudentAccountRequestDetailView,
@@ -21,17 +21,24 @@ from .views.study_views import (
     CourseListCreateView, CourseDetailView, enroll_course, drop_course,
     AssignmentListCreateView, AssignmentDetailView, publish_assignment,
     AssignmentSubmissionListCreateView, AssignmentSubmissionDetailView,
-    GradeListCreateView, GradeDetailView,
+    GradeListCreateView, GradeDetailView, CourseGradebookView, ClassRosterView,
     TagListCreateView, TagDetailView,
     NoteListCreateView, NoteDetailView,
     course_analytics
 )
 
+from .views.notification_views import notification_list, notification_unread_count, mark_notifications_read
+
+from core.views import async_views
+
 app_name = 'api'
 
 # Auth URLs
 auth_urlpatterns = [
     path('auth/login/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
+    # /api/auth/login/ trùng với LoginView (session) trong core.urls, client JWT dùng auth/token/
+    path('auth/token/', CustomTokenObtainPairView.as_view(), name='token_obtain'),
+    path('auth/token/logout/', TokenLogoutView.as_view(), name='token_logout'),
     path('auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('auth/verify/', TokenVerifyView.as_view(), name='token_verify'),
     path('auth/password/change/', PasswordChangeView.as_view(), name='password_change'),
@@ -63,6 +70,12 @@ course_urlpatterns = [
     path('courses/<int:pk>/enroll/', enroll_course, name='enroll_course'),
     path('courses/<int:pk>/drop/', drop_course, name='drop_course'),
     path('courses/<int:pk>/analytics/', course_analytics, name='course_analytics'),
+    path('courses/<int:pk>/gradebook/', CourseGradebookView.as_view(), name='course_gradebook'),
+]
+
+# Class URLs
+class_urlpatterns = [
+    path('classes/<int:pk>/roster/', ClassRosterView.as_view(), name='class_roster'),
 ]
 
 # Assignment URLs
@@ -96,6 +109,23 @@ note_urlpatterns = [
     path('notes/<int:pk>/', NoteDetailView.as_view(), name='note_detail'),
 ]
 
+# Notification URLs
+notification_urlpatterns = [
+    path('notifications/', notification_list, name='notification_list'),
+    path('notifications/unread-count/', notification_unread_count, name='notification_unread_count'),
+    path('notifications/mark-read/', mark_notifications_read, name='mark_notifications_read'),
+]
+
+# Async (ASGI) read-only endpoints
+async_urlpatterns = [
+    path('async/admin/stats/', async_views.admin_stats_api, name='async_admin_stats'),
+    path('async/admin/activity-data/', async_views.admin_activity_data_api, name='async_admin_activity_data'),
+    path('async/courses/<int:pk>/analytics/', async_views.course_analytics, name='async_course_analytics'),
+    path('async/users/search/', async_views.user_search_api, name='async_user_search'),
+    path('async/classes/search/', async_views.admin_search_classes, name='async_class_search'),
+    path('async/notifications/stream/', async_views.notification_stream, name='async_notification_stream'),
+]
+
 # Combine all URL patterns
 urlpatterns = [
     # Auth
@@ -107,6 +137,9 @@ urlpatterns = [
     # Courses
     *course_urlpatterns,
     
+    # Classes
+    *class_urlpatterns,
+    
     # Assignments
     *assignment_urlpatterns,
     
@@ -121,4 +154,10 @@ urlpatterns = [
     
     # Notes
     *note_urlpatterns,
+    
+    # Notifications
+    *notification_urlpatterns,
+    
+    # Async read-only endpoints
+    *async_urlpatterns,
 ] 
\ No newline at end of file
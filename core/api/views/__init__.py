@@ -3,4 +3,5 @@ Views package - API views
 """
 
 from .user_views import *
-from .study_views import * 
\ No newline at end of file
+from .study_views import *
+from .notification_views import *
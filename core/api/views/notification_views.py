@@ -0,0 +1,57 @@
+"""
+Notification API Views
+"""
+from django.conf import settings
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from core.utils.notifications import list_notifications, mark_read, serialize_notification, unread_count
+
+
+def _optional_id(value):
+    """id dạng chuỗi trong query / body, None nếu không có hoặc không hợp lệ"""
+    if isinstance(value, int) or (isinstance(value, str) and value.isdigit()):
+        return int(value)
+    return None
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def notification_list(request):
+    """
+    Thông báo của user hiện tại, mới nhất trước
+
+    Phân trang theo keyset: ?before=<next_before của trang trước>&limit=<tối đa 100>
+    """
+    limit = min(_optional_id(request.query_params.get('limit')) or settings.NOTIFICATION_PAGE_SIZE, 100)
+    notifications, next_before = list_notifications(
+        request.user.id, before=_optional_id(request.query_params.get('before')), limit=limit
+    )
+    return Response({
+        'results': [serialize_notification(notification) for notification in notifications],
+        'next_before': next_before,
+        'unread_count': unread_count(request.user.id),
+    })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def notification_unread_count(request):
+    """Số thông báo chưa đọc (đọc từ cache nếu không có thông báo mới)"""
+    return Response({'unread_count': unread_count(request.user.id)})
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def mark_notifications_read(request):
+    """
+    Đánh dấu đã đọc
+
+    Body: {"up_to": <id>} - mọi thông báo có id <= up_to; bỏ trống để đánh dấu tất cả
+    """
+    up_to = request.data.get('up_to')
+    if up_to is not None and _optional_id(up_to) is None:
+        return Response({'error': 'up_to phải là id của thông báo.'}, status=status.HTTP_400_BAD_REQUEST)
+    last_read_id = mark_read(request.user.id, up_to=_optional_id(up_to))
+    return Response({'last_read_id': last_read_id, 'unread_count': unread_count(request.user.id)})
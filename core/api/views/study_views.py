@@ -5,25 +5,31 @@ from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db.models import Q, Avg, Count
+from django.db.models import Q, Count
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
 from django.utils import timezone
 
+from core.db_router import read_replica
+from core.utils.analytics import grade_summary
+from core.utils.gradebook import GradebookEditError, apply_gradebook_edits, build_gradebook
+from core.utils.query_metrics import query_budget
+from core.utils.roster import ClassFullError, RosterError, assign_students, remove_students
 from core.models import (
     Course, CourseEnrollment, Assignment, AssignmentSubmission,
-    Grade, Tag, Note
+    Grade, Tag, Note, Class
 )
 from ..serializers import (
     CourseSerializer, CourseEnrollmentSerializer, AssignmentSerializer,
-    AssignmentSubmissionSerializer, GradeSerializer, TagSerializer,
-    NoteSerializer, NoteCreateSerializer, BulkEnrollmentSerializer,
+    AssignmentSubmissionSerializer, GradeSerializer, GradebookPatchSerializer, TagSerializer,
+    NoteSerializer, NoteCreateSerializer, BulkEnrollmentSerializer, ClassRosterSerializer,
     CourseAnalyticsSerializer, StudentPerformanceSerializer
 )
 from ..permissions import (
-    IsTeacherOrAdmin, IsAdminOnly, IsCourseTeacherOrAdmin,
+    IsTeacherOrAdmin, IsAdminOnly, IsCourseTeacherOrAdmin, IsCourseStaffOrAdmin,
     IsEnrolledStudentOrTeacherOrAdmin, CanManageAssignment,
-    CanSubmitAssignment, CanGradeAssignment, IsOwnerOrReadOnly
+    CanSubmitAssignment, CanGradeAssignment, IsOwnerOrReadOnly,
+    get_user_role, in_course_scope
 )
 
 
@@ -52,20 +58,21 @@ class CourseListCreateView(generics.ListCreateAPIView):
     
     def get_queryset(self):
         user = self.request.user
+        role = get_user_role(self.request)
         queryset = super().get_queryset()
         
         # Admin xem tất cả
-        if hasattr(user, 'profile') and user.profile.role == 'admin':
+        if role == 'admin':
             return queryset
         
         # Teacher chỉ xem course mình phụ trách hoặc hỗ trợ
-        if hasattr(user, 'profile') and user.profile.role == 'teacher':
-            return queryset.filter(Q(teacher=user) | Q(assistant_teachers=user)).distinct()
+        if role == 'teacher':
+            return queryset.filter(Q(teacher_id=user.id) | Q(assistant_teachers__id=user.id)).distinct()
         
         # Student: thấy các môn đã đăng ký hoặc phù hợp với năm học của họ, hoặc môn tự chọn (không gắn năm học)
-        if hasattr(user, 'profile') and user.profile.role == 'student':
+        if role == 'student':
             return queryset.filter(
-                Q(students=user) |
+                Q(students__id=user.id) |
                 Q(academic_year=user.profile.academic_year) |
                 Q(academic_year__isnull=True)
             ).distinct()
@@ -94,7 +101,7 @@ def enroll_course(request, pk):
     """
     Sinh viên đăng ký môn học
     """
-    if request.user.profile.role != 'student':
+    if get_user_role(request) != 'student':
         return Response({
             'error': 'Chỉ sinh viên mới có thể đăng ký môn học.'
         }, status=status.HTTP_403_FORBIDDEN)
@@ -187,19 +194,20 @@ class AssignmentListCreateView(generics.ListCreateAPIView):
     
     def get_queryset(self):
         user = self.request.user
+        role = get_user_role(self.request)
         queryset = super().get_queryset()
         
         # Admin xem tất cả
-        if user.profile.role == 'admin':
+        if role == 'admin':
             return queryset
         
         # Teacher chỉ xem assignment của course mình dạy
-        elif user.profile.role == 'teacher':
-            return queryset.filter(course__teacher=user)
+        elif role == 'teacher':
+            return queryset.filter(course__teacher_id=user.id)
         
         # Student chỉ xem assignment của course đã đăng ký
-        elif user.profile.role == 'student':
-            return queryset.filter(course__students=user)
+        elif role == 'student':
+            return queryset.filter(course__students__id=user.id)
         
         return queryset.none()
 
@@ -223,8 +231,8 @@ def publish_assignment(request, pk):
         assignment = Assignment.objects.get(pk=pk)
         
         # Kiểm tra quyền
-        if (request.user.profile.role == 'teacher' and 
-            assignment.course.teacher != request.user):
+        if (get_user_role(request) == 'teacher' and 
+            assignment.course.teacher_id != request.user.id):
             return Response({
                 'error': 'Không có quyền.'
             }, status=status.HTTP_403_FORBIDDEN)
@@ -269,17 +277,18 @@ class AssignmentSubmissionListCreateView(generics.ListCreateAPIView):
     
     def get_queryset(self):
         user = self.request.user
+        role = get_user_role(self.request)
         queryset = super().get_queryset()
         
         # Admin và Teacher xem submission của course mình dạy
-        if user.profile.role in ['admin', 'teacher']:
-            if user.profile.role == 'teacher':
-                return queryset.filter(assignment__course__teacher=user)
+        if role in ['admin', 'teacher']:
+            if role == 'teacher':
+                return queryset.filter(assignment__course__teacher_id=user.id)
             return queryset
         
         # Student chỉ xem submission của mình
-        elif user.profile.role == 'student':
-            return queryset.filter(student=user)
+        elif role == 'student':
+            return queryset.filter(student_id=user.id)
         
         return queryset.none()
 
@@ -318,19 +327,20 @@ class GradeListCreateView(generics.ListCreateAPIView):
     
     def get_queryset(self):
         user = self.request.user
+        role = get_user_role(self.request)
         queryset = super().get_queryset()
         
         # Admin xem tất cả
-        if user.profile.role == 'admin':
+        if role == 'admin':
             return queryset
         
         # Teacher xem grade của course mình dạy
-        elif user.profile.role == 'teacher':
-            return queryset.filter(course__teacher=user)
+        elif role == 'teacher':
+            return queryset.filter(course__teacher_id=user.id)
         
         # Student chỉ xem grade của mình
-        elif user.profile.role == 'student':
-            return queryset.filter(student=user)
+        elif role == 'student':
+            return queryset.filter(student_id=user.id)
         
         return queryset.none()
 
@@ -346,6 +356,81 @@ class GradeDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticated, CanGradeAssignment]
 
 
+@query_budget(10)
+class CourseGradebookView(APIView):
+    """
+    Gradebook grid của môn học (giảng viên chính, trợ giảng của môn hoặc admin)
+
+    GET: ma trận sinh viên × đầu điểm dạng mảng theo cột (?class=<id lớp> để lọc một lớp)
+    PATCH: {"cells": [...]} - một lô ô sửa, ghi trong một transaction; 400 nếu có ô không
+    hợp lệ, 409 nếu có ô đã bị sửa sau khi tải (version cũ), khi đó không ô nào được ghi
+    """
+    permission_classes = [permissions.IsAuthenticated, CanGradeAssignment, IsCourseStaffOrAdmin]
+    
+    def get_course(self, pk):
+        course = generics.get_object_or_404(Course.objects.all(), pk=pk)
+        self.check_object_permissions(self.request, course)
+        return course
+    
+    def get(self, request, pk):
+        course = self.get_course(pk)
+        student_class = request.query_params.get('class') or None
+        if student_class is not None and not student_class.isdigit():
+            return Response({'error': 'class phải là id của lớp.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(build_gradebook(course, student_class=student_class).to_columns())
+    
+    def patch(self, request, pk):
+        course = self.get_course(pk)
+        serializer = GradebookPatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        try:
+            result = apply_gradebook_edits(course, serializer.validated_data['cells'], request.user)
+        except GradebookEditError as e:
+            if e.conflicts:
+                return Response({
+                    'error': 'Một số ô đã được sửa sau khi tải gradebook.',
+                    'conflicts': e.conflicts,
+                    'errors': e.errors,
+                }, status=status.HTTP_409_CONFLICT)
+            return Response({'errors': e.errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+
+# =============================================================================
+# CLASS ROSTER VIEWS
+# =============================================================================
+
+class ClassRosterView(APIView):
+    """
+    Xếp lớp hàng loạt (admin)
+
+    POST: {"action": "add" | "remove", "student_ids": [...]} - cả lô được áp dụng trong một
+    transaction; 400 nếu có id không phải sinh viên (hoặc không thuộc lớp khi xóa), 409 nếu
+    lớp không đủ chỗ, khi đó không sinh viên nào bị chuyển
+    """
+    permission_classes = [IsAdminOnly]
+    
+    def post(self, request, pk):
+        class_obj = generics.get_object_or_404(Class.objects.all(), pk=pk)
+        serializer = ClassRosterSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        student_ids = serializer.validated_data['student_ids']
+        
+        try:
+            if serializer.validated_data['action'] == 'add':
+                result = assign_students(student_ids, class_obj)
+            else:
+                result = remove_students(student_ids, from_class=class_obj)
+                class_obj.refresh_from_db(fields=['current_students'])
+                result['current_students'] = class_obj.current_students
+        except ClassFullError as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+        except RosterError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({**result, 'max_students': class_obj.max_students})
+
+
 # =============================================================================
 # TAG & NOTE VIEWS
 # =============================================================================
@@ -393,7 +478,7 @@ class NoteListCreateView(generics.ListCreateAPIView):
         
         # Chỉ xem note của mình và note public
         return queryset.filter(
-            Q(user=user) | Q(is_public=True)
+            Q(user_id=user.id) | Q(is_public=True)
         )
 
 
@@ -412,6 +497,7 @@ class NoteDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@read_replica
 def course_analytics(request, pk):
     """
     Analytics của một course
@@ -421,22 +507,34 @@ def course_analytics(request, pk):
         
         # Kiểm tra quyền
         user = request.user
-        if (user.profile.role == 'teacher' and course.teacher != user) or \
-           (user.profile.role == 'student' and not course.students.filter(id=user.id).exists()):
-            if user.profile.role != 'admin':
+        role = get_user_role(request)
+        if (role == 'teacher' and course.teacher_id != user.id) or \
+           (role == 'student' and not in_course_scope(
+               request, course.pk, lambda: course.students.filter(id=user.id).exists())):
+            if role != 'admin':
                 return Response({
                     'error': 'Không có quyền truy cập.'
                 }, status=status.HTTP_403_FORBIDDEN)
         
-        enrollments = course.enrollments.all()
-        grades = course.grades.all()
+        enrollments = course.enrollments.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(status='enrolled')),
+            completed=Count('id', filter=Q(status='completed')),
+            dropped=Count('id', filter=Q(status='dropped')),
+        )
+        grades = grade_summary('course', course.pk)
         
         analytics_data = {
-            'total_students': enrollments.count(),
-            'active_students': enrollments.filter(status='enrolled').count(),
-            'completed_students': enrollments.filter(status='completed').count(),
-            'dropped_students': enrollments.filter(status='dropped').count(),
-            'average_grade': grades.aggregate(avg=Avg('score'))['avg'] or 0,
+            'total_students': enrollments['total'],
+            'active_students': enrollments['active'],
+            'completed_students': enrollments['completed'],
+            'dropped_students': enrollments['dropped'],
+            'average_grade': grades['weighted_mean'],
+            'median_grade': grades['median'],
+            'grade_std_dev': grades['std'],
+            'pass_rate': grades['pass_rate'],
+            'quantiles': grades['quantiles'],
+            'grade_distribution': grades['distribution'],
             'assignment_count': course.assignments.count(),
             'completion_rate': 0
         }
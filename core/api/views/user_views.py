@@ -3,7 +3,10 @@ User API Views
 """
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.response import Response
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import Token
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework.views import APIView
 from django.contrib.auth.models import User
@@ -11,21 +14,72 @@ from django.contrib.auth import update_session_auth_hash
 from django_ratelimit.decorators import ratelimit
 from django.utils.decorators import method_decorator
 
+from core.db_router import read_replica
+from core.utils.brute_force import get_client_ip, login_rate_limiter
+from core.utils.token_revocation import revoke_token
 from core.models import UserProfile, UserRole, StudentAccountRequest
 from ..serializers import (
     UserSerializer, UserCreateSerializer, UserProfileSerializer,
     UserRoleSerializer, StudentAccountRequestSerializer,
     StudentAccountRequestCreateSerializer, PasswordChangeSerializer
 )
-from ..permissions import IsAdminOnly, IsTeacherOrAdmin
+from ..authentication import ClaimsRefreshToken
+from ..permissions import IsAdminOnly, IsTeacherOrAdmin, get_user_role
 
 
 class CustomTokenObtainPairView(TokenObtainPairView):
-    """Custom JWT token obtain view với rate limiting"""
+    """Custom JWT token obtain view, dùng chung brute-force limiter với LoginView"""
     
-    @method_decorator(ratelimit(key='ip', rate='5/m', method='POST'))
     def post(self, request, *args, **kwargs):
-        return super().post(request, *args, **kwargs)
+        identifier = request.data.get('username') or request.data.get('email') or ''
+        ip_address = get_client_ip(request)
+        
+        decision = login_rate_limiter.check(identifier, ip_address)
+        if not decision.allowed:
+            response = Response({
+                'detail': 'Quá nhiều lần đăng nhập sai. Vui lòng thử lại sau.'
+            }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+            response['Retry-After'] = str(decision.retry_after)
+            return response
+        
+        try:
+            response = super().post(request, *args, **kwargs)
+        except AuthenticationFailed:
+            login_rate_limiter.register_failure(identifier, ip_address)
+            raise
+        
+        if response.status_code == status.HTTP_200_OK:
+            login_rate_limiter.register_success(identifier, ip_address)
+        return response
+
+
+class TokenLogoutView(APIView):
+    """
+    Đăng xuất JWT: blacklist refresh token và thu hồi access token đang dùng
+    (danh sách thu hồi nằm trong cache nên có hiệu lực ngay với mọi worker)
+    """
+    permission_classes = [permissions.AllowAny]
+    
+    def post(self, request):
+        refresh = request.data.get('refresh')
+        access = request.auth if isinstance(request.auth, Token) else None
+        if not refresh and access is None:
+            return Response({
+                'error': 'Thiếu refresh token.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if refresh:
+            try:
+                token = ClaimsRefreshToken(refresh)
+            except TokenError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            token.blacklist()
+            revoke_token(token['jti'], token['exp'])
+        
+        if access is not None:
+            revoke_token(access['jti'], access['exp'])
+        
+        return Response({'message': 'Đăng xuất thành công.'}, status=status.HTTP_200_OK)
 
 
 class UserListCreateView(generics.ListCreateAPIView):
@@ -258,11 +312,12 @@ def reject_student_request(request, pk):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@read_replica
 def user_stats(request):
     """
     Thống kê người dùng
     """
-    if not request.user.profile.role == 'admin':
+    if get_user_role(request) != 'admin':
         return Response({
             'error': 'Không có quyền truy cập.'
         }, status=status.HTTP_403_FORBIDDEN)
@@ -7,7 +7,15 @@ class CoreConfig(AppConfig):
     verbose_name = 'Core Application'
     
     def ready(self):
+        from django.contrib.auth.models import update_last_login
+        from django.contrib.auth.signals import user_logged_in
+        from .utils.login_audit import record_last_login
+
         # Import signals
         from . import signals
+
+        # last_login được ghi theo lô bởi login audit writer thay vì UPDATE trong request
+        user_logged_in.disconnect(update_last_login, dispatch_uid='update_last_login')
+        user_logged_in.connect(record_last_login, dispatch_uid='record_last_login')
         # Import admin to register decorators
         from . import admin 
\ No newline at end of file
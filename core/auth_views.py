@@ -16,7 +16,11 @@ from django.db import transaction
 import logging
 from django.db import models
 
-from .models import UserProfile, LoginHistory, PasswordReset, AccountLockout, StudentAccountRequest
+from .models import UserProfile, LoginHistory, PasswordReset, StudentAccountRequest
+from .utils.brute_force import get_client_ip, login_rate_limiter
+from .utils.login import find_user_for_login, run_dummy_password_hasher
+from .utils.login_audit import record_login
+from .utils.outbox import enqueue_email
 from .serializers import (
     LoginSerializer, UserSerializer, UserProfileSerializer,
     PasswordChangeSerializer, PasswordResetRequestSerializer, 
@@ -28,6 +32,21 @@ from .serializers import (
 logger = logging.getLogger(__name__)
 
 
+def login_blocked_response(decision):
+    """Response khi bị chặn bởi brute-force limiter"""
+    minutes = max(1, (decision.retry_after + 59) // 60)
+    if decision.scope == 'user':
+        response = Response({
+            'error': f'Tài khoản đã bị khóa do đăng nhập sai nhiều lần. Vui lòng thử lại sau {minutes} phút.'
+        }, status=status.HTTP_423_LOCKED)
+    else:
+        response = Response({
+            'error': f'Quá nhiều lần đăng nhập sai từ địa chỉ này. Vui lòng thử lại sau {minutes} phút.'
+        }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+    response['Retry-After'] = str(decision.retry_after)
+    return response
+
+
 class LoginView(APIView):
     """View cho đăng nhập"""
     
@@ -42,49 +61,43 @@ class LoginView(APIView):
             password = serializer.validated_data['password']
             remember_me = serializer.validated_data.get('remember_me', False)
             
-            # Kiểm tra account lockout
-            ip_address = self.get_client_ip(request)
-            lockout = AccountLockout.objects.filter(
-                user__email=email,
-                ip_address=ip_address
-            ).first()
+            # Chống brute-force: kiểm tra trong cache trước khi chạm tới database
+            ip_address = get_client_ip(request)
+            decision = login_rate_limiter.check(email, ip_address)
+            if not decision.allowed:
+                return login_blocked_response(decision)
             
-            if lockout and lockout.is_locked():
-                return Response({
-                    'error': 'Tài khoản đã bị khóa do đăng nhập sai nhiều lần. Vui lòng thử lại sau 30 phút.'
-                }, status=status.HTTP_423_LOCKED)
+            # Một query lấy user + profile (index LOWER(email))
+            login_user = find_user_for_login(email)
             
-            # Xác thực user bằng email
-            user = authenticate(request, username=email, password=password)
+            # Xác thực user bằng email (không tìm thấy user thì không cần query lại)
+            if login_user is not None:
+                user = authenticate(request, username=email, password=password, login_user=login_user)
+            else:
+                run_dummy_password_hasher(password)
+                user = None
             
             if user is not None and user.is_active:
                 # Reset failed attempts nếu đăng nhập thành công
-                if lockout:
-                    lockout.reset_failed_attempts()
+                login_rate_limiter.register_success(email, ip_address)
                 
-                # Login - this will create a new session
+                # Login - tạo session mới; last_login được ghi theo lô qua signal
                 login(request, user)
                 
-                # Cập nhật last_login
-                user.last_login = timezone.now()
-                user.save()
-                
-                # Tạo login history
-                LoginHistory.objects.create(
-                    user=user,
-                    ip_address=ip_address,
-                    user_agent=request.META.get('HTTP_USER_AGENT', ''),
-                    success=True
-                )
-                
                 # Set session type and path for user
+                # (SessionMiddleware lưu session một lần khi trả response)
                 request.session['session_type'] = 'user'
                 request.session['session_path'] = '/'
                 request.session['user_id'] = user.id
                 request.session['user_role'] = user.profile.role
                 
-                # Ensure session is saved
-                request.session.save()
+                # Tạo login history (ghi theo lô)
+                record_login(
+                    user.pk,
+                    ip_address=ip_address,
+                    user_agent=request.META.get('HTTP_USER_AGENT', ''),
+                    success=True
+                )
                 
                 response = Response({
                     'message': 'Đăng nhập thành công!',
@@ -112,28 +125,17 @@ class LoginView(APIView):
                 return response
             
             else:
-                # Ghi nhận lần đăng nhập thất bại
-                try:
-                    user = User.objects.get(email=email)
-                    if user.is_active:
-                        # Tạo hoặc cập nhật lockout
-                        lockout, created = AccountLockout.objects.get_or_create(
-                            user=user,
-                            ip_address=ip_address,
-                            defaults={'failed_attempts': 0}
-                        )
-                        lockout.increment_failed_attempts()
-                        
-                        # Tạo login history cho lần thất bại
-                        LoginHistory.objects.create(
-                            user=user,
-                            ip_address=ip_address,
-                            user_agent=request.META.get('HTTP_USER_AGENT', ''),
-                            success=False,
-                            failure_reason='Sai mật khẩu'
-                        )
-                except User.DoesNotExist:
-                    pass
+                # Ghi nhận lần đăng nhập thất bại (chỉ ghi cache, DB khi vượt ngưỡng)
+                login_rate_limiter.register_failure(email, ip_address)
+                if login_user is not None and login_user.is_active:
+                    # Tạo login history cho lần thất bại
+                    record_login(
+                        login_user.pk,
+                        ip_address=ip_address,
+                        user_agent=request.META.get('HTTP_USER_AGENT', ''),
+                        success=False,
+                        failure_reason='Sai mật khẩu'
+                    )
                 
                 return Response({
                     'error': 'Email hoặc mật khẩu không đúng.'
@@ -143,12 +145,7 @@ class LoginView(APIView):
     
     def get_client_ip(self, request):
         """Lấy IP của client"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
+        return get_client_ip(request)
 
 
 class LogoutView(APIView):
@@ -500,37 +497,19 @@ class StudentAccountRequestActionView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     def send_account_created_email(self, new_user, created_by, password):
-        """Gửi email thông báo tài khoản được tạo"""
-        try:
-            subject = 'Tài khoản sinh viên đã được tạo - Hệ thống Quản lý Học tập'
-            message = f"""
-            Xin chào {new_user.get_full_name()}!
-            
-            Tài khoản sinh viên của bạn đã được tạo bởi {created_by.get_full_name()} ({created_by.profile.get_role_display()}).
-            
-            Thông tin tài khoản:
-            - Tên đăng nhập: {new_user.username}
-            - Email: {new_user.email}
-            - Mật khẩu: {password}
-            - Mã sinh viên: {new_user.profile.student_id}
-            - Khoa/Ngành: {new_user.profile.get_department_display()}
-            - Năm học: {new_user.profile.year_of_study}
-            
-            Vui lòng đăng nhập và đổi mật khẩu ngay để bảo mật tài khoản.
-            
-            Trân trọng,
-            Đội ngũ phát triển
-            """
-            
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [new_user.email],
-                fail_silently=True,
-            )
-        except Exception as e:
-            logger.error(f"Lỗi gửi email: {str(e)}")
+        """Xếp email thông báo tài khoản được tạo vào outbox (gửi bởi lệnh send_outbox)"""
+        profile = new_user.profile
+        enqueue_email('account_created', new_user.email, {
+            'full_name': new_user.get_full_name(),
+            'created_by': created_by.get_full_name(),
+            'created_by_role': created_by.profile.get_role_display(),
+            'username': new_user.username,
+            'email': new_user.email,
+            'password': password,
+            'student_id': profile.student_id,
+            'department': profile.get_department_display(),
+            'year_of_study': profile.year_of_study,
+        })
 
 
 # Admin Views
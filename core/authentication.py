@@ -1,6 +1,7 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth.models import User
-from django.db.models import Q
+
+from .utils.login import find_user_for_login, run_dummy_password_hasher
 
 
 class EmailBackend(ModelBackend):
@@ -8,28 +9,27 @@ class EmailBackend(ModelBackend):
     Custom authentication backend để đăng nhập bằng email hoặc username
     """
     
-    def authenticate(self, request, username=None, password=None, **kwargs):
+    def authenticate(self, request, username=None, password=None, login_user=None, **kwargs):
         """
         Xác thực user bằng email hoặc username
+
+        Args:
+            login_user: User đã được tìm sẵn (LoginView), tránh query lại
         """
         if username is None:
             username = kwargs.get('username')
-        if password is None:
-            password = kwargs.get('password')
         
-        if username is None or password is None:
+        if password is None or (username is None and login_user is None):
             return None
         
-        try:
-            # Tìm user bằng email hoặc username
-            user = User.objects.get(
-                Q(username=username) | Q(email=username)
-            )
-        except User.DoesNotExist:
+        # Một query dùng index: LOWER(email) hoặc username
+        user = login_user if login_user is not None else find_user_for_login(username)
+        if user is None:
+            run_dummy_password_hasher(password)
             return None
-        else:
-            if user.check_password(password) and self.user_can_authenticate(user):
-                return user
+        
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
         
         return None
     
@@ -40,4 +40,4 @@ class EmailBackend(ModelBackend):
         try:
             return User.objects.get(pk=user_id)
         except User.DoesNotExist:
-            return None 
\ No newline at end of file
+            return None 
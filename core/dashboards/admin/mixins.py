@@ -9,6 +9,8 @@ from django.shortcuts import redirect
 from django.contrib import messages
 from django.core.exceptions import PermissionDenied
 
+from core.utils.role_context import get_request_role_context
+
 
 class AdminRequiredMixin(LoginRequiredMixin):
     """
@@ -19,11 +21,12 @@ class AdminRequiredMixin(LoginRequiredMixin):
             return self.handle_no_permission()
         
         # Check if user has admin profile
-        if not hasattr(request.user, 'profile'):
+        role_context = get_request_role_context(request)
+        if not role_context.has_profile:
             messages.error(request, 'Tài khoản chưa được thiết lập profile.')
             return redirect('core:profile')
         
-        if not request.user.profile.is_admin:
+        if not role_context.is_admin:
             messages.error(request, 'Bạn không có quyền truy cập vào trang này.')
             raise PermissionDenied("Chỉ quản trị viên mới có thể truy cập trang này.")
         
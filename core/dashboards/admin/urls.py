@@ -54,5 +54,6 @@ urlpatterns = [
         path('user-search/', views.AdminUserSearchAPIView.as_view(), name='user_search_api'),
         path('stats/', views.AdminStatsAPIView.as_view(), name='stats_api'),
         path('activity-data/', views.AdminActivityDataAPIView.as_view(), name='activity_data_api'),
+        path('query-metrics/', views.AdminQueryMetricsAPIView.as_view(), name='query_metrics_api'),
     ])),
 ] 
\ No newline at end of file
@@ -15,12 +15,16 @@ from django.conf import settings
 from django.core.management import call_command
 from django.contrib.auth.models import User
 from django.db.models import Count, Avg
+from django.db.models.functions import TruncDate
 from django.utils import timezone
 
 from core.models.user import UserProfile
 from core.models.study import Course, Grade
 from core.models.assignment import Assignment
 from core.models.authentication import LoginHistory
+from core.utils.login_rollups import get_login_activity, get_login_totals
+from core.utils.outbox import enqueue_bulk
+from core.utils.statistics import day_range, fill_daily_series
 
 
 def backup_database():
@@ -242,23 +246,29 @@ def generate_system_statistics():
             'distribution': {},
         }
     
-    # Activity statistics
-    stats['activity'] = {
-        'total_logins': LoginHistory.objects.count(),
-        'logins_today': LoginHistory.objects.filter(
-            login_time__date=timezone.now().date()
-        ).count(),
-        'logins_this_week': LoginHistory.objects.filter(
-            login_time__gte=timezone.now() - timedelta(days=7)
-        ).count(),
-        'unique_users_today': LoginHistory.objects.filter(
-            login_time__date=timezone.now().date()
-        ).values('user').distinct().count(),
-    }
+    # Activity statistics (đọc từ bảng rollup theo ngày)
+    stats['activity'] = get_login_statistics()
     
     return stats
 
 
+def get_login_statistics():
+    """
+    Số liệu đăng nhập cho admin dashboard (đọc từ bảng rollup theo ngày)
+
+    Mọi số liệu chỉ tính lần đăng nhập thành công, giống biểu đồ hoạt động
+    (get_user_activity_data) và trang analytics
+    """
+    today = timezone.localdate()
+    today_totals = get_login_totals(since=today)
+    return {
+        'total_logins': get_login_totals()['logins'],
+        'logins_today': today_totals['logins'],
+        'logins_this_week': get_login_totals(since=today - timedelta(days=7))['logins'],
+        'unique_users_today': today_totals['unique_users'],
+    }
+
+
 def get_grade_distribution(grades_queryset):
     """
     Get grade distribution by ranges
@@ -282,32 +292,21 @@ def get_user_activity_data(days=30):
     """
     Get user activity data for the last N days
     """
-    end_date = timezone.now().date()
-    start_date = end_date - timedelta(days=days)
-    
-    activity_data = []
-    current_date = start_date
-    
-    while current_date <= end_date:
-        # User registrations
-        new_users = User.objects.filter(date_joined__date=current_date).count()
-        
-        # Logins
-        logins = LoginHistory.objects.filter(login_time__date=current_date).count()
-        
-        # Unique active users
-        unique_users = LoginHistory.objects.filter(
-            login_time__date=current_date
-        ).values('user').distinct().count()
-        
-        activity_data.append({
-            'date': current_date.strftime('%Y-%m-%d'),
-            'new_users': new_users,
-            'logins': logins,
-            'unique_users': unique_users,
-        })
-        
-        current_date += timedelta(days=1)
+    start_date, end_date, start_datetime = day_range(days)
+    
+    # User registrations (một query group theo ngày)
+    new_users = fill_daily_series(
+        User.objects.filter(date_joined__gte=start_datetime)
+        .annotate(day=TruncDate('date_joined')).values('day')
+        .annotate(count=Count('id')).order_by('day'),
+        start_date, end_date, 'new_users'
+    )
+    
+    # Logins (chỉ lần thành công) và unique users đọc từ bảng rollup (một query)
+    activity_data = get_login_activity(days)
+    for item, registrations in zip(activity_data, new_users):
+        item['new_users'] = registrations['new_users']
+        del item['failures']
     
     return activity_data
 
@@ -431,29 +430,9 @@ def validate_csv_import_file(csv_file):
 
 def send_bulk_email(user_list, subject, message, from_email=None):
     """
-    Send bulk email to users
+    Queue bulk email to users in the outbox (sent by the send_outbox command)
     """
-    from django.core.mail import send_mass_mail
-    from django.conf import settings
-    
-    if not from_email:
-        from_email = settings.DEFAULT_FROM_EMAIL
-    
-    messages = []
-    for user in user_list:
-        if user.email:
-            messages.append((
-                subject,
-                message,
-                from_email,
-                [user.email]
-            ))
-    
-    try:
-        send_mass_mail(messages, fail_silently=False)
-        return len(messages)
-    except Exception as e:
-        raise Exception(f'Lỗi khi gửi email: {str(e)}')
+    return enqueue_bulk((user.email for user in user_list), subject, message, from_email=from_email)
 
 
 def generate_activity_log_csv(days=30):
@@ -12,9 +12,11 @@ from django.views.generic import (
     UpdateView, DeleteView, FormView, View
 )
 from django.contrib import messages
-from django.db.models import Q, Count, Avg, Sum, Max, Min
+from django.db.models import Q, Count, Sum
+from django.db.models.functions import TruncDate
 from django.urls import reverse_lazy, reverse
 from django.http import JsonResponse, HttpResponse
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.core.paginator import Paginator
@@ -26,13 +28,18 @@ import io
 import logging
 logger = logging.getLogger('core')
 
+from core.db_router import ReadReplicaMixin
 from core.models.study import Course, Grade
 from core.models.assignment import Assignment, AssignmentSubmission
 from core.models.user import UserProfile
-from core.models.academic import (
-    AcademicYear, Department
-)
+from core.models.academic import Department
 from core.models.authentication import LoginHistory
+from core.utils.analytics import grade_summary
+from core.utils.cache import DASHBOARD_NAMESPACE, cache_get_or_set
+from core.utils.login_rollups import get_login_activity, get_login_totals
+from core.utils.query_metrics import metrics_buffer, metrics_to_dict, query_budget, summarize
+from core.utils.reference_data import get_academic_years
+from core.utils.statistics import day_range, fill_daily_series
 from .forms import (
     AdminUserCreateForm, AdminUserUpdateForm, AdminUserImportForm,
     AdminBulkUserActionForm, AdminResetPasswordForm, AdminSystemSettingsForm,
@@ -41,73 +48,70 @@ from .forms import (
 from .mixins import AdminRequiredMixin
 from .utils import generate_user_report, backup_database
 
+# Số liệu dashboard được cache ngắn hạn (giây)
+DASHBOARD_CACHE_TIMEOUT = 60
+
 
-class AdminDashboardView(AdminRequiredMixin, TemplateView):
+@query_budget(14)
+class AdminDashboardView(AdminRequiredMixin, ReadReplicaMixin, TemplateView):
     """Admin Dashboard main view"""
     template_name = 'dashboards/admin/dashboard.html'
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # User statistics
-        total_users = User.objects.count()
-        active_users = User.objects.filter(is_active=True).count()
-        students = User.objects.filter(profile__role='student').count()
-        teachers = User.objects.filter(profile__role='teacher').count()
-        admins = User.objects.filter(profile__role='admin').count()
-        
-        # System statistics
-        total_courses = Course.objects.count()
-        active_courses = Course.objects.filter(status='active').count()
-        total_assignments = Assignment.objects.count()
-        total_grades = Grade.objects.count()
+        # Số liệu tổng hợp được cache ngắn hạn, hoạt động gần đây luôn lấy mới
+        context.update(cache_get_or_set(
+            DASHBOARD_NAMESPACE, 'admin_dashboard', self.get_dashboard_stats, timeout=DASHBOARD_CACHE_TIMEOUT
+        ))
+        context.update({
+            'recent_logins': LoginHistory.objects.select_related('user').order_by('-login_time')[:10],
+            'recent_users': User.objects.select_related('profile').order_by('-date_joined')[:5],
+        })
         
-        # Recent activity
-        recent_logins = LoginHistory.objects.order_by('-login_time')[:10]
-        recent_users = User.objects.order_by('-date_joined')[:5]
+        return context
+    
+    def get_dashboard_stats(self):
+        """Thống kê người dùng và hệ thống"""
+        users = User.objects.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(is_active=True)),
+            students=Count('id', filter=Q(profile__role='student')),
+            teachers=Count('id', filter=Q(profile__role='teacher')),
+            admins=Count('id', filter=Q(profile__role='admin')),
+        )
+        courses = Course.objects.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(status='active')),
+        )
         
-        context.update({
+        return {
             # User stats
-            'total_users': total_users,
-            'active_users': active_users,
-            'inactive_users': total_users - active_users,
-            'students_count': students,
-            'teachers_count': teachers,
-            'admins_count': admins,
+            'total_users': users['total'],
+            'active_users': users['active'],
+            'inactive_users': users['total'] - users['active'],
+            'students_count': users['students'],
+            'teachers_count': users['teachers'],
+            'admins_count': users['admins'],
             
             # System stats
-            'total_courses': total_courses,
-            'active_courses': active_courses,
-            'total_assignments': total_assignments,
-            'total_grades': total_grades,
-            
-            # Recent activity
-            'recent_logins': recent_logins,
-            'recent_users': recent_users,
+            'total_courses': courses['total'],
+            'active_courses': courses['active'],
+            'total_assignments': Assignment.objects.count(),
+            'total_grades': Grade.objects.count(),
             
             # Quick stats for charts
             'user_growth_data': self.get_user_growth_data(),
             'course_status_data': self.get_course_status_data(),
-        })
-        
-        return context
+        }
     
     def get_user_growth_data(self):
         """Get user growth data for last 30 days"""
-        end_date = timezone.now().date()
-        start_date = end_date - timedelta(days=30)
-        
-        data = []
-        current_date = start_date
-        while current_date <= end_date:
-            count = User.objects.filter(date_joined__date=current_date).count()
-            data.append({
-                'date': current_date.strftime('%Y-%m-%d'),
-                'count': count
-            })
-            current_date += timedelta(days=1)
-        
-        return data
+        start_date, end_date, start_datetime = day_range(30)
+        rows = User.objects.filter(
+            date_joined__gte=start_datetime
+        ).annotate(day=TruncDate('date_joined')).values('day').annotate(count=Count('id')).order_by('day')
+        return fill_daily_series(rows, start_date, end_date, 'count')
     
     def get_course_status_data(self):
         """Get course status distribution"""
@@ -511,7 +515,7 @@ class AdminCourseListView(AdminRequiredMixin, ListView):
         context = super().get_context_data(**kwargs)
         context.update({
             'teachers': User.objects.filter(profile__role='teacher').order_by('last_name', 'first_name'),
-            'years': AcademicYear.objects.all().order_by('-start_date'),
+            'years': get_academic_years(),
             'q': self.request.GET.get('q', ''),
             'filter_teacher': self.request.GET.get('teacher', ''),
             'filter_year': self.request.GET.get('year', ''),
@@ -627,7 +631,7 @@ class AdminLogsView(AdminRequiredMixin, TemplateView):
 # ANALYTICS VIEWS
 # =============================================================================
 
-class AdminAnalyticsView(AdminRequiredMixin, TemplateView):
+class AdminAnalyticsView(AdminRequiredMixin, ReadReplicaMixin, TemplateView):
     """Analytics overview"""
     template_name = 'dashboards/admin/analytics/overview.html'
     
@@ -662,45 +666,44 @@ class AdminAnalyticsView(AdminRequiredMixin, TemplateView):
         }
     
     def get_grade_statistics(self):
-        """Get grade statistics"""
-        grades = Grade.objects.all()
-        if grades.exists():
-            return {
-                'total': grades.count(),
-                'average': grades.aggregate(avg=Avg('score'))['avg'],
-                'highest': grades.aggregate(max=Max('score'))['max'],
-                'lowest': grades.aggregate(min=Min('score'))['min'],
-            }
-        return {'total': 0, 'average': 0, 'highest': 0, 'lowest': 0}
+        """Get grade statistics (điểm hệ 10, trung bình có trọng số)"""
+        summary = grade_summary('all')
+        return {
+            **summary,
+            'total': summary['grade_count'],
+            'average': summary['weighted_mean'],
+            'highest': summary['max'],
+            'lowest': summary['min'],
+        }
     
     def get_activity_statistics(self):
         """Get activity statistics"""
-        today = timezone.now().date()
+        today = timezone.localdate()
         week_ago = today - timedelta(days=7)
         
         return {
-            'logins_today': LoginHistory.objects.filter(login_time__date=today).count(),
-            'logins_week': LoginHistory.objects.filter(login_time__date__gte=week_ago).count(),
+            'logins_today': get_login_totals(since=today)['logins'],
+            'logins_week': get_login_totals(since=week_ago)['logins'],
             'new_users_week': User.objects.filter(date_joined__date__gte=week_ago).count(),
         }
 
 
-class AdminUserAnalyticsView(AdminRequiredMixin, TemplateView):
+class AdminUserAnalyticsView(AdminRequiredMixin, ReadReplicaMixin, TemplateView):
     """User analytics"""
     template_name = 'dashboards/admin/analytics/users.html'
 
 
-class AdminCourseAnalyticsView(AdminRequiredMixin, TemplateView):
+class AdminCourseAnalyticsView(AdminRequiredMixin, ReadReplicaMixin, TemplateView):
     """Course analytics"""
     template_name = 'dashboards/admin/analytics/courses.html'
 
 
-class AdminGradeAnalyticsView(AdminRequiredMixin, TemplateView):
+class AdminGradeAnalyticsView(AdminRequiredMixin, ReadReplicaMixin, TemplateView):
     """Grade analytics"""
     template_name = 'dashboards/admin/analytics/grades.html'
 
 
-class AdminActivityLogView(AdminRequiredMixin, ListView):
+class AdminActivityLogView(AdminRequiredMixin, ReadReplicaMixin, ListView):
     """Activity log view"""
     model = LoginHistory
     template_name = 'dashboards/admin/analytics/activity.html'
@@ -711,12 +714,12 @@ class AdminActivityLogView(AdminRequiredMixin, ListView):
         return LoginHistory.objects.select_related('user').order_by('-login_time')
 
 
-class AdminReportsView(AdminRequiredMixin, TemplateView):
+class AdminReportsView(AdminRequiredMixin, ReadReplicaMixin, TemplateView):
     """Reports dashboard"""
     template_name = 'dashboards/admin/analytics/reports.html'
 
 
-class AdminExportReportView(AdminRequiredMixin, View):
+class AdminExportReportView(AdminRequiredMixin, ReadReplicaMixin, View):
     """Export system report"""
     
     def get(self, request):
@@ -796,56 +799,105 @@ class AdminUserSearchAPIView(AdminRequiredMixin, View):
         return JsonResponse({'users': data})
 
 
-class AdminStatsAPIView(AdminRequiredMixin, View):
+class AdminStatsAPIView(AdminRequiredMixin, ReadReplicaMixin, View):
     """Statistics API for dashboard charts"""
     
     def get(self, request):
         stats_type = request.GET.get('type', 'overview')
+        producers = {
+            'overview': self.get_overview_data,
+            'user_growth': self.get_user_growth_data,
+            'course_status': self.get_course_status_data,
+            'grade_distribution': self.get_grade_distribution_data,
+            'all': self.get_all_data,
+        }
+        if stats_type not in producers:
+            stats_type = 'overview'
         
-        if stats_type == 'user_growth':
-            return JsonResponse({'data': self.get_user_growth_data()})
-        elif stats_type == 'course_status':
-            return JsonResponse({'data': self.get_course_status_data()})
-        elif stats_type == 'grade_distribution':
-            return JsonResponse({'data': self.get_grade_distribution_data()})
-        else:
-            return JsonResponse({'data': []})
+        data = cache_get_or_set(
+            DASHBOARD_NAMESPACE, f'admin_stats:{stats_type}', producers[stats_type], timeout=DASHBOARD_CACHE_TIMEOUT
+        )
+        return JsonResponse({'data': data})
     
-    def get_user_growth_data(self):
+    def get_all_data(self):
+        return {
+            'overview': self.get_overview_data(),
+            'user_growth': self.get_user_growth_data(),
+            'course_status': self.get_course_status_data(),
+            'grade_distribution': self.get_grade_distribution_data(),
+        }
+    
+    def get_overview_data(self):
+        """Overall counters"""
+        users = User.objects.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(is_active=True)),
+        )
+        courses = Course.objects.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(status='active')),
+        )
+        return {
+            'total_users': users['total'],
+            'active_users': users['active'],
+            'total_courses': courses['total'],
+            'active_courses': courses['active'],
+            'total_assignments': Assignment.objects.count(),
+            'total_grades': Grade.objects.count(),
+        }
+    
+    def get_user_growth_data(self, days=30):
         """User growth over last 30 days"""
-        # Implementation similar to dashboard view
-        return []
+        start_date, end_date, start_datetime = day_range(days)
+        rows = User.objects.filter(
+            date_joined__gte=start_datetime
+        ).annotate(day=TruncDate('date_joined')).values('day').annotate(count=Count('id')).order_by('day')
+        return fill_daily_series(rows, start_date, end_date, 'count')
     
     def get_course_status_data(self):
         """Course status distribution"""
-        # Implementation similar to dashboard view
-        return []
+        return list(Course.objects.values('status').annotate(count=Count('id')).order_by('status'))
     
     def get_grade_distribution_data(self):
         """Grade distribution"""
-        # Implementation for grade distribution
-        return []
+        return grade_summary('all')['distribution']
 
 
-class AdminActivityDataAPIView(AdminRequiredMixin, View):
+class AdminActivityDataAPIView(AdminRequiredMixin, ReadReplicaMixin, View):
     """Activity data API"""
     
     def get(self, request):
-        days = int(request.GET.get('days', 7))
-        end_date = timezone.now().date()
-        start_date = end_date - timedelta(days=days)
-        
-        # Get login activity
-        login_data = []
-        current_date = start_date
-        while current_date <= end_date:
-            count = LoginHistory.objects.filter(
-                login_time__date=current_date
-            ).count()
-            login_data.append({
-                'date': current_date.strftime('%Y-%m-%d'),
-                'logins': count
-            })
-            current_date += timedelta(days=1)
+        try:
+            days = int(request.GET.get('days', 7))
+        except ValueError:
+            days = 7
         
-        return JsonResponse({'login_activity': login_data}) 
\ No newline at end of file
+        # Đọc từ bảng rollup theo ngày (một query)
+        login_data = get_login_activity(days)
+        
+        return JsonResponse({'login_activity': login_data}) 
+
+
+class AdminQueryMetricsAPIView(AdminRequiredMixin, View):
+    """
+    Số câu query / thời gian theo view từ ring buffer của process hiện tại
+    (cần QUERY_INSTRUMENTATION_ENABLED)
+    """
+    
+    def get(self, request):
+        try:
+            top = min(max(int(request.GET.get('top', 10)), 1), 100)
+        except ValueError:
+            top = 10
+        records = metrics_buffer.snapshot()
+        view = request.GET.get('view')
+        if view:
+            records = [record for record in records if record.view == view]
+        
+        data = summarize(records, top=top)
+        data['enabled'] = getattr(settings, 'QUERY_INSTRUMENTATION_ENABLED', False)
+        data['slowest'] = [
+            metrics_to_dict(record)
+            for record in sorted(records, key=lambda record: record.latency_ms, reverse=True)[:top]
+        ]
+        return JsonResponse(data)
@@ -8,19 +8,24 @@ from django.shortcuts import render, redirect
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import TemplateView, View, UpdateView, ListView
 from django.contrib import messages
+from django.conf import settings
 from django.urls import reverse_lazy
 
+from core.utils.notifications import list_notifications, mark_read, unread_count
+from core.utils.role_context import get_request_role_context
+
 
 class DashboardRedirectView(LoginRequiredMixin, View):
     """
     Redirect user to appropriate dashboard based on their role
     """
     def get(self, request, *args, **kwargs):
-        if not hasattr(request.user, 'profile'):
+        role_context = get_request_role_context(request)
+        if not role_context.has_profile:
             messages.error(request, 'Tài khoản chưa được thiết lập profile.')
             return redirect('core:profile')
         
-        user_role = request.user.profile.role
+        user_role = role_context.role
         
         if user_role == 'student':
             return redirect('core:dashboards:student:dashboard')
@@ -52,19 +57,33 @@ class ProfileEditView(LoginRequiredMixin, TemplateView):
 
 
 class NotificationListView(LoginRequiredMixin, ListView):
-    """List user notifications"""
+    """List user notifications (keyset: ?before=<id>)"""
     template_name = 'dashboards/common/notifications.html'
     context_object_name = 'notifications'
-    paginate_by = 20
     
     def get_queryset(self):
-        # This would need a Notification model
-        return []
+        before = self.request.GET.get('before', '')
+        self.notifications, self.next_before = list_notifications(
+            self.request.user.id,
+            before=int(before) if before.isdigit() else None,
+            limit=settings.NOTIFICATION_PAGE_SIZE,
+        )
+        return self.notifications
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['next_before'] = self.next_before
+        context['unread_count'] = unread_count(self.request.user.id)
+        # Stream SSE chỉ khi chạy ASGI, dưới WSGI trang hỏi số chưa đọc theo chu kỳ
+        context['notification_stream'] = settings.SERVER_MODE == 'asgi'
+        context['notification_poll_interval'] = settings.NOTIFICATION_POLL_INTERVAL
+        return context
 
 
 class MarkNotificationsReadView(LoginRequiredMixin, View):
     """Mark notifications as read"""
     def post(self, request, *args, **kwargs):
-        # Implementation would mark notifications as read
+        up_to = request.POST.get('up_to', '')
+        mark_read(request.user.id, up_to=int(up_to) if up_to.isdigit() else None)
         messages.success(request, 'Đã đánh dấu tất cả thông báo là đã đọc.')
-        return redirect('dashboards:common:notifications') 
\ No newline at end of file
+        return redirect('dashboards:common:notifications')
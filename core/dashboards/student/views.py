@@ -10,16 +10,23 @@ from django.views.generic import TemplateView, ListView, DetailView, CreateView,
 from django.shortcuts import redirect, get_object_or_404
 from django.contrib import messages
 from django.db import models
-from django.db.models import Avg, Count, Q, Max, Min
+from django.db.models import Avg, Count, Exists, OuterRef, Q, Max, Min
 from django.utils import timezone
 from django.urls import reverse_lazy, reverse
 from datetime import timedelta
 from django.views import View
 
+from core.db_router import ReadReplicaMixin
+from core.utils.cache import COURSE_NAMESPACE, cache_get_or_set
+from core.utils.query_metrics import query_budget
+from core.utils.role_context import get_request_role_context
 from core.models.study import Course, CourseEnrollment, Grade, Note
 from core.models.assignment import Assignment, AssignmentSubmission
 from core.models.academic import AcademicYear
 
+# Catalog môn học được cache, bị vô hiệu hóa khi môn học/đăng ký thay đổi (giây)
+CATALOG_CACHE_TIMEOUT = 10 * 60
+
 
 class StudentRequiredMixin(LoginRequiredMixin):
     """
@@ -30,18 +37,20 @@ class StudentRequiredMixin(LoginRequiredMixin):
             return self.handle_no_permission()
         
         # Check if user has student profile
-        if not hasattr(request.user, 'profile'):
+        role_context = get_request_role_context(request)
+        if not role_context.has_profile:
             messages.error(request, 'Tài khoản chưa được thiết lập profile.')
             return redirect('core:profile')
         
-        if not request.user.profile.is_student:
+        if not role_context.is_student:
             messages.error(request, 'Bạn không có quyền truy cập vào trang này.')
             return redirect('core:home')
         
         return super().dispatch(request, *args, **kwargs)
 
 
-class StudentDashboardView(StudentRequiredMixin, TemplateView):
+@query_budget(14)
+class StudentDashboardView(StudentRequiredMixin, ReadReplicaMixin, TemplateView):
     """Student Dashboard main view"""
     template_name = 'dashboards/student/dashboard.html'
     
@@ -59,7 +68,7 @@ class StudentDashboardView(StudentRequiredMixin, TemplateView):
             course__enrollments__student=user,
             course__enrollments__status='enrolled',
             due_date__gte=timezone.now()
-        ).order_by('due_date')[:5]
+        ).select_related('course').order_by('due_date')[:5]
         
         # Get recent grades
         recent_grades = Grade.objects.filter(
@@ -154,6 +163,7 @@ class StudentCourseDetailView(StudentRequiredMixin, DetailView):
         return context
 
 
+@query_budget(9)
 class StudentAssignmentListView(StudentRequiredMixin, ListView):
     """List enrolled courses with assignment statistics"""
     template_name = 'dashboards/student/assignment/list.html'
@@ -165,38 +175,34 @@ class StudentAssignmentListView(StudentRequiredMixin, ListView):
         return Course.objects.filter(
             enrollments__student=self.request.user,
             enrollments__status='enrolled'
-        ).select_related('teacher').prefetch_related('assignments').order_by('name')
+        ).select_related('teacher').order_by('name')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         student = self.request.user
         
-        # Add assignment statistics for each course
-        for course in context['enrolled_courses']:
-            # Get assignments for this course that are visible to students
-            course_assignments = course.assignments.filter(
+        # Thống kê bài tập của mọi môn trong trang bằng một query GROUP BY course
+        submitted = AssignmentSubmission.objects.filter(assignment=OuterRef('pk'), student=student)
+        stats = {
+            row['course_id']: row
+            for row in Assignment.objects.filter(
+                course__in=[course.pk for course in context['enrolled_courses']],
                 is_visible_to_students=True,
                 status='active'
-            )
-            
-            # Calculate statistics
-            total_assignments = course_assignments.count()
-            submitted_assignments = AssignmentSubmission.objects.filter(
-                assignment__in=course_assignments,
-                student=student
-            ).count()
-            
-            overdue_assignments = course_assignments.filter(
-                due_date__lt=timezone.now()
-            ).exclude(
-                submissions__student=student
-            ).count()
-            
-            # Add to course object
-            course.total_assignments = total_assignments
-            course.submitted_assignments = submitted_assignments
-            course.pending_assignments = total_assignments - submitted_assignments
-            course.overdue_assignments = overdue_assignments
+            ).values('course_id').annotate(
+                total=Count('pk'),
+                submitted=Count('pk', filter=Q(Exists(submitted))),
+                overdue=Count('pk', filter=Q(due_date__lt=timezone.now()) & ~Q(Exists(submitted))),
+            ).order_by()
+        }
+        
+        # Add to course object
+        for course in context['enrolled_courses']:
+            row = stats.get(course.pk, {})
+            course.total_assignments = row.get('total', 0)
+            course.submitted_assignments = row.get('submitted', 0)
+            course.pending_assignments = course.total_assignments - course.submitted_assignments
+            course.overdue_assignments = row.get('overdue', 0)
         
         return context
 
@@ -275,6 +281,7 @@ class StudentAssignmentDetailView(StudentRequiredMixin, DetailView):
         return context
 
 
+@query_budget(12)
 class StudentGradeListView(StudentRequiredMixin, ListView):
     """List all grades for the student"""
     template_name = 'dashboards/student/grade/list.html'
@@ -367,6 +374,7 @@ class StudentNoteUpdateView(StudentRequiredMixin, UpdateView):
         return reverse_lazy('core:dashboards:student:note_detail', kwargs={'pk': self.object.pk}) 
 
 
+@query_budget(8)
 class StudentCourseCatalogView(StudentRequiredMixin, ListView):
     """Danh sách các môn học mà sinh viên có thể đăng ký"""
     template_name = 'dashboards/student/course/catalog.html'
@@ -376,14 +384,26 @@ class StudentCourseCatalogView(StudentRequiredMixin, ListView):
     def get_queryset(self):
         user = self.request.user
         q = self.request.GET.get('q')
-        year = user.profile.academic_year
-        qs = Course.objects.select_related('teacher', 'academic_year').filter(
-            Q(status__in=['upcoming', 'active']) &
-            (Q(academic_year=year) | Q(academic_year__isnull=True))
+        year_id = user.profile.academic_year_id
+        if not q:
+            # Catalog không tìm kiếm giống nhau cho mọi sinh viên cùng năm học
+            return cache_get_or_set(
+                COURSE_NAMESPACE, f'catalog:{year_id}',
+                lambda: list(self.get_catalog_queryset(year_id)), timeout=CATALOG_CACHE_TIMEOUT
+            )
+        qs = self.get_catalog_queryset(year_id).filter(
+            Q(name__icontains=q) | Q(code__icontains=q) | Q(teacher__first_name__icontains=q) | Q(teacher__last_name__icontains=q)
         )
-        if q:
-            qs = qs.filter(Q(name__icontains=q) | Q(code__icontains=q) | Q(teacher__first_name__icontains=q) | Q(teacher__last_name__icontains=q))
-        return qs.order_by('name').distinct()
+        return qs
+
+    def get_catalog_queryset(self, year_id):
+        return Course.objects.select_related('teacher', 'academic_year').filter(
+            Q(status__in=['upcoming', 'active']) &
+            (Q(academic_year_id=year_id) | Q(academic_year__isnull=True))
+        ).annotate(
+            student_total=Count('enrollments', distinct=True),
+            enrolled_total=Count('enrollments', filter=Q(enrollments__status='enrolled'), distinct=True),
+        ).order_by('name')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -556,7 +576,7 @@ class StudentAssignmentSubmitView(StudentRequiredMixin, View):
         
         # Handle file upload
         # If updating, we need to replace the old file
-        if hasattr(submission, 'files') and submission.files.exists():
+        if not created:
             # Delete old files
             for old_file in submission.files.all():
                 if old_file.file:
@@ -567,6 +587,7 @@ class StudentAssignmentSubmitView(StudentRequiredMixin, View):
         from core.models.assignment import AssignmentFile
         AssignmentFile.objects.create(
             assignment=assignment,
+            submission=submission,
             file=uploaded_file,
             file_name=uploaded_file.name,
             file_type=f'.{file_extension}',
@@ -9,6 +9,8 @@ from django.shortcuts import redirect
 from django.contrib import messages
 from django.core.exceptions import PermissionDenied
 
+from core.utils.role_context import get_request_role_context
+
 
 class TeacherRequiredMixin(LoginRequiredMixin):
     """
@@ -19,12 +21,13 @@ class TeacherRequiredMixin(LoginRequiredMixin):
             return self.handle_no_permission()
         
         # Check if user has teacher profile
-        if not hasattr(request.user, 'profile'):
+        role_context = get_request_role_context(request)
+        if not role_context.has_profile:
             messages.error(request, 'Tài khoản chưa được thiết lập profile.')
             return redirect('auth:login')
         
         # Check if user is teacher or admin (admin can access teacher dashboard)
-        if not (request.user.profile.is_teacher or request.user.profile.is_admin or request.user.is_superuser):
+        if not (role_context.has_role('teacher', 'admin') or request.user.is_superuser):
             messages.error(request, 'Bạn không có quyền truy cập vào trang này.')
             raise PermissionDenied("Chỉ giảng viên hoặc admin mới có thể truy cập trang này.")
         
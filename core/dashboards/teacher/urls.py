@@ -18,6 +18,7 @@ urlpatterns = [
         path('<int:pk>/edit/', views.TeacherCourseUpdateView.as_view(), name='course_edit'),
         path('<int:pk>/delete/', views.TeacherCourseDeleteView.as_view(), name='course_delete'),
         path('<int:pk>/students/', views.TeacherCourseStudentsView.as_view(), name='course_students'),
+        path('<int:pk>/gradebook/export/', views.TeacherCourseGradebookExportView.as_view(), name='course_gradebook_export'),
     ])),
     
     # Assignment Management
@@ -28,6 +29,7 @@ urlpatterns = [
         path('<int:pk>/edit/', views.TeacherAssignmentUpdateView.as_view(), name='assignment_edit'),
         path('<int:pk>/delete/', views.TeacherAssignmentDeleteView.as_view(), name='assignment_delete'),
         path('<int:pk>/submissions/', views.TeacherAssignmentSubmissionsView.as_view(), name='assignment_submissions'),
+        path('<int:pk>/submissions/archive/', views.TeacherAssignmentSubmissionsView.as_view(), {'archive': True}, name='assignment_submissions_archive'),
         path('<int:pk>/grade/', views.TeacherAssignmentGradingView.as_view(), name='assignment_grading'),
     ])),
     
@@ -44,6 +46,7 @@ urlpatterns = [
     # Student Management
     path('students/', include([
         path('', views.TeacherStudentListView.as_view(), name='student_list'),
+        path('at-risk/', views.TeacherAtRiskStudentListView.as_view(), name='at_risk_students'),
         path('<int:pk>/', views.TeacherStudentDetailView.as_view(), name='student_detail'),
         path('<int:pk>/grades/', views.TeacherStudentGradeView.as_view(), name='student_grades'),
     ])),
@@ -15,15 +15,22 @@ from django.views.generic import (
 from django.contrib import messages
 from django.db.models import Q, Count, Avg, Max, Min
 from django.urls import reverse_lazy, reverse
-from django.http import JsonResponse
+from django.http import HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.contrib.auth.models import User
 from django.utils import timezone
 from datetime import datetime, timedelta
 import json
 
-from core.models.study import Course, Grade
-from core.models.assignment import Assignment, AssignmentSubmission
+from core.db_router import ReadReplicaMixin
+from core.models.study import Course, Grade, StudentRiskScore
+from core.models.assignment import Assignment, AssignmentFile, AssignmentSubmission
 from core.models.user import UserProfile
+from core.utils.analytics import grade_analytics
+from core.utils.archives import ArchiveEntry, stream_zip, unique_arcname
+from core.utils.gradebook import EXPORT_FORMATS, build_gradebook, gradebook_response
+from core.utils.query_metrics import query_budget
+from core.utils.risk import advisee_risk_scores, dashboard_risk_panels, teacher_risk_scores
+from core.utils.role_context import get_request_role_context
 from .forms import (
     TeacherCourseForm, TeacherAssignmentForm, TeacherGradeForm,
     TeacherBulkGradeForm, TeacherAssignmentGradingForm
@@ -32,7 +39,8 @@ from .mixins import TeacherRequiredMixin
 from django.core.exceptions import PermissionDenied
 
 
-class TeacherDashboardView(TeacherRequiredMixin, TemplateView):
+@query_budget(34)
+class TeacherDashboardView(TeacherRequiredMixin, ReadReplicaMixin, TemplateView):
     """Teacher Dashboard main view"""
     template_name = 'dashboards/teacher/dashboard.html'
     
@@ -41,14 +49,13 @@ class TeacherDashboardView(TeacherRequiredMixin, TemplateView):
         user = self.request.user
         
         # Overview statistics
+        context.update(Course.objects.filter(
+            Q(teacher=user) | Q(assistant_teachers=user)
+        ).aggregate(
+            total_courses=Count('pk', distinct=True),
+            active_courses=Count('pk', filter=Q(status='active'), distinct=True),
+        ))
         context.update({
-            'total_courses': Course.objects.filter(
-                Q(teacher=user) | Q(assistant_teachers=user)
-            ).distinct().count(),
-            'active_courses': Course.objects.filter(
-                Q(teacher=user) | Q(assistant_teachers=user),
-                status='active'
-            ).distinct().count(),
             'total_assignments': Assignment.objects.filter(
                 Q(course__teacher=user) | Q(course__assistant_teachers=user)
             ).distinct().count(),
@@ -77,6 +84,9 @@ class TeacherDashboardView(TeacherRequiredMixin, TemplateView):
             Q(assignment__course__teacher=user) | Q(assignment__course__assistant_teachers=user),
             status__in=['submitted', 'late']
         ).distinct().order_by('-submitted_at')[:5]
+
+        # Sinh viên có nguy cơ (bảng StudentRiskScore do compute_risk_scores tính hàng đêm)
+        context['at_risk_students'], context['advisee_risk_students'] = dashboard_risk_panels(user)
         
         return context
 
@@ -146,7 +156,7 @@ class TeacherCourseCreateView(TeacherRequiredMixin, CreateView):
     
     def form_valid(self, form):
         # Restrict to admin only
-        if not (self.request.user.is_superuser or (hasattr(self.request.user, 'profile') and self.request.user.profile.role == 'admin')):
+        if not (self.request.user.is_superuser or get_request_role_context(self.request).is_admin):
             raise PermissionDenied('Chỉ admin mới có thể thêm môn học.')
         messages.success(self.request, 'Môn học đã được tạo thành công!')
         return super().form_valid(form)
@@ -168,7 +178,7 @@ class TeacherCourseUpdateView(TeacherRequiredMixin, UpdateView):
     
     def form_valid(self, form):
         # Restrict to admin only
-        if not (self.request.user.is_superuser or (hasattr(self.request.user, 'profile') and self.request.user.profile.role == 'admin')):
+        if not (self.request.user.is_superuser or get_request_role_context(self.request).is_admin):
             raise PermissionDenied('Chỉ admin mới có thể sửa môn học.')
         messages.success(self.request, 'Môn học đã được cập nhật thành công!')
         return super().form_valid(form)
@@ -190,7 +200,7 @@ class TeacherCourseDeleteView(TeacherRequiredMixin, DeleteView):
     
     def delete(self, request, *args, **kwargs):
         # Restrict to admin only
-        if not (request.user.is_superuser or (hasattr(request.user, 'profile') and request.user.profile.role == 'admin')):
+        if not (request.user.is_superuser or get_request_role_context(request).is_admin):
             raise PermissionDenied('Chỉ admin mới có thể xóa môn học.')
         messages.success(request, 'Môn học đã được xóa thành công!')
         return super().delete(request, *args, **kwargs)
@@ -235,10 +245,38 @@ class TeacherCourseStudentsView(TeacherRequiredMixin, DetailView):
         return context
 
 
+class TeacherCourseGradebookExportView(TeacherRequiredMixin, ReadReplicaMixin, DetailView):
+    """
+    Export bảng điểm sinh viên × đầu điểm của môn học
+    ?format=xlsx|csv (mặc định xlsx), ?class=<id lớp sinh viên> để chỉ xuất một lớp
+    """
+    model = Course
+    
+    def get_queryset(self):
+        return Course.objects.filter(
+            Q(teacher=self.request.user) | Q(assistant_teachers=self.request.user)
+        ).distinct()
+    
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get('format', 'xlsx')
+        if export_format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest(f"format phải là một trong: {', '.join(EXPORT_FORMATS)}")
+        
+        student_class = request.GET.get('class') or None
+        if student_class is not None and not student_class.isdigit():
+            return HttpResponseBadRequest('class phải là id của lớp')
+        
+        course = self.get_object()
+        gradebook = build_gradebook(course, student_class=student_class)
+        filename = f"{course.code}_gradebook" + (f"_class{student_class}" if student_class else '')
+        return gradebook_response([gradebook], export_format, filename)
+
+
 # =============================================================================
 # ASSIGNMENT MANAGEMENT VIEWS  
 # =============================================================================
 
+@query_budget(10)
 class TeacherAssignmentListView(TeacherRequiredMixin, ListView):
     """List all assignments created by teacher"""
     model = Assignment
@@ -246,21 +284,28 @@ class TeacherAssignmentListView(TeacherRequiredMixin, ListView):
     context_object_name = 'assignments'
     paginate_by = 10
     
-    def get_queryset(self):
+    def get_assignments(self):
+        # Lọc theo subquery môn học (không join assistant_teachers) để không cần distinct
         return Assignment.objects.filter(
-            Q(course__teacher=self.request.user) | Q(course__assistant_teachers=self.request.user)
-        ).distinct().select_related('course').order_by('-created_at')
+            course__in=Course.objects.filter(Q(teacher=self.request.user) | Q(assistant_teachers=self.request.user))
+        )
+    
+    def get_queryset(self):
+        # Số bài nộp của mỗi bài tập được annotate thay vì đếm riêng từng dòng trong template
+        return self.get_assignments().select_related('course').annotate(
+            submissions_total=Count('submissions'),
+            submissions_graded=Count('submissions', filter=Q(submissions__status='graded')),
+            submissions_pending=Count('submissions', filter=Q(submissions__status__in=['submitted', 'late'])),
+        ).order_by('-created_at')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        queryset = self.get_queryset()
-        
-        context.update({
-            'total_assignments': queryset.count(),
-            'draft_assignments': queryset.filter(status='draft').count(),
-            'active_assignments': queryset.filter(status='active').count(),
-            'closed_assignments': queryset.filter(status='closed').count(),
-        })
+        context.update(self.get_assignments().aggregate(
+            total_assignments=Count('pk'),
+            draft_assignments=Count('pk', filter=Q(status='draft')),
+            active_assignments=Count('pk', filter=Q(status='active')),
+            closed_assignments=Count('pk', filter=Q(status='closed')),
+        ))
         return context
 
 
@@ -371,6 +416,7 @@ class TeacherAssignmentDeleteView(TeacherRequiredMixin, DeleteView):
         return super().delete(request, *args, **kwargs)
 
 
+@query_budget(12)
 class TeacherAssignmentSubmissionsView(TeacherRequiredMixin, DetailView):
     """View all submissions for an assignment"""
     model = Assignment
@@ -386,22 +432,63 @@ class TeacherAssignmentSubmissionsView(TeacherRequiredMixin, DetailView):
         context = super().get_context_data(**kwargs)
         assignment = self.get_object()
         
-        # Get all submissions with student info
+        # Get all submissions with student info and their files
         submissions = AssignmentSubmission.objects.filter(
             assignment=assignment
-        ).select_related('student', 'student__profile').order_by('-submitted_at')
+        ).select_related('assignment', 'student', 'student__profile').prefetch_related('files').order_by('-submitted_at')
         
         context['submissions'] = submissions
         
         # Submission statistics
-        context.update({
-            'total_submissions': submissions.count(),
-            'graded_count': submissions.filter(status='graded').count(),
-            'pending_count': submissions.filter(status__in=['submitted', 'late']).count(),
-            'late_count': submissions.filter(status='late').count(),
-        })
+        context.update(submissions.aggregate(
+            total_submissions=Count('id'),
+            graded_count=Count('id', filter=Q(status='graded')),
+            pending_count=Count('id', filter=Q(status__in=['submitted', 'late'])),
+            late_count=Count('id', filter=Q(status='late')),
+        ))
         
         return context
+    
+    def get(self, request, *args, **kwargs):
+        if kwargs.get('archive'):
+            return self.download_archive()
+        return super().get(request, *args, **kwargs)
+    
+    def get_archive_entries(self, assignment):
+        """Danh sách file bài nộp, mỗi sinh viên một thư mục theo mã sinh viên"""
+        files = AssignmentFile.objects.filter(
+            submission__assignment=assignment,
+            is_submission_file=True
+        ).select_related('submission__student__profile').order_by('submission__student_id', 'uploaded_at')
+        
+        entries = []
+        used_names = set()
+        for assignment_file in files:
+            student = assignment_file.submission.student
+            profile = getattr(student, 'profile', None)
+            folder = (profile.student_id if profile and profile.student_id else student.username)
+            arcname = unique_arcname(f"{folder}/{assignment_file.file_name}", used_names)
+            entries.append(ArchiveEntry(
+                arcname=arcname,
+                file=assignment_file.file,
+                size=assignment_file.file_size,
+                modified=assignment_file.uploaded_at,
+            ))
+        return entries
+    
+    def download_archive(self):
+        """Tải toàn bộ bài nộp dưới dạng ZIP (stream, không dùng file tạm), chỉ sau hạn nộp"""
+        assignment = self.get_object()
+        if not assignment.is_overdue:
+            # Trước hạn sinh viên vẫn có thể nộp / nộp lại nên bản ZIP chưa đầy đủ
+            messages.warning(self.request, 'Chỉ có thể tải toàn bộ bài nộp sau hạn nộp.')
+            return redirect('dashboards:teacher:assignment_submissions', pk=assignment.pk)
+        entries = self.get_archive_entries(assignment)
+        
+        response = StreamingHttpResponse(stream_zip(entries), content_type='application/zip')
+        filename = f"{assignment.course.code}_assignment_{assignment.pk}_submissions.zip"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
 
 
 class TeacherAssignmentGradingView(TeacherRequiredMixin, DetailView):
@@ -568,53 +655,31 @@ class TeacherGradeDeleteView(TeacherRequiredMixin, DeleteView):
         return super().delete(request, *args, **kwargs)
 
 
-class TeacherGradeStatisticsView(TeacherRequiredMixin, TemplateView):
+class TeacherGradeStatisticsView(TeacherRequiredMixin, ReadReplicaMixin, TemplateView):
     """View grade statistics and analytics"""
     template_name = 'dashboards/teacher/grade/statistics.html'
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        teacher = self.request.user
+        analytics = grade_analytics('teacher', self.request.user.pk)
+        summary = analytics.summary
         
-        # Overall statistics
-        all_grades = Grade.objects.filter(
-            Q(course__teacher=teacher) | Q(course__assistant_teachers=teacher)
-        ).distinct()
+        # Overall statistics (điểm hệ 10, trung bình có trọng số)
         context.update({
-            'total_grades': all_grades.count(),
-            'average_grade': all_grades.aggregate(avg=Avg('score'))['avg'] or 0,
-            'highest_grade': all_grades.aggregate(max=Max('score'))['max'] or 0,
-            'lowest_grade': all_grades.aggregate(min=Min('score'))['min'] or 0,
+            'grade_summary': summary,
+            'total_grades': summary['grade_count'],
+            'average_grade': summary['weighted_mean'],
+            'highest_grade': summary['max'],
+            'lowest_grade': summary['min'],
+            'grade_distribution': [(bucket['range'], bucket['count']) for bucket in summary['distribution']],
         })
         
-        # Grade distribution
-        grade_ranges = [
-            ('A+ (9.0-10)', all_grades.filter(score__gte=9.0).count()),
-            ('A (8.0-8.9)', all_grades.filter(score__gte=8.0, score__lt=9.0).count()),
-            ('B+ (7.0-7.9)', all_grades.filter(score__gte=7.0, score__lt=8.0).count()),
-            ('B (6.0-6.9)', all_grades.filter(score__gte=6.0, score__lt=7.0).count()),
-            ('C+ (5.0-5.9)', all_grades.filter(score__gte=5.0, score__lt=6.0).count()),
-            ('C (4.0-4.9)', all_grades.filter(score__gte=4.0, score__lt=5.0).count()),
-            ('D+ (3.0-3.9)', all_grades.filter(score__gte=3.0, score__lt=4.0).count()),
-            ('D (2.0-2.9)', all_grades.filter(score__gte=2.0, score__lt=3.0).count()),
-            ('F (0-1.9)', all_grades.filter(score__lt=2.0).count()),
+        # Course statistics: thống kê từng môn đã tính sẵn, chỉ cần một query lấy các môn
+        courses = Course.objects.in_bulk([row['course_id'] for row in analytics.courses])
+        context['course_statistics'] = [
+            {**row, 'course': courses[row['course_id']]}
+            for row in analytics.courses if row['course_id'] in courses
         ]
-        context['grade_distribution'] = grade_ranges
-        
-        # Course statistics
-        course_stats = []
-        for course in Course.objects.filter(
-            Q(teacher=teacher) | Q(assistant_teachers=teacher)
-        ).distinct():
-            course_grades = all_grades.filter(course=course)
-            if course_grades.exists():
-                course_stats.append({
-                    'course': course,
-                    'grade_count': course_grades.count(),
-                    'average': course_grades.aggregate(avg=Avg('score'))['avg'],
-                    'student_count': course.students.filter(profile__role='student').count(),
-                })
-        context['course_statistics'] = course_stats
         
         return context
 
@@ -688,6 +753,42 @@ class TeacherStudentListView(TeacherRequiredMixin, ListView):
         return context
 
 
+class TeacherAtRiskStudentListView(TeacherRequiredMixin, ReadReplicaMixin, ListView):
+    """
+    Sinh viên có nguy cơ trong các môn giảng viên dạy, hoặc trong lớp giảng viên cố vấn (?scope=advisees)
+    Lọc theo mức ?level=high|medium|low, mặc định bỏ qua mức thấp
+    """
+    template_name = 'dashboards/teacher/student/at_risk.html'
+    context_object_name = 'risk_scores'
+    paginate_by = 20
+
+    def get_scope(self):
+        return 'advisees' if self.request.GET.get('scope') == 'advisees' else 'courses'
+
+    def get_queryset(self):
+        user = self.request.user
+        queryset = advisee_risk_scores(user) if self.get_scope() == 'advisees' else teacher_risk_scores(user)
+        level = self.request.GET.get('level')
+        if level in dict(StudentRiskScore.LEVEL_CHOICES):
+            queryset = queryset.filter(level=level)
+        else:
+            queryset = queryset.exclude(level='low')
+        course_id = self.request.GET.get('course')
+        if course_id and course_id.isdigit():
+            queryset = queryset.filter(course_id=course_id)
+        return queryset.select_related('student', 'course').order_by('-score', 'pk')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update({
+            'scope': self.get_scope(),
+            'level': self.request.GET.get('level', ''),
+            'level_choices': StudentRiskScore.LEVEL_CHOICES,
+            'last_computed': StudentRiskScore.objects.aggregate(Max('computed_at'))['computed_at__max'],
+        })
+        return context
+
+
 class TeacherStudentDetailView(TeacherRequiredMixin, DetailView):
     """Student detail view for teacher"""
     model = User
@@ -7,10 +7,11 @@ from django.views.generic import TemplateView
 from django.contrib import messages
 from django.http import JsonResponse
 from django.core.exceptions import PermissionDenied
-from django.db.models import Q, Count, Avg
-from core.models import UserProfile, Course, Assignment, Grade
+from django.db.models import Q, Count
+from core.models import UserProfile, Course, Assignment
 from django.utils import timezone
-from django.db import models
+from core.utils.analytics import grade_summary
+from core.utils.role_context import get_request_role_context
 
 
 class DashboardMixin(LoginRequiredMixin):
@@ -33,11 +34,8 @@ class DashboardMixin(LoginRequiredMixin):
         return None
     
     def get_user_role(self):
-        """Lấy role của user hiện tại"""
-        profile = self.get_user_profile()
-        if profile and hasattr(profile, 'role'):
-            return profile.role  # role đã là string trong UserProfile model
-        return None
+        """Lấy role của user hiện tại (từ request.role_context, không load profile)"""
+        return get_request_role_context(self.request).role
 
 
 class BaseDashboardView(DashboardMixin, TemplateView):
@@ -176,31 +174,32 @@ class StatisticsMixin:
         return stats
     
     def get_grade_statistics(self, user=None):
-        """Thống kê điểm số"""
+        """Thống kê điểm số (hệ 10, trung bình có trọng số - core/utils/analytics.py)"""
         if user is None:
             user = self.request.user
             
         stats = {}
         
         if self.get_user_role() == 'student':
-            grades = Grade.objects.filter(student=user)
-            if grades.exists():
-                avg_score = grades.aggregate(avg=Avg('score'))['avg']
+            summary = grade_summary('student', user.pk)
+            if summary['grade_count']:
                 stats.update({
-                    'total_grades': grades.count(),
-                    'average_score': round(avg_score, 2) if avg_score else 0,
-                    'highest_score': grades.aggregate(max_score=models.Max('score'))['max_score'] or 0,
-                    'lowest_score': grades.aggregate(min_score=models.Min('score'))['min_score'] or 0,
+                    'total_grades': summary['grade_count'],
+                    'average_score': summary['weighted_mean'],
+                    'highest_score': summary['max'],
+                    'lowest_score': summary['min'],
+                    'median_score': summary['median'],
+                    'pass_rate': summary['pass_rate'],
                 })
         
         elif self.get_user_role() == 'teacher':
-            grades = Grade.objects.filter(course__teacher=user)
+            summary = grade_summary('teacher', user.pk)
             stats.update({
-                'total_grades_given': grades.count(),
-                'students_graded': grades.values('student').distinct().count(),
-                'average_class_score': round(
-                    grades.aggregate(avg=Avg('score'))['avg'] or 0, 2
-                ),
+                'total_grades_given': summary['grade_count'],
+                'students_graded': summary['student_count'],
+                'average_class_score': summary['weighted_mean'],
+                'median_class_score': summary['median'],
+                'pass_rate': summary['pass_rate'],
             })
         
         return stats 
\ No newline at end of file
@@ -0,0 +1,116 @@
+"""
+Database router primary/replica
+Các query chỉ đọc của dashboard, analytics và report được gửi tới alias 'replica'
+(nếu có cấu hình). Mọi thao tác ghi, và mọi lần đọc ngay sau khi ghi, luôn dùng
+primary để không đọc phải dữ liệu cũ do replica trễ.
+
+Việc dùng replica là opt-in theo view:
+
+    @read_replica
+    def report(request): ...
+
+    class AnalyticsView(ReadReplicaMixin, TemplateView): ...
+"""
+import contextvars
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_DB_ALIAS = 'replica'
+
+_use_replica = contextvars.ContextVar('use_replica', default=False)
+_pinned_to_primary = contextvars.ContextVar('pinned_to_primary', default=False)
+
+
+def replica_configured():
+    return REPLICA_DB_ALIAS in connections.databases
+
+
+def pin_to_primary():
+    """Các query đọc sau lời gọi này (trong cùng request) dùng primary"""
+    _pinned_to_primary.set(True)
+
+
+def set_pinned_to_primary(value):
+    """Đặt trạng thái ghim primary cho request hiện tại (dùng bởi middleware)"""
+    _pinned_to_primary.set(value)
+
+
+def is_pinned_to_primary():
+    return _pinned_to_primary.get()
+
+
+class _ReplicaScope:
+    """Bật đọc từ replica trong phạm vi một view, khôi phục trạng thái khi thoát"""
+
+    def __enter__(self):
+        self._tokens = (_use_replica.set(True), _pinned_to_primary.set(_pinned_to_primary.get()))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        use_token, pinned_token = self._tokens
+        _pinned_to_primary.reset(pinned_token)
+        _use_replica.reset(use_token)
+
+
+def use_replica():
+    """Context manager: with use_replica(): ..."""
+    return _ReplicaScope()
+
+
+def read_replica(view_func):
+    """Decorator cho view chỉ đọc (hỗ trợ cả view sync và async)"""
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _wrapped_async_view(*args, **kwargs):
+            with use_replica():
+                return await view_func(*args, **kwargs)
+        return _wrapped_async_view
+
+    @wraps(view_func)
+    def _wrapped_view(*args, **kwargs):
+        with use_replica():
+            return view_func(*args, **kwargs)
+    return _wrapped_view
+
+
+class ReadReplicaMixin:
+    """Mixin cho class-based view chỉ đọc, chỉ áp dụng cho GET/HEAD"""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        with use_replica():
+            return super().dispatch(request, *args, **kwargs)
+
+
+class PrimaryReplicaRouter:
+    """
+    - Ghi: luôn primary, đồng thời ghim các lần đọc sau đó về primary
+    - Đọc: replica khi view bật read_replica, chưa bị ghim và không nằm trong transaction
+    - Migrate: chỉ chạy trên primary, replica nhận schema qua replication
+    """
+
+    def db_for_read(self, model, **hints):
+        if not replica_configured():
+            return None
+        if not _use_replica.get() or _pinned_to_primary.get():
+            # Trả về primary tường minh để object đã load từ replica cũng đọc quan hệ từ primary
+            return DEFAULT_DB_ALIAS
+        # Đang trong transaction trên primary: đọc phải thấy dữ liệu vừa ghi
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return REPLICA_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        if _use_replica.get():
+            pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primary và replica chứa cùng dữ liệu
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_DB_ALIAS
@@ -0,0 +1,158 @@
+"""
+Management command to archive and purge old login history
+Usage:
+    python manage.py archive_login_history
+    python manage.py archive_login_history --days 90 --output-dir /backups/login_history
+    python manage.py archive_login_history --rebuild-rollups 30
+"""
+import gzip
+import json
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from core.models.authentication import LoginHistory
+from core.utils.login_rollups import day_start, rebuild_login_rollups
+
+ARCHIVE_FIELDS = (
+    'id', 'user_id', 'user__username', 'login_time', 'logout_time',
+    'ip_address', 'user_agent', 'success', 'failure_reason',
+)
+
+
+class Command(BaseCommand):
+    help = 'Archive LoginHistory rows older than the retention period to gzip NDJSON and delete them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=getattr(settings, 'LOGIN_HISTORY_RETENTION_DAYS', 180),
+            help='Keep this many days of raw login history (default: LOGIN_HISTORY_RETENTION_DAYS)'
+        )
+        parser.add_argument(
+            '--output-dir',
+            default=getattr(settings, 'LOGIN_HISTORY_ARCHIVE_DIR', 'backups/login_history'),
+            help='Directory for the .ndjson.gz archive files (default: LOGIN_HISTORY_ARCHIVE_DIR)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows read and deleted per query (default: 5000)'
+        )
+        parser.add_argument(
+            '--rebuild-rollups',
+            type=int,
+            metavar='DAYS',
+            help='Only recompute LoginActivityDaily for the last DAYS days (never before the retention '
+                 'cutoff or the oldest remaining login history), do not archive'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be archived without writing or deleting anything'
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild_rollups'] is not None:
+            end_date = timezone.localdate()
+            requested = end_date - timedelta(days=options['rebuild_rollups'])
+            start_date = self.rebuild_start(requested, options['days'])
+            if start_date is None:
+                self.stdout.write(self.style.WARNING("No login history left to rebuild rollups from"))
+                return
+            if start_date > requested:
+                self.stdout.write(self.style.WARNING(
+                    f"Rollups before {start_date} come from archived login history and were kept "
+                    f"(requested from {requested})"
+                ))
+            written = rebuild_login_rollups(start_date, end_date)
+            self.stdout.write(self.style.SUCCESS(
+                f"Rebuilt {written} rollup rows for {start_date} .. {end_date}"
+            ))
+            return
+
+        days = options['days']
+        if days < 1:
+            raise CommandError('--days must be at least 1')
+        batch_size = options['batch_size']
+
+        # Cắt theo đầu ngày để mỗi ngày được lưu trữ trọn vẹn (rollup của ngày đó không đổi)
+        cutoff_date = timezone.localdate() - timedelta(days=days)
+        cutoff = day_start(cutoff_date)
+        old_rows = LoginHistory.objects.filter(login_time__lt=cutoff)
+
+        oldest = old_rows.order_by('login_time').values_list('login_time', flat=True).first()
+        if oldest is None:
+            self.stdout.write(f"No login history older than {cutoff_date}")
+            return
+        first_date = timezone.localdate(oldest)
+        last_date = cutoff_date - timedelta(days=1)
+        total = old_rows.count()
+
+        self.stdout.write(f"Found {total} login history rows from {first_date} to {last_date}")
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING("DRY RUN - Nothing will be archived or deleted"))
+            return
+
+        # Rollup của các ngày sắp xóa phải được tính từ dữ liệu đầy đủ
+        rebuild_login_rollups(first_date, last_date)
+
+        os.makedirs(options['output_dir'], exist_ok=True)
+        filename = f"login_history_{first_date:%Y%m%d}_{last_date:%Y%m%d}_{timezone.now():%Y%m%d%H%M%S}.ndjson.gz"
+        path = os.path.join(options['output_dir'], filename)
+
+        archived, max_pk = self.write_archive(old_rows, path, batch_size)
+        deleted = self.delete_archived(old_rows.filter(pk__lte=max_pk), batch_size)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {archived} rows to {path}, deleted {deleted} rows"
+        ))
+
+    def rebuild_start(self, requested, days):
+        """
+        Ngày đầu tiên được phép tính lại rollup: không sớm hơn mốc lưu trữ và ngày cũ nhất còn
+        LoginHistory, vì rollup của các ngày đã lưu trữ không tính lại được từ dữ liệu còn lại
+
+        Returns:
+            date, hoặc None nếu không còn LoginHistory
+        """
+        oldest = LoginHistory.objects.order_by('login_time').values_list('login_time', flat=True).first()
+        if oldest is None:
+            return None
+        return max(requested, timezone.localdate() - timedelta(days=days), timezone.localdate(oldest))
+
+    def write_archive(self, rows, path, batch_size):
+        """Ghi theo pk tăng dần, file tạm chỉ được đổi tên khi ghi xong"""
+        tmp_path = f"{path}.tmp"
+        archived = 0
+        last_pk = 0
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as archive:
+            while True:
+                batch = list(
+                    rows.filter(pk__gt=last_pk).order_by('pk').values(*ARCHIVE_FIELDS)[:batch_size]
+                )
+                if not batch:
+                    break
+                for row in batch:
+                    row['username'] = row.pop('user__username')
+                    archive.write(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False))
+                    archive.write('\n')
+                archived += len(batch)
+                last_pk = batch[-1]['id']
+        os.replace(tmp_path, path)
+        return archived, last_pk
+
+    def delete_archived(self, rows, batch_size):
+        deleted = 0
+        while True:
+            pks = list(rows.order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            deleted += LoginHistory.objects.filter(pk__in=pks).delete()[0]
+        return deleted
@@ -0,0 +1,162 @@
+"""
+Management command to compare sync and async versions of read-heavy endpoints
+Usage:
+    python manage.py benchmark_async_views --username admin
+    python manage.py benchmark_async_views --base-url http://127.0.0.1:8000 --sessionid <cookie>
+"""
+import asyncio
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client
+
+from core.models.study import Course
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark sync vs async read-only JSON endpoints at different concurrency levels'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--username',
+            help='Admin user to authenticate as (in-process mode)'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Number of requests per endpoint and concurrency level (default: 200)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            default='1,8,32',
+            help='Comma-separated concurrency levels (default: 1,8,32)'
+        )
+        parser.add_argument(
+            '--endpoints',
+            default='',
+            help='Comma-separated endpoint names to run (default: all)'
+        )
+        parser.add_argument(
+            '--base-url',
+            help='Benchmark a running server instead of the in-process test client'
+        )
+        parser.add_argument(
+            '--sessionid',
+            help='Session cookie of an admin user (required with --base-url)'
+        )
+
+    def get_endpoints(self):
+        course = Course.objects.order_by('pk').only('pk').first()
+        endpoints = [
+            ('admin_stats', '/dashboard/admin/api/stats/?type=all', '/api/async/admin/stats/?type=all'),
+            ('activity_data', '/dashboard/admin/api/activity-data/?days=30', '/api/async/admin/activity-data/?days=30'),
+            ('user_search', '/custom-admin/users/search/?q=an', '/api/async/users/search/?q=an'),
+            ('class_search', '/custom-admin/classes/search/?q=IT', '/api/async/classes/search/?q=IT'),
+        ]
+        if course:
+            endpoints.append((
+                'course_analytics',
+                f'/api/courses/{course.pk}/analytics/',
+                f'/api/async/courses/{course.pk}/analytics/',
+            ))
+        return endpoints
+
+    def handle(self, *args, **options):
+        levels = [int(level) for level in options['concurrency'].split(',') if level.strip()]
+        total = options['requests']
+        selected = {name.strip() for name in options['endpoints'].split(',') if name.strip()}
+
+        endpoints = self.get_endpoints()
+        if selected:
+            endpoints = [endpoint for endpoint in endpoints if endpoint[0] in selected]
+
+        if options['base_url']:
+            if not options['sessionid']:
+                raise CommandError('--sessionid is required with --base-url')
+            runner = self.make_http_runner(options['base_url'].rstrip('/'), options['sessionid'])
+        else:
+            runner = self.make_in_process_runner(options['username'])
+
+        self.stdout.write(f"{'endpoint':<18} {'mode':<6} {'conc':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+        for name, sync_path, async_path in endpoints:
+            for concurrency in levels:
+                for mode, path in (('sync', sync_path), ('async', async_path)):
+                    elapsed, latencies, errors = runner(path, total, concurrency)
+                    self.stdout.write(
+                        f"{name:<18} {mode:<6} {concurrency:>5} {total / elapsed:>9.1f} "
+                        f"{percentile(latencies, 50) * 1000:>9.2f} {percentile(latencies, 95) * 1000:>9.2f} {errors:>7}"
+                    )
+
+    def make_in_process_runner(self, username):
+        """Chạy qua AsyncClient: view sync chạy trong thread pool, view async chạy trên event loop"""
+        if username:
+            user = User.objects.filter(username=username).first()
+        else:
+            user = User.objects.filter(profile__role='admin', is_active=True).first()
+        if user is None:
+            raise CommandError('No admin user found, use --username')
+
+        # Đăng nhập bằng client sync rồi dùng lại cookie cho client async
+        login_client = Client()
+        login_client.force_login(user)
+
+        def run(path, total, concurrency):
+            async def main():
+                client = AsyncClient()
+                client.cookies = login_client.cookies
+                semaphore = asyncio.Semaphore(concurrency)
+                latencies = []
+                errors = 0
+
+                async def one():
+                    nonlocal errors
+                    async with semaphore:
+                        started = time.perf_counter()
+                        response = await client.get(path)
+                        latencies.append(time.perf_counter() - started)
+                        if response.status_code != 200:
+                            errors += 1
+
+                started = time.perf_counter()
+                await asyncio.gather(*(one() for _ in range(total)))
+                return time.perf_counter() - started, latencies, errors
+
+            return asyncio.run(main())
+
+        return run
+
+    def make_http_runner(self, base_url, sessionid):
+        """Gửi request HTTP thật tới server đang chạy (WSGI hoặc ASGI)"""
+        def fetch(path):
+            request = urllib.request.Request(base_url + path, headers={'Cookie': f'sessionid={sessionid}'})
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    response.read()
+                    ok = response.status == 200
+            except Exception:
+                ok = False
+            return time.perf_counter() - started, ok
+
+        def run(path, total, concurrency):
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                results = list(pool.map(fetch, [path] * total))
+            elapsed = time.perf_counter() - started
+            latencies = [latency for latency, _ in results]
+            errors = sum(1 for _, ok in results if not ok)
+            return elapsed, latencies, errors
+
+        return run
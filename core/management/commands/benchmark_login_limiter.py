@@ -0,0 +1,172 @@
+"""
+Management command to benchmark the brute-force login limiter under attack traffic
+Usage:
+    python manage.py benchmark_login_limiter
+    python manage.py benchmark_login_limiter --attempts 10000 --users 500 --ips 2000 --subnets 50
+    python manage.py benchmark_login_limiter --mode view --attempts 2000
+"""
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from core.utils.brute_force import LoginRateLimiter
+
+
+class Command(BaseCommand):
+    help = 'Simulate a burst of failed logins (default 10k/minute) and report limiter throughput and DB cost'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--attempts',
+            type=int,
+            default=10000,
+            help='Number of failed login attempts to simulate (default: 10000)'
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=500,
+            help='Number of distinct targeted identifiers (default: 500)'
+        )
+        parser.add_argument(
+            '--ips',
+            type=int,
+            default=2000,
+            help='Number of distinct attacking IP addresses (default: 2000)'
+        )
+        parser.add_argument(
+            '--subnets',
+            type=int,
+            default=50,
+            help='Number of /24 subnets the IP addresses are spread over (default: 50)'
+        )
+        parser.add_argument(
+            '--mode',
+            choices=['limiter', 'view'],
+            default='limiter',
+            help='limiter: call the limiter directly; view: POST to the login endpoint (default: limiter)'
+        )
+        parser.add_argument(
+            '--path',
+            default='/api/auth/login/',
+            help='Login endpoint used in view mode (default: /api/auth/login/)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed for the generated traffic (default: 42)'
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        attempts = options['attempts']
+        users = [f"bench-user-{i}@example.invalid" for i in range(options['users'])]
+        subnets = [f"10.{i // 256}.{i % 256}" for i in range(options['subnets'])]
+        ips = [f"{subnets[i % len(subnets)]}.{rng.randint(1, 254)}" for i in range(options['ips'])]
+        traffic = [(rng.choice(users), rng.choice(ips)) for _ in range(attempts)]
+
+        # Namespace riêng để không ảnh hưởng bộ đếm thật
+        limiter = BenchmarkLimiter(run_id=f"{int(time.time())}-{rng.randint(0, 10**6)}")
+
+        self.stdout.write(
+            f"Simulating {attempts} failed logins over {len(users)} users, "
+            f"{len(ips)} IPs in {len(subnets)} subnets ({options['mode']} mode)"
+        )
+        if options['mode'] == 'limiter':
+            result = self.run_limiter(limiter, traffic)
+        else:
+            result = self.run_view(options['path'], traffic)
+        self.report(attempts, result)
+
+    def run_limiter(self, limiter, traffic):
+        blocked = {}
+        tripped = {}
+        # Giả lập 1 phút: mỗi lần thử cách nhau 60/attempts giây
+        start_at = time.time()
+        step = 60.0 / max(len(traffic), 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for index, (identifier, ip_address) in enumerate(traffic):
+                now = start_at + index * step
+                decision = limiter.check(identifier, ip_address, now=now)
+                if not decision.allowed:
+                    blocked[decision.scope] = blocked.get(decision.scope, 0) + 1
+                    continue
+                for scope in limiter.register_failure(identifier, ip_address, now=now):
+                    tripped[scope] = tripped.get(scope, 0) + 1
+            elapsed = time.perf_counter() - started
+
+        return {
+            'elapsed': elapsed,
+            'blocked': blocked,
+            'tripped': tripped,
+            'queries': len(queries),
+            'writes': sum(1 for query in queries if not query['sql'].lstrip().upper().startswith('SELECT')),
+        }
+
+    def run_view(self, path, traffic):
+        client = Client()
+        blocked = {}
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for identifier, ip_address in traffic:
+                response = client.post(
+                    path,
+                    {'email': identifier, 'password': 'wrong-password'},
+                    content_type='application/json',
+                    REMOTE_ADDR=ip_address,
+                )
+                if response.status_code in (423, 429):
+                    scope = 'user' if response.status_code == 423 else 'ip/subnet'
+                    blocked[scope] = blocked.get(scope, 0) + 1
+            elapsed = time.perf_counter() - started
+
+        return {
+            'elapsed': elapsed,
+            'blocked': blocked,
+            'tripped': {},
+            'queries': len(queries),
+            'writes': sum(1 for query in queries if not query['sql'].lstrip().upper().startswith('SELECT')),
+        }
+
+    def report(self, attempts, result):
+        elapsed = result['elapsed'] or 1e-9
+        blocked_total = sum(result['blocked'].values())
+        self.stdout.write(f"\n  elapsed:        {elapsed:.2f}s")
+        self.stdout.write(f"  throughput:     {attempts / elapsed:,.0f} attempts/s "
+                          f"({attempts / elapsed * 60:,.0f}/min)")
+        self.stdout.write(f"  per attempt:    {elapsed / attempts * 1000:.3f} ms")
+        self.stdout.write(f"  blocked:        {blocked_total} ({blocked_total / attempts:.1%}) "
+                          f"{self.format_counts(result['blocked'])}")
+        if result['tripped']:
+            self.stdout.write(f"  blocks issued:  {self.format_counts(result['tripped'])}")
+        self.stdout.write(f"  DB queries:     {result['queries']} ({result['queries'] / attempts:.3f}/attempt)")
+        self.stdout.write(f"  DB writes:      {result['writes']}")
+        self.stdout.write(self.style.SUCCESS('\nDone.'))
+
+    @staticmethod
+    def format_counts(counts):
+        return ', '.join(f"{scope}={count}" for scope, count in sorted(counts.items())) or '-'
+
+
+class BenchmarkLimiter(LoginRateLimiter):
+    """Limiter dùng key riêng cho mỗi lần chạy benchmark"""
+
+    def __init__(self, run_id, **kwargs):
+        super().__init__(**kwargs)
+        self.run_id = run_id
+
+    def _counter_key(self, scope, value, bucket):
+        return f"bench:{self.run_id}:{super()._counter_key(scope, value, bucket)}"
+
+    def _block_key(self, scope, value):
+        return f"bench:{self.run_id}:{super()._block_key(scope, value)}"
+
+    def _strikes_key(self, scope, value):
+        return f"bench:{self.run_id}:{super()._strikes_key(scope, value)}"
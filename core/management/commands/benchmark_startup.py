@@ -0,0 +1,124 @@
+"""
+Management command to measure cold-start time (process start -> first response)
+Usage:
+    python manage.py benchmark_startup --server gunicorn --runs 5
+    python manage.py benchmark_startup --server runserver
+"""
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def get_free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = 'Measure cold-start time from launching the server to the first HTTP response'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--server',
+            choices=['gunicorn', 'asgi', 'runserver'],
+            default='gunicorn',
+            help='Server to launch (default: gunicorn)'
+        )
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=3,
+            help='Number of cold starts to measure (default: 3)'
+        )
+        parser.add_argument(
+            '--path',
+            default='/custom-admin/login/',
+            help='Path requested as the first request (default: /custom-admin/login/)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='Gunicorn workers (default: 2)'
+        )
+        parser.add_argument(
+            '--no-preload',
+            action='store_true',
+            help='Disable gunicorn preload_app for comparison'
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=60.0,
+            help='Seconds to wait for the first response (default: 60)'
+        )
+
+    def handle(self, *args, **options):
+        timings = []
+        for run in range(1, options['runs'] + 1):
+            elapsed = self.measure(options)
+            timings.append(elapsed)
+            self.stdout.write(f"Run {run}: first response after {elapsed * 1000:.0f} ms")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['server']}: min {min(timings) * 1000:.0f} ms, "
+            f"median {statistics.median(timings) * 1000:.0f} ms, "
+            f"max {max(timings) * 1000:.0f} ms"
+        ))
+
+    def build_command(self, options, port):
+        env = os.environ.copy()
+        if options['server'] == 'runserver':
+            cmd = [sys.executable, 'manage.py', 'runserver', f'127.0.0.1:{port}', '--noreload']
+            return cmd, env
+
+        env['SERVER_MODE'] = 'asgi' if options['server'] == 'asgi' else 'wsgi'
+        env['GUNICORN_BIND'] = f'127.0.0.1:{port}'
+        env['WEB_CONCURRENCY'] = str(options['workers'])
+        env['GUNICORN_PRELOAD'] = '0' if options['no_preload'] else '1'
+        env['GUNICORN_ACCESS_LOG'] = ''
+        cmd = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py']
+        return cmd, env
+
+    def measure(self, options):
+        port = get_free_port()
+        cmd, env = self.build_command(options, port)
+        url = f"http://127.0.0.1:{port}{options['path']}"
+
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            cmd, cwd=settings.BASE_DIR, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            deadline = started + options['timeout']
+            while time.perf_counter() < deadline:
+                if process.poll() is not None:
+                    raise CommandError(f"Server exited with code {process.returncode}")
+                try:
+                    with urllib.request.urlopen(url, timeout=5) as response:
+                        response.read()
+                    return time.perf_counter() - started
+                except urllib.error.HTTPError:
+                    # Bất kỳ response HTTP nào (kể cả 3xx/4xx) đều tính là đã sẵn sàng
+                    return time.perf_counter() - started
+                except (urllib.error.URLError, ConnectionError, socket.timeout):
+                    time.sleep(0.02)
+            raise CommandError(f"No response from {url} after {options['timeout']} seconds")
+        finally:
+            process.send_signal(signal.SIGTERM)
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
@@ -0,0 +1,179 @@
+"""
+Management command to benchmark the key pages and API endpoints against a baseline
+Usage:
+    python manage.py benchmark_suite
+    python manage.py benchmark_suite --students 1000 --courses 50 --iterations 30
+    python manage.py benchmark_suite --scenarios api_courses,document_list --no-latency
+    python manage.py benchmark_suite --update-baseline
+"""
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.test.utils import (
+    setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+)
+
+from core.utils.benchmark_suite import (
+    SCENARIOS, BenchmarkRunner, compare_with_baseline, load_baseline, run_scenario,
+    save_baseline, seed_benchmark_data
+)
+
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, 'benchmarks', 'baseline.json')
+
+
+class Command(BaseCommand):
+    help = 'Seed a synthetic dataset in a throwaway test database, benchmark key paths and compare with a baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=200, help='Students to seed (default: 200)')
+        parser.add_argument('--teachers', type=int, default=10, help='Teachers to seed (default: 10)')
+        parser.add_argument('--courses', type=int, default=20, help='Courses to seed (default: 20)')
+        parser.add_argument(
+            '--enrollments', type=int, default=4, help='Courses per student (default: 4)'
+        )
+        parser.add_argument(
+            '--assignments', type=int, default=5, help='Assignments per course (default: 5)'
+        )
+        parser.add_argument(
+            '--documents', type=int, default=3, help='Documents per course (default: 3)'
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+        parser.add_argument(
+            '--iterations', type=int, default=20, help='Measured requests per scenario (default: 20)'
+        )
+        parser.add_argument(
+            '--warmup', type=int, default=2, help='Unmeasured requests per scenario (default: 2)'
+        )
+        parser.add_argument(
+            '--scenarios',
+            default='',
+            help='Comma-separated scenario names to run (default: all)'
+        )
+        parser.add_argument(
+            '--baseline',
+            default=DEFAULT_BASELINE,
+            help='Baseline JSON file (default: benchmarks/baseline.json)'
+        )
+        parser.add_argument(
+            '--update-baseline',
+            action='store_true',
+            help='Write the results as the new baseline instead of comparing'
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.5,
+            help='Allowed p95 slowdown versus baseline, as a fraction (default: 0.5)'
+        )
+        parser.add_argument(
+            '--no-latency',
+            action='store_true',
+            help='Only compare query counts and status codes (for machines other than the baseline one)'
+        )
+        parser.add_argument(
+            '--keepdb',
+            action='store_true',
+            help='Keep the test database between runs'
+        )
+
+    def handle(self, *args, **options):
+        selected = {name.strip() for name in options['scenarios'].split(',') if name.strip()}
+        scenarios = [scenario for scenario in SCENARIOS if not selected or scenario.name in selected]
+        unknown = selected - {scenario.name for scenario in SCENARIOS}
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+        results = self.run(scenarios, options)
+        self.print_results(results)
+
+        meta = {
+            name: options[name]
+            for name in ('students', 'teachers', 'courses', 'enrollments', 'assignments', 'documents',
+                         'seed', 'iterations', 'warmup')
+        }
+        if options['update_baseline']:
+            os.makedirs(os.path.dirname(os.path.abspath(options['baseline'])), exist_ok=True)
+            save_baseline(options['baseline'], results, meta)
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}"))
+            return
+
+        baseline = load_baseline(options['baseline'])
+        if baseline is None:
+            self.stdout.write(self.style.WARNING(
+                f"No baseline at {options['baseline']}, run with --update-baseline to create one"
+            ))
+            return
+        if baseline.get('meta', {}) != meta:
+            self.stdout.write(self.style.WARNING('Dataset/iteration options differ from the baseline run'))
+
+        regressions = compare_with_baseline(
+            results, baseline, tolerance=options['tolerance'], check_latency=not options['no_latency']
+        )
+        if regressions:
+            for regression in regressions:
+                self.stderr.write(self.style.ERROR(f"REGRESSION {regression}"))
+            raise CommandError(f"{len(regressions)} benchmark regression(s) against {options['baseline']}")
+        self.stdout.write(self.style.SUCCESS('No regressions against baseline'))
+
+    def run(self, scenarios, options):
+        """Tạo database test, sinh dữ liệu và chạy các scenario; dọn dẹp khi xong"""
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=options['keepdb'])
+        media_root = tempfile.mkdtemp(prefix='benchmark_media_')
+        # Cache riêng trong bộ nhớ để kết quả không phụ thuộc cache của môi trường thật
+        isolated = override_settings(
+            MEDIA_ROOT=media_root,
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+            QUERY_INSTRUMENTATION_ENABLED=False,
+        )
+        isolated.enable()
+        try:
+            self.stdout.write('Seeding benchmark dataset...')
+            dataset = seed_benchmark_data(
+                students=options['students'],
+                teachers=options['teachers'],
+                courses=options['courses'],
+                enrollments_per_student=options['enrollments'],
+                assignments_per_course=options['assignments'],
+                documents_per_course=options['documents'],
+                seed=options['seed'],
+            )
+            self.stdout.write(', '.join(f"{name}: {count}" for name, count in sorted(dataset.counts.items())))
+
+            users = {
+                'admin': dataset.admin_id,
+                'teacher': dataset.teacher_id,
+                'student': dataset.student_id,
+            }
+            clients = {}
+            for role, user_id in users.items():
+                # Lỗi 500 được ghi nhận như một status, không dừng cả bộ benchmark
+                clients[role] = Client(raise_request_exception=False)
+                clients[role].force_login(User.objects.get(pk=user_id))
+
+            runner = BenchmarkRunner(iterations=options['iterations'], warmup=options['warmup'])
+            results = {}
+            for scenario in scenarios:
+                result = run_scenario(scenario, clients[scenario.role], dataset, runner)
+                results[scenario.name] = result.stats()
+            return results
+        finally:
+            isolated.disable()
+            teardown_databases(old_config, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+            shutil.rmtree(media_root, ignore_errors=True)
+
+    def print_results(self, results):
+        self.stdout.write(
+            f"{'scenario':<24} {'status':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8} {'q max':>6}"
+        )
+        for name, stats in results.items():
+            self.stdout.write(
+                f"{name:<24} {str(stats['status']):>6} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} "
+                f"{stats['p99_ms']:>9.2f} {stats['queries']:>8} {stats['queries_max']:>6}"
+            )
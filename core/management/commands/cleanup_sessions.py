@@ -1,70 +1,115 @@
 """
 Management command to cleanup old sessions
+Usage:
+    python manage.py cleanup_sessions
+    python manage.py cleanup_sessions --batch-size 500 --pause 0.2
+    python manage.py cleanup_sessions --loop --interval 300
 """
-from django.core.management.base import BaseCommand
+import logging
+import signal
+import threading
+from datetime import timedelta
+
+from django.conf import settings
 from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
 from django.utils import timezone
-from datetime import timedelta
+
+from core.utils.session_cleanup import delete_expired_sessions
+
+logger = logging.getLogger(__name__)
 
 
 class Command(BaseCommand):
-    help = 'Cleanup old sessions from database'
-    
+    help = 'Delete expired sessions in small primary-key batches (once or continuously with --loop)'
+
     def add_arguments(self, parser):
         parser.add_argument(
             '--days',
             type=int,
-            default=1,
-            help='Delete sessions older than this many days (default: 1)'
+            default=0,
+            help='Only delete sessions that expired more than this many days ago (default: 0)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=getattr(settings, 'SESSION_CLEANUP_BATCH_SIZE', 1000),
+            help='Sessions deleted per batch (default: SESSION_CLEANUP_BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=getattr(settings, 'SESSION_CLEANUP_PAUSE', 0.1),
+            help='Seconds to sleep between batches (default: SESSION_CLEANUP_PAUSE)'
+        )
+        parser.add_argument(
+            '--max-batches',
+            type=int,
+            help='Stop after this many batches per run'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running, starting a new run every --interval seconds'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=getattr(settings, 'SESSION_CLEANUP_INTERVAL', 300),
+            help='Seconds between runs in --loop mode (default: SESSION_CLEANUP_INTERVAL)'
         )
         parser.add_argument(
             '--dry-run',
             action='store_true',
             help='Show what would be deleted without actually deleting'
         )
-    
+
     def handle(self, *args, **options):
         days = options['days']
-        dry_run = options['dry_run']
-        
-        # Calculate cutoff time
-        cutoff_time = timezone.now() - timedelta(days=days)
-        
-        # Find old sessions
-        old_sessions = Session.objects.filter(expire_date__lt=cutoff_time)
-        old_count = old_sessions.count()
-        
-        # Find invalid sessions
-        invalid_sessions = Session.objects.filter(expire_date__isnull=True)
-        invalid_count = invalid_sessions.count()
-        
-        total_count = old_count + invalid_count
-        
-        self.stdout.write(f"Found {old_count} old sessions (older than {days} days)")
-        self.stdout.write(f"Found {invalid_count} invalid sessions (no expire_date)")
-        self.stdout.write(f"Total sessions to delete: {total_count}")
-        
-        if dry_run:
+
+        if options['dry_run']:
+            cutoff = timezone.now() - timedelta(days=days)
+            expired_count = Session.objects.filter(expire_date__lt=cutoff).count()
+            self.stdout.write(f"Found {expired_count} expired sessions (expired more than {days} days ago)")
             self.stdout.write(self.style.WARNING("DRY RUN - No sessions will be deleted"))
             return
-        
-        if total_count > 0:
-            # Delete old sessions
-            if old_count > 0:
-                old_sessions.delete()
-                self.stdout.write(f"Deleted {old_count} old sessions")
-            
-            # Delete invalid sessions
-            if invalid_count > 0:
-                invalid_sessions.delete()
-                self.stdout.write(f"Deleted {invalid_count} invalid sessions")
-            
-            self.stdout.write(
-                self.style.SUCCESS(f"Successfully deleted {total_count} sessions")
-            )
+
+        stop_event = threading.Event()
+        if options['loop']:
+            # Dừng sau lô hiện tại khi container/job runner gửi SIGTERM hoặc Ctrl+C
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(signum, lambda *_: stop_event.set())
+
+        while True:
+            try:
+                stats = delete_expired_sessions(
+                    cutoff=timezone.now() - timedelta(days=days),
+                    batch_size=options['batch_size'],
+                    pause=options['pause'],
+                    max_batches=options['max_batches'],
+                    stop_event=stop_event,
+                    on_batch=self.report_batch if options['verbosity'] > 1 else None,
+                )
+                self.report(stats)
+            except DatabaseError as e:
+                if not options['loop']:
+                    raise
+                # Lỗi tạm thời (mất kết nối, lock timeout): thử lại ở lần chạy sau
+                logger.error(f"Session cleanup failed: {str(e)}")
+
+            if not options['loop'] or stop_event.wait(options['interval']):
+                break
+            close_old_connections()
+
+    def report_batch(self, batch, count):
+        self.stdout.write(f"  batch {batch}: deleted {count}")
+
+    def report(self, stats):
+        if stats['deleted']:
+            self.stdout.write(self.style.SUCCESS(
+                f"Deleted {stats['deleted']} expired sessions in {stats['batches']} batches "
+                f"({stats['elapsed']:.2f}s, {stats['rate']:.0f} sessions/s)"
+            ))
         else:
             self.stdout.write("No sessions to delete")
-        
-        # Show remaining sessions
-        remaining = Session.objects.count()
-        self.stdout.write(f"Remaining sessions: {remaining}") 
\ No newline at end of file
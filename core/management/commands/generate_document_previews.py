@@ -0,0 +1,48 @@
+"""
+Management command to (re)generate document previews
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from core.models.documents import Document
+from core.utils.previews import build_document_preview
+
+
+class Command(BaseCommand):
+    help = 'Generate thumbnails and text excerpts for documents'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Also retry documents whose preview generation failed'
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Regenerate previews for every active document'
+        )
+    
+    def handle(self, *args, **options):
+        documents = Document.objects.filter(status='active')
+        if not options['all']:
+            statuses = ['pending']
+            if options['retry_failed']:
+                statuses.append('failed')
+            documents = documents.filter(preview_status__in=statuses)
+        
+        document_ids = list(documents.values_list('pk', flat=True))
+        self.stdout.write(f"Found {len(document_ids)} documents to process")
+        
+        for document_id in document_ids:
+            build_document_preview(document_id)
+        
+        summary = dict(
+            Document.objects.filter(pk__in=document_ids)
+            .values_list('preview_status')
+            .annotate(total=Count('pk'))
+        )
+        for status, total in sorted(summary.items()):
+            self.stdout.write(f"  {status}: {total}")
+        
+        self.stdout.write(self.style.SUCCESS(f"Processed {len(document_ids)} documents"))
@@ -0,0 +1,128 @@
+"""
+Management command to report SQL query counts and latency per view
+Usage:
+    python manage.py query_report --path /dashboard/admin/ --path /api/courses/ --username admin
+    python manage.py query_report --path /dashboard/student/ --username sv001 --repeat 20 --fail-over-budget
+    python manage.py query_report --base-url http://127.0.0.1:8000 --sessionid <cookie>
+"""
+import json
+import urllib.request
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+from core.utils.query_metrics import metrics_buffer, summarize
+
+
+class Command(BaseCommand):
+    help = 'Show p50/p95/p99 query counts and latency per view, plus the worst repeated (N+1) queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            action='append',
+            default=[],
+            help='Path to request in-process (repeatable)'
+        )
+        parser.add_argument(
+            '--username',
+            help='User to authenticate as for in-process requests'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Requests per path in-process (default: 5)'
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=10,
+            help='Number of N+1 offenders to show (default: 10)'
+        )
+        parser.add_argument(
+            '--base-url',
+            help='Read the ring buffer of a running server from the admin query-metrics endpoint'
+        )
+        parser.add_argument(
+            '--sessionid',
+            help='Session cookie of an admin user (required with --base-url)'
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the raw report as JSON'
+        )
+        parser.add_argument(
+            '--fail-over-budget',
+            action='store_true',
+            help='Exit with an error if any view exceeded its query budget'
+        )
+
+    def handle(self, *args, **options):
+        if options['base_url']:
+            if not options['sessionid']:
+                raise CommandError('--sessionid is required with --base-url')
+            report = self.fetch_report(options['base_url'].rstrip('/'), options['sessionid'], options['top'])
+        elif options['path']:
+            report = self.run_in_process(options)
+        else:
+            raise CommandError('Give at least one --path, or --base-url to read a running server')
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2, ensure_ascii=False))
+        else:
+            self.print_report(report)
+
+        over = [row['view'] for row in report['views'] if row['over_budget']]
+        if options['fail_over_budget'] and over:
+            raise CommandError(f"Query budget exceeded: {', '.join(over)}")
+
+    def run_in_process(self, options):
+        client = Client()
+        if options['username']:
+            user = User.objects.filter(username=options['username']).first()
+            if user is None:
+                raise CommandError(f"User '{options['username']}' not found")
+            client.force_login(user)
+
+        # Middleware được nạp ở request đầu tiên của client nên bật trước khi gửi request
+        with override_settings(QUERY_INSTRUMENTATION_ENABLED=True, QUERY_BUDGET_STRICT=False):
+            metrics_buffer.clear()
+            for path in options['path']:
+                for _ in range(options['repeat']):
+                    response = client.get(path)
+                    if response.status_code >= 400:
+                        self.stderr.write(f"{path}: HTTP {response.status_code}")
+            return summarize(metrics_buffer.snapshot(), top=options['top'])
+
+    def fetch_report(self, base_url, sessionid, top):
+        url = f"{base_url}/dashboard/admin/api/query-metrics/?top={top}"
+        request = urllib.request.Request(url, headers={'Cookie': f'sessionid={sessionid}'})
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return json.loads(response.read())
+        except Exception as e:
+            raise CommandError(f"Could not read {url}: {e}")
+
+    def print_report(self, report):
+        self.stdout.write(f"Requests recorded: {report['requests']}")
+        self.stdout.write(
+            f"{'view':<45} {'reqs':>5} {'q p50':>6} {'q p95':>6} {'q p99':>6} {'q max':>6} "
+            f"{'ms p50':>8} {'ms p95':>8} {'ms p99':>8} {'sql ms':>7} {'budget':>7}"
+        )
+        for row in report['views']:
+            budget = '' if row['budget'] is None else str(row['budget'])
+            line = (
+                f"{row['view'][:45]:<45} {row['requests']:>5} {row['queries_p50']:>6} {row['queries_p95']:>6} "
+                f"{row['queries_p99']:>6} {row['queries_max']:>6} {row['latency_p50_ms']:>8.1f} "
+                f"{row['latency_p95_ms']:>8.1f} {row['latency_p99_ms']:>8.1f} {row['sql_ms_avg']:>7.1f} {budget:>7}"
+            )
+            self.stdout.write(self.style.ERROR(line) if row['over_budget'] else line)
+
+        if report['offenders']:
+            self.stdout.write("\nRepeated queries (possible N+1):")
+            for row in report['offenders']:
+                self.stdout.write(f"  x{row['max_repeats']:<4} {row['view']} ({row['requests']} requests)")
+                self.stdout.write(f"        {row['sql'][:200]}")
@@ -0,0 +1,106 @@
+"""
+Management command to run the reminder scheduler (assignment deadlines, password reset expiry,
+pending account requests). Reminder emails are queued in the outbox and sent by send_outbox.
+Usage:
+    python manage.py run_scheduler                 # run everything due now and exit (cron)
+    python manage.py run_scheduler --loop
+    python manage.py run_scheduler --dry-run --horizon 86400
+"""
+import logging
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
+from django.utils import timezone
+
+from core.utils.scheduler import ReminderScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Queue due reminders and expire tokens (once, or continuously with --loop)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running, sleeping until the next due entry'
+        )
+        parser.add_argument(
+            '--horizon',
+            type=int,
+            default=getattr(settings, 'SCHEDULER_HORIZON', 3600),
+            help='Seconds ahead to load into the schedule (default: SCHEDULER_HORIZON)'
+        )
+        parser.add_argument(
+            '--refresh-interval',
+            type=int,
+            default=getattr(settings, 'SCHEDULER_REFRESH_INTERVAL', 300),
+            help='Seconds between schedule reloads in --loop mode (default: SCHEDULER_REFRESH_INTERVAL)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the schedule without running anything'
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        scheduler = ReminderScheduler(horizon=options['horizon'], dry_run=options['dry_run'])
+
+        if options['dry_run']:
+            now = timezone.now()
+            count = scheduler.refresh(now)
+            self.stdout.write(f"{count} entries due within {options['horizon']}s")
+            for when, _, name, key in sorted(scheduler.heap):
+                state = 'due' if when <= now else f"in {(when - now).total_seconds():.0f}s"
+                self.stdout.write(f"  {timezone.localtime(when):%Y-%m-%d %H:%M:%S}  {name:<26} {key}  ({state})")
+            self.stdout.write(self.style.WARNING("DRY RUN - Nothing was sent"))
+            return
+
+        stop_event = threading.Event()
+        if options['loop']:
+            # Dừng sau lô hiện tại khi container/job runner gửi SIGTERM hoặc Ctrl+C
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(signum, lambda *_: stop_event.set())
+
+        refreshed_at = None
+        while True:
+            now = timezone.now()
+            try:
+                if refreshed_at is None or (now - refreshed_at).total_seconds() >= options['refresh_interval']:
+                    scheduler.refresh(now)
+                    refreshed_at = now
+                self.report(scheduler.run_due(now))
+            except DatabaseError as e:
+                if not options['loop']:
+                    raise
+                # Lỗi tạm thời (mất kết nối, lock timeout): dựng lại lịch ở lần sau
+                logger.error(f"Scheduler run failed: {str(e)}")
+                refreshed_at = None
+
+            if not options['loop'] or stop_event.wait(self.sleep_seconds(scheduler, refreshed_at, options)):
+                break
+            close_old_connections()
+
+    def sleep_seconds(self, scheduler, refreshed_at, options):
+        """Ngủ đến mục kế tiếp trong heap hoặc lần dựng lại lịch, tùy cái nào đến trước"""
+        now = timezone.now()
+        wake = options['refresh_interval'] - ((now - refreshed_at).total_seconds() if refreshed_at else 0)
+        next_due = scheduler.next_due()
+        if next_due is not None:
+            wake = min(wake, (next_due - now).total_seconds())
+        return max(wake, 1)
+
+    def report(self, results):
+        if not results:
+            if self.verbosity > 1:
+                self.stdout.write("Nothing due")
+            return
+        for name, stats in results.items():
+            self.stdout.write(self.style.SUCCESS(
+                f"{name}: " + ', '.join(f"{key}={value}" for key, value in stats.items())
+            ))
@@ -0,0 +1,148 @@
+"""
+Management command to generate a production-scale synthetic university for load testing
+Usage:
+    python manage.py seed_scale
+    python manage.py seed_scale --scale 0.1
+    python manage.py seed_scale --students 20000 --courses 800 --prefix lt2 --seed 7
+"""
+import logging
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.utils.cache import (
+    ANALYTICS_NAMESPACE, COURSE_NAMESPACE, DASHBOARD_NAMESPACE, REFERENCE_NAMESPACE, invalidate_namespace
+)
+from core.utils.synthetic_data import DEFAULT_PASSWORD, SyntheticDataGenerator
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Bulk-generate faculties, classes, users, courses, enrollments, assignments, submissions, grades, notes and documents'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=50000, help='Students (default: 50000)')
+        parser.add_argument('--teachers', type=int, default=1500, help='Teachers (default: 1500)')
+        parser.add_argument('--admins', type=int, default=2, help='Admins (default: 2)')
+        parser.add_argument('--courses', type=int, default=2000, help='Courses (default: 2000)')
+        parser.add_argument('--faculties', type=int, default=10, help='Faculties (default: 10)')
+        parser.add_argument(
+            '--majors-per-faculty', type=int, default=4, help='Majors per faculty (default: 4)'
+        )
+        parser.add_argument('--class-size', type=int, default=40, help='Students per class (default: 40)')
+        parser.add_argument(
+            '--enrollments', type=int, default=5, help='Courses per student (default: 5)'
+        )
+        parser.add_argument(
+            '--assignments', type=int, default=4, help='Assignments per course (default: 4)'
+        )
+        parser.add_argument(
+            '--submission-ratio',
+            type=float,
+            default=0.5,
+            help='Share of (student, assignment) pairs with a submission (default: 0.5)'
+        )
+        parser.add_argument(
+            '--graded-ratio',
+            type=float,
+            default=0.6,
+            help='Share of submissions that are graded and get a Grade row (default: 0.6)'
+        )
+        parser.add_argument('--notes', type=int, default=1, help='Notes per student (default: 1)')
+        parser.add_argument('--documents', type=int, default=2, help='Documents per course (default: 2)')
+        parser.add_argument(
+            '--document-files',
+            type=int,
+            default=50,
+            help='Distinct small files shared by all documents (default: 50)'
+        )
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=1.0,
+            help='Multiply students, teachers, courses and faculties by this factor (e.g. 0.01 for a smoke run)'
+        )
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows per INSERT batch (default: 2000)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+        parser.add_argument(
+            '--prefix',
+            default='seed',
+            help='Prefix for usernames and codes, max 6 characters (default: seed)'
+        )
+        parser.add_argument(
+            '--password',
+            default=DEFAULT_PASSWORD,
+            help=f'Password of every generated user (default: {DEFAULT_PASSWORD})'
+        )
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if not prefix.isalnum() or len(prefix) > 6:
+            raise CommandError('--prefix must be alphanumeric and at most 6 characters')
+        if User.objects.filter(username__startswith=f'{prefix}_').exists():
+            raise CommandError(
+                f"Data with prefix '{prefix}' already exists; use another --prefix or start from an empty database"
+            )
+
+        scale = options['scale']
+        students = max(1, int(options['students'] * scale))
+        teachers = max(1, int(options['teachers'] * scale))
+        courses = max(1, int(options['courses'] * scale))
+        faculties = max(1, int(options['faculties'] * min(scale, 1) + 0.5))
+        class_size = options['class_size']
+        class_count = -(-students // class_size)
+
+        generator = SyntheticDataGenerator(
+            seed=options['seed'],
+            prefix=prefix,
+            batch_size=options['batch_size'],
+            password=options['password'],
+            progress=self.report_progress if options['verbosity'] > 1 else None,
+        )
+        started = time.perf_counter()
+
+        majors = self.step('Faculties and majors', generator.create_faculties, faculties, options['majors_per_faculty'])
+        department_ids = sorted({department_id for _, department_id in majors})
+        classes = self.step('Classes', generator.create_classes, class_count, majors, class_size, students)
+        self.step('Admins', generator.create_users, options['admins'], 'admin')
+        teacher_ids = self.step('Teachers', generator.create_users, teachers, 'teacher')
+        student_ids = self.step('Students', generator.create_students, students, classes, class_size)
+        course_ids = self.step('Courses', generator.create_courses, courses, teacher_ids, department_ids)
+        enrollments = self.step('Enrollments', generator.create_enrollments, student_ids, course_ids, options['enrollments'])
+        assignments = self.step('Assignments', generator.create_assignments, course_ids, options['assignments'])
+        self.step(
+            'Submissions and grades', generator.create_submissions, assignments, enrollments,
+            options['submission_ratio'], options['graded_ratio'],
+        )
+        self.step('Notes', generator.create_notes, student_ids, options['notes'], enrollments)
+        self.step('Documents', generator.create_documents, course_ids, options['documents'], options['document_files'])
+
+        # bulk_create không phát signal: tự vô hiệu hóa cache danh mục / môn học / dashboard / thống kê điểm
+        for namespace in (REFERENCE_NAMESPACE, COURSE_NAMESPACE, DASHBOARD_NAMESPACE, ANALYTICS_NAMESPACE):
+            invalidate_namespace(namespace)
+
+        elapsed = time.perf_counter() - started
+        counts = {name: count for name, count in generator.counts.items() if ':' not in name}
+        total = sum(counts.values())
+        self.stdout.write('')
+        for name, count in sorted(counts.items()):
+            self.stdout.write(f"  {name:<22} {count:>10}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {total} rows in {elapsed:.1f}s ({total / elapsed:.0f} rows/s). "
+            f"Users log in as {prefix}_student000000 ... with password '{options['password']}'"
+        ))
+        logger.info(f"seed_scale created {total} rows with prefix '{prefix}' in {elapsed:.1f}s")
+
+    def step(self, label, func, *args):
+        """Chạy một bước trong một transaction và in thời gian"""
+        started = time.perf_counter()
+        with transaction.atomic():
+            result = func(*args)
+        self.stdout.write(f"{label:<24} {time.perf_counter() - started:>7.1f}s")
+        return result
+
+    def report_progress(self, model, count):
+        self.stdout.write(f"    {model}: {count}")
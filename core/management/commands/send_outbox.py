@@ -0,0 +1,101 @@
+"""
+Management command to send queued emails from the outbox
+Usage:
+    python manage.py send_outbox
+    python manage.py send_outbox --rate 5 --batch-size 50
+    python manage.py send_outbox --loop --interval 10
+"""
+import logging
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
+from django.db.models import Count
+
+from core.models import OutboundEmail
+from core.utils.outbox import send_pending
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Send queued outbox emails in rate-limited batches (once or continuously with --loop)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=getattr(settings, 'OUTBOX_BATCH_SIZE', 100),
+            help='Emails claimed and sent per connection (default: OUTBOX_BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=getattr(settings, 'OUTBOX_RATE', 10),
+            help='Maximum emails per second, 0 for unlimited (default: OUTBOX_RATE)'
+        )
+        parser.add_argument(
+            '--max-batches',
+            type=int,
+            help='Stop after this many batches per run'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running, polling the outbox every --interval seconds when it is empty'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=getattr(settings, 'OUTBOX_POLL_INTERVAL', 10),
+            help='Seconds between polls in --loop mode (default: OUTBOX_POLL_INTERVAL)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show the outbox by status without sending'
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            counts = dict(OutboundEmail.objects.order_by().values_list('status').annotate(count=Count('pk')))
+            for status, label in OutboundEmail.STATUS_CHOICES:
+                self.stdout.write(f"  {label:<14} {counts.get(status, 0):>8}")
+            self.stdout.write(self.style.WARNING("DRY RUN - No emails will be sent"))
+            return
+
+        stop_event = threading.Event()
+        if options['loop']:
+            # Dừng sau email hiện tại khi container/job runner gửi SIGTERM hoặc Ctrl+C
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(signum, lambda *_: stop_event.set())
+
+        while True:
+            try:
+                stats = send_pending(
+                    batch_size=options['batch_size'],
+                    rate=options['rate'],
+                    max_batches=options['max_batches'],
+                    stop_event=stop_event,
+                )
+                self.report(stats, options['verbosity'])
+            except DatabaseError as e:
+                if not options['loop']:
+                    raise
+                # Lỗi tạm thời (mất kết nối, lock timeout): thử lại ở lần chạy sau
+                logger.error(f"Outbox run failed: {str(e)}")
+
+            if not options['loop'] or stop_event.wait(options['interval']):
+                break
+            close_old_connections()
+
+    def report(self, stats, verbosity):
+        if stats['batches']:
+            self.stdout.write(self.style.SUCCESS(
+                f"Sent {stats['sent']} emails in {stats['batches']} batches ({stats['elapsed']:.2f}s), "
+                f"{stats['retried']} to retry, {stats['failed']} failed"
+            ))
+        elif verbosity > 1:
+            self.stdout.write("No emails to send")
@@ -8,7 +8,16 @@ from django.contrib.sessions.models import Session
 from django.utils import timezone
 from django.contrib.sessions.backends.db import SessionStore
 from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from contextlib import ExitStack
 import logging
+import time
+
+from .db_router import replica_configured, set_pinned_to_primary
+from .utils.query_metrics import (
+    QueryBudgetExceeded, QueryRecorder, RequestMetrics, get_query_budget, metrics_buffer, view_label
+)
 
 logger = logging.getLogger(__name__)
 
@@ -33,10 +42,8 @@ class SimpleSessionMiddleware(MiddlewareMixin):
                     request.session = SessionStore(session_key=session_key)
                     logger.debug(f"Using existing session: {session_key}")
                 else:
-                    # Session expired, delete it
-                    session.delete()
-                    logger.debug(f"Expired session deleted: {session_key}")
-                    # Create new session
+                    # Session expired: bỏ qua, lệnh cleanup_sessions sẽ xóa theo lô
+                    logger.debug(f"Expired session ignored: {session_key}")
                     request.session = SessionStore()
             except Session.DoesNotExist:
                 # Session doesn't exist, create new one
@@ -63,6 +70,84 @@ class SimpleSessionMiddleware(MiddlewareMixin):
         return response
 
 
+class DatabaseRoutingMiddleware(MiddlewareMixin):
+    """
+    Đảm bảo read-after-write khi có database replica
+    - Request ghi (POST/PUT/PATCH/DELETE) luôn đọc từ primary
+    - Sau request ghi, đặt cookie để các request tiếp theo của user (ví dụ trang
+      redirect sau khi lưu) cũng đọc từ primary trong DB_REPLICA_PIN_SECONDS giây
+    """
+    cookie_name = 'db_primary_pin'
+    safe_methods = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+    def process_request(self, request):
+        pinned = False
+        if replica_configured():
+            pinned = request.method not in self.safe_methods or self.cookie_name in request.COOKIES
+        set_pinned_to_primary(pinned)
+
+    def process_response(self, request, response):
+        if replica_configured() and request.method not in self.safe_methods:
+            response.set_cookie(
+                self.cookie_name,
+                '1',
+                max_age=getattr(settings, 'DB_REPLICA_PIN_SECONDS', 5),
+                httponly=True,
+                samesite='Lax',
+            )
+        set_pinned_to_primary(False)
+        return response
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Ghi số câu SQL, thời gian SQL, query lặp và thời gian xử lý của mỗi request
+    vào ring buffer (core/utils/query_metrics.py)
+    - Chỉ chạy khi QUERY_INSTRUMENTATION_ENABLED bật; đặt đầu MIDDLEWARE để đếm
+      cả query của session/auth middleware
+    - View vượt query budget: ghi log warning, hoặc raise QueryBudgetExceeded
+      khi QUERY_BUDGET_STRICT bật
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_INSTRUMENTATION_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.exclude = tuple(getattr(settings, 'QUERY_INSTRUMENTATION_EXCLUDE', ()))
+
+    def __call__(self, request):
+        if self.exclude and request.path.startswith(self.exclude):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        latency = time.perf_counter() - started
+
+        metrics = RequestMetrics(
+            view=view_label(request),
+            method=request.method,
+            path=request.path,
+            status=response.status_code,
+            latency_ms=round(latency * 1000, 2),
+            queries=recorder.count,
+            sql_ms=round(recorder.sql_time * 1000, 2),
+            budget=get_query_budget(getattr(request, 'resolver_match', None)),
+            duplicates=tuple(recorder.duplicates()),
+        )
+        metrics_buffer.record(metrics)
+
+        if metrics.over_budget:
+            message = f"{metrics.view} ran {metrics.queries} queries (budget {metrics.budget}): {request.path}"
+            if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+
 # Keep legacy middleware classes for backward compatibility but they won't be used
 class MultipleSessionMiddleware(MiddlewareMixin):
     """Legacy middleware - not used"""
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_alter_assignment_allowed_file_types'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assignmentfile',
+            name='submission',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='files', to='core.assignmentsubmission', verbose_name='Bài nộp'),
+        ),
+        migrations.AddIndex(
+            model_name='assignmentfile',
+            index=models.Index(fields=['assignment', 'uploaded_by', 'is_submission_file'], name='core_assign_assignm_8c5030_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assignmentfile',
+            index=models.Index(fields=['submission', '-uploaded_at'], name='core_assign_submiss_83ffff_idx'),
+        ),
+    ]
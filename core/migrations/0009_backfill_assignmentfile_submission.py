@@ -0,0 +1,44 @@
+from django.db import migrations
+
+
+def backfill_submission(apps, schema_editor):
+    """Gắn các file bài nộp cũ vào AssignmentSubmission tương ứng"""
+    AssignmentFile = apps.get_model('core', 'AssignmentFile')
+    AssignmentSubmission = apps.get_model('core', 'AssignmentSubmission')
+
+    submission_ids = {
+        (assignment_id, student_id): pk
+        for pk, assignment_id, student_id in AssignmentSubmission.objects.values_list(
+            'pk', 'assignment_id', 'student_id'
+        ).iterator()
+    }
+    if not submission_ids:
+        return
+
+    pending = []
+    orphan_files = AssignmentFile.objects.filter(
+        is_submission_file=True,
+        submission__isnull=True,
+    ).only('pk', 'assignment_id', 'uploaded_by_id')
+    for assignment_file in orphan_files.iterator():
+        submission_id = submission_ids.get((assignment_file.assignment_id, assignment_file.uploaded_by_id))
+        if submission_id is None:
+            continue
+        assignment_file.submission_id = submission_id
+        pending.append(assignment_file)
+        if len(pending) >= 500:
+            AssignmentFile.objects.bulk_update(pending, ['submission'])
+            pending = []
+    if pending:
+        AssignmentFile.objects.bulk_update(pending, ['submission'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_assignmentfile_submission'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_submission, migrations.RunPython.noop),
+    ]
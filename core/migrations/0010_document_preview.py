@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_backfill_assignmentfile_submission'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64, verbose_name='Mã băm nội dung'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='has_thumbnail',
+            field=models.BooleanField(default=False, verbose_name='Có ảnh thu nhỏ'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='preview_status',
+            field=models.CharField(choices=[('pending', 'Đang chờ xử lý'), ('ready', 'Đã có bản xem trước'), ('unsupported', 'Không hỗ trợ xem trước'), ('failed', 'Lỗi tạo bản xem trước')], default='pending', max_length=20, verbose_name='Trạng thái xem trước'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='preview_text',
+            field=models.TextField(blank=True, verbose_name='Trích đoạn nội dung'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['preview_status'], name='core_docume_preview_5f129c_idx'),
+        ),
+    ]
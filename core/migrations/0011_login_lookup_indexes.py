@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:37
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_document_preview'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='loginhistory',
+            name='login_time',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='loginhistory',
+            index=models.Index(fields=['login_time'], name='core_loginh_login_t_1c5894_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loginhistory',
+            index=models.Index(fields=['user', '-login_time'], name='core_loginh_user_id_0e9c01_idx'),
+        ),
+        # Index cho đăng nhập bằng email không phân biệt hoa thường (LOWER(email) = ...)
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS core_auth_user_email_lower_idx ON auth_user (LOWER(email));',
+            reverse_sql='DROP INDEX IF EXISTS core_auth_user_email_lower_idx;',
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:47
+
+from django.db import migrations, models
+from django.db.models import CharField, Count, Q, Value
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def backfill_login_rollups(apps, schema_editor):
+    """Tính rollup cho toàn bộ LoginHistory hiện có (một query group theo ngày, vai trò)"""
+    LoginHistory = apps.get_model('core', 'LoginHistory')
+    LoginActivityDaily = apps.get_model('core', 'LoginActivityDaily')
+
+    rows = LoginHistory.objects.annotate(
+        day=TruncDate('login_time'),
+        role_name=Coalesce('user__profile__role', Value(''), output_field=CharField()),
+    ).values('day', 'role_name').annotate(
+        logins=Count('id', filter=Q(success=True)),
+        failures=Count('id', filter=Q(success=False)),
+        unique_users=Count('user', filter=Q(success=True), distinct=True),
+    ).order_by()
+
+    LoginActivityDaily.objects.bulk_create([
+        LoginActivityDaily(
+            date=row['day'],
+            role=row['role_name'],
+            logins=row['logins'],
+            failures=row['failures'],
+            unique_users=row['unique_users'],
+        )
+        for row in rows.iterator()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_login_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoginActivityDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('role', models.CharField(blank=True, default='', max_length=20)),
+                ('logins', models.PositiveIntegerField(default=0)),
+                ('failures', models.PositiveIntegerField(default=0)),
+                ('unique_users', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Thống kê đăng nhập theo ngày',
+                'verbose_name_plural': 'Thống kê đăng nhập theo ngày',
+                'ordering': ['-date', 'role'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'role'), name='login_activity_daily_date_role')],
+            },
+        ),
+        migrations.RunPython(backfill_login_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_login_activity_daily'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='grade',
+            name='version',
+            field=models.PositiveIntegerField(default=1, verbose_name='Phiên bản'),
+        ),
+    ]
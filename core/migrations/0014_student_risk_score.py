@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_grade_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentRiskScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(default=0, verbose_name='Điểm rủi ro')),
+                ('level', models.CharField(choices=[('low', 'Thấp'), ('medium', 'Trung bình'), ('high', 'Cao')], default='low', max_length=10, verbose_name='Mức rủi ro')),
+                ('grade_average', models.FloatField(blank=True, null=True, verbose_name='Điểm trung bình (hệ 10)')),
+                ('missing_ratio', models.FloatField(default=0, verbose_name='Tỷ lệ bài quá hạn chưa nộp')),
+                ('late_ratio', models.FloatField(default=0, verbose_name='Tỷ lệ bài nộp muộn')),
+                ('days_inactive', models.PositiveIntegerField(default=0, verbose_name='Số ngày không đăng nhập')),
+                ('computed_at', models.DateTimeField(verbose_name='Thời điểm tính')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='risk_scores', to='core.course', verbose_name='Môn học')),
+                ('enrollment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='risk_score', to='core.courseenrollment', verbose_name='Đăng ký môn học')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='risk_scores', to=settings.AUTH_USER_MODEL, verbose_name='Sinh viên')),
+            ],
+            options={
+                'verbose_name': 'Điểm rủi ro học tập',
+                'verbose_name_plural': 'Điểm rủi ro học tập',
+                'ordering': ['-score'],
+                'indexes': [models.Index(fields=['course', '-score'], name='core_studen_course__c73c99_idx'), models.Index(fields=['student', '-score'], name='core_studen_student_e4ae83_idx'), models.Index(fields=['level', '-score'], name='core_studen_level_9204b6_idx')],
+            },
+        ),
+    ]
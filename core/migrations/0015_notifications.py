@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:51
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_student_risk_score'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_read_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='notification_cursor', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Con trỏ thông báo',
+                'verbose_name_plural': 'Con trỏ thông báo',
+            },
+        ),
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('assignment_published', 'Bài tập mới'), ('assignment_graded', 'Bài tập đã chấm điểm'), ('assignment_due', 'Sắp đến hạn nộp'), ('announcement', 'Thông báo')], default='announcement', max_length=30, verbose_name='Loại')),
+                ('title', models.CharField(max_length=200, verbose_name='Tiêu đề')),
+                ('message', models.TextField(blank=True, verbose_name='Nội dung')),
+                ('url', models.CharField(blank=True, max_length=500, verbose_name='Đường dẫn')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Thời gian')),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sent_notifications', to=settings.AUTH_USER_MODEL, verbose_name='Người gửi')),
+                ('assignment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='core.assignment', verbose_name='Bài tập')),
+                ('course', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='core.course', verbose_name='Môn học')),
+                ('recipient', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL, verbose_name='Người nhận')),
+            ],
+            options={
+                'verbose_name': 'Thông báo',
+                'verbose_name_plural': 'Thông báo',
+                'ordering': ['-id'],
+                'indexes': [models.Index(fields=['course', '-id'], name='core_notifi_course__e37747_idx'), models.Index(fields=['recipient', '-id'], name='core_notifi_recipie_d6c95f_idx'), models.Index(fields=['assignment', 'kind'], name='core_notifi_assignm_9856a8_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('course__isnull', False), ('recipient__isnull', False), _connector='OR'), name='notification_has_audience')],
+            },
+        ),
+    ]
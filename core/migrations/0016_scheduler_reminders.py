@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:54
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_notifications'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssignmentReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hours_before', models.PositiveIntegerField(verbose_name='Số giờ trước hạn')),
+                ('sent_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Thời gian gửi')),
+                ('recipient_count', models.PositiveIntegerField(default=0, verbose_name='Số sinh viên được nhắc')),
+            ],
+            options={
+                'verbose_name': 'Nhắc hạn nộp bài',
+                'verbose_name_plural': 'Nhắc hạn nộp bài',
+                'ordering': ['-sent_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='studentaccountrequest',
+            name='reminded_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Đã nhắc duyệt lúc'),
+        ),
+        migrations.AddIndex(
+            model_name='passwordreset',
+            index=models.Index(fields=['used', 'expires_at'], name='core_passwo_used_623d2d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentaccountrequest',
+            index=models.Index(fields=['status', 'created_at'], name='core_studen_status_103128_idx'),
+        ),
+        migrations.AddField(
+            model_name='assignmentreminder',
+            name='assignment',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='core.assignment', verbose_name='Bài tập'),
+        ),
+        migrations.AddConstraint(
+            model_name='assignmentreminder',
+            constraint=models.UniqueConstraint(fields=('assignment', 'hours_before'), name='assignment_reminder_once'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:58
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_scheduler_reminders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('welcome', 'Chào mừng tài khoản mới'), ('account_created', 'Tài khoản sinh viên đã được tạo'), ('custom', 'Email soạn sẵn')], max_length=30, verbose_name='Loại')),
+                ('to_email', models.EmailField(max_length=254, verbose_name='Người nhận')),
+                ('from_email', models.CharField(blank=True, max_length=254, verbose_name='Người gửi')),
+                ('subject', models.CharField(blank=True, max_length=255, verbose_name='Tiêu đề')),
+                ('body', models.TextField(blank=True, verbose_name='Nội dung')),
+                ('context', models.JSONField(blank=True, default=dict, verbose_name='Dữ liệu mẫu')),
+                ('status', models.CharField(choices=[('pending', 'Chờ gửi'), ('sending', 'Đang gửi'), ('sent', 'Đã gửi'), ('failed', 'Gửi thất bại')], default='pending', max_length=10, verbose_name='Trạng thái')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Số lần thử')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Thử lại lúc')),
+                ('claim_token', models.CharField(blank=True, db_index=True, max_length=32)),
+                ('last_error', models.TextField(blank=True, verbose_name='Lỗi gần nhất')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Tạo lúc')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Gửi lúc')),
+            ],
+            options={
+                'verbose_name': 'Email chờ gửi',
+                'verbose_name_plural': 'Email chờ gửi',
+                'ordering': ['-id'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='core_outbou_status_f5f1ae_idx')],
+            },
+        ),
+    ]
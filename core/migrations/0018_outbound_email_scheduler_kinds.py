@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_outbound_email'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='outboundemail',
+            name='kind',
+            field=models.CharField(choices=[('welcome', 'Chào mừng tài khoản mới'), ('account_created', 'Tài khoản sinh viên đã được tạo'), ('assignment_due', 'Nhắc hạn nộp bài'), ('account_request_digest', 'Nhắc duyệt yêu cầu tạo tài khoản'), ('custom', 'Email soạn sẵn')], max_length=30, verbose_name='Loại'),
+        ),
+    ]
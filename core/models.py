@@ -4,7 +4,7 @@ Django models for core app
 
 # Import all models from sub-modules so Django can discover them
 from .models.user import UserProfile, UserRole
-from .models.authentication import LoginHistory, PasswordReset, AccountLockout
+from .models.authentication import LoginHistory, LoginActivityDaily, PasswordReset, AccountLockout
 from .models.study import Course, CourseEnrollment, Grade, Note, Tag
 from .models.assignment import Assignment, AssignmentSubmission
 from .models.requests import StudentAccountRequest
@@ -15,7 +15,7 @@ from .documents.models import Document, DocumentCategory, DocumentDownloadLog, D
 # Make models available for import
 __all__ = [
     'UserProfile', 'UserRole',
-    'LoginHistory', 'PasswordReset', 'AccountLockout',
+    'LoginHistory', 'LoginActivityDaily', 'PasswordReset', 'AccountLockout',
     'Course', 'CourseEnrollment', 'Assignment', 'AssignmentSubmission', 'Grade', 'Note', 'Tag',
     'Document', 'DocumentCategory', 'DocumentDownloadLog', 'DocumentComment',
     'StudentAccountRequest',
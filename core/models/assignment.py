@@ -131,6 +131,17 @@ class Assignment(models.Model):
         """Kiểm tra bài tập đã quá hạn chưa"""
         return timezone.now() > self.due_date
     
+    @property
+    def is_published(self):
+        """Sinh viên đã thấy bài tập (đang hoạt động và hiển thị)"""
+        return self.status == 'active' and self.is_visible_to_students
+    
+    def publish(self):
+        """Công bố bài tập cho sinh viên (thông báo được gửi trong signal của Assignment)"""
+        self.status = 'active'
+        self.is_visible_to_students = True
+        self.save(update_fields=['status', 'is_visible_to_students', 'updated_at'])
+    
     @property
     def submission_count(self):
         """Số lượng bài nộp"""
@@ -209,6 +220,14 @@ class AssignmentFile(models.Model):
         default=False,
         verbose_name='Là file bài nộp'
     )
+    submission = models.ForeignKey(
+        'AssignmentSubmission',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='files',
+        verbose_name='Bài nộp'
+    )
     description = models.CharField(
         max_length=255,
         blank=True,
@@ -222,6 +241,8 @@ class AssignmentFile(models.Model):
         indexes = [
             models.Index(fields=['assignment', 'is_submission_file']),
             models.Index(fields=['uploaded_by']),
+            models.Index(fields=['assignment', 'uploaded_by', 'is_submission_file']),
+            models.Index(fields=['submission', '-uploaded_at']),
         ]
     
     def __str__(self):
@@ -376,15 +397,6 @@ class AssignmentSubmission(models.Model):
             return round((self.grade / self.assignment.max_score) * 100, 2)
         return 0
     
-    @property
-    def files(self):
-        """Lấy danh sách file bài nộp"""
-        return AssignmentFile.objects.filter(
-            assignment=self.assignment,
-            uploaded_by=self.student,
-            is_submission_file=True
-        )
-    
     def can_be_viewed_by(self, user):
         """Kiểm tra user có thể xem bài nộp không"""
         if user.is_superuser:
@@ -1,5 +1,5 @@
 """
-Authentication models - LoginHistory, PasswordReset, AccountLockout
+Authentication models - LoginHistory, LoginActivityDaily, PasswordReset, AccountLockout
 """
 from django.db import models
 from django.contrib.auth.models import User
@@ -11,7 +11,8 @@ class LoginHistory(models.Model):
     """Model lưu lịch sử đăng nhập"""
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='login_history')
-    login_time = models.DateTimeField(auto_now_add=True)
+    # Gán khi tạo bản ghi (không dùng auto_now_add) để giữ đúng thời điểm khi ghi theo lô
+    login_time = models.DateTimeField(default=timezone.now)
     logout_time = models.DateTimeField(null=True, blank=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True, null=True)
@@ -22,6 +23,10 @@ class LoginHistory(models.Model):
         verbose_name = 'Lịch sử đăng nhập'
         verbose_name_plural = 'Lịch sử đăng nhập'
         ordering = ['-login_time']
+        indexes = [
+            models.Index(fields=['login_time']),
+            models.Index(fields=['user', '-login_time']),
+        ]
     
     def __str__(self):
         status = "Thành công" if self.success else "Thất bại"
@@ -48,6 +53,34 @@ class LoginHistory(models.Model):
         super().save(*args, **kwargs)
 
 
+class LoginActivityDaily(models.Model):
+    """
+    Tổng hợp đăng nhập theo ngày và vai trò
+    
+    Được cập nhật mỗi khi LoginHistory được ghi (chỉ tính lại các ngày vừa có dữ
+    liệu mới) và giữ lại khi LoginHistory cũ được lưu trữ rồi xóa, nên biểu đồ
+    hoạt động chỉ cần đọc bảng nhỏ này.
+    """
+    
+    date = models.DateField()
+    role = models.CharField(max_length=20, blank=True, default='')
+    logins = models.PositiveIntegerField(default=0)
+    failures = models.PositiveIntegerField(default=0)
+    unique_users = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Thống kê đăng nhập theo ngày'
+        verbose_name_plural = 'Thống kê đăng nhập theo ngày'
+        ordering = ['-date', 'role']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'role'], name='login_activity_daily_date_role'),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} - {self.role or 'N/A'} - {self.logins} lần đăng nhập"
+
+
 class PasswordReset(models.Model):
     """Model quản lý đặt lại mật khẩu"""
     
@@ -61,6 +94,9 @@ class PasswordReset(models.Model):
         verbose_name = 'Đặt lại mật khẩu'
         verbose_name_plural = 'Đặt lại mật khẩu'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['used', 'expires_at']),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.created_at.strftime('%Y-%m-%d %H:%M')}"
@@ -77,6 +77,13 @@ class Document(models.Model):
         ('course_only', 'Chỉ môn học'),
     ]
     
+    PREVIEW_STATUS_CHOICES = [
+        ('pending', 'Đang chờ xử lý'),
+        ('ready', 'Đã có bản xem trước'),
+        ('unsupported', 'Không hỗ trợ xem trước'),
+        ('failed', 'Lỗi tạo bản xem trước'),
+    ]
+    
     # Thông tin cơ bản
     title = models.CharField(max_length=200, verbose_name='Tiêu đề')
     description = models.TextField(blank=True, null=True, verbose_name='Mô tả')
@@ -121,6 +128,17 @@ class Document(models.Model):
     download_count = models.IntegerField(default=0, verbose_name='Số lần tải về')
     last_downloaded_at = models.DateTimeField(null=True, blank=True, verbose_name='Lần tải về cuối')
     
+    # Preview (thumbnail ảnh / trích đoạn văn bản), sinh bất đồng bộ sau khi upload
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True, verbose_name='Mã băm nội dung')
+    preview_status = models.CharField(
+        max_length=20,
+        choices=PREVIEW_STATUS_CHOICES,
+        default='pending',
+        verbose_name='Trạng thái xem trước'
+    )
+    has_thumbnail = models.BooleanField(default=False, verbose_name='Có ảnh thu nhỏ')
+    preview_text = models.TextField(blank=True, verbose_name='Trích đoạn nội dung')
+    
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -129,13 +147,30 @@ class Document(models.Model):
         verbose_name = 'Tài liệu'
         verbose_name_plural = 'Tài liệu'
         ordering = ['-uploaded_at']
+        indexes = [
+            models.Index(fields=['preview_status']),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.course.name}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Ghi nhớ file đã lưu để biết khi nào cần sinh lại bản xem trước
+        instance._loaded_file_name = instance.__dict__.get('file')
+        return instance
+    
     def get_absolute_url(self):
         return reverse('core:document_detail', kwargs={'pk': self.pk})
     
+    @property
+    def thumbnail_url(self):
+        """URL ảnh thu nhỏ, gắn với mã băm nội dung để cache lâu dài"""
+        if not (self.has_thumbnail and self.content_hash):
+            return None
+        return reverse('core:document_thumbnail', kwargs={'pk': self.pk, 'content_hash': self.content_hash})
+    
     @property
     def file_size_mb(self):
         """Trả về kích thước file theo MB"""
@@ -147,10 +182,14 @@ class Document(models.Model):
         return os.path.splitext(self.file_name)[1].lower()
     
     def increment_download_count(self):
-        """Tăng số lượt tải về"""
-        self.download_count += 1
+        """
+        Tăng số lượt tải về bằng một UPDATE (F expression): không mất lượt khi tải đồng thời và
+        không phát post_save (queue_document_preview)
+        """
         self.last_downloaded_at = timezone.now()
-        self.save(update_fields=['download_count', 'last_downloaded_at'])
+        Document.objects.filter(pk=self.pk).update(
+            download_count=models.F('download_count') + 1, last_downloaded_at=self.last_downloaded_at
+        )
     
     def can_be_edited_by(self, user):
         """Kiểm tra xem user có thể chỉnh sửa tài liệu không"""
@@ -221,7 +260,15 @@ class Document(models.Model):
         if self.file_size is None and self.file:
             self.file_size = self.file.size
         
+        # File thay đổi thì bản xem trước cũ không còn đúng
+        if self.file and self.file.name != getattr(self, '_loaded_file_name', None):
+            self.content_hash = ''
+            self.preview_status = 'pending'
+            self.has_thumbnail = False
+            self.preview_text = ''
+        
         super().save(*args, **kwargs)
+        self._loaded_file_name = self.file.name
 
 
 class DocumentDownloadLog(models.Model):
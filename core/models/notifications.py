@@ -0,0 +1,128 @@
+"""
+Notification models - Notification, NotificationCursor, AssignmentReminder
+"""
+from django.db import models
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+
+class Notification(models.Model):
+    """
+    Thông báo - một dòng cho mỗi sự kiện
+
+    Thông báo gửi cho môn học (course) được mọi sinh viên đang học môn đó thấy mà không
+    tạo dòng riêng cho từng người; thông báo riêng có recipient. Trạng thái đã đọc của
+    mỗi user là một con trỏ (NotificationCursor), xem core/utils/notifications.py.
+    """
+
+    KIND_CHOICES = [
+        ('assignment_published', 'Bài tập mới'),
+        ('assignment_graded', 'Bài tập đã chấm điểm'),
+        ('assignment_due', 'Sắp đến hạn nộp'),
+        ('announcement', 'Thông báo'),
+    ]
+
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES, default='announcement', verbose_name='Loại')
+    title = models.CharField(max_length=200, verbose_name='Tiêu đề')
+    message = models.TextField(blank=True, verbose_name='Nội dung')
+    url = models.CharField(max_length=500, blank=True, verbose_name='Đường dẫn')
+
+    # Người nhận: cả môn học hoặc một user
+    course = models.ForeignKey(
+        'Course',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='notifications',
+        verbose_name='Môn học'
+    )
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='notifications',
+        verbose_name='Người nhận'
+    )
+
+    assignment = models.ForeignKey(
+        'Assignment',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='notifications',
+        verbose_name='Bài tập'
+    )
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='sent_notifications',
+        verbose_name='Người gửi'
+    )
+    created_at = models.DateTimeField(default=timezone.now, verbose_name='Thời gian')
+
+    class Meta:
+        verbose_name = 'Thông báo'
+        verbose_name_plural = 'Thông báo'
+        ordering = ['-id']
+        indexes = [
+            # Danh sách theo keyset (id giảm dần) của từng nhóm người nhận
+            models.Index(fields=['course', '-id']),
+            models.Index(fields=['recipient', '-id']),
+            models.Index(fields=['assignment', 'kind']),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(course__isnull=False) | models.Q(recipient__isnull=False),
+                name='notification_has_audience',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} - {self.title}"
+
+
+class NotificationCursor(models.Model):
+    """Con trỏ đã đọc của một user: mọi thông báo có id <= last_read_id được coi là đã đọc"""
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='notification_cursor')
+    last_read_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Con trỏ thông báo'
+        verbose_name_plural = 'Con trỏ thông báo'
+
+    def __str__(self):
+        return f"{self.user} - {self.last_read_id}"
+
+
+class AssignmentReminder(models.Model):
+    """
+    Lần nhắc hạn nộp đã gửi của một bài tập (mỗi mốc hours_before một lần)
+
+    Dòng được tạo trước khi gửi nên hai scheduler chạy cùng lúc không gửi trùng.
+    """
+
+    assignment = models.ForeignKey(
+        'Assignment',
+        on_delete=models.CASCADE,
+        related_name='reminders',
+        verbose_name='Bài tập'
+    )
+    hours_before = models.PositiveIntegerField(verbose_name='Số giờ trước hạn')
+    sent_at = models.DateTimeField(default=timezone.now, verbose_name='Thời gian gửi')
+    recipient_count = models.PositiveIntegerField(default=0, verbose_name='Số sinh viên được nhắc')
+
+    class Meta:
+        verbose_name = 'Nhắc hạn nộp bài'
+        verbose_name_plural = 'Nhắc hạn nộp bài'
+        ordering = ['-sent_at']
+        constraints = [
+            models.UniqueConstraint(fields=['assignment', 'hours_before'], name='assignment_reminder_once'),
+        ]
+
+    def __str__(self):
+        return f"{self.assignment} - {self.hours_before}h"
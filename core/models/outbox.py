@@ -0,0 +1,61 @@
+"""
+Outbox models - OutboundEmail
+"""
+from django.db import models
+from django.utils import timezone
+
+
+class OutboundEmail(models.Model):
+    """
+    Email chờ gửi (hàng đợi gửi đi, xem core/utils/outbox.py)
+
+    Email theo mẫu lưu kind + context và được render khi gửi bằng templates/emails/<kind>*.txt;
+    email soạn sẵn (kind='custom') lưu subject/body. Dòng được tạo trong cùng transaction với
+    thao tác gốc (tạo tài khoản, duyệt yêu cầu, mốc nhắc của scheduler) nên chỉ được gửi khi
+    thao tác đó commit.
+    Context và nội dung được xóa sau khi gửi xong vì có thể chứa mật khẩu tạm (dòng thất bại
+    giữ lại để admin gửi lại).
+    """
+
+    KIND_CHOICES = [
+        ('welcome', 'Chào mừng tài khoản mới'),
+        ('account_created', 'Tài khoản sinh viên đã được tạo'),
+        ('assignment_due', 'Nhắc hạn nộp bài'),
+        ('account_request_digest', 'Nhắc duyệt yêu cầu tạo tài khoản'),
+        ('custom', 'Email soạn sẵn'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'Chờ gửi'),
+        ('sending', 'Đang gửi'),
+        ('sent', 'Đã gửi'),
+        ('failed', 'Gửi thất bại'),
+    ]
+
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES, verbose_name='Loại')
+    to_email = models.EmailField(verbose_name='Người nhận')
+    from_email = models.CharField(max_length=254, blank=True, verbose_name='Người gửi')
+    subject = models.CharField(max_length=255, blank=True, verbose_name='Tiêu đề')
+    body = models.TextField(blank=True, verbose_name='Nội dung')
+    context = models.JSONField(default=dict, blank=True, verbose_name='Dữ liệu mẫu')
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name='Trạng thái')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='Số lần thử')
+    # Lần thử kế tiếp; với dòng đang gửi là hạn giữ chỗ của worker (quá hạn thì worker khác nhận lại)
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name='Thử lại lúc')
+    claim_token = models.CharField(max_length=32, blank=True, db_index=True)
+    last_error = models.TextField(blank=True, verbose_name='Lỗi gần nhất')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Tạo lúc')
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name='Gửi lúc')
+
+    class Meta:
+        verbose_name = 'Email chờ gửi'
+        verbose_name_plural = 'Email chờ gửi'
+        ordering = ['-id']
+        indexes = [
+            # Worker lấy các dòng đến lượt gửi theo next_attempt_at
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} - {self.to_email} - {self.get_status_display()}"
@@ -55,11 +55,16 @@ class StudentAccountRequest(models.Model):
     notes = models.TextField(blank=True, null=True, verbose_name='Ghi chú')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Admin đã được nhắc duyệt yêu cầu đang chờ (core/utils/scheduler.py)
+    reminded_at = models.DateTimeField(null=True, blank=True, verbose_name='Đã nhắc duyệt lúc')
     
     class Meta:
         verbose_name = 'Yêu cầu tạo tài khoản sinh viên'
         verbose_name_plural = 'Yêu cầu tạo tài khoản sinh viên'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
     
     def __str__(self):
         return f"{self.student_id} - {self.first_name} {self.last_name} - {self.get_status_display()}"
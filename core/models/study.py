@@ -252,6 +252,55 @@ class CourseEnrollment(models.Model):
         super().save(*args, **kwargs)
 
 
+class StudentRiskScore(models.Model):
+    """
+    Điểm rủi ro học tập của một lượt đăng ký đang học
+
+    Được tính lại hàng loạt (lệnh compute_risk_scores, core/utils/risk.py), dashboard
+    giảng viên / cố vấn học tập chỉ đọc bảng này.
+    """
+
+    LEVEL_CHOICES = [
+        ('low', 'Thấp'),
+        ('medium', 'Trung bình'),
+        ('high', 'Cao'),
+    ]
+
+    enrollment = models.OneToOneField(
+        CourseEnrollment,
+        on_delete=models.CASCADE,
+        related_name='risk_score',
+        verbose_name='Đăng ký môn học'
+    )
+    # Lặp lại từ enrollment để lọc theo môn / sinh viên không cần JOIN
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='risk_scores', verbose_name='Sinh viên')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='risk_scores', verbose_name='Môn học')
+
+    score = models.FloatField(default=0, verbose_name='Điểm rủi ro')
+    level = models.CharField(max_length=10, choices=LEVEL_CHOICES, default='low', verbose_name='Mức rủi ro')
+
+    # Các đặc trưng dùng để tính điểm
+    grade_average = models.FloatField(null=True, blank=True, verbose_name='Điểm trung bình (hệ 10)')
+    missing_ratio = models.FloatField(default=0, verbose_name='Tỷ lệ bài quá hạn chưa nộp')
+    late_ratio = models.FloatField(default=0, verbose_name='Tỷ lệ bài nộp muộn')
+    days_inactive = models.PositiveIntegerField(default=0, verbose_name='Số ngày không đăng nhập')
+
+    computed_at = models.DateTimeField(verbose_name='Thời điểm tính')
+
+    class Meta:
+        verbose_name = 'Điểm rủi ro học tập'
+        verbose_name_plural = 'Điểm rủi ro học tập'
+        ordering = ['-score']
+        indexes = [
+            models.Index(fields=['course', '-score']),
+            models.Index(fields=['student', '-score']),
+            models.Index(fields=['level', '-score']),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} - {self.course_id} - {self.score:.0f} ({self.level})"
+
+
 class Grade(models.Model):
     """Model quản lý điểm số"""
     
@@ -263,6 +312,19 @@ class Grade(models.Model):
         ('other', 'Khác'),
     ]
     
+    # Ngưỡng phần trăm tối thiểu của từng điểm chữ (giảm dần), dưới mức cuối là FAILING_LETTER
+    LETTER_GRADES = [
+        (90, 'A+'),
+        (85, 'A'),
+        (80, 'B+'),
+        (75, 'B'),
+        (70, 'C+'),
+        (65, 'C'),
+        (60, 'D+'),
+        (55, 'D'),
+    ]
+    FAILING_LETTER = 'F'
+    
     student = models.ForeignKey(
         User, 
         on_delete=models.CASCADE, 
@@ -302,6 +364,9 @@ class Grade(models.Model):
     comment = models.TextField(blank=True, null=True, verbose_name='Nhận xét')
     is_final = models.BooleanField(default=False, verbose_name='Điểm cuối cùng')
     
+    # Tăng mỗi lần lưu, dùng cho optimistic concurrency của gradebook grid (core/utils/gradebook.py)
+    version = models.PositiveIntegerField(default=1, verbose_name='Phiên bản')
+    
     # Metadata
     created_by = models.ForeignKey(
         User, 
@@ -338,25 +403,10 @@ class Grade(models.Model):
     def letter_grade(self):
         """Chuyển đổi sang điểm chữ"""
         percentage = self.percentage
-        
-        if percentage >= 90:
-            return 'A+'
-        elif percentage >= 85:
-            return 'A'
-        elif percentage >= 80:
-            return 'B+'
-        elif percentage >= 75:
-            return 'B'
-        elif percentage >= 70:
-            return 'C+'
-        elif percentage >= 65:
-            return 'C'
-        elif percentage >= 60:
-            return 'D+'
-        elif percentage >= 55:
-            return 'D'
-        else:
-            return 'F'
+        for threshold, letter in self.LETTER_GRADES:
+            if percentage >= threshold:
+                return letter
+        return self.FAILING_LETTER
     
     def clean(self):
         """Validation tùy chỉnh"""
@@ -384,6 +434,8 @@ class Grade(models.Model):
     def save(self, *args, **kwargs):
         """Override save để validation"""
         self.full_clean()
+        if not self._state.adding:
+            self.version += 1
         super().save(*args, **kwargs)
 
 
@@ -675,7 +727,12 @@ class Class(models.Model):
         return f"{self.name} - {self.get_department_display()}"
     
     def save(self, *args, **kwargs):
-        """Override save để tự động tạo tên lớp và cập nhật sĩ số"""
+        """
+        Override save để tự động tạo tên lớp
+
+        current_students không được đếm lại ở đây: sĩ số được cập nhật khi xếp lớp
+        (core/utils/roster.py) và khi UserProfile đổi lớp (core/signals.py).
+        """
         # Tạo tên lớp tự động chỉ khi chưa có và đang tạo mới
         if not self.name and not self.pk:
             self.name = self.generate_class_name()
@@ -684,18 +741,10 @@ class Class(models.Model):
         if not self.display_name and not self.pk:
             self.display_name = self.generate_display_name()
         
-        # Lưu trước để có pk
         super().save(*args, **kwargs)
         
-        # Cập nhật sĩ số hiện tại sau khi đã lưu
-        self.update_student_count()
-        
-        # Lưu lại nếu sĩ số thay đổi
-        if self.pk:  # Chỉ lưu lại nếu đã có pk
-            super().save(update_fields=['current_students'])
-        
         # Log thay đổi
-        logger.info(f"Class {self.name} saved by {self.created_by}")
+        logger.info(f"Class {self.name} saved by {self.created_by_id}")
     
     def generate_class_name(self):
         """Tạo tên lớp tự động theo format: 20IT1, 21KT2..."""
@@ -707,13 +756,10 @@ class Class(models.Model):
         return f"Lớp {self.get_department_display()} K{self.academic_year} - Lớp {self.class_number}"
     
     def update_student_count(self):
-        """Cập nhật số lượng sinh viên hiện tại"""
-        from .user import UserProfile
-        count = UserProfile.objects.filter(
-            role='student',
-            class_enrolled=self
-        ).count()
-        self.current_students = count
+        """Đếm lại và lưu số lượng sinh viên hiện tại (một UPDATE)"""
+        from core.utils.roster import refresh_class_counts
+        refresh_class_counts([self.pk])
+        self.refresh_from_db(fields=['current_students'])
     
     def get_students(self):
         """Lấy danh sách sinh viên trong lớp"""
@@ -724,29 +770,25 @@ class Class(models.Model):
         ).select_related('user')
     
     def add_student(self, student_profile):
-        """Thêm sinh viên vào lớp"""
-        if self.current_students >= self.max_students:
-            raise ValueError(f"Lớp {self.name} đã đầy ({self.max_students} sinh viên)")
-        
+        """Thêm sinh viên vào lớp (sĩ số được kiểm tra trong SQL, xem core/utils/roster.py)"""
+        from core.utils.roster import assign_students
         if student_profile.role != 'student':
             raise ValueError("Chỉ có thể thêm sinh viên vào lớp")
         
+        assign_students([student_profile.user_id], self)
         student_profile.class_enrolled = self
-        student_profile.save()
-        self.update_student_count()
-        self.save()
         
-        logger.info(f"Student {student_profile.user.username} added to class {self.name}")
+        logger.info(f"Student {student_profile.user_id} added to class {self.name}")
     
     def remove_student(self, student_profile):
         """Xóa sinh viên khỏi lớp"""
-        if student_profile.class_enrolled == self:
+        from core.utils.roster import remove_students
+        if student_profile.class_enrolled_id == self.pk:
+            remove_students([student_profile.user_id])
             student_profile.class_enrolled = None
-            student_profile.save()
-            self.update_student_count()
-            self.save()
+            self.refresh_from_db(fields=['current_students'])
             
-            logger.info(f"Student {student_profile.user.username} removed from class {self.name}")
+            logger.info(f"Student {student_profile.user_id} removed from class {self.name}")
     
     def is_full(self):
         """Kiểm tra lớp đã đầy chưa"""
@@ -1,10 +1,20 @@
 """
 Django signals for core app
 """
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import UserProfile
+from .models import (
+    AcademicYear, Assignment, AssignmentSubmission, Course, CourseCategory, CourseEnrollment, Department,
+    Document, DocumentCategory, Grade, Major, UserProfile
+)
+from .utils.analytics import invalidate_grade_analytics
+from .utils.cache import COURSE_NAMESPACE, REFERENCE_NAMESPACE, invalidate_namespace
+from .utils.notifications import forget_unread_count, notify_assignment_published, notify_submission_graded
+from .utils.previews import schedule_document_preview
+from .utils.role_context import invalidate_role_context
+from .utils.roster import refresh_class_counts
+from .utils.token_revocation import revoke_user_tokens
 
 
 @receiver(post_save, sender=User)
@@ -31,4 +41,209 @@ def save_user_profile(sender, instance, **kwargs):
                 instance.profile.save()
             except Exception:
                 # Nếu có lỗi, tạo profile mới
-                UserProfile.objects.get_or_create(user=instance) 
\ No newline at end of file
+                UserProfile.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Document)
+def queue_document_preview(sender, instance, created, update_fields=None, **kwargs):
+    """Sinh bản xem trước (bất đồng bộ) khi tài liệu mới được upload hoặc đổi file"""
+    if instance.preview_status != 'pending':
+        return
+    if update_fields and 'file' not in update_fields:
+        return
+    schedule_document_preview(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=AcademicYear)
+@receiver([post_save, post_delete], sender=Department)
+@receiver([post_save, post_delete], sender=Major)
+@receiver([post_save, post_delete], sender=CourseCategory)
+@receiver([post_save, post_delete], sender=DocumentCategory)
+def invalidate_reference_cache(sender, **kwargs):
+    """Dữ liệu danh mục thay đổi: vô hiệu hóa cache reference data"""
+    invalidate_namespace(REFERENCE_NAMESPACE)
+
+
+@receiver([post_save, post_delete], sender=Course)
+@receiver([post_save, post_delete], sender=CourseEnrollment)
+def invalidate_course_cache(sender, **kwargs):
+    """Môn học hoặc số lượng đăng ký thay đổi: vô hiệu hóa cache catalog"""
+    invalidate_namespace(COURSE_NAMESPACE)
+
+
+# =============================================================================
+# THU HỒI JWT KHI CLAIMS HOẶC THÔNG TIN ĐĂNG NHẬP THAY ĐỔI
+# =============================================================================
+
+def _changed(sender, instance, fields, update_fields):
+    """Giá trị cũ của các trường nếu có trường nào thay đổi, ngược lại None"""
+    if instance.pk is None:
+        return None
+    if update_fields is not None:
+        # update_fields có thể chứa tên field ("teacher") hoặc attname ("teacher_id")
+        names = {field.removesuffix('_id') for field in fields}
+        if not names & {field.removesuffix('_id') for field in update_fields}:
+            return None
+    old = sender.objects.filter(pk=instance.pk).values(*fields).first()
+    if old is None or all(old[field] == getattr(instance, field) for field in fields):
+        return None
+    return old
+
+
+@receiver(pre_save, sender=User)
+def revoke_tokens_on_credentials_change(sender, instance, update_fields=None, **kwargs):
+    """Đổi mật khẩu hoặc khóa tài khoản: mọi token đã cấp hết hiệu lực"""
+    if _changed(sender, instance, ['password', 'is_active', 'is_superuser', 'is_staff'], update_fields):
+        revoke_user_tokens(instance.pk)
+
+
+@receiver(pre_save, sender=UserProfile)
+def track_profile_changes(sender, instance, update_fields=None, **kwargs):
+    """
+    So profile với bản trong database trước khi lưu:
+    Đổi vai trò: claim role trong token cũ không còn đúng
+    Đổi lớp: thống kê điểm của lớp cũ và lớp mới phải tính lại
+    Đổi vai trò hoặc lớp (Class): sĩ số của lớp cũ và lớp mới được đếm lại sau khi lưu
+    """
+    old = _changed(sender, instance, ['role', 'student_class_id', 'class_enrolled_id'], update_fields)
+    if old is None:
+        return
+    if old['role'] != instance.role:
+        revoke_user_tokens(instance.user_id)
+    if old['student_class_id'] != instance.student_class_id:
+        invalidate_grade_analytics(student_ids=[instance.user_id], scopes=[('class', instance.student_class_id)])
+    if old['role'] != instance.role or old['class_enrolled_id'] != instance.class_enrolled_id:
+        instance._roster_class_ids = {old['class_enrolled_id'], instance.class_enrolled_id}
+
+
+@receiver(pre_save, sender=Course)
+def revoke_tokens_on_teacher_change(sender, instance, update_fields=None, **kwargs):
+    """
+    Đổi giảng viên: giảng viên cũ mất quyền với môn này trong claim courses
+    Đổi giảng viên / khoa / năm học: thống kê điểm của các phạm vi cũ phải tính lại
+    """
+    old = _changed(sender, instance, ['teacher_id', 'department_id', 'academic_year_id'], update_fields)
+    if old is None:
+        return
+    if old['teacher_id'] != instance.teacher_id and old['teacher_id']:
+        revoke_user_tokens(old['teacher_id'])
+        invalidate_role_context(old['teacher_id'], instance.teacher_id)
+    # Phạm vi cũ được tra từ database (chưa lưu), phạm vi mới lấy từ instance
+    invalidate_grade_analytics(course_ids=[instance.pk], scopes=[
+        ('teacher', instance.teacher_id),
+        ('department', instance.department_id),
+        ('academic_year', instance.academic_year_id),
+    ])
+
+
+@receiver(post_delete, sender=CourseEnrollment)
+def revoke_tokens_on_unenroll(sender, instance, **kwargs):
+    """Hủy đăng ký: sinh viên mất quyền với môn này trong claim courses"""
+    revoke_user_tokens(instance.student_id)
+
+
+# =============================================================================
+# ROLE CONTEXT (core/utils/role_context.py)
+# =============================================================================
+
+@receiver([post_save, post_delete], sender=UserProfile)
+def invalidate_role_context_on_profile_change(sender, instance, **kwargs):
+    """Vai trò hoặc khoa thay đổi"""
+    invalidate_role_context(instance.user_id)
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=CourseEnrollment)
+def invalidate_role_context_on_course_created(sender, instance, created, **kwargs):
+    """Môn học mới của giảng viên hoặc đăng ký mới của sinh viên"""
+    if created:
+        invalidate_role_context(getattr(instance, 'teacher_id', None), getattr(instance, 'student_id', None))
+
+
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=CourseEnrollment)
+def invalidate_role_context_on_course_deleted(sender, instance, **kwargs):
+    """Môn học bị xóa hoặc sinh viên hủy đăng ký"""
+    invalidate_role_context(getattr(instance, 'teacher_id', None), getattr(instance, 'student_id', None))
+
+
+# =============================================================================
+# SĨ SỐ LỚP (core/utils/roster.py)
+# =============================================================================
+
+@receiver(post_save, sender=UserProfile)
+def refresh_class_counts_on_profile_save(sender, instance, created, **kwargs):
+    """Profile mới có lớp, hoặc đổi lớp / vai trò (lớp cũ được ghi lại ở pre_save)"""
+    class_ids = instance.__dict__.pop('_roster_class_ids', set())
+    if created:
+        class_ids.add(instance.class_enrolled_id)
+    refresh_class_counts(class_ids)
+
+
+@receiver(post_delete, sender=UserProfile)
+def refresh_class_counts_on_profile_delete(sender, instance, **kwargs):
+    refresh_class_counts([instance.class_enrolled_id])
+
+
+# =============================================================================
+# THỐNG KÊ ĐIỂM (core/utils/analytics.py)
+# =============================================================================
+
+@receiver([post_save, post_delete], sender=Grade)
+def invalidate_grade_analytics_on_grade_change(sender, instance, **kwargs):
+    """Điểm thay đổi: các phạm vi chứa điểm này phải tính lại"""
+    invalidate_grade_analytics(course_ids=[instance.course_id], student_ids=[instance.student_id])
+
+
+@receiver(m2m_changed, sender=Course.assistant_teachers.through)
+def invalidate_grade_analytics_on_assistants_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Thêm / bớt giảng viên hỗ trợ: phạm vi của các giảng viên đó phải tính lại"""
+    if reverse and action in ('post_add', 'post_remove', 'pre_clear'):
+        # instance là giảng viên
+        invalidate_grade_analytics(scopes=[('teacher', instance.pk)])
+    elif action in ('post_add', 'post_remove'):
+        invalidate_grade_analytics(scopes=[('teacher', pk) for pk in pk_set])
+    elif action == 'pre_clear':
+        # Trước khi xóa: tra được các giảng viên hỗ trợ hiện tại của môn
+        invalidate_grade_analytics(course_ids=[instance.pk])
+
+
+# =============================================================================
+# THÔNG BÁO (core/utils/notifications.py)
+# =============================================================================
+
+@receiver(pre_save, sender=Assignment)
+def track_assignment_publish(sender, instance, update_fields=None, **kwargs):
+    """Ghi lại trạng thái công bố trước khi lưu"""
+    old = _changed(sender, instance, ['status', 'is_visible_to_students'], update_fields)
+    if old is not None:
+        instance._was_published = old['status'] == 'active' and old['is_visible_to_students']
+
+
+@receiver(post_save, sender=Assignment)
+def notify_on_assignment_publish(sender, instance, created, **kwargs):
+    """Bài tập vừa được công bố (tạo mới đã công bố hoặc chuyển sang công bố)"""
+    was_published = instance.__dict__.pop('_was_published', None)
+    if instance.is_published and (created or was_published is False):
+        notify_assignment_published(instance)
+
+
+@receiver(pre_save, sender=AssignmentSubmission)
+def track_submission_grading(sender, instance, update_fields=None, **kwargs):
+    old = _changed(sender, instance, ['status'], update_fields)
+    if old is not None:
+        instance._was_graded = old['status'] == 'graded'
+
+
+@receiver(post_save, sender=AssignmentSubmission)
+def notify_on_submission_graded(sender, instance, created, **kwargs):
+    """Bài nộp vừa được chấm"""
+    was_graded = instance.__dict__.pop('_was_graded', None)
+    if instance.status == 'graded' and (created or was_graded is False):
+        notify_submission_graded(instance)
+
+
+@receiver([post_save, post_delete], sender=CourseEnrollment)
+def forget_unread_count_on_enrollment_change(sender, instance, **kwargs):
+    """Đăng ký / hủy môn: nhóm người nhận của sinh viên thay đổi"""
+    forget_unread_count(instance.student_id)
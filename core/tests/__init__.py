@@ -0,0 +1,35 @@
+"""
+Tests cho app core (chạy: python manage.py test core.tests)
+
+Test dùng database kế thừa CacheIsolatedTestCase: cache locmem riêng cho test, được xóa trước
+mỗi test, và SyntheticDataGenerator với prefix theo tên lớp test.
+"""
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from core.utils.cache import tiered_cache
+from core.utils.synthetic_data import SyntheticDataGenerator
+
+TEST_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'core-tests'}}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CacheIsolatedTestCase(TestCase):
+    """
+    TestCase không đọc / ghi cache file thật: mọi test dùng TEST_CACHES và bắt đầu với cache
+    trống (kể cả L1 trong process của tiered_cache), nên kết quả không phụ thuộc thứ tự chạy
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.clear_caches()
+
+    @staticmethod
+    def clear_caches():
+        caches['default'].clear()
+        tiered_cache.local.clear()
+
+    @classmethod
+    def data_generator(cls, seed=1):
+        """Bộ sinh dữ liệu với prefix theo tên lớp test (username / mã không trùng giữa các lớp)"""
+        return SyntheticDataGenerator(seed=seed, prefix=cls.__name__[:6].lower())
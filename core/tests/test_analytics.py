@@ -0,0 +1,76 @@
+"""
+Tests cho thống kê điểm (core/utils/analytics.py)
+"""
+from decimal import Decimal
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from core.models import Course, Grade
+from core.tests import CacheIsolatedTestCase
+from core.utils.analytics import ANALYTICS_NAMESPACE, PASS_SCORE, compute_analytics
+
+# (student_id, course_id, score, max_score, weight)
+ROWS = [
+    (1, 10, 8, 10, 1), (1, 10, 6, 10, 3),   # lượt học (10, 1): (8 + 18) / 4 = 6.5, đạt
+    (2, 10, 90, 100, 1),                    # lượt học (10, 2): 9, đạt
+    (2, 20, 3, 10, 1),                      # lượt học (20, 2): 3, trượt
+    (3, 20, 5, 0, 1),                       # max_score = 0: bị bỏ qua
+]
+
+
+class ComputeAnalyticsTests(SimpleTestCase):
+
+    def setUp(self):
+        self.analytics = compute_analytics('all', None, ROWS)
+
+    def test_zero_max_score_rows_are_dropped(self):
+        summary = self.analytics.summary
+        self.assertEqual((summary['grade_count'], summary['student_count'], summary['course_count']), (4, 2, 2))
+        self.assertEqual(list(self.analytics.student_ids), [1, 2])
+
+    def test_weighted_mean(self):
+        summary = self.analytics.summary
+        self.assertEqual(summary['mean'], 6.5)
+        self.assertEqual(summary['weighted_mean'], round(38 / 6, 2))
+        self.assertEqual(self.analytics.student(1)['average'], 6.5)
+
+    def test_pass_rate_is_per_student_course_pair(self):
+        # Trung bình của sinh viên 2 là 6 (>= PASS_SCORE) nhưng trượt môn 20
+        self.assertGreaterEqual(self.analytics.student(2)['average'], PASS_SCORE)
+        summary = self.analytics.summary
+        self.assertEqual((summary['passed'], summary['enrollment_count'], summary['pass_rate']), (2, 3, 66.67))
+        self.assertEqual(self.analytics.courses, [
+            {'course_id': 10, 'grade_count': 3, 'student_count': 2, 'average': 7.0, 'pass_rate': 100.0},
+            {'course_id': 20, 'grade_count': 1, 'student_count': 1, 'average': 3.0, 'pass_rate': 0.0},
+        ])
+
+    def test_empty_scope(self):
+        summary = compute_analytics('course', 1, []).summary
+        self.assertEqual((summary['grade_count'], summary['pass_rate']), (0, 0.0))
+
+
+class GradeInvalidationTests(CacheIsolatedTestCase):
+
+    def test_grade_save_invalidates_only_affected_scopes(self):
+        generator = self.data_generator(seed=8)
+        teacher_id, assistant_id, other_teacher_id = generator.create_users(3, 'teacher')
+        student_id = generator.create_users(1, 'student')[0]
+        # Môn thứ hai (giảng viên khác) không bị vô hiệu hóa
+        course_id = generator.create_courses(2, [teacher_id, other_teacher_id])[0]
+        Course.objects.get(pk=course_id).assistant_teachers.add(assistant_id)
+
+        with mock.patch('core.utils.analytics.invalidate_namespace') as invalidate:
+            with self.captureOnCommitCallbacks(execute=True):
+                Grade.objects.create(
+                    student_id=student_id, course_id=course_id, grade_type='midterm', score=Decimal('7.00'),
+                    date=timezone.localdate(), created_by_id=teacher_id,
+                )
+
+        self.assertEqual(set(invalidate.call_args.args), {
+            f'{ANALYTICS_NAMESPACE}:{scope}:{pk}' for scope, pk in [
+                ('all', None), ('course', course_id), ('student', student_id),
+                ('teacher', teacher_id), ('teacher', assistant_id),
+            ]
+        })
@@ -0,0 +1,90 @@
+"""
+Tests cho LoginRateLimiter (core/utils/brute_force.py)
+"""
+import shutil
+import tempfile
+import time
+
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.utils.brute_force import LoginRateLimiter, get_client_ip
+
+LIMITS = {'user': {'limit': 3, 'window': 60, 'block': 60}}
+
+
+class LoginBackoffTests(SimpleTestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        # TIMEOUT mặc định ngắn hơn thời gian chặn: bộ đếm không được hết hạn theo TIMEOUT này
+        settings_override = override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'short': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': self.cache_dir,
+                'TIMEOUT': 1,
+            },
+        })
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.limiter = LoginRateLimiter(limits=LIMITS, cache_alias='short')
+
+    def fail_until_blocked(self, now):
+        tripped = []
+        while not tripped:
+            tripped = self.limiter.register_failure('student@example.com', None, now=now)
+        return self.limiter.check('student@example.com', None, now=now)
+
+    def test_block_after_limit(self):
+        now = time.time()
+        self.assertTrue(self.limiter.check('student@example.com', None, now=now).allowed)
+        decision = self.fail_until_blocked(now)
+        self.assertFalse(decision.allowed)
+        self.assertEqual(decision.scope, 'user')
+
+    def test_backoff_escalates_past_default_timeout(self):
+        now = time.time()
+        # Mỗi lần chặn trong một cửa sổ đếm mới, sau khi lần chặn trước hết hạn
+        first = self.fail_until_blocked(now)
+        second = self.fail_until_blocked(now + 10 * 60)
+        time.sleep(1.2)
+        third = self.fail_until_blocked(now + 20 * 60)
+        self.assertEqual([first.retry_after, second.retry_after, third.retry_after], [61, 121, 241])
+
+    def test_counter_survives_default_timeout(self):
+        now = time.time()
+        self.limiter.register_failure('student@example.com', None, now=now)
+        self.limiter.register_failure('student@example.com', None, now=now)
+        time.sleep(1.2)
+        self.assertEqual(self.limiter.register_failure('student@example.com', None, now=now), ['user'])
+
+    def test_user_scope_is_per_subnet(self):
+        now = time.time()
+        tripped = []
+        while 'user' not in tripped:
+            tripped = self.limiter.register_failure('student@example.com', '203.0.113.7', now=now)
+        self.assertFalse(self.limiter.check('student@example.com', '203.0.113.9', now=now).allowed)
+        # Client ở dải mạng khác không khóa được tài khoản
+        self.assertTrue(self.limiter.check('student@example.com', '198.51.100.7', now=now).allowed)
+
+
+class ClientIpTests(SimpleTestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_spoofed_forwarded_for_is_ignored(self):
+        request = self.factory.post('/', REMOTE_ADDR='203.0.113.7', HTTP_X_FORWARDED_FOR='10.9.8.7')
+        with override_settings(TRUSTED_PROXIES=[]):
+            self.assertEqual(get_client_ip(request), '203.0.113.7')
+        with override_settings(TRUSTED_PROXIES=['10.0.0.0/8']):
+            self.assertEqual(get_client_ip(request), '203.0.113.7')
+
+    @override_settings(TRUSTED_PROXIES=['10.0.0.0/8'])
+    def test_forwarded_for_from_trusted_proxy(self):
+        # Phần bên trái do client tự thêm, chỉ địa chỉ proxy tin cậy ghi nhận mới được dùng
+        request = self.factory.post(
+            '/', REMOTE_ADDR='10.0.0.2', HTTP_X_FORWARDED_FOR='1.2.3.4, 203.0.113.7, 10.0.0.5'
+        )
+        self.assertEqual(get_client_ip(request), '203.0.113.7')
@@ -0,0 +1,53 @@
+"""
+Tests cho TieredCache (core/utils/cache.py)
+"""
+import shutil
+import tempfile
+import time
+
+from django.test import SimpleTestCase, override_settings
+
+from core.utils.cache import TieredCache
+
+
+class TieredCacheNamespaceTests(SimpleTestCase):
+    """Version của namespace phải sống lâu hơn TIMEOUT mặc định của cache dùng chung"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        # FileBasedCache dùng incr của BaseCache (get + set với TIMEOUT mặc định)
+        settings_override = override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'short': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': self.cache_dir,
+                'TIMEOUT': 1,
+            },
+        })
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.cache = TieredCache(alias='short', local_timeout=0, jitter=0)
+
+    def test_invalidate_survives_default_timeout(self):
+        self.cache.set('reference', 'years', 'old', timeout=None)
+        self.cache.invalidate('reference')
+        version = self.cache.get_namespace_version('reference')
+
+        time.sleep(1.2)
+
+        self.assertEqual(self.cache.get_namespace_version('reference'), version)
+        self.assertIsNone(self.cache.get('reference', 'years'))
+
+    def test_invalidate_changes_version(self):
+        self.cache.set('reference', 'years', 'old', timeout=None)
+        before = self.cache.get_namespace_version('reference')
+        self.cache.invalidate('reference')
+        self.assertNotEqual(self.cache.get_namespace_version('reference'), before)
+        self.assertIsNone(self.cache.get('reference', 'years'))
+
+    def test_evicted_version_does_not_restore_old_entries(self):
+        self.cache.set('reference', 'years', 'old', timeout=None)
+        self.cache.invalidate('reference')
+        self.cache.shared.delete(self.cache._version_key('reference'))
+        self.assertIsNone(self.cache.get('reference', 'years'))
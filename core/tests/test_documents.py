@@ -0,0 +1,46 @@
+"""
+Tests cho tải tài liệu (core/views/main_views.py document_download)
+"""
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+
+from core.models import Document
+from core.tests import CacheIsolatedTestCase
+
+
+class DocumentDownloadTests(CacheIsolatedTestCase):
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        generator = self.data_generator(seed=5)
+        teacher = User.objects.get(pk=generator.create_users(1, 'teacher')[0])
+        with mock.patch('core.signals.schedule_document_preview'):
+            self.document = Document.objects.create(
+                title='Đề cương', course_id=generator.create_courses(1, [teacher.pk])[0],
+                file=SimpleUploadedFile('de-cuong.txt', b'noi dung'), file_name='de-cuong.txt',
+                file_size=8, file_type='txt', uploaded_by=teacher,
+            )
+        self.client.force_login(teacher)
+
+    def test_download_counts_without_requeueing_preview(self):
+        self.assertEqual(self.document.preview_status, 'pending')
+        with mock.patch('core.signals.schedule_document_preview') as schedule:
+            for _ in range(2):
+                response = self.client.get(reverse('core:document_download', args=[self.document.pk]))
+                self.assertEqual(response.content, b'noi dung')
+        schedule.assert_not_called()
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.download_count, 2)
+        self.assertIsNotNone(self.document.last_downloaded_at)
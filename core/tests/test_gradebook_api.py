@@ -0,0 +1,103 @@
+"""
+Tests cho API gradebook của môn học (core/api/views/study_views.py CourseGradebookView)
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import Assignment, Course, CourseEnrollment, Grade
+from core.tests import CacheIsolatedTestCase
+
+
+class CourseGradebookPermissionTests(CacheIsolatedTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        generator = cls.data_generator(seed=4)
+        cls.teacher_id, cls.assistant_id, cls.other_id = generator.create_users(3, 'teacher')
+        cls.course = Course.objects.get(pk=generator.create_courses(1, [cls.teacher_id])[0])
+        cls.course.assistant_teachers.add(cls.assistant_id)
+
+    def client_for(self, user_id):
+        client = APIClient()
+        client.force_authenticate(User.objects.get(pk=user_id))
+        return client
+
+    def get_gradebook(self, user_id):
+        return self.client_for(user_id).get(f'/api/courses/{self.course.pk}/gradebook/')
+
+    def test_course_teacher_and_assistant_can_read(self):
+        self.assertEqual(self.get_gradebook(self.teacher_id).status_code, 200)
+        self.assertEqual(self.get_gradebook(self.assistant_id).status_code, 200)
+
+    def test_other_teacher_is_forbidden(self):
+        self.assertEqual(self.get_gradebook(self.other_id).status_code, 403)
+
+    def test_assistant_cannot_manage_assignments(self):
+        # Trợ giảng chỉ được dùng gradebook; sửa / xóa bài tập vẫn chỉ dành cho giảng viên chính
+        assignment = Assignment.objects.create(
+            course=self.course, title='Bài tập 1', description='', created_by_id=self.teacher_id,
+            due_date=timezone.now() + timedelta(days=7),
+        )
+        client = self.client_for(self.assistant_id)
+        url = f'/api/assignments/{assignment.pk}/'
+        self.assertEqual(client.patch(url, {'title': 'Đổi tên'}, format='json').status_code, 403)
+        self.assertEqual(client.delete(url).status_code, 403)
+        self.assertTrue(Assignment.objects.filter(pk=assignment.pk, title='Bài tập 1').exists())
+
+
+class CourseGradebookEditTests(CacheIsolatedTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        generator = cls.data_generator(seed=6)
+        cls.teacher = User.objects.get(pk=generator.create_users(1, 'teacher')[0])
+        student_ids = generator.create_users(2, 'student')
+        course_id = generator.create_courses(1, [cls.teacher.pk])[0]
+        CourseEnrollment.objects.bulk_create(
+            CourseEnrollment(student_id=student_id, course_id=course_id, status='enrolled')
+            for student_id in student_ids
+        )
+        cls.course = Course.objects.get(pk=course_id)
+        cls.grades = [
+            Grade.objects.create(
+                student_id=student_id, course=cls.course, grade_type='midterm', score=Decimal('5.00'),
+                date=timezone.localdate(), created_by=cls.teacher,
+            )
+            for student_id in student_ids
+        ]
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+        self.url = f'/api/courses/{self.course.pk}/gradebook/'
+
+    def patch(self, *cells):
+        return self.client.patch(self.url, {'cells': list(cells)}, format='json')
+
+    def test_update_bumps_version(self):
+        response = self.patch({'grade': self.grades[0].pk, 'version': 1, 'score': '7.5'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['updated'], [{'index': 0, 'grade': self.grades[0].pk, 'version': 2}])
+        grade = Grade.objects.get(pk=self.grades[0].pk)
+        self.assertEqual((grade.score, grade.version), (Decimal('7.50'), 2))
+
+    def test_stale_version_returns_conflict_and_writes_nothing(self):
+        self.assertEqual(self.patch({'grade': self.grades[0].pk, 'version': 1, 'score': '7'}).status_code, 200)
+
+        # Lô thứ hai tải gradebook trước lần sửa trên: ô 0 lệch version, ô 1 hợp lệ
+        response = self.patch(
+            {'grade': self.grades[1].pk, 'version': 1, 'score': '9'},
+            {'grade': self.grades[0].pk, 'version': 1, 'score': '8'},
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['conflicts'], {
+            '1': {'grade': self.grades[0].pk, 'version': 2, 'score': 7.0},
+        })
+        scores = dict(Grade.objects.filter(course=self.course).values_list('pk', 'score'))
+        self.assertEqual(scores, {self.grades[0].pk: Decimal('7.00'), self.grades[1].pk: Decimal('5.00')})
+        self.assertEqual(Grade.objects.get(pk=self.grades[1].pk).version, 1)
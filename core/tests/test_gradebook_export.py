@@ -0,0 +1,48 @@
+"""
+Tests cho file xuất bảng điểm (core/utils/gradebook.py stream_csv / write_xlsx)
+"""
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from core.models import Assignment, Course, CourseEnrollment, Grade
+from core.tests import CacheIsolatedTestCase
+from core.utils.gradebook import build_gradebook, stream_csv, write_xlsx
+
+
+class GradebookExportTests(CacheIsolatedTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        generator = cls.data_generator(seed=7)
+        teacher_id = generator.create_users(1, 'teacher')[0]
+        student_id = generator.create_users(1, 'student')[0]
+        User.objects.filter(pk=student_id).update(first_name='=HYPERLINK("http://x")', last_name='')
+        cls.course = Course.objects.get(pk=generator.create_courses(1, [teacher_id])[0])
+        CourseEnrollment.objects.create(student_id=student_id, course=cls.course, status='enrolled')
+        assignment = Assignment.objects.create(
+            course=cls.course, title='+cmd|calc', description='', created_by_id=teacher_id,
+            due_date=timezone.now() + timedelta(days=1),
+        )
+        Grade.objects.create(
+            student_id=student_id, course=cls.course, assignment=assignment, grade_type='assignment',
+            score=Decimal('8.00'), date=timezone.localdate(), created_by_id=teacher_id,
+        )
+
+    def test_formula_cells_are_escaped(self):
+        gradebook = build_gradebook(self.course)
+        content = ''.join(stream_csv(gradebook))
+        self.assertIn("'+cmd|calc", content)
+        self.assertIn("'=HYPERLINK", content)
+
+        fileobj = BytesIO()
+        write_xlsx([gradebook], fileobj)
+        fileobj.seek(0)
+        rows = list(load_workbook(fileobj).worksheets[0].values)
+        self.assertEqual(rows[0][3], "'+cmd|calc")
+        self.assertEqual(rows[1][2], "'=HYPERLINK(\"http://x\")")
+        self.assertEqual(rows[1][3], 8.0)
@@ -0,0 +1,23 @@
+"""
+Tests cho tìm user khi đăng nhập (core/utils/login.py)
+"""
+from django.contrib.auth.models import User
+
+from core.tests import CacheIsolatedTestCase
+from core.utils.login import find_user_for_login
+
+
+class FindUserForLoginTests(CacheIsolatedTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.by_email = User.objects.create_user('an.nguyen', email='An.Nguyen@example.com', password='x')
+        cls.by_username = User.objects.create_user('binh@khoa-cntt', email='binh@example.com', password='x')
+
+    def test_email_is_case_insensitive(self):
+        self.assertEqual(find_user_for_login(' an.nguyen@EXAMPLE.com '), self.by_email)
+
+    def test_username_containing_at_sign(self):
+        self.assertEqual(find_user_for_login('binh@khoa-cntt'), self.by_username)
+        self.assertEqual(find_user_for_login('an.nguyen'), self.by_email)
+        self.assertIsNone(find_user_for_login('nobody@example.com'))
@@ -0,0 +1,61 @@
+"""
+Tests cho số liệu đăng nhập của admin dashboard (core/dashboards/admin/utils.py)
+"""
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from core.dashboards.admin.utils import get_login_statistics, get_user_activity_data
+from core.models.authentication import LoginActivityDaily, LoginHistory
+from core.tests import CacheIsolatedTestCase
+from core.utils.login_rollups import apply_login_rollups
+
+
+class LoginStatisticsTests(CacheIsolatedTestCase):
+
+    def setUp(self):
+        super().setUp()
+        generator = self.data_generator(seed=3)
+        user_ids = generator.create_users(2, 'student')
+        now = timezone.now()
+        entries = [
+            LoginHistory(user_id=user_ids[0], login_time=now, success=True),
+            LoginHistory(user_id=user_ids[0], login_time=now, success=False),
+            LoginHistory(user_id=user_ids[1], login_time=now, success=False),
+            LoginHistory(user_id=user_ids[1], login_time=now - timedelta(days=3), success=True),
+        ]
+        apply_login_rollups(LoginHistory.objects.bulk_create(entries))
+
+    def test_counters_count_successful_logins_only(self):
+        activity = get_login_statistics()
+        self.assertEqual(activity, {
+            'total_logins': 2,
+            'logins_today': 1,
+            'logins_this_week': 2,
+            'unique_users_today': 1,
+        })
+        series = get_user_activity_data(7)
+        self.assertEqual(sum(item['logins'] for item in series), activity['logins_this_week'])
+        self.assertEqual(series[-1]['logins'], activity['logins_today'])
+
+
+class RebuildRollupsTests(CacheIsolatedTestCase):
+
+    def test_rebuild_keeps_rollups_of_archived_days(self):
+        user_id = self.data_generator(seed=4).create_users(1, 'student')[0]
+        today = timezone.localdate()
+        # Ngày đã lưu trữ: chỉ còn rollup, LoginHistory đã bị xóa
+        archived_day = today - timedelta(days=300)
+        LoginActivityDaily.objects.create(date=archived_day, role='student', logins=7, unique_users=3)
+        LoginHistory.objects.create(user_id=user_id, login_time=timezone.now() - timedelta(days=2), success=True)
+
+        out = StringIO()
+        call_command('archive_login_history', rebuild_rollups=365, days=180, stdout=out)
+
+        self.assertIn('were kept', out.getvalue())
+        self.assertEqual(LoginActivityDaily.objects.get(date=archived_day).logins, 7)
+        self.assertEqual(
+            LoginActivityDaily.objects.filter(date=today - timedelta(days=2)).values_list('logins', flat=True).get(), 1
+        )
@@ -0,0 +1,105 @@
+"""
+Tests cho số thông báo chưa đọc (core/utils/notifications.py)
+"""
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import CourseEnrollment
+from core.tests import CacheIsolatedTestCase
+from core.utils.notifications import (
+    _stamp_key, latest_notification_id, mark_read, notify_course, notify_users, unread_count
+)
+from core.views.async_views import STREAM_PAGE_SIZE
+
+
+class UnreadCountTests(CacheIsolatedTestCase):
+
+    def setUp(self):
+        super().setUp()
+        generator = self.data_generator(seed=1)
+        teacher_ids = generator.create_users(1, 'teacher')
+        self.student_id = generator.create_users(1, 'student')[0]
+        self.course_id = generator.create_courses(1, teacher_ids)[0]
+        CourseEnrollment.objects.create(student_id=self.student_id, course_id=self.course_id, status='enrolled')
+        CourseEnrollment.objects.filter(course_id=self.course_id).update(
+            enrolled_at=timezone.now() - timedelta(days=1)
+        )
+
+    def notify(self, title):
+        with self.captureOnCommitCallbacks(execute=True):
+            notify_course(self.course_id, 'announcement', title)
+
+    def test_new_notification_invalidates_cached_count(self):
+        self.notify('TB 1')
+        self.assertEqual(unread_count(self.student_id), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.student_id), 1)
+        self.notify('TB 2')
+        self.assertEqual(unread_count(self.student_id), 2)
+
+    def test_expired_stamp_cannot_match_cached_count(self):
+        self.notify('TB 1')
+        self.assertEqual(unread_count(self.student_id), 1)
+        # Stamp hết hạn / bị evict rồi được ghi lại bởi thông báo kế tiếp
+        caches['default'].delete(_stamp_key('course', self.course_id))
+        self.notify('TB 2')
+        self.assertEqual(unread_count(self.student_id), 2)
+
+
+class NotificationPageTests(CacheIsolatedTestCase):
+
+    def setUp(self):
+        super().setUp()
+        generator = self.data_generator(seed=2)
+        self.client.force_login(User.objects.get(pk=generator.create_users(1, 'student')[0]))
+
+    @override_settings(SERVER_MODE='wsgi')
+    def test_wsgi_polls_instead_of_streaming(self):
+        response = self.client.get(reverse('dashboards:common:notifications'))
+        self.assertNotContains(response, 'EventSource(')
+        self.assertContains(response, reverse('api:notification_unread_count'))
+        # Client cũ vẫn mở stream: trả 204 ngay thay vì giữ thread của worker
+        self.assertEqual(self.client.get(reverse('api:async_notification_stream')).status_code, 204)
+
+    @override_settings(SERVER_MODE='asgi')
+    def test_asgi_opens_stream(self):
+        response = self.client.get(reverse('dashboards:common:notifications'))
+        self.assertContains(response, reverse('api:async_notification_stream'))
+        self.assertNotContains(response, reverse('api:notification_unread_count'))
+
+
+class MarkReadAndStreamTests(CacheIsolatedTestCase):
+
+    def setUp(self):
+        super().setUp()
+        generator = self.data_generator(seed=3)
+        self.student = User.objects.get(pk=generator.create_users(1, 'student')[0])
+
+    def notify(self, count):
+        with self.captureOnCommitCallbacks(execute=True):
+            for index in range(count):
+                notify_users([self.student.pk], 'announcement', f'TB {index}')
+
+    def test_mark_read_is_clamped_to_latest_notification(self):
+        self.notify(1)
+        latest = latest_notification_id(self.student.pk)
+        self.assertEqual(mark_read(self.student.pk, up_to=999999999), latest)
+        self.notify(1)
+        self.assertEqual(unread_count(self.student.pk), 1)
+
+    @override_settings(
+        SERVER_MODE='asgi', NOTIFICATION_STREAM_TIMEOUT=0.01, NOTIFICATION_STREAM_INTERVAL=0.02, LOGIN_AUDIT_ASYNC=False
+    )
+    async def test_stream_sends_every_new_notification(self):
+        await sync_to_async(self.notify)(STREAM_PAGE_SIZE + 5)
+        await self.async_client.aforce_login(self.student)
+        response = await self.async_client.get(reverse('api:async_notification_stream'), {'after': 0})
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        self.assertEqual(body.count('event: notification'), STREAM_PAGE_SIZE + 5)
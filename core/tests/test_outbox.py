@@ -0,0 +1,91 @@
+"""
+Tests cho hàng đợi email (core/utils/outbox.py)
+"""
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.test import override_settings
+from django.utils import timezone
+
+from core.models import OutboundEmail
+from core.tests import CacheIsolatedTestCase
+from core.utils.outbox import claim_batch, enqueue_bulk, retry_delay, send_pending
+
+_send = EmailMessage.send
+
+
+def send_or_fail(message, *args, **kwargs):
+    if message.to == ['bad@example.com']:
+        raise ConnectionError('mailbox unavailable')
+    return _send(message, *args, **kwargs)
+
+
+@override_settings(OUTBOX_RATE=0, OUTBOX_MAX_ATTEMPTS=3, OUTBOX_RETRY_BACKOFF=60)
+class OutboxTests(CacheIsolatedTestCase):
+
+    def test_sends_and_clears_content(self):
+        self.assertEqual(enqueue_bulk(['a@example.com', 'b@example.com', ''], 'Tiêu đề', 'Nội dung'), 2)
+        stats = send_pending()
+        self.assertEqual((stats['sent'], stats['retried'], stats['failed']), (2, 0, 0))
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['a@example.com', 'b@example.com'])
+        self.assertFalse(OutboundEmail.objects.exclude(status='sent').exists())
+        self.assertFalse(OutboundEmail.objects.exclude(body='').exists())
+
+    def test_failed_email_is_retried_with_backoff_then_marked_failed(self):
+        enqueue_bulk(['ok@example.com', 'bad@example.com'], 'Tiêu đề', 'Nội dung')
+        with mock.patch.object(EmailMessage, 'send', autospec=True, side_effect=send_or_fail):
+            started = timezone.now()
+            stats = send_pending()
+            self.assertEqual((stats['sent'], stats['retried'], stats['failed']), (1, 1, 0))
+            bad = OutboundEmail.objects.get(to_email='bad@example.com')
+            self.assertEqual((bad.status, bad.attempts, bad.claim_token), ('pending', 1, ''))
+            self.assertIn('mailbox unavailable', bad.last_error)
+            self.assertGreaterEqual(bad.next_attempt_at, started + retry_delay(1))
+
+            # Chưa đến lần thử kế tiếp thì không được nhận lại
+            self.assertEqual(send_pending()['batches'], 0)
+
+            for attempts in (2, 3):
+                OutboundEmail.objects.filter(pk=bad.pk).update(next_attempt_at=timezone.now())
+                send_pending()
+                bad.refresh_from_db()
+                self.assertEqual(bad.attempts, attempts)
+        self.assertEqual(bad.status, 'failed')
+        self.assertEqual([message.to for message in mail.outbox], [['ok@example.com']])
+
+    def test_claimed_rows_are_not_claimed_twice(self):
+        enqueue_bulk(['a@example.com', 'b@example.com', 'c@example.com'], 'Tiêu đề', 'Nội dung')
+        first = claim_batch(2)
+        second = claim_batch(2)
+        self.assertEqual(len(first), 2)
+        self.assertEqual([email.to_email for email in second], ['c@example.com'])
+        self.assertEqual(claim_batch(2), [])
+        self.assertEqual(len({email.claim_token for email in first + second}), 2)
+
+    def test_expired_claim_is_taken_over(self):
+        enqueue_bulk(['a@example.com'], 'Tiêu đề', 'Nội dung')
+        (claimed,) = claim_batch(10)
+        # Worker giữ dòng đã chết: quá hạn giữ chỗ thì worker khác nhận lại và gửi
+        self.assertEqual(claim_batch(10, now=claimed.next_attempt_at - timedelta(seconds=1)), [])
+        (taken,) = claim_batch(10, now=claimed.next_attempt_at + timedelta(seconds=1))
+        self.assertEqual(taken.pk, claimed.pk)
+        self.assertNotEqual(taken.claim_token, claimed.claim_token)
+
+    @override_settings(OUTBOX_CLAIM_TIMEOUT=600)
+    def test_claim_covers_slow_batch(self):
+        enqueue_bulk([f'sv{index}@example.com' for index in range(10)], 'Tiêu đề', 'Nội dung')
+        now = timezone.now()
+        # 10 email ở 0.01 email/giây mất 1000 giây: quá OUTBOX_CLAIM_TIMEOUT vẫn chưa được nhận lại
+        self.assertEqual(len(claim_batch(10, now=now, rate=0.01)), 10)
+        self.assertEqual(claim_batch(10, now=now + timedelta(seconds=1500), rate=0.01), [])
+        self.assertEqual(len(claim_batch(10, now=now + timedelta(seconds=1601), rate=0.01)), 10)
+
+    def test_connection_failure_requeues_whole_batch(self):
+        enqueue_bulk(['a@example.com', 'b@example.com'], 'Tiêu đề', 'Nội dung')
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.open', side_effect=OSError('refused')):
+            stats = send_pending()
+        self.assertEqual((stats['sent'], stats['retried']), (0, 2))
+        self.assertEqual(set(OutboundEmail.objects.values_list('status', 'attempts')), {('pending', 1)})
+        self.assertEqual(mail.outbox, [])
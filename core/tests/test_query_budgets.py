@@ -0,0 +1,97 @@
+"""
+Tests cho query budget của các view chính (core/utils/query_metrics.py)
+
+Mỗi view được gọi với cache trống, QUERY_INSTRUMENTATION_ENABLED và QUERY_BUDGET_STRICT bật:
+view chạy nhiều query hơn @query_budget sẽ raise QueryBudgetExceeded và làm test fail.
+"""
+from django.contrib.auth.models import User
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from core.models import Assignment, AssignmentSubmission, Course
+from core.tests import CacheIsolatedTestCase
+from core.utils.benchmark_suite import seed_benchmark_data
+from core.utils.query_metrics import QueryBudgetExceeded, metrics_buffer
+
+
+HOT_VIEWS = [
+    ('student', lambda ds: '/dashboard/student/'),
+    ('student', lambda ds: '/dashboard/student/catalog/'),
+    ('student', lambda ds: '/dashboard/student/grades/'),
+    ('student', lambda ds: '/dashboard/student/assignments/'),
+    ('student', lambda ds: '/api/courses/'),
+    ('student', lambda ds: '/api/assignments/'),
+    ('student', lambda ds: '/documents/'),
+    ('teacher', lambda ds: '/dashboard/teacher/'),
+    ('teacher', lambda ds: '/dashboard/teacher/assignments/'),
+    ('teacher', lambda ds: f'/dashboard/teacher/assignments/{ds.assignment_id}/submissions/'),
+    ('teacher', lambda ds: f'/api/courses/{ds.course_id}/gradebook/'),
+    ('admin', lambda ds: '/dashboard/admin/'),
+]
+
+
+@override_settings(QUERY_INSTRUMENTATION_ENABLED=True, QUERY_BUDGET_STRICT=True)
+class QueryBudgetTests(CacheIsolatedTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_benchmark_data(
+            students=30, teachers=3, courses=6, enrollments_per_student=3,
+            assignments_per_course=3, documents_per_course=2, seed=7,
+        )
+
+    def setUp(self):
+        super().setUp()
+        metrics_buffer.clear()
+
+    def client_for(self, role):
+        client = Client()
+        client.force_login(User.objects.get(pk=getattr(self.dataset, f'{role}_id')))
+        return client
+
+    def get(self, role, path):
+        response = self.client_for(role).get(path)
+        self.assertEqual(response.status_code, 200, path)
+        return response, metrics_buffer.snapshot()[-1]
+
+    def test_hot_views_stay_within_budget(self):
+        for role, path in HOT_VIEWS:
+            path = path(self.dataset)
+            with self.subTest(path=path):
+                self.clear_caches()
+                _, metrics = self.get(role, path)
+                self.assertIsNotNone(metrics.budget, f'{metrics.view} has no query budget')
+                self.assertLessEqual(metrics.queries, metrics.budget)
+
+    def test_exceeding_budget_raises_in_strict_mode(self):
+        _, metrics = self.get('student', '/dashboard/student/')
+        with override_settings(QUERY_BUDGETS={metrics.view: 1}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client_for('student').get('/dashboard/student/')
+
+    def test_teacher_assignment_list_counts(self):
+        response, _ = self.get('teacher', '/dashboard/teacher/assignments/')
+        assignments = response.context['assignments']
+        self.assertTrue(assignments)
+        for assignment in assignments:
+            self.assertEqual(assignment.submissions_total, assignment.submission_count)
+            self.assertEqual(assignment.submissions_graded, assignment.graded_count)
+            self.assertEqual(assignment.submissions_pending, assignment.pending_grades_count)
+        teacher = User.objects.get(pk=self.dataset.teacher_id)
+        self.assertEqual(response.context['total_assignments'], Assignment.objects.filter(course__teacher=teacher).count())
+
+    def test_student_assignment_list_counts(self):
+        response, _ = self.get('student', '/dashboard/student/assignments/')
+        courses = response.context['enrolled_courses']
+        self.assertTrue(courses)
+        for course in courses:
+            visible = Assignment.objects.filter(course=course, is_visible_to_students=True, status='active')
+            submitted = AssignmentSubmission.objects.filter(
+                assignment__in=visible, student_id=self.dataset.student_id
+            ).values('assignment_id')
+            self.assertEqual(course.total_assignments, visible.count())
+            self.assertEqual(course.submitted_assignments, submitted.count())
+            self.assertEqual(
+                course.overdue_assignments,
+                visible.filter(due_date__lt=timezone.now()).exclude(pk__in=submitted).count(),
+            )
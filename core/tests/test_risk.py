@@ -0,0 +1,53 @@
+"""
+Tests cho bảng "sinh viên có nguy cơ" của dashboard giảng viên (core/utils/risk.py)
+"""
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import Class, CourseEnrollment, StudentRiskScore
+from core.tests import CacheIsolatedTestCase
+from core.utils.risk import advisee_risk_scores, dashboard_risk_panels, teacher_risk_scores
+
+
+class DashboardRiskPanelTests(CacheIsolatedTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        generator = cls.data_generator(seed=1)
+        classes = generator.create_classes(2, generator.create_faculties(1, 1), class_size=8)
+        cls.teacher_id, other_teacher_id = generator.create_users(2, 'teacher')
+        students = generator.create_students(16, classes, class_size=8)
+        Class.objects.filter(pk=classes[0][1]).update(advisor_id=cls.teacher_id)
+        courses = generator.create_courses(2, [cls.teacher_id, other_teacher_id])
+        generator.create_enrollments(students, courses, 2)
+
+        now = timezone.now()
+        StudentRiskScore.objects.bulk_create([
+            StudentRiskScore(
+                enrollment=enrollment, student_id=enrollment.student_id, course_id=enrollment.course_id,
+                score=40 + index, level='high' if index % 4 else 'medium', computed_at=now,
+            )
+            for index, enrollment in enumerate(CourseEnrollment.objects.order_by('pk'))
+        ])
+        # Sinh viên cố vấn học môn của chính giảng viên: cùng một dòng nằm trong cả hai bảng
+        StudentRiskScore.objects.filter(
+            course__teacher_id=cls.teacher_id, student__profile__class_enrolled_id=classes[0][1]
+        ).update(level='high', score=F('score') + 100)
+
+    def expected(self, queryset):
+        return list(queryset.filter(level='high').order_by(F('score').desc(), 'pk')[:5])
+
+    def test_panels_match_separate_queries_in_one_query(self):
+        with self.assertNumQueries(1):
+            taught, advised = dashboard_risk_panels(self.teacher_id)
+            [(row.student.username, row.course.code) for row in taught + advised]
+
+        self.assertEqual(taught, self.expected(teacher_risk_scores(self.teacher_id)))
+        self.assertEqual(advised, self.expected(advisee_risk_scores(self.teacher_id)))
+        self.assertEqual(len(taught), 5)
+        self.assertEqual(len(advised), 5)
+        self.assertTrue({row.pk for row in taught} & {row.pk for row in advised})
+
+    def test_panels_empty_for_other_user(self):
+        taught, advised = dashboard_risk_panels(0)
+        self.assertEqual((taught, advised), ([], []))
@@ -0,0 +1,65 @@
+"""
+Tests cho API xếp lớp hàng loạt (core/api/views/study_views.py ClassRosterView)
+"""
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from core.models import Class, UserProfile
+from core.tests import CacheIsolatedTestCase
+
+
+class ClassRosterTests(CacheIsolatedTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        generator = cls.data_generator(seed=8)
+        cls.admin = User.objects.get(pk=generator.create_users(1, 'admin')[0])
+        majors = generator.create_faculties(1, 1)
+        (_, cls.class_id, *_), (_, cls.other_class_id, *_) = generator.create_classes(2, majors, class_size=3, students=0)
+        cls.student_ids = generator.create_users(5, 'student')
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def post(self, action, student_ids, class_id=None):
+        return self.client.post(
+            f'/api/classes/{class_id or self.class_id}/roster/',
+            {'action': action, 'student_ids': student_ids}, format='json',
+        )
+
+    def members(self, class_id=None):
+        return set(UserProfile.objects.filter(class_enrolled_id=class_id or self.class_id).values_list('user_id', flat=True))
+
+    def current_students(self, class_id=None):
+        return Class.objects.get(pk=class_id or self.class_id).current_students
+
+    def test_add_up_to_capacity(self):
+        response = self.post('add', self.student_ids[:3])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'moved': 3, 'current_students': 3, 'max_students': 3})
+        self.assertEqual(self.members(), set(self.student_ids[:3]))
+
+    def test_over_capacity_returns_conflict_and_moves_nobody(self):
+        self.assertEqual(self.post('add', self.student_ids[:2]).status_code, 200)
+        response = self.post('add', self.student_ids[2:4])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.members(), set(self.student_ids[:2]))
+        self.assertEqual(self.current_students(), 2)
+
+    def test_remove_non_member_returns_bad_request_and_removes_nobody(self):
+        self.post('add', self.student_ids[:2])
+        self.post('add', self.student_ids[2:3], class_id=self.other_class_id)
+        response = self.post('remove', [self.student_ids[0], self.student_ids[2]])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.members(), set(self.student_ids[:2]))
+        self.assertEqual(self.members(self.other_class_id), {self.student_ids[2]})
+        self.assertEqual(self.current_students(), 2)
+
+    def test_remove_members(self):
+        self.post('add', self.student_ids[:2])
+        response = self.post('remove', self.student_ids[:1])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['current_students'], 1)
+        self.assertEqual(self.members(), {self.student_ids[1]})
@@ -0,0 +1,120 @@
+"""
+Tests cho scheduler nhắc việc (core/utils/scheduler.py)
+"""
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import (
+    Assignment, AssignmentReminder, AssignmentSubmission, CourseEnrollment, Notification, OutboundEmail,
+    StudentAccountRequest
+)
+from core.tests import CacheIsolatedTestCase
+from core.utils.outbox import render_email
+from core.utils.scheduler import AccountRequestReminderJob, AssignmentDueJob, ReminderScheduler, SchedulerJob
+
+
+class AssignmentDueJobTests(CacheIsolatedTestCase):
+
+    def setUp(self):
+        super().setUp()
+        generator = self.data_generator(seed=1)
+        teacher_ids = generator.create_users(1, 'teacher')
+        self.student_ids = generator.create_users(3, 'student')
+        course_id = generator.create_courses(1, teacher_ids)[0]
+        CourseEnrollment.objects.bulk_create(
+            CourseEnrollment(student_id=student_id, course_id=course_id, status='enrolled')
+            for student_id in self.student_ids
+        )
+        self.now = timezone.now()
+        self.assignment = Assignment.objects.create(
+            course_id=course_id, title='Bài tập 1', description='', created_by_id=teacher_ids[0],
+            due_date=self.now + timedelta(hours=1), status='active', is_visible_to_students=True,
+        )
+        AssignmentSubmission.objects.create(assignment=self.assignment, student_id=self.student_ids[0])
+        self.scheduler = ReminderScheduler(jobs=[AssignmentDueJob(hours=[2])], horizon=0)
+
+    def run_scheduler(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.scheduler.refresh(self.now)
+            return self.scheduler.run_due(self.now)
+
+    def test_queues_reminders_for_students_without_submission(self):
+        results = self.run_scheduler()
+        self.assertEqual(results['assignment_due'], {'assignments': 1, 'students': 2, 'emails': 2})
+        emails = OutboundEmail.objects.filter(kind='assignment_due', status='pending')
+        expected = set(User.objects.filter(pk__in=self.student_ids[1:]).values_list('email', flat=True))
+        self.assertEqual(set(emails.values_list('to_email', flat=True)), expected)
+        subject, body = render_email(emails.first())
+        self.assertIn('Bài tập 1', subject)
+        self.assertIn(reverse('dashboards:student:assignment_detail', args=[self.assignment.pk]), body)
+        self.assertEqual(AssignmentReminder.objects.get(assignment=self.assignment).recipient_count, 2)
+
+    def test_rerun_does_not_queue_again(self):
+        self.run_scheduler()
+        self.assertEqual(self.run_scheduler(), {})
+        self.assertEqual(OutboundEmail.objects.count(), 2)
+
+    def test_marks_due_together_send_once(self):
+        # Bài công bố 1 giờ trước hạn: cả mốc 24 giờ và 2 giờ cùng đến hạn
+        self.scheduler = ReminderScheduler(jobs=[AssignmentDueJob(hours=[24, 2])], horizon=0)
+        results = self.run_scheduler()
+        self.assertEqual(results['assignment_due'], {'assignments': 1, 'students': 2, 'emails': 2})
+        self.assertEqual(OutboundEmail.objects.filter(kind='assignment_due').count(), 2)
+        self.assertEqual(Notification.objects.filter(kind='assignment_due').count(), 2)
+        self.assertEqual(
+            dict(AssignmentReminder.objects.values_list('hours_before', 'recipient_count')), {24: 0, 2: 2}
+        )
+        self.assertEqual(self.run_scheduler(), {})
+
+    def test_failed_enqueue_keeps_reminder_due(self):
+        with mock.patch('core.utils.scheduler.enqueue_templated', side_effect=RuntimeError('db down')):
+            with self.assertRaises(RuntimeError):
+                self.run_scheduler()
+        self.assertFalse(AssignmentReminder.objects.exists())
+        # Lần chạy sau vẫn thấy mốc nhắc và xếp đủ email
+        self.assertEqual(self.run_scheduler()['assignment_due']['emails'], 2)
+
+
+class AccountRequestReminderJobTests(CacheIsolatedTestCase):
+
+    def setUp(self):
+        super().setUp()
+        generator = self.data_generator(seed=2)
+        self.admin_ids = generator.create_users(2, 'admin')
+        requester_id = generator.create_users(1, 'teacher')[0]
+        self.request = StudentAccountRequest.objects.create(
+            student_id='SV0001', email='sv0001@example.com', first_name='Nguyễn', last_name='An',
+            department='cntt', year_of_study=2025, requested_by_id=requester_id,
+        )
+        StudentAccountRequest.objects.filter(pk=self.request.pk).update(created_at=timezone.now() - timedelta(hours=49))
+
+    def test_queues_digest_for_admins(self):
+        job = AccountRequestReminderJob(hours=48)
+        with self.captureOnCommitCallbacks(execute=True):
+            stats = job.run({self.request.pk}, timezone.now())
+        self.assertEqual(stats, {'requests': 1, 'emails': 2})
+        emails = OutboundEmail.objects.filter(kind='account_request_digest')
+        self.assertEqual(emails.count(), 2)
+        subject, body = render_email(emails.first())
+        self.assertIn('1 yêu cầu', subject)
+        self.assertIn('SV0001: Nguyễn An', body)
+        self.request.refresh_from_db()
+        self.assertIsNotNone(self.request.reminded_at)
+        self.assertEqual(job.run({self.request.pk}, timezone.now()), {'requests': 0, 'emails': 0})
+
+
+class SchedulerJobTests(CacheIsolatedTestCase):
+
+    def test_job_must_implement_hooks(self):
+        class IncompleteJob(SchedulerJob):
+            name = 'incomplete'
+
+            def upcoming(self, now, until):
+                return []
+
+        with self.assertRaises(TypeError):
+            IncompleteJob()
@@ -0,0 +1,59 @@
+"""
+Tests cho tải toàn bộ bài nộp dạng ZIP (TeacherAssignmentSubmissionsView archive)
+"""
+import io
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Assignment, AssignmentFile, AssignmentSubmission
+from core.tests import CacheIsolatedTestCase
+
+
+class SubmissionArchiveTests(CacheIsolatedTestCase):
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp(prefix='test_archive_media_')
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        generator = self.data_generator(seed=5)
+        self.teacher = User.objects.get(pk=generator.create_users(1, 'teacher')[0])
+        student_id = generator.create_users(1, 'student')[0]
+        course_id = generator.create_courses(1, [self.teacher.pk])[0]
+        self.assignment = Assignment.objects.create(
+            course_id=course_id, title='Bài tập 1', description='', created_by=self.teacher,
+            due_date=timezone.now() - timedelta(hours=1), status='active', is_visible_to_students=True,
+        )
+        submission = AssignmentSubmission.objects.create(assignment=self.assignment, student_id=student_id)
+        AssignmentFile.objects.create(
+            assignment=self.assignment, submission=submission, is_submission_file=True,
+            uploaded_by_id=student_id, file=ContentFile(b'bai lam', name='bai_lam.txt'),
+        )
+        self.client.force_login(self.teacher)
+        self.url = reverse('dashboards:teacher:assignment_submissions_archive', args=[self.assignment.pk])
+
+    def test_archive_after_due_date(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual([name.split('/')[-1] for name in archive.namelist()], ['bai_lam.txt'])
+
+    def test_archive_refused_before_due_date(self):
+        Assignment.objects.filter(pk=self.assignment.pk).update(due_date=timezone.now() + timedelta(days=1))
+        response = self.client.get(self.url)
+        self.assertRedirects(
+            response, reverse('dashboards:teacher:assignment_submissions', args=[self.assignment.pk]),
+            fetch_redirect_response=False,
+        )
+        self.assertNotIn('Content-Disposition', response)
@@ -39,6 +39,7 @@ urlpatterns = [
     path('documents/upload/', views.document_upload, name='document_upload'),
     path('documents/<int:pk>/', views.document_detail, name='document_detail'),
     path('documents/<int:pk>/download/', views.document_download, name='document_download'),
+    path('documents/<int:pk>/thumbnail/<str:content_hash>.jpg', views.document_thumbnail, name='document_thumbnail'),
     path('documents/<int:pk>/edit/', views.document_edit, name='document_edit'),
     path('documents/<int:pk>/delete/', views.document_delete, name='document_delete'),
     path('documents/categories/', views.document_categories, name='document_categories'),
@@ -0,0 +1,254 @@
+"""
+Grade analytics
+Thống kê điểm theo phạm vi: môn học, lớp sinh viên, khoa, năm học, giảng viên, sinh viên
+hoặc toàn hệ thống. Mỗi phạm vi chỉ tốn một query lấy mảng điểm, mọi chỉ số tính bằng numpy.
+
+- Điểm được quy về hệ 10 (score * 10 / max_score) nên bài chấm thang 100 và thang 10 so sánh được
+- Trung bình có trọng số theo Grade.weight, kể cả điểm trung bình của từng sinh viên / từng môn
+- Trung vị, phân vị, độ lệch chuẩn, phân bố theo GRADE_BUCKETS
+- Tỷ lệ đạt tính trên lượt học (sinh viên × môn): điểm trung bình của lượt học >= PASS_SCORE
+- z-score của từng sinh viên so với các sinh viên khác trong cùng phạm vi
+
+Kết quả được cache theo phạm vi: key nằm trong ANALYTICS_NAMESPACE và kèm version riêng của
+phạm vi, nên invalidate_grade_analytics chỉ làm các phạm vi chứa điểm bị sửa phải tính lại.
+Signal của Grade / Course / UserProfile gọi hàm này; ghi hàng loạt (bulk_create, bulk_update)
+phải tự gọi.
+"""
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import FloatField, Q
+from django.db.models.functions import Cast
+
+from core.models import Course, Grade, UserProfile
+
+from .cache import ANALYTICS_NAMESPACE, cache_get_or_set, invalidate_namespace, tiered_cache
+from .statistics import GRADE_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+SCOPES = ('course', 'class', 'department', 'academic_year', 'teacher', 'student', 'all')
+
+QUANTILES = (10, 25, 50, 75, 90)
+
+# Điểm (hệ 10) tối thiểu để đạt: mức điểm chữ thấp nhất chưa trượt của Grade.LETTER_GRADES
+PASS_SCORE = Grade.LETTER_GRADES[-1][0] / 10
+
+# Cận dưới tăng dần của GRADE_BUCKETS (bucket cuối - F - không có cận dưới)
+_BUCKET_EDGES = [lower for _, lower, _ in reversed(GRADE_BUCKETS) if lower is not None]
+
+_SCOPE_FILTERS = {
+    'course': lambda pk: Q(course_id=pk),
+    'class': lambda pk: Q(student__profile__student_class_id=pk),
+    'department': lambda pk: Q(course__department_id=pk),
+    'academic_year': lambda pk: Q(course__academic_year_id=pk),
+    'teacher': lambda pk: Q(course__in=Course.objects.filter(
+        Q(teacher_id=pk) | Q(assistant_teachers=pk)
+    ).values('pk')),
+    'student': lambda pk: Q(student_id=pk),
+    'all': lambda pk: Q(),
+}
+
+
+@dataclass
+class ScopeAnalytics:
+    """
+    Thống kê của một phạm vi
+
+    summary: các chỉ số tổng hợp (dict, dùng trực tiếp trong template / JSON)
+    student_ids, student_averages, z_scores: mảng theo sinh viên, sắp theo student_id
+    courses: thống kê theo từng môn học trong phạm vi
+    """
+    scope: str
+    pk: int
+    summary: dict
+    student_ids: np.ndarray
+    student_averages: np.ndarray
+    z_scores: np.ndarray
+    courses: list
+
+    def student(self, student_id):
+        """Điểm trung bình, z-score và phân vị (% sinh viên thấp hơn) của một sinh viên, None nếu không có điểm"""
+        index = np.searchsorted(self.student_ids, student_id)
+        if index >= len(self.student_ids) or self.student_ids[index] != student_id:
+            return None
+        average = self.student_averages[index]
+        return {
+            'average': round(float(average), 2),
+            'z_score': round(float(self.z_scores[index]), 2),
+            'percentile': round(float((self.student_averages < average).mean() * 100), 1),
+        }
+
+
+def scope_grades(scope, pk=None):
+    """Queryset Grade của một phạm vi"""
+    if scope not in _SCOPE_FILTERS:
+        raise ValueError(f"Unknown analytics scope: {scope}")
+    return Grade.objects.filter(_SCOPE_FILTERS[scope](pk))
+
+
+def fetch_grade_rows(scope, pk=None):
+    """Một query: (student_id, course_id, score, max_score, weight) của mọi điểm trong phạm vi"""
+    return list(scope_grades(scope, pk).order_by().values_list(
+        'student_id', 'course_id',
+        Cast('score', FloatField()), Cast('max_score', FloatField()), Cast('weight', FloatField()),
+    ))
+
+
+def group_weighted_means(index, values, weights, size):
+    """Trung bình có trọng số theo nhóm; nhóm có tổng trọng số 0 lấy trung bình thường"""
+    weight_sums = np.bincount(index, weights, size)
+    weighted = np.bincount(index, values * weights, size)
+    counts = np.bincount(index, minlength=size)
+    plain = np.bincount(index, values, size) / np.maximum(counts, 1)
+    return np.where(weight_sums > 0, weighted / np.where(weight_sums > 0, weight_sums, 1), plain)
+
+
+def _rounded(value):
+    return round(float(value), 2)
+
+
+def compute_analytics(scope, pk, rows):
+    """Tính ScopeAnalytics từ các dòng của fetch_grade_rows"""
+    data = np.array(rows, dtype=float).reshape(-1, 5)
+    data = data[data[:, 3] > 0]
+    students = data[:, 0].astype(np.int64)
+    courses = data[:, 1].astype(np.int64)
+    # Làm tròn để 6 * 10 / 10 không thành 5.999... và rơi xuống bucket dưới
+    scores = np.round(data[:, 2] * 10 / data[:, 3], 6)
+    weights = data[:, 4]
+
+    student_ids, student_index = np.unique(students, return_inverse=True)
+    course_ids, course_index = np.unique(courses, return_inverse=True)
+    # Lượt học: mỗi cặp (môn học, sinh viên) có điểm, mã hóa thành một số để np.unique chạy trên mảng 1 chiều
+    pair_keys, pair_index = np.unique(course_index * len(student_ids) + student_index, return_inverse=True)
+    pair_course = pair_keys // max(len(student_ids), 1)
+
+    student_averages = group_weighted_means(student_index, scores, weights, len(student_ids))
+    pair_averages = group_weighted_means(pair_index, scores, weights, len(pair_keys))
+    pair_passed = pair_averages >= PASS_SCORE
+
+    student_mean = student_averages.mean() if len(student_ids) else 0.0
+    student_std = student_averages.std() if len(student_ids) else 0.0
+    z_scores = (student_averages - student_mean) / student_std if student_std > 0 else np.zeros(len(student_ids))
+
+    buckets = np.bincount(np.digitize(scores, _BUCKET_EDGES), minlength=len(GRADE_BUCKETS))[::-1]
+    if len(scores):
+        quantiles = np.percentile(scores, QUANTILES)
+        weighted_mean = np.average(scores, weights=weights) if weights.sum() > 0 else scores.mean()
+        stats = {
+            'mean': scores.mean(), 'weighted_mean': weighted_mean, 'median': np.median(scores),
+            'std': scores.std(), 'min': scores.min(), 'max': scores.max(),
+            'pass_rate': pair_passed.mean() * 100,
+        }
+    else:
+        quantiles = np.zeros(len(QUANTILES))
+        stats = dict.fromkeys(('mean', 'weighted_mean', 'median', 'std', 'min', 'max', 'pass_rate'), 0.0)
+
+    summary = {
+        'grade_count': len(scores),
+        'student_count': len(student_ids),
+        'course_count': len(course_ids),
+        **{name: _rounded(value) for name, value in stats.items()},
+        'quantiles': {f'p{q}': _rounded(value) for q, value in zip(QUANTILES, quantiles)},
+        'distribution': [
+            {'range': label, 'count': int(count)} for (label, _, _), count in zip(GRADE_BUCKETS, buckets)
+        ],
+        'passed': int(pair_passed.sum()),
+        'enrollment_count': len(pair_keys),
+        'student_mean': _rounded(student_mean),
+        'student_std': _rounded(student_std),
+    }
+
+    course_grades = np.bincount(course_index, minlength=len(course_ids))
+    course_averages = group_weighted_means(course_index, scores, weights, len(course_ids))
+    course_students = np.bincount(pair_course, minlength=len(course_ids))
+    course_passed = np.bincount(pair_course, pair_passed, len(course_ids))
+    course_breakdown = [
+        {
+            'course_id': int(course_id),
+            'grade_count': int(course_grades[index]),
+            'student_count': int(course_students[index]),
+            'average': _rounded(course_averages[index]),
+            'pass_rate': _rounded(course_passed[index] / course_students[index] * 100),
+        }
+        for index, course_id in enumerate(course_ids)
+    ]
+
+    return ScopeAnalytics(
+        scope=scope,
+        pk=pk,
+        summary=summary,
+        student_ids=student_ids,
+        student_averages=np.round(student_averages, 4),
+        z_scores=np.round(z_scores, 4),
+        courses=course_breakdown,
+    )
+
+
+def _scope_namespace(scope, pk):
+    return f"{ANALYTICS_NAMESPACE}:{scope}:{pk}"
+
+
+def grade_analytics(scope, pk=None):
+    """
+    Thống kê điểm của một phạm vi (có cache)
+
+    Args:
+        scope: một trong SCOPES ('all' không cần pk)
+        pk: id của môn học / lớp / khoa / năm học / giảng viên / sinh viên
+
+    Returns:
+        ScopeAnalytics
+    """
+    if scope not in _SCOPE_FILTERS:
+        raise ValueError(f"Unknown analytics scope: {scope}")
+    version = tiered_cache.get_namespace_version(_scope_namespace(scope, pk))
+    return cache_get_or_set(
+        ANALYTICS_NAMESPACE,
+        f"{scope}:{pk}:v{version}",
+        lambda: compute_analytics(scope, pk, fetch_grade_rows(scope, pk)),
+        timeout=settings.ANALYTICS_CACHE_TIMEOUT,
+    )
+
+
+def grade_summary(scope, pk=None):
+    return grade_analytics(scope, pk).summary
+
+
+def invalidate_grade_analytics(course_ids=(), student_ids=(), scopes=()):
+    """
+    Vô hiệu hóa cache của mọi phạm vi chứa điểm của các môn học / sinh viên đã cho
+
+    Khoa, năm học, giảng viên của môn và lớp của sinh viên được tra bằng vài query; version
+    của các phạm vi được tăng sau khi transaction hiện tại commit, để request khác không kịp
+    cache lại dữ liệu cũ.
+
+    Args:
+        scopes: các cặp (scope, pk) cần vô hiệu hóa thêm, vd. lớp cũ khi sinh viên đổi lớp
+    """
+    course_ids, student_ids = set(course_ids) - {None}, set(student_ids) - {None}
+    scopes = {('all', None), *scopes}
+    scopes.update(('course', pk) for pk in course_ids)
+    scopes.update(('student', pk) for pk in student_ids)
+    if course_ids:
+        for department_id, academic_year_id, teacher_id in Course.objects.filter(pk__in=course_ids).values_list(
+            'department_id', 'academic_year_id', 'teacher_id'
+        ):
+            scopes.update([('department', department_id), ('academic_year', academic_year_id), ('teacher', teacher_id)])
+        scopes.update(
+            ('teacher', pk) for pk in Course.assistant_teachers.through.objects.filter(
+                course_id__in=course_ids
+            ).values_list('user_id', flat=True)
+        )
+    if student_ids:
+        scopes.update(
+            ('class', pk) for pk in UserProfile.objects.filter(
+                user_id__in=student_ids, student_class__isnull=False
+            ).values_list('student_class_id', flat=True)
+        )
+    namespaces = [_scope_namespace(scope, pk) for scope, pk in scopes if scope == 'all' or pk is not None]
+    transaction.on_commit(lambda: invalidate_namespace(*namespaces))
@@ -0,0 +1,123 @@
+"""
+Streaming ZIP archive helpers
+Tạo file ZIP theo dạng stream, không dùng file tạm và không buffer toàn bộ
+"""
+import logging
+import os
+import zipfile
+from collections import namedtuple
+
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Các định dạng đã được nén sẵn - nén lại chỉ tốn CPU mà không giảm dung lượng
+STORED_EXTENSIONS = {
+    '.zip', '.rar', '.7z', '.gz', '.bz2', '.xz',
+    '.png', '.jpg', '.jpeg', '.gif', '.webp',
+    '.mp3', '.mp4', '.avi', '.mkv', '.mov',
+    '.docx', '.xlsx', '.pptx', '.odt', '.ods', '.odp',
+}
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+ArchiveEntry = namedtuple('ArchiveEntry', ['arcname', 'file', 'size', 'modified'])
+
+
+class _ZipStreamBuffer:
+    """
+    File-like object chỉ hỗ trợ ghi, để ZipFile ghi vào
+    Dữ liệu được lấy ra sau mỗi lần ghi nên bộ nhớ dùng luôn giới hạn ở một chunk
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def get_compress_type(filename):
+    """Chọn kiểu nén theo phần mở rộng của file"""
+    ext = os.path.splitext(filename)[1].lower()
+    if ext in STORED_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def _zip_date_time(value):
+    """Chuyển datetime sang tuple date_time của ZipInfo (không hỗ trợ trước 1980)"""
+    if value is None:
+        value = timezone.now()
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    if value.year < 1980:
+        return (1980, 1, 1, 0, 0, 0)
+    return value.timetuple()[:6]
+
+
+def stream_zip(entries, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Generator trả về từng phần của file ZIP
+
+    Args:
+        entries: Iterable các ArchiveEntry (file là FieldFile hoặc Django File)
+        chunk_size: Kích thước mỗi lần đọc file nguồn
+    """
+    buffer = _ZipStreamBuffer()
+    with zipfile.ZipFile(buffer, mode='w', allowZip64=True) as archive:
+        for entry in entries:
+            zinfo = zipfile.ZipInfo(entry.arcname, date_time=_zip_date_time(entry.modified))
+            zinfo.compress_type = get_compress_type(entry.arcname)
+            zinfo.file_size = entry.size or 0
+
+            try:
+                source = entry.file.open('rb')
+            except (FileNotFoundError, OSError) as e:
+                logger.warning(f"Skip missing file {entry.arcname} in archive: {str(e)}")
+                continue
+
+            try:
+                with archive.open(zinfo, mode='w') as target:
+                    while True:
+                        chunk = source.read(chunk_size)
+                        if not chunk:
+                            break
+                        target.write(chunk)
+                        data = buffer.drain()
+                        if data:
+                            yield data
+            finally:
+                source.close()
+
+            data = buffer.drain()
+            if data:
+                yield data
+
+    data = buffer.drain()
+    if data:
+        yield data
+
+
+def unique_arcname(arcname, used_names):
+    """Đổi tên nếu trùng trong archive: bai.pdf -> bai (2).pdf"""
+    if arcname not in used_names:
+        used_names.add(arcname)
+        return arcname
+
+    base, ext = os.path.splitext(arcname)
+    counter = 2
+    while f"{base} ({counter}){ext}" in used_names:
+        counter += 1
+    arcname = f"{base} ({counter}){ext}"
+    used_names.add(arcname)
+    return arcname
@@ -0,0 +1,211 @@
+"""
+Benchmark suite
+Đo latency và số câu query của các trang / API quan trọng trên bộ dữ liệu giả
+(core/utils/synthetic_data.py), rồi so sánh với baseline JSON đã lưu.
+
+- BenchmarkRunner: chạy một hàm nhiều lần (có warmup) kiểu pytest-benchmark,
+  ghi latency và số câu query của từng lần
+- SCENARIOS: các đường dẫn được đo, mỗi scenario đăng nhập bằng một vai trò
+- compare_with_baseline: số câu query tăng, hoặc p95 chậm hơn baseline quá
+  tolerance, đều bị coi là regression
+
+Được chạy bởi lệnh benchmark_suite trên database test tạm thời.
+"""
+import io
+import itertools
+import json
+import time
+from collections import Counter
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+
+from django.db import connections
+
+from .query_metrics import QueryRecorder, percentile
+from .synthetic_data import SyntheticDataGenerator
+
+# Chênh lệch p95 nhỏ hơn mức này (ms) không tính là regression dù vượt tolerance
+LATENCY_NOISE_FLOOR_MS = 5.0
+
+# Số dòng mỗi file CSV import (mỗi dòng băm mật khẩu một lần nên rất chậm)
+IMPORT_ROWS = 5
+
+
+@dataclass
+class BenchmarkDataset:
+    """Id của các object mà scenario cần (user theo vai trò, môn, bài tập, tài liệu)"""
+    admin_id: int
+    teacher_id: int
+    student_id: int
+    course_id: int
+    assignment_id: int
+    document_id: int
+    counts: dict = field(default_factory=dict)
+
+
+def seed_benchmark_data(students=200, teachers=10, courses=20, enrollments_per_student=4,
+                        assignments_per_course=5, documents_per_course=3, seed=42):
+    """Sinh bộ dữ liệu benchmark và chọn các object đại diện cho scenario"""
+    generator = SyntheticDataGenerator(seed=seed, prefix='bench')
+    admin_ids = generator.create_users(1, 'admin')
+    teacher_ids = generator.create_users(teachers, 'teacher')
+    student_ids = generator.create_users(students, 'student')
+    course_ids = generator.create_courses(courses, teacher_ids)
+    enrollments = generator.create_enrollments(student_ids, course_ids, enrollments_per_student)
+    assignments = generator.create_assignments(course_ids, assignments_per_course)
+    generator.create_submissions(assignments, enrollments)
+    document_ids = generator.create_documents(course_ids, documents_per_course)
+
+    # Sinh viên đầu tiên và môn đầu tiên của sinh viên đó; giảng viên dạy môn đó
+    student_id, course_id = enrollments[0]
+    assignment_id, _, teacher_id = next(item for item in assignments if item[1] == course_id)
+    return BenchmarkDataset(
+        admin_id=admin_ids[0],
+        teacher_id=teacher_id,
+        student_id=student_id,
+        course_id=course_id,
+        assignment_id=assignment_id,
+        document_id=document_ids[0],
+        counts={name: count for name, count in generator.counts.items() if ':' not in name},
+    )
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    latencies_ms: list = field(default_factory=list)
+    queries: list = field(default_factory=list)
+    statuses: list = field(default_factory=list)
+
+    def stats(self):
+        return {
+            'iterations': len(self.latencies_ms),
+            'min_ms': round(min(self.latencies_ms), 2),
+            'mean_ms': round(sum(self.latencies_ms) / len(self.latencies_ms), 2),
+            'p50_ms': round(percentile(self.latencies_ms, 50), 2),
+            'p95_ms': round(percentile(self.latencies_ms, 95), 2),
+            'p99_ms': round(percentile(self.latencies_ms, 99), 2),
+            'max_ms': round(max(self.latencies_ms), 2),
+            'queries': percentile(self.queries, 50),
+            'queries_max': max(self.queries),
+            'status': Counter(self.statuses).most_common(1)[0][0],
+        }
+
+
+class BenchmarkRunner:
+    """
+    Chạy func warmup lần (không ghi) rồi iterations lần, đo latency và số câu query
+
+        runner = BenchmarkRunner(iterations=20)
+        result = runner('course_list', lambda: client.get('/api/courses/'))
+    """
+
+    def __init__(self, iterations=20, warmup=2):
+        self.iterations = iterations
+        self.warmup = warmup
+
+    def __call__(self, name, func):
+        for _ in range(self.warmup):
+            func()
+
+        result = BenchmarkResult(name)
+        for _ in range(self.iterations):
+            recorder = QueryRecorder()
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(recorder))
+                started = time.perf_counter()
+                response = func()
+                elapsed = time.perf_counter() - started
+            result.latencies_ms.append(elapsed * 1000)
+            result.queries.append(recorder.count)
+            result.statuses.append(getattr(response, 'status_code', None))
+        return result
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    role: str
+    path: object                 # hàm (dataset) -> đường dẫn
+    method: str = 'get'
+    payload: object = None       # hàm (dataset, lần chạy) -> dữ liệu POST
+
+
+def _import_csv(dataset, iteration):
+    """File CSV IMPORT_ROWS user mới (username không trùng giữa các lần chạy)"""
+    rows = ['username,email,first_name,last_name,role,student_id,department,phone']
+    for number in range(IMPORT_ROWS):
+        username = f'import_{iteration}_{number}'
+        rows.append(f'{username},{username}@example.com,Văn,Nguyễn,student,IMP{iteration:04d}{number:02d},cntt,')
+    csv_file = io.BytesIO('\n'.join(rows).encode('utf-8'))
+    csv_file.name = 'users.csv'
+    return {'csv_file': csv_file}
+
+
+SCENARIOS = [
+    Scenario('student_dashboard', 'student', lambda ds: '/dashboard/student/'),
+    Scenario('student_course_catalog', 'student', lambda ds: '/dashboard/student/catalog/'),
+    Scenario('student_grades', 'student', lambda ds: '/dashboard/student/grades/'),
+    Scenario('teacher_dashboard', 'teacher', lambda ds: '/dashboard/teacher/'),
+    Scenario('teacher_grading', 'teacher', lambda ds: f'/dashboard/teacher/assignments/{ds.assignment_id}/submissions/'),
+    Scenario('admin_dashboard', 'admin', lambda ds: '/dashboard/admin/'),
+    Scenario('api_courses', 'student', lambda ds: '/api/courses/'),
+    Scenario('document_list', 'student', lambda ds: '/documents/'),
+    Scenario('document_download', 'student', lambda ds: f'/documents/{ds.document_id}/download/'),
+    Scenario('users_export_csv', 'admin', lambda ds: '/dashboard/admin/users/export/'),
+    Scenario('users_import_csv', 'admin', lambda ds: '/dashboard/admin/users/import/', 'post', _import_csv),
+]
+
+
+def run_scenario(scenario, client, dataset, runner):
+    """Chạy một scenario bằng test client đã đăng nhập"""
+    path = scenario.path(dataset)
+    if scenario.method == 'post':
+        counter = itertools.count()
+        return runner(scenario.name, lambda: client.post(path, scenario.payload(dataset, next(counter))))
+    return runner(scenario.name, lambda: client.get(path))
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding='utf-8') as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path, results, meta=None):
+    data = {'meta': meta or {}, 'scenarios': results}
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump(data, fh, indent=2, ensure_ascii=False, sort_keys=True)
+        fh.write('\n')
+
+
+def compare_with_baseline(results, baseline, tolerance=0.5, check_latency=True):
+    """
+    So sánh thống kê với baseline
+
+    Args:
+        results: {scenario: stats()}
+        baseline: nội dung file baseline (load_baseline)
+        tolerance: p95 được phép chậm hơn baseline bao nhiêu phần (0.5 = 50%)
+        check_latency: False thì chỉ so sánh số câu query (chạy trên máy khác baseline)
+
+    Returns:
+        Danh sách mô tả regression (rỗng nếu không có)
+    """
+    regressions = []
+    for name, stats in results.items():
+        base = (baseline or {}).get('scenarios', {}).get(name)
+        if not base:
+            continue
+        if stats['queries_max'] > base['queries_max']:
+            regressions.append(f"{name}: {stats['queries_max']} queries (baseline {base['queries_max']})")
+        if stats['status'] != base['status']:
+            regressions.append(f"{name}: HTTP {stats['status']} (baseline {base['status']})")
+        if check_latency:
+            limit = base['p95_ms'] * (1 + tolerance)
+            if stats['p95_ms'] > limit and stats['p95_ms'] - base['p95_ms'] > LATENCY_NOISE_FLOOR_MS:
+                regressions.append(f"{name}: p95 {stats['p95_ms']:.1f} ms (baseline {base['p95_ms']:.1f} ms)")
+    return regressions
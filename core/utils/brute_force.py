@@ -0,0 +1,218 @@
+"""
+Brute-force protection
+Bộ giới hạn đăng nhập sai dùng sliding window trong cache dùng chung, áp dụng
+cho cả đăng nhập session (LoginView) và JWT (CustomTokenObtainPairView).
+
+Mỗi lần đăng nhập sai được đếm theo ba phạm vi:
+- user:   email/username (chuẩn hóa chữ thường) trong một dải mạng, nên client ở dải khác
+          không thể khóa tài khoản của người khác
+- ip:     địa chỉ IP của client
+- subnet: /24 (IPv4) hoặc /64 (IPv6), chặn tấn công phân tán trong một dải mạng
+
+Khi một phạm vi vượt ngưỡng, phạm vi đó bị chặn trong một khoảng thời gian tăng
+gấp đôi sau mỗi lần vi phạm (exponential backoff). Trạng thái chặn chỉ nằm trong cache,
+không ghi database.
+
+IP của client là REMOTE_ADDR; X-Forwarded-For chỉ được dùng khi request đến từ một proxy
+trong TRUSTED_PROXIES.
+"""
+import ipaddress
+import logging
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'bf'
+STRIKES_TIMEOUT = 24 * 60 * 60
+
+DEFAULT_LIMITS = {
+    'user': {'limit': 5, 'window': 15 * 60, 'block': 30 * 60},
+    'ip': {'limit': 20, 'window': 5 * 60, 'block': 5 * 60},
+    'subnet': {'limit': 100, 'window': 5 * 60, 'block': 5 * 60},
+}
+
+LimitDecision = namedtuple('LimitDecision', ['allowed', 'scope', 'retry_after'])
+
+
+def _trusted_networks():
+    networks = []
+    for proxy in getattr(settings, 'TRUSTED_PROXIES', []):
+        try:
+            networks.append(ipaddress.ip_network(proxy, strict=False))
+        except ValueError:
+            logger.warning(f"Ignoring invalid TRUSTED_PROXIES entry: {proxy}")
+    return networks
+
+
+def _is_trusted_proxy(ip_address, networks):
+    try:
+        address = ipaddress.ip_address(ip_address)
+    except (TypeError, ValueError):
+        return False
+    return any(address in network for network in networks)
+
+
+def get_client_ip(request):
+    """
+    Lấy IP của client
+
+    Client tự đặt được X-Forwarded-For nên header này chỉ được đọc khi REMOTE_ADDR là proxy tin
+    cậy; khi đó lấy địa chỉ ngoài cùng bên phải không thuộc proxy tin cậy (phần bên trái do
+    client gửi lên).
+    """
+    remote_addr = request.META.get('REMOTE_ADDR')
+    networks = _trusted_networks()
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if not x_forwarded_for or not _is_trusted_proxy(remote_addr, networks):
+        return remote_addr
+
+    forwarded = [ip.strip() for ip in x_forwarded_for.split(',') if ip.strip()]
+    for ip in reversed(forwarded):
+        if not _is_trusted_proxy(ip, networks):
+            return ip
+    return forwarded[0] if forwarded else remote_addr
+
+
+def get_subnet(ip_address):
+    """Dải mạng của IP: /24 cho IPv4, /64 cho IPv6"""
+    try:
+        address = ipaddress.ip_address(ip_address)
+    except (TypeError, ValueError):
+        return None
+    prefix = 24 if address.version == 4 else 64
+    return str(ipaddress.ip_network(f"{address}/{prefix}", strict=False))
+
+
+class LoginRateLimiter:
+    """Sliding window (xấp xỉ bằng hai cửa sổ cố định liền kề) + exponential backoff"""
+
+    def __init__(self, limits=None, cache_alias='default', max_block=None):
+        self._limits = limits
+        self.cache_alias = cache_alias
+        self._max_block = max_block
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    @property
+    def limits(self):
+        return self._limits or getattr(settings, 'LOGIN_RATE_LIMITS', DEFAULT_LIMITS)
+
+    @property
+    def max_block(self):
+        return self._max_block or getattr(settings, 'LOGIN_BACKOFF_MAX_SECONDS', STRIKES_TIMEOUT)
+
+    # -- keys ---------------------------------------------------------------
+
+    def get_identities(self, identifier, ip_address):
+        """Danh sách (scope, giá trị) cần kiểm tra cho một lần đăng nhập"""
+        identities = []
+        subnet = get_subnet(ip_address) if ip_address else None
+        if identifier:
+            identities.append(('user', self._user_value(identifier, subnet)))
+        if ip_address:
+            identities.append(('ip', ip_address))
+            if subnet:
+                identities.append(('subnet', subnet))
+        return [(scope, value) for scope, value in identities if scope in self.limits]
+
+    @staticmethod
+    def _user_value(identifier, subnet):
+        """Phạm vi user: identifier trong dải mạng của client"""
+        return f"{identifier.strip().lower()}|{subnet or ''}"
+
+    def _counter_key(self, scope, value, bucket):
+        return f"{KEY_PREFIX}:cnt:{scope}:{value}:{bucket}"
+
+    def _block_key(self, scope, value):
+        return f"{KEY_PREFIX}:block:{scope}:{value}"
+
+    def _strikes_key(self, scope, value):
+        return f"{KEY_PREFIX}:strikes:{scope}:{value}"
+
+    # -- public API ---------------------------------------------------------
+
+    def check(self, identifier, ip_address, now=None):
+        """Kiểm tra có được phép thử đăng nhập không (một lần đọc cache)"""
+        now = now or time.time()
+        identities = self.get_identities(identifier, ip_address)
+        if not identities:
+            return LimitDecision(True, None, 0)
+
+        keys = {self._block_key(scope, value): scope for scope, value in identities}
+        blocked = self.cache.get_many(list(keys))
+        worst = None
+        for key, until in blocked.items():
+            retry_after = int(until - now) + 1
+            if retry_after > 0 and (worst is None or retry_after > worst.retry_after):
+                worst = LimitDecision(False, keys[key], retry_after)
+        return worst or LimitDecision(True, None, 0)
+
+    def register_failure(self, identifier, ip_address, now=None):
+        """
+        Ghi nhận một lần đăng nhập sai
+        Trả về danh sách các phạm vi vừa bị chặn do lần sai này
+        """
+        now = now or time.time()
+        tripped = []
+        for scope, value in self.get_identities(identifier, ip_address):
+            config = self.limits[scope]
+            count = self._increment(scope, value, config['window'], now)
+            if count >= config['limit']:
+                self._block(scope, value, config['block'], now)
+                tripped.append(scope)
+        return tripped
+
+    def register_success(self, identifier, ip_address):
+        """Đăng nhập thành công: xóa bộ đếm của user (không xóa bộ đếm IP/subnet)"""
+        if not identifier:
+            return
+        value = self._user_value(identifier, get_subnet(ip_address) if ip_address else None)
+        window = self.limits['user']['window']
+        bucket = int(time.time() // window)
+        self.cache.delete_many([
+            self._counter_key('user', value, bucket),
+            self._counter_key('user', value, bucket - 1),
+            self._block_key('user', value),
+        ])
+
+    # -- internals ----------------------------------------------------------
+
+    def _incr(self, key, timeout):
+        """
+        Tăng key (tạo với giá trị 1 nếu chưa có), giữ TTL là timeout giây
+
+        incr của các backend không có lệnh incr riêng (file, database) ghi lại key với TIMEOUT
+        mặc định của cache, nên TTL được đặt lại sau mỗi lần tăng.
+        """
+        try:
+            count = self.cache.incr(key)
+        except ValueError:
+            if self.cache.add(key, 1, timeout):
+                return 1
+            count = self.cache.incr(key)
+        self.cache.touch(key, timeout)
+        return count
+
+    def _increment(self, scope, value, window, now):
+        """Tăng bộ đếm cửa sổ hiện tại, trả về số lần sai ước lượng trong window giây gần nhất"""
+        bucket = int(now // window)
+        current = self._incr(self._counter_key(scope, value, bucket), window * 2)
+
+        previous = self.cache.get(self._counter_key(scope, value, bucket - 1), 0)
+        elapsed = (now % window) / window
+        return current + previous * (1 - elapsed)
+
+    def _block(self, scope, value, base_seconds, now):
+        strikes = self._incr(self._strikes_key(scope, value), STRIKES_TIMEOUT)
+        duration = min(base_seconds * (2 ** (strikes - 1)), self.max_block)
+        self.cache.set(self._block_key(scope, value), now + duration, int(duration) + 1)
+        logger.warning(f"Login {scope} {value} blocked for {int(duration)}s (strike {strikes})")
+
+
+login_rate_limiter = LoginRateLimiter()
@@ -0,0 +1,278 @@
+"""
+Tiered cache
+Cache hai tầng: LRU nhỏ trong process (L1) đứng trước cache dùng chung giữa các
+worker (L2 - settings.CACHES, Redis khi production, file cache khi chạy local).
+
+- Key được chia theo namespace và có version: tăng version của namespace là
+  vô hiệu hóa toàn bộ key trong namespace đó mà không cần xóa từng key
+- get_or_set chống cache stampede: chỉ một thread/process tính lại giá trị
+  (single-flight lock qua cache.add), các request khác chờ kết quả
+- TTL được cộng/trừ ngẫu nhiên để các key không hết hạn cùng một lúc
+
+L1 chỉ giữ giá trị trong thời gian ngắn (TIERED_CACHE_LOCAL_TIMEOUT) nên thay
+đổi từ process khác sẽ được thấy sau tối đa khoảng thời gian đó.
+"""
+import hashlib
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'tc'
+MAX_KEY_LENGTH = 200
+
+# Namespace dùng chung trong app
+REFERENCE_NAMESPACE = 'reference'   # năm học, khoa, danh mục
+COURSE_NAMESPACE = 'courses'        # danh sách / catalog môn học
+DASHBOARD_NAMESPACE = 'dashboard'   # số liệu thống kê dashboard
+ANALYTICS_NAMESPACE = 'analytics'   # thống kê điểm theo phạm vi (core/utils/analytics.py)
+
+_MISSING = object()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class LocalLRUCache:
+    """LRU thread-safe trong process, mỗi key có thời điểm hết hạn riêng"""
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=_MISSING):
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class TieredCache:
+    """Cache L1 (process) + L2 (dùng chung)"""
+
+    def __init__(self, alias=None, local_max_entries=None, local_timeout=None,
+                 lock_timeout=None, jitter=None):
+        self.alias = alias or _setting('TIERED_CACHE_ALIAS', 'default')
+        self.local = LocalLRUCache(local_max_entries or _setting('TIERED_CACHE_LOCAL_MAX_ENTRIES', 1000))
+        self.local_timeout = local_timeout if local_timeout is not None else _setting('TIERED_CACHE_LOCAL_TIMEOUT', 10)
+        self.lock_timeout = lock_timeout or _setting('TIERED_CACHE_LOCK_TIMEOUT', 10)
+        self.jitter = jitter if jitter is not None else _setting('TIERED_CACHE_JITTER', 0.1)
+        self._key_locks = {}
+        self._key_locks_guard = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    # -- keys ---------------------------------------------------------------
+
+    def _version_key(self, namespace):
+        return f"{KEY_PREFIX}:ns:{namespace}"
+
+    def get_namespace_version(self, namespace):
+        """Version hiện tại của namespace (L1 giữ trong thời gian ngắn)"""
+        version_key = self._version_key(namespace)
+        version = self.local.get(version_key)
+        if version is _MISSING:
+            version = self.shared.get(version_key)
+            if version is None:
+                # Key chưa có hoặc đã bị evict: version theo thời gian không trùng version cũ nào
+                # (trở lại version 1 sẽ làm các giá trị cũ được đọc lại)
+                version = time.time_ns()
+                if not self.shared.add(version_key, version, None):
+                    version = self.shared.get(version_key) or version
+            self.local.set(version_key, version, self.local_timeout)
+        return version
+
+    def make_key(self, namespace, key):
+        version = self.get_namespace_version(namespace)
+        full_key = f"{KEY_PREFIX}:{namespace}:v{version}:{key}"
+        if len(full_key) > MAX_KEY_LENGTH:
+            digest = hashlib.md5(str(key).encode('utf-8')).hexdigest()
+            full_key = f"{KEY_PREFIX}:{namespace}:v{version}:h:{digest}"
+        return full_key
+
+    def jittered(self, timeout):
+        if not timeout or not self.jitter:
+            return timeout
+        return max(1, int(timeout * random.uniform(1 - self.jitter, 1 + self.jitter)))
+
+    # -- basic operations ---------------------------------------------------
+
+    def get(self, namespace, key, default=None):
+        full_key = self.make_key(namespace, key)
+        value = self.local.get(full_key)
+        if value is not _MISSING:
+            return value
+        value = self.shared.get(full_key, _MISSING)
+        if value is _MISSING:
+            return default
+        self.local.set(full_key, value, self.local_timeout)
+        return value
+
+    def set(self, namespace, key, value, timeout=300):
+        full_key = self.make_key(namespace, key)
+        self._store(full_key, value, timeout)
+
+    def _store(self, full_key, value, timeout):
+        timeout = self.jittered(timeout)
+        self.shared.set(full_key, value, timeout)
+        local_timeout = self.local_timeout if timeout is None else min(self.local_timeout, timeout)
+        self.local.set(full_key, value, local_timeout)
+
+    def delete(self, namespace, key):
+        full_key = self.make_key(namespace, key)
+        self.local.delete(full_key)
+        self.shared.delete(full_key)
+
+    def invalidate(self, namespace):
+        """Vô hiệu hóa toàn bộ key của namespace bằng cách tăng version"""
+        version_key = self._version_key(namespace)
+        try:
+            version = self.shared.incr(version_key)
+            # incr của các backend không có lệnh incr riêng (file, database) ghi lại key với
+            # TIMEOUT mặc định: version key phải không bao giờ hết hạn
+            self.shared.touch(version_key, None)
+        except ValueError:
+            # Key chưa tồn tại (hoặc đã bị evict): bắt đầu từ version mới khác version cũ
+            version = time.time_ns()
+            self.shared.set(version_key, version, None)
+        self.local.set(version_key, version, self.local_timeout)
+
+    # -- get_or_set with stampede protection ---------------------------------
+
+    def _thread_lock(self, full_key):
+        with self._key_locks_guard:
+            lock = self._key_locks.get(full_key)
+            if lock is None:
+                lock = self._key_locks[full_key] = threading.Lock()
+            return lock
+
+    def _release_thread_lock(self, full_key, lock):
+        with self._key_locks_guard:
+            if self._key_locks.get(full_key) is lock:
+                del self._key_locks[full_key]
+
+    def get_or_set(self, namespace, key, producer, timeout=300):
+        """
+        Lấy giá trị từ cache, nếu chưa có thì gọi producer() để tính
+
+        Args:
+            namespace: Nhóm key (dùng cho invalidate)
+            key: Key trong namespace
+            producer: Hàm không tham số trả về giá trị cần cache
+            timeout: TTL (giây) trước khi cộng jitter
+        """
+        full_key = self.make_key(namespace, key)
+
+        value = self.local.get(full_key)
+        if value is not _MISSING:
+            return value
+        value = self.shared.get(full_key, _MISSING)
+        if value is not _MISSING:
+            self.local.set(full_key, value, self.local_timeout)
+            return value
+
+        # Trong process: chỉ một thread tính, các thread khác chờ trên lock
+        lock = self._thread_lock(full_key)
+        with lock:
+            try:
+                value = self.local.get(full_key)
+                if value is not _MISSING:
+                    return value
+                return self._fill(full_key, producer, timeout)
+            finally:
+                self._release_thread_lock(full_key, lock)
+
+    def _fill(self, full_key, producer, timeout):
+        # Giữa các process: lock trong cache dùng chung
+        lock_key = f"{full_key}:lock"
+        if self.shared.add(lock_key, 1, self.lock_timeout):
+            try:
+                value = producer()
+                self._store(full_key, value, timeout)
+                return value
+            finally:
+                self.shared.delete(lock_key)
+
+        # Process khác đang tính: chờ kết quả, hết thời gian chờ thì tự tính
+        deadline = time.monotonic() + self.lock_timeout
+        delay = 0.02
+        while time.monotonic() < deadline:
+            time.sleep(delay)
+            value = self.shared.get(full_key, _MISSING)
+            if value is not _MISSING:
+                self.local.set(full_key, value, self.local_timeout)
+                return value
+            if not self.shared.has_key(lock_key):
+                break
+            delay = min(delay * 2, 0.2)
+
+        logger.debug(f"Cache lock wait expired for {full_key}, computing value")
+        value = producer()
+        self._store(full_key, value, timeout)
+        return value
+
+
+tiered_cache = TieredCache()
+
+
+def cache_get_or_set(namespace, key, producer, timeout=300):
+    return tiered_cache.get_or_set(namespace, key, producer, timeout)
+
+
+def invalidate_namespace(*namespaces):
+    for namespace in namespaces:
+        tiered_cache.invalidate(namespace)
+
+
+def cached(namespace, timeout=300, key=None):
+    """
+    Decorator cache kết quả hàm theo namespace
+
+    Args:
+        key: Hàm nhận cùng tham số với hàm gốc và trả về key, mặc định dùng tên
+            hàm và repr của tham số
+    """
+    def decorator(func):
+        @wraps(func)
+        def _wrapped(*args, **kwargs):
+            if key is not None:
+                cache_key = key(*args, **kwargs)
+            else:
+                cache_key = ':'.join([func.__qualname__] + [repr(arg) for arg in args] +
+                                     [f"{k}={v!r}" for k, v in sorted(kwargs.items())])
+            return tiered_cache.get_or_set(namespace, cache_key, lambda: func(*args, **kwargs), timeout)
+        _wrapped.invalidate = lambda: tiered_cache.invalidate(namespace)
+        return _wrapped
+    return decorator
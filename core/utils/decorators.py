@@ -6,6 +6,8 @@ from django.shortcuts import redirect
 from django.contrib import messages
 from django.core.exceptions import PermissionDenied
 
+from .role_context import get_request_role_context
+
 
 def role_required(allowed_roles):
     """
@@ -24,10 +26,8 @@ def role_required(allowed_roles):
             if request.user.is_superuser:
                 return view_func(request, *args, **kwargs)
             
-            if hasattr(request.user, 'userprofile'):
-                user_role = request.user.userprofile.role
-                if user_role in allowed_roles:
-                    return view_func(request, *args, **kwargs)
+            if get_request_role_context(request).has_role(*allowed_roles):
+                return view_func(request, *args, **kwargs)
             
             messages.error(request, 'Bạn không có quyền truy cập trang này.')
             raise PermissionDenied("Bạn không có quyền truy cập trang này.")
@@ -0,0 +1,483 @@
+"""
+Gradebook export
+Xoay các dòng Grade của một môn học (hoặc của một lớp sinh viên trong môn) thành bảng
+sinh viên × đầu điểm, tính điểm tổng có trọng số và điểm chữ, rồi ghi ra XLSX
+(openpyxl write-only) hoặc CSV dạng stream.
+
+- build_gradebook: một query lấy toàn bộ điểm kèm thông tin sinh viên / bài tập (và một
+  query danh sách sinh viên đăng ký để sinh viên chưa có điểm vẫn có dòng); pivot, điểm
+  tổng và điểm chữ được tính bằng numpy trên cả ma trận
+- stream_csv / write_xlsx / gradebook_response: ghi từng dòng, không dựng cả file trong bộ nhớ;
+  tên sinh viên và tiêu đề bài tập bắt đầu bằng = + - @ được thêm ' để không chạy như công thức
+- Gradebook.to_columns / apply_gradebook_edits: dữ liệu cho gradebook grid API (GET dạng mảng
+  theo cột, PATCH một lô ô sửa trong một transaction với bulk_update và kiểm tra Grade.version)
+
+Đầu điểm: mỗi bài tập một cột; điểm không gắn bài tập (giữa kỳ, cuối kỳ...) gom theo loại điểm.
+Một sinh viên có nhiều điểm trong cùng một cột thì lấy điểm is_final, rồi điểm mới nhất.
+Điểm tổng (hệ 10) là trung bình phần trăm có trọng số của các ô đã có điểm.
+"""
+import csv
+import logging
+import re
+import tempfile
+from dataclasses import dataclass
+
+import numpy as np
+from django.db import transaction
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.http import content_disposition_header
+from openpyxl import Workbook
+
+from core.models import CourseEnrollment, Grade
+
+from .analytics import invalidate_grade_analytics
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('xlsx', 'csv')
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# File XLSX nhỏ hơn mức này nằm trong bộ nhớ, lớn hơn thì chuyển ra file tạm
+XLSX_SPOOL_SIZE = 8 * 1024 * 1024
+
+_STUDENT_FIELDS = (
+    'student_id', 'student__username', 'student__first_name', 'student__last_name',
+    'student__profile__student_id',
+)
+
+_GRADE_TYPE_ORDER = {grade_type: index for index, (grade_type, _) in enumerate(Grade.GRADE_TYPES)}
+_GRADE_TYPE_LABELS = dict(Grade.GRADE_TYPES)
+
+
+@dataclass(frozen=True)
+class GradebookStudent:
+    id: int
+    username: str
+    full_name: str
+    code: str
+
+
+@dataclass(frozen=True)
+class Assessment:
+    """Một cột của bảng điểm: một bài tập, hoặc một loại điểm không gắn bài tập"""
+    key: tuple
+    label: str
+
+    @property
+    def id(self):
+        """Id dạng chuỗi dùng trong API: 'assignment:<id>' hoặc 'type:<grade_type>'"""
+        return f"{self.key[0]}:{self.key[1]}"
+
+
+def parse_assessment_id(value):
+    """Ngược lại của Assessment.id, trả về key hoặc None nếu không hợp lệ"""
+    kind, _, ident = str(value).partition(':')
+    if kind == 'assignment' and ident.isdigit():
+        return ('assignment', int(ident))
+    if kind == 'type' and ident in _GRADE_TYPE_LABELS:
+        return ('type', ident)
+    return None
+
+
+@dataclass
+class Gradebook:
+    course: object
+    students: list
+    assessments: list
+    scores: np.ndarray      # điểm gốc (sinh viên × đầu điểm), NaN nếu chưa có
+    totals: np.ndarray      # điểm tổng hệ 10, NaN nếu sinh viên chưa có điểm nào
+    letters: list
+    grade_ids: np.ndarray   # id của Grade trong từng ô, 0 nếu chưa có
+    versions: np.ndarray    # Grade.version của từng ô, 0 nếu chưa có
+
+    @property
+    def header(self):
+        return (
+            ['MSSV', 'Username', 'Họ tên']
+            + [_text(assessment.label) for assessment in self.assessments]
+            + ['Tổng (hệ 10)', 'Điểm chữ']
+        )
+
+    def rows(self):
+        """Từng dòng của bảng điểm theo thứ tự header, ô chưa có điểm là None"""
+        for index, student in enumerate(self.students):
+            yield [
+                _text(student.code), _text(student.username), _text(student.full_name),
+                *(_cell(value) for value in self.scores[index]),
+                _cell(self.totals[index]), self.letters[index],
+            ]
+
+    def to_columns(self):
+        """
+        Bảng điểm dạng mảng theo cột cho API: scores[j][i] là điểm của sinh viên i ở đầu
+        điểm j (None nếu chưa có), grade_ids / versions cùng hình dạng
+        """
+        return {
+            'course': {'id': self.course.pk, 'code': self.course.code, 'name': self.course.name},
+            'students': {
+                'id': [student.id for student in self.students],
+                'code': [student.code for student in self.students],
+                'username': [student.username for student in self.students],
+                'full_name': [student.full_name for student in self.students],
+            },
+            'assessments': {
+                'id': [assessment.id for assessment in self.assessments],
+                'label': [assessment.label for assessment in self.assessments],
+            },
+            'scores': [[_cell(value) for value in column] for column in self.scores.T],
+            'grade_ids': [[int(value) or None for value in column] for column in self.grade_ids.T],
+            'versions': [[int(value) or None for value in column] for column in self.versions.T],
+            'totals': [_cell(value) for value in self.totals],
+            'letters': self.letters,
+        }
+
+
+def _cell(value):
+    return None if np.isnan(value) else round(float(value), 2)
+
+
+# Ký tự đầu khiến Excel / LibreOffice hiểu ô là công thức (CSV / formula injection)
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _text(value):
+    """Ô chữ trong file xuất: thêm ' trước tên / tiêu đề bắt đầu như một công thức"""
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def _student(row):
+    student_id, username, first_name, last_name, code = row[:5]
+    full_name = f"{first_name} {last_name}".strip() or username
+    return GradebookStudent(student_id, username, full_name, code or '')
+
+
+def _assessment_key(assignment_id, grade_type):
+    if assignment_id is not None:
+        return ('assignment', assignment_id)
+    return ('type', grade_type)
+
+
+def letter_grades(percentages):
+    """Điểm chữ cho mảng phần trăm theo Grade.LETTER_GRADES ('' với NaN)"""
+    thresholds = [threshold for threshold, _ in reversed(Grade.LETTER_GRADES)]
+    labels = np.array(
+        [Grade.FAILING_LETTER] + [letter for _, letter in reversed(Grade.LETTER_GRADES)], dtype=object
+    )
+    letters = labels[np.digitize(np.nan_to_num(percentages, nan=0.0), thresholds)]
+    return np.where(np.isnan(percentages), '', letters).tolist()
+
+
+def build_gradebook(course, student_class=None, grades=None):
+    """
+    Dựng bảng điểm của một môn học
+
+    Args:
+        course: Course
+        student_class: StudentClass (hoặc id) - chỉ lấy sinh viên thuộc lớp này
+        grades: queryset Grade giới hạn các điểm được xuất (vd. các dòng admin đã chọn);
+            khi có thì chỉ sinh viên có điểm trong queryset mới có dòng
+
+    Returns:
+        Gradebook
+    """
+    include_roster = grades is None
+    grades = (Grade.objects.all() if include_roster else grades).filter(course=course)
+    if student_class is not None:
+        grades = grades.filter(student__profile__student_class=student_class)
+
+    # Sắp xếp để dòng sau ghi đè dòng trước: điểm is_final, rồi điểm mới nhất được giữ lại
+    rows = list(grades.order_by('is_final', 'date', 'pk').values_list(
+        *_STUDENT_FIELDS, 'assignment_id', 'assignment__title', 'assignment__due_date',
+        'grade_type', 'score', 'max_score', 'weight', 'pk', 'version',
+    ))
+
+    students = {row[0]: _student(row) for row in rows}
+    if include_roster:
+        roster = CourseEnrollment.objects.filter(course=course).exclude(status='dropped')
+        if student_class is not None:
+            roster = roster.filter(student__profile__student_class=student_class)
+        for row in roster.values_list(*_STUDENT_FIELDS):
+            students.setdefault(row[0], _student(row))
+    students = sorted(students.values(), key=lambda student: (not student.code, student.code, student.username))
+
+    # Cột: bài tập theo hạn nộp, sau đó các loại điểm không gắn bài tập theo Grade.GRADE_TYPES
+    columns = {}
+    for row in rows:
+        assignment_id, title, due_date, grade_type = row[5:9]
+        key = _assessment_key(assignment_id, grade_type)
+        if key in columns:
+            continue
+        if assignment_id is not None:
+            columns[key] = ((0, due_date is None, due_date or 0, assignment_id), title)
+        else:
+            order = _GRADE_TYPE_ORDER.get(grade_type, len(_GRADE_TYPE_ORDER))
+            columns[key] = ((1, order), _GRADE_TYPE_LABELS.get(grade_type, grade_type))
+    assessments = [
+        Assessment(key, label) for key, (_, label) in sorted(columns.items(), key=lambda item: item[1][0])
+    ]
+
+    student_index = {student.id: index for index, student in enumerate(students)}
+    column_index = {assessment.key: index for index, assessment in enumerate(assessments)}
+    cells = {}
+    for row in rows:
+        cells[(student_index[row[0]], column_index[_assessment_key(row[5], row[8])])] = row[9:14]
+
+    shape = (len(students), len(assessments))
+    scores = np.full(shape, np.nan)
+    maxima = np.full(shape, np.nan)
+    weights = np.zeros(shape)
+    grade_ids = np.zeros(shape, dtype=np.int64)
+    versions = np.zeros(shape, dtype=np.int64)
+    if cells:
+        positions = np.array(list(cells.keys())).T
+        values = np.array([cell[:3] for cell in cells.values()], dtype=float)
+        identities = np.array([cell[3:] for cell in cells.values()], dtype=np.int64)
+        scores[positions[0], positions[1]] = values[:, 0]
+        maxima[positions[0], positions[1]] = values[:, 1]
+        weights[positions[0], positions[1]] = values[:, 2]
+        grade_ids[positions[0], positions[1]] = identities[:, 0]
+        versions[positions[0], positions[1]] = identities[:, 1]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        percentages = scores / maxima * 100
+        graded = ~np.isnan(percentages)
+        weight_sum = np.where(graded, weights, 0).sum(axis=1)
+        weighted = np.where(graded, percentages * weights, 0).sum(axis=1)
+        total_percentages = np.where(weight_sum > 0, weighted / weight_sum, np.nan)
+
+    logger.debug(f"Gradebook {course.code}: {len(students)} students x {len(assessments)} assessments, {len(rows)} grades")
+
+    return Gradebook(
+        course=course,
+        students=students,
+        assessments=assessments,
+        scores=scores,
+        totals=total_percentages / 10,
+        letters=letter_grades(total_percentages),
+        grade_ids=grade_ids,
+        versions=versions,
+    )
+
+
+# Số ô tối đa trong một lần PATCH gradebook grid
+MAX_EDITS_PER_REQUEST = 2000
+
+EDITABLE_FIELDS = ('score', 'max_score', 'weight', 'comment')
+
+
+class GradebookEditError(Exception):
+    """
+    Lô ô sửa không được áp dụng (không ô nào được ghi)
+
+    errors: {vị trí ô trong lô: thông báo} - dữ liệu không hợp lệ
+    conflicts: {vị trí ô trong lô: giá trị hiện tại} - ô đã bị sửa sau khi client tải gradebook
+    """
+
+    def __init__(self, errors=None, conflicts=None):
+        self.errors = errors or {}
+        self.conflicts = conflicts or {}
+        super().__init__(f"{len(self.errors)} invalid and {len(self.conflicts)} conflicting cells")
+
+
+def _check_values(grade):
+    """Các ràng buộc của Grade.clean với điểm số, không đọc các FK"""
+    if grade.max_score <= 0:
+        return 'Điểm tối đa phải lớn hơn 0.'
+    if grade.score < 0 or grade.score > grade.max_score:
+        return f'Điểm phải từ 0 đến {grade.max_score}.'
+    if grade.weight <= 0:
+        return 'Trọng số phải lớn hơn 0.'
+    return None
+
+
+def apply_gradebook_edits(course, edits, user):
+    """
+    Áp dụng một lô ô sửa của gradebook grid trong một transaction
+
+    Mỗi ô (dict đã qua GradebookCellEditSerializer) hoặc sửa điểm đã có (grade + version),
+    hoặc tạo điểm cho ô trống (student + assessment). Toàn bộ lô được kiểm tra trong một
+    lượt với số query cố định; chỉ cần một ô lỗi hoặc lệch version là không ô nào được ghi.
+
+    Returns:
+        {'updated': [{'index', 'grade', 'version'}], 'created': [{'index', 'grade', 'version',
+        'student', 'assessment'}]}
+
+    Raises:
+        GradebookEditError
+    """
+    errors, conflicts = {}, {}
+    updates = [(index, edit) for index, edit in enumerate(edits) if edit.get('grade') is not None]
+    creates = [(index, edit) for index, edit in enumerate(edits) if edit.get('grade') is None]
+
+    with transaction.atomic():
+        grades = Grade.objects.select_for_update().filter(
+            course=course, pk__in={edit['grade'] for _, edit in updates}
+        ).in_bulk() if updates else {}
+
+        changed, seen_grades = [], set()
+        for index, edit in updates:
+            grade = grades.get(edit['grade'])
+            if grade is None:
+                errors[index] = 'Không tìm thấy điểm trong môn học này.'
+                continue
+            if grade.pk in seen_grades:
+                errors[index] = 'Ô bị sửa nhiều lần trong cùng một lô.'
+                continue
+            seen_grades.add(grade.pk)
+            if grade.version != edit['version']:
+                conflicts[index] = {'grade': grade.pk, 'version': grade.version, 'score': grade.score}
+                continue
+            for name in EDITABLE_FIELDS:
+                if name in edit:
+                    setattr(grade, name, edit[name])
+            message = _check_values(grade)
+            if message:
+                errors[index] = message
+                continue
+            changed.append((index, grade))
+
+        keys = {index: parse_assessment_id(edit['assessment']) for index, edit in creates}
+        enrolled, assignment_ids, existing = set(), set(), set()
+        if creates:
+            student_ids = {edit['student'] for _, edit in creates}
+            enrolled = set(
+                CourseEnrollment.objects.filter(course=course, student_id__in=student_ids)
+                .exclude(status='dropped').values_list('student_id', flat=True)
+            )
+            assignment_ids = set(course.assignments.filter(
+                pk__in={key[1] for key in keys.values() if key[0] == 'assignment'}
+            ).values_list('pk', flat=True))
+            existing = {
+                (student_id, _assessment_key(assignment_id, grade_type))
+                for student_id, assignment_id, grade_type in Grade.objects.filter(
+                    course=course, student_id__in=student_ids
+                ).values_list('student_id', 'assignment_id', 'grade_type')
+            }
+
+        created, seen_cells, today = [], set(), timezone.localdate()
+        for index, edit in creates:
+            kind, ident = keys[index]
+            cell = (edit['student'], (kind, ident))
+            if edit['student'] not in enrolled:
+                errors[index] = 'Sinh viên không đăng ký môn học này.'
+                continue
+            if kind == 'assignment' and ident not in assignment_ids:
+                errors[index] = 'Bài tập không thuộc môn học này.'
+                continue
+            if cell in seen_cells:
+                errors[index] = 'Ô bị sửa nhiều lần trong cùng một lô.'
+                continue
+            seen_cells.add(cell)
+            if cell in existing:
+                conflicts[index] = {'student': edit['student'], 'assessment': edit['assessment']}
+                continue
+            grade = Grade(
+                course=course,
+                student_id=edit['student'],
+                assignment_id=ident if kind == 'assignment' else None,
+                grade_type='assignment' if kind == 'assignment' else ident,
+                date=today,
+                created_by=user,
+                **{name: edit[name] for name in EDITABLE_FIELDS if name in edit},
+            )
+            message = _check_values(grade)
+            if message:
+                errors[index] = message
+                continue
+            created.append((index, grade))
+
+        if errors or conflicts:
+            raise GradebookEditError(errors, conflicts)
+
+        now = timezone.now()
+        for _, grade in changed:
+            grade.version += 1
+            grade.updated_at = now
+        Grade.objects.bulk_update([grade for _, grade in changed], [*EDITABLE_FIELDS, 'version', 'updated_at'])
+        Grade.objects.bulk_create([grade for _, grade in created])
+        # bulk_update / bulk_create không phát signal
+        invalidate_grade_analytics(
+            course_ids=[course.pk], student_ids={grade.student_id for _, grade in changed + created}
+        )
+
+    logger.info(
+        f"Gradebook {course.code}: {len(changed)} grades updated, {len(created)} created by user {user.pk}"
+    )
+    return {
+        'updated': [
+            {'index': index, 'grade': grade.pk, 'version': grade.version} for index, grade in changed
+        ],
+        'created': [
+            {
+                'index': index, 'grade': grade.pk, 'version': grade.version,
+                'student': grade.student_id, 'assessment': edits[index]['assessment'],
+            }
+            for index, grade in created
+        ],
+    }
+
+
+class _Echo:
+    """File-like object cho csv.writer: trả lại chính dòng vừa ghi để stream"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(gradebook):
+    """Sinh từng dòng CSV của bảng điểm (có BOM để Excel đọc đúng tiếng Việt)"""
+    writer = csv.writer(_Echo())
+    yield '\ufeff'
+    yield writer.writerow(gradebook.header)
+    for row in gradebook.rows():
+        yield writer.writerow(['' if value is None else value for value in row])
+
+
+def _sheet_title(course, used_titles):
+    """Tên sheet từ mã môn: tối đa 31 ký tự, không chứa []:*?/\\ và không trùng"""
+    base = re.sub(r'[\[\]:*?/\\]', '-', course.code or str(course.pk))[:28] or 'Sheet'
+    title, number = base, 1
+    while title.lower() in used_titles:
+        number += 1
+        title = f"{base}_{number}"
+    used_titles.add(title.lower())
+    return title
+
+
+def write_xlsx(gradebooks, fileobj):
+    """Ghi các bảng điểm (mỗi môn một sheet) vào fileobj bằng workbook write-only"""
+    workbook = Workbook(write_only=True)
+    used_titles = set()
+    for gradebook in gradebooks:
+        sheet = workbook.create_sheet(title=_sheet_title(gradebook.course, used_titles))
+        sheet.freeze_panes = 'D2'
+        sheet.append(gradebook.header)
+        for row in gradebook.rows():
+            sheet.append(row)
+    if not gradebooks:
+        workbook.create_sheet(title='Gradebook')
+    workbook.save(fileobj)
+
+
+def gradebook_response(gradebooks, export_format, filename):
+    """
+    Response tải bảng điểm
+
+    Args:
+        gradebooks: danh sách Gradebook (CSV chỉ xuất bảng đầu tiên)
+        export_format: 'xlsx' hoặc 'csv'
+        filename: tên file không kèm phần mở rộng
+    """
+    if export_format == 'csv':
+        response = StreamingHttpResponse(stream_csv(gradebooks[0]), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = content_disposition_header(True, f"{filename}.csv")
+        return response
+
+    spool = tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_SIZE)
+    write_xlsx(gradebooks, spool)
+    spool.seek(0)
+    return FileResponse(spool, as_attachment=True, filename=f"{filename}.xlsx", content_type=XLSX_CONTENT_TYPE)
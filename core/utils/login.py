@@ -0,0 +1,39 @@
+"""
+Login helpers
+Tìm user bằng một query dùng index (email chuẩn hóa chữ thường hoặc username).
+Giới hạn đăng nhập sai nằm trong brute_force.py.
+"""
+from django.contrib.auth.models import User
+from django.db.models.functions import Lower
+
+
+def normalize_login_identifier(identifier):
+    """Chuẩn hóa email/username nhập vào"""
+    return (identifier or '').strip()
+
+
+def find_user_for_login(identifier):
+    """
+    Tìm user theo email (không phân biệt hoa thường) hoặc username
+
+    Email dùng index LOWER(email), username dùng unique index sẵn có,
+    profile được lấy kèm trong cùng query. Username được phép chứa '@' nên khi không có email
+    nào khớp thì tìm tiếp theo username.
+    """
+    identifier = normalize_login_identifier(identifier)
+    if not identifier:
+        return None
+
+    users = User.objects.select_related('profile')
+    if '@' in identifier:
+        user = users.alias(email_lower=Lower('email')).filter(
+            email_lower=identifier.lower()
+        ).order_by('pk').first()
+        if user is not None:
+            return user
+    return users.filter(username=identifier).first()
+
+
+def run_dummy_password_hasher(password):
+    """Chạy hasher khi không tìm thấy user để thời gian phản hồi không tiết lộ user có tồn tại"""
+    User().set_password(password)
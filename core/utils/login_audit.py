@@ -0,0 +1,155 @@
+"""
+Login audit writer
+Gom các bản ghi LoginHistory và cập nhật last_login rồi ghi theo lô trong một
+thread nền, để request đăng nhập không phải chờ các lệnh INSERT/UPDATE này.
+
+Dữ liệu được ghi sau tối đa LOGIN_AUDIT_FLUSH_INTERVAL giây hoặc khi đủ
+LOGIN_AUDIT_BATCH_SIZE bản ghi; mỗi lô cũng được cộng dồn vào bảng rollup
+LoginActivityDaily. Khi LOGIN_AUDIT_ASYNC = False (test, script)
+mọi thứ được ghi ngay trong request.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import close_old_connections
+from django.utils import timezone
+
+from ..models.authentication import LoginHistory
+from .login_rollups import apply_login_rollups
+
+logger = logging.getLogger(__name__)
+
+
+class LoginAuditWriter:
+    """Hàng đợi ghi LoginHistory / last_login theo lô"""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_async(self):
+        return getattr(settings, 'LOGIN_AUDIT_ASYNC', True)
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'LOGIN_AUDIT_FLUSH_INTERVAL', 1.0)
+
+    @property
+    def batch_size(self):
+        return getattr(settings, 'LOGIN_AUDIT_BATCH_SIZE', 200)
+
+    # -- public API ----------------------------------------------------------
+
+    def record_login(self, user_id, ip_address=None, user_agent='', success=True, failure_reason=None):
+        entry = LoginHistory(
+            user_id=user_id,
+            login_time=timezone.now(),
+            ip_address=ip_address,
+            user_agent=user_agent,
+            success=success,
+            failure_reason=failure_reason,
+        )
+        self._submit(('history', entry))
+
+    def record_last_login(self, user_id, when=None):
+        self._submit(('last_login', (user_id, when or timezone.now())))
+
+    def flush(self):
+        """Ghi ngay mọi thứ đang chờ trong hàng đợi"""
+        items = []
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if items:
+            self._write(items)
+
+    # -- internals -----------------------------------------------------------
+
+    def _submit(self, item):
+        if not self.is_async:
+            self._write([item])
+            return
+        self._ensure_thread()
+        self._queue.put(item)
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None:
+                # Ghi nốt phần còn lại khi process tắt (ví dụ worker gunicorn bị recycle)
+                atexit.register(self.flush)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='login-audit-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            # Gom thêm các bản ghi đến trong khoảng flush_interval
+            deadline = time.monotonic() + self.flush_interval
+            while len(items) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._write(items)
+            finally:
+                close_old_connections()
+
+    def _write(self, items):
+        history = []
+        last_logins = {}
+        for kind, payload in items:
+            if kind == 'history':
+                history.append(payload)
+            else:
+                user_id, when = payload
+                if user_id not in last_logins or last_logins[user_id] < when:
+                    last_logins[user_id] = when
+
+        try:
+            if history:
+                LoginHistory.objects.bulk_create(history, batch_size=self.batch_size)
+            if last_logins:
+                User.objects.bulk_update(
+                    [User(pk=user_id, last_login=when) for user_id, when in last_logins.items()],
+                    ['last_login'],
+                    batch_size=self.batch_size,
+                )
+        except Exception as e:
+            logger.error(f"Error writing login audit batch ({len(items)} items): {str(e)}")
+            return
+
+        if history:
+            try:
+                apply_login_rollups(history)
+            except Exception as e:
+                logger.error(f"Error updating login rollups ({len(history)} entries): {str(e)}")
+
+
+login_audit_writer = LoginAuditWriter()
+
+
+def record_login(user_id, **kwargs):
+    login_audit_writer.record_login(user_id, **kwargs)
+
+
+def record_last_login(sender, user, **kwargs):
+    """Receiver user_logged_in thay cho django.contrib.auth.models.update_last_login"""
+    now = timezone.now()
+    user.last_login = now
+    login_audit_writer.record_last_login(user.pk, now)
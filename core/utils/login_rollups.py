@@ -0,0 +1,174 @@
+"""
+Login activity rollups
+Bảng LoginActivityDaily tổng hợp số lần đăng nhập thành công, thất bại và số
+user khác nhau theo ngày và vai trò.
+
+- apply_login_rollups: cộng dồn một lô LoginHistory vừa ghi (gọi bởi login audit
+  writer), chỉ đụng tới các dòng (ngày, vai trò) của lô đó
+- rebuild_login_rollups: tính lại chính xác từ LoginHistory cho một khoảng ngày
+  (backfill, trước khi lưu trữ dữ liệu cũ, hoặc sửa sai lệch hiếm gặp khi hai
+  process cùng ghi lần đăng nhập đầu tiên trong ngày của một user)
+- get_login_activity / get_login_totals: đọc cho dashboard và analytics
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import CharField, Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from ..models.authentication import LoginActivityDaily, LoginHistory
+from ..models.user import UserProfile
+from .statistics import fill_daily_rows
+
+ROLLUP_FIELDS = ('logins', 'failures', 'unique_users')
+
+
+def day_start(day):
+    """Thời điểm bắt đầu ngày (theo timezone hiện tại) dạng aware"""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+# =============================================================================
+# GHI
+# =============================================================================
+
+def apply_login_rollups(entries):
+    """
+    Cộng dồn các bản ghi LoginHistory vừa được ghi vào bảng rollup
+
+    Args:
+        entries: Danh sách LoginHistory đã được lưu (có pk nếu backend hỗ trợ)
+    """
+    if not entries:
+        return
+
+    user_ids = {entry.user_id for entry in entries}
+    roles = dict(UserProfile.objects.filter(user_id__in=user_ids).values_list('user_id', 'role'))
+
+    deltas = defaultdict(lambda: dict.fromkeys(ROLLUP_FIELDS, 0))
+    successful_users = defaultdict(set)
+    for entry in entries:
+        day = timezone.localdate(entry.login_time)
+        key = (day, roles.get(entry.user_id, ''))
+        if entry.success:
+            deltas[key]['logins'] += 1
+            successful_users[day].add(entry.user_id)
+        else:
+            deltas[key]['failures'] += 1
+
+    batch_pks = [entry.pk for entry in entries if entry.pk is not None]
+    if len(batch_pks) != len(entries):
+        # Backend không trả về pk khi bulk_create (MySQL): tính lại các ngày liên quan
+        days = sorted({day for day, _ in deltas})
+        rebuild_login_rollups(days[0], days[-1])
+        return
+
+    for day, users in successful_users.items():
+        # User đã có lần đăng nhập thành công khác trong ngày thì không tính là user mới
+        seen_before = set(
+            LoginHistory.objects.filter(
+                user_id__in=users,
+                success=True,
+                login_time__gte=day_start(day),
+                login_time__lt=day_start(day + timedelta(days=1)),
+            ).exclude(pk__in=batch_pks).values_list('user_id', flat=True).distinct()
+        )
+        for user_id in users - seen_before:
+            deltas[(day, roles.get(user_id, ''))]['unique_users'] += 1
+
+    for (day, role), delta in deltas.items():
+        _increment_rollup(day, role, delta)
+
+
+def _increment_rollup(day, role, delta):
+    changes = {field: F(field) + value for field, value in delta.items() if value}
+    if not changes:
+        return
+    changes['updated_at'] = timezone.now()
+    rows = LoginActivityDaily.objects.filter(date=day, role=role)
+    if rows.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            LoginActivityDaily.objects.create(date=day, role=role, **delta)
+    except IntegrityError:
+        # Process khác vừa tạo dòng này
+        rows.update(**changes)
+
+
+def rebuild_login_rollups(start_date, end_date):
+    """
+    Tính lại rollup từ LoginHistory cho các ngày trong [start_date, end_date]
+
+    Chỉ gọi cho các ngày LoginHistory còn đầy đủ (chưa bị lưu trữ).
+    Trả về số dòng rollup được ghi.
+    """
+    rows = LoginHistory.objects.filter(
+        login_time__gte=day_start(start_date),
+        login_time__lt=day_start(end_date + timedelta(days=1)),
+    ).annotate(
+        day=TruncDate('login_time'),
+        role_name=Coalesce('user__profile__role', Value(''), output_field=CharField()),
+    ).values('day', 'role_name').annotate(
+        logins=Count('id', filter=Q(success=True)),
+        failures=Count('id', filter=Q(success=False)),
+        unique_users=Count('user', filter=Q(success=True), distinct=True),
+    ).order_by()
+
+    rollups = [
+        LoginActivityDaily(
+            date=row['day'],
+            role=row['role_name'],
+            logins=row['logins'],
+            failures=row['failures'],
+            unique_users=row['unique_users'],
+        )
+        for row in rows
+    ]
+    with transaction.atomic():
+        LoginActivityDaily.objects.filter(date__gte=start_date, date__lte=end_date).delete()
+        LoginActivityDaily.objects.bulk_create(rollups, batch_size=500)
+    return len(rollups)
+
+
+# =============================================================================
+# ĐỌC
+# =============================================================================
+
+def login_activity_range(days):
+    """(start_date, end_date) cho N ngày gần nhất, tính cả hôm nay"""
+    end_date = timezone.localdate()
+    return end_date - timedelta(days=days), end_date
+
+
+def login_activity_rows(start_date, end_date, role=None):
+    """Queryset các dòng {'day', 'logins', 'failures', 'unique_users'} group theo ngày"""
+    rollups = LoginActivityDaily.objects.filter(date__gte=start_date, date__lte=end_date)
+    if role is not None:
+        rollups = rollups.filter(role=role)
+    return rollups.values(day=F('date')).annotate(
+        **{field: Sum(field) for field in ROLLUP_FIELDS}
+    ).order_by('day')
+
+
+def get_login_activity(days=30, role=None):
+    """
+    Chuỗi hoạt động đăng nhập N ngày gần nhất (một query trên bảng rollup)
+
+    Returns:
+        [{'date': 'YYYY-MM-DD', 'logins': .., 'failures': .., 'unique_users': ..}, ...]
+    """
+    start_date, end_date = login_activity_range(days)
+    rows = login_activity_rows(start_date, end_date, role)
+    return fill_daily_rows(rows, start_date, end_date, ROLLUP_FIELDS)
+
+
+def get_login_totals(since=None):
+    """Tổng logins / failures / unique_users (cộng theo ngày) từ ngày since"""
+    rollups = LoginActivityDaily.objects.all()
+    if since is not None:
+        rollups = rollups.filter(date__gte=since)
+    totals = rollups.aggregate(**{field: Sum(field) for field in ROLLUP_FIELDS})
+    return {field: totals[field] or 0 for field in ROLLUP_FIELDS}
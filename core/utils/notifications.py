@@ -0,0 +1,248 @@
+"""
+Notifications
+Thông báo cho sinh viên: bài tập mới, bài tập đã chấm, sắp đến hạn nộp.
+
+- Gửi cho cả môn học (notify_course) chỉ ghi một dòng Notification, không phụ thuộc sĩ số;
+  sinh viên đang học môn thấy các thông báo của môn tạo sau thời điểm đăng ký
+- Gửi riêng (notify_users) ghi một dòng cho mỗi người nhận bằng bulk_create
+- Đã đọc / chưa đọc: mỗi user có một con trỏ last_read_id (NotificationCursor)
+- Danh sách phân trang theo keyset (id giảm dần, ?before=<id>), không dùng OFFSET
+
+Số chưa đọc được cache theo user kèm "stamp" của từng nhóm người nhận (mỗi môn học và
+chính user). Gửi thông báo chỉ đổi stamp của một nhóm; đọc số chưa đọc chỉ tốn hai lần
+đọc cache khi không có gì mới, và một câu COUNT khi có stamp thay đổi.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Max, Q
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import CourseEnrollment, Notification, NotificationCursor
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'notifications'
+
+
+def _cache():
+    return caches[getattr(settings, 'NOTIFICATION_CACHE_ALIAS', 'default')]
+
+
+def _stamp_key(kind, pk):
+    return f"{KEY_PREFIX}:stamp:{kind}:{pk}"
+
+
+def _unread_key(user_id):
+    return f"{KEY_PREFIX}:unread:{user_id}"
+
+
+def _bump_stamps(keys):
+    """
+    Đổi stamp của các nhóm người nhận
+
+    Stamp là thời điểm (ns) của lần gửi cuối, ghi không hết hạn: stamp bị evict rồi được ghi lại
+    không thể trùng giá trị đã lưu trong số chưa đọc đã cache (đếm tăng từ 0 thì có thể).
+    """
+    _cache().set_many({key: time.time_ns() for key in keys}, None)
+
+
+# =============================================================================
+# GỬI THÔNG BÁO
+# =============================================================================
+
+def notify_course(course_id, kind, title, message='', url='', assignment=None, actor=None):
+    """
+    Thông báo cho mọi sinh viên đang học môn: một INSERT và một lần tăng stamp trong cache
+
+    Returns:
+        Notification
+    """
+    notification = Notification.objects.create(
+        course_id=course_id, kind=kind, title=title, message=message, url=url,
+        assignment=assignment, actor=actor,
+    )
+    transaction.on_commit(lambda: _bump_stamps([_stamp_key('course', course_id)]))
+    return notification
+
+
+def notify_users(user_ids, kind, title, message='', url='', assignment=None, actor=None):
+    """
+    Thông báo riêng cho từng user: các dòng được ghi theo lô bằng bulk_create
+
+    Returns:
+        số thông báo đã tạo
+    """
+    user_ids = sorted(set(user_ids) - {None})
+    Notification.objects.bulk_create([
+        Notification(
+            recipient_id=user_id, kind=kind, title=title, message=message, url=url,
+            assignment=assignment, actor=actor,
+        )
+        for user_id in user_ids
+    ], batch_size=getattr(settings, 'NOTIFICATION_BATCH_SIZE', 1000))
+    keys = [_stamp_key('user', user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: _bump_stamps(keys))
+    return len(user_ids)
+
+
+def notify_assignment_published(assignment):
+    """Bài tập mới được công bố: thông báo cho cả môn"""
+    return notify_course(
+        assignment.course_id,
+        'assignment_published',
+        f"Bài tập mới: {assignment.title}",
+        message=f"Hạn nộp {timezone.localtime(assignment.due_date):%d/%m/%Y %H:%M}",
+        url=reverse('dashboards:student:assignment_detail', args=[assignment.pk]),
+        assignment=assignment,
+        actor=assignment.created_by,
+    )
+
+
+def notify_submission_graded(submission):
+    """Bài nộp đã được chấm: thông báo riêng cho sinh viên"""
+    assignment = submission.assignment
+    return notify_users(
+        [submission.student_id],
+        'assignment_graded',
+        f"Đã có điểm: {assignment.title}",
+        message=f"Điểm: {float(submission.grade):g}/{float(assignment.max_score):g}" if submission.grade is not None else '',
+        url=reverse('dashboards:student:assignment_detail', args=[assignment.pk]),
+        assignment=assignment,
+    )
+
+
+def forget_unread_count(*user_ids):
+    """Xóa số chưa đọc đã cache (nhóm người nhận của user thay đổi, vd. đăng ký / hủy môn)"""
+    keys = [_unread_key(user_id) for user_id in user_ids if user_id is not None]
+    if keys:
+        _cache().delete_many(keys)
+
+
+# =============================================================================
+# ĐỌC THÔNG BÁO
+# =============================================================================
+
+def enrolled_courses(user_id):
+    """{course_id: enrolled_at} của các môn user đang học"""
+    return dict(CourseEnrollment.objects.filter(
+        student_id=user_id, status='enrolled'
+    ).values_list('course_id', 'enrolled_at'))
+
+
+def visible_notifications(user_id, courses=None):
+    """Queryset thông báo user thấy được: thông báo riêng và thông báo của các môn đang học"""
+    if courses is None:
+        courses = enrolled_courses(user_id)
+    audience = Q(recipient_id=user_id)
+    for course_id, enrolled_at in courses.items():
+        audience |= Q(course_id=course_id, created_at__gte=enrolled_at)
+    return Notification.objects.filter(audience)
+
+
+def last_read_id(user_id):
+    return NotificationCursor.objects.filter(user_id=user_id).values_list('last_read_id', flat=True).first() or 0
+
+
+def list_notifications(user_id, before=None, limit=20):
+    """
+    Một trang thông báo (mới nhất trước) theo keyset
+
+    Args:
+        before: chỉ lấy thông báo có id nhỏ hơn (next_before của trang trước)
+
+    Returns:
+        (danh sách Notification có thuộc tính is_read, next_before hoặc None nếu hết)
+    """
+    queryset = visible_notifications(user_id).select_related('course', 'assignment')
+    if before is not None:
+        queryset = queryset.filter(id__lt=before)
+    notifications = list(queryset.order_by('-id')[:limit + 1])
+    has_more = len(notifications) > limit
+    notifications = notifications[:limit]
+    read_up_to = last_read_id(user_id)
+    for notification in notifications:
+        notification.is_read = notification.id <= read_up_to
+    return notifications, (notifications[-1].id if has_more else None)
+
+
+def audience_stamps(user_id, course_ids):
+    """Stamp hiện tại của các nhóm người nhận của user (chỉ đọc cache)"""
+    keys = [_stamp_key('user', user_id), *(_stamp_key('course', pk) for pk in sorted(course_ids))]
+    found = _cache().get_many(keys)
+    return [found.get(key, 0) for key in keys]
+
+
+def unread_count(user_id):
+    """
+    Số thông báo chưa đọc (có cache)
+
+    Cache lưu số đếm cùng stamp của các nhóm người nhận tại lúc đếm; stamp không đổi nghĩa là
+    không có thông báo mới nên không cần query. Stamp được đọc trước khi đếm để thông báo gửi
+    trong lúc đếm làm lần đọc sau phải đếm lại.
+    """
+    cache = _cache()
+    entry = cache.get(_unread_key(user_id))
+    if entry is not None and audience_stamps(user_id, entry['courses']) == entry['stamps']:
+        return entry['count']
+
+    courses = enrolled_courses(user_id)
+    stamps = audience_stamps(user_id, courses)
+    count = visible_notifications(user_id, courses).filter(id__gt=last_read_id(user_id)).count()
+    cache.set(_unread_key(user_id), {
+        'courses': sorted(courses), 'stamps': stamps, 'count': count,
+    }, getattr(settings, 'NOTIFICATION_CACHE_TIMEOUT', 3600))
+    return count
+
+
+def notifications_after(user_id, after, courses=None, limit=50):
+    """Thông báo mới hơn id after (cũ nhất trước), cho stream cập nhật trực tiếp"""
+    return list(
+        visible_notifications(user_id, courses).filter(id__gt=after).order_by('id')[:limit]
+    )
+
+
+def latest_notification_id(user_id, courses=None):
+    return visible_notifications(user_id, courses).aggregate(last=Max('id'))['last'] or 0
+
+
+def mark_read(user_id, up_to=None):
+    """
+    Đánh dấu đã đọc mọi thông báo có id <= up_to (mặc định: tất cả); con trỏ không lùi lại
+
+    up_to do client gửi lên được giới hạn ở thông báo mới nhất user thấy được, để con trỏ không
+    vượt qua các thông báo chưa được tạo.
+
+    Returns:
+        last_read_id sau khi cập nhật
+    """
+    latest = latest_notification_id(user_id)
+    up_to = latest if up_to is None else min(up_to, latest)
+    with transaction.atomic():
+        cursor, created = NotificationCursor.objects.select_for_update().get_or_create(
+            user_id=user_id, defaults={'last_read_id': up_to}
+        )
+        if not created and cursor.last_read_id < up_to:
+            cursor.last_read_id = up_to
+            cursor.save(update_fields=['last_read_id', 'updated_at'])
+    forget_unread_count(user_id)
+    return cursor.last_read_id
+
+
+def serialize_notification(notification):
+    """Dict JSON của một thông báo (API và stream)"""
+    return {
+        'id': notification.id,
+        'kind': notification.kind,
+        'title': notification.title,
+        'message': notification.message,
+        'url': notification.url,
+        'course_id': notification.course_id,
+        'assignment_id': notification.assignment_id,
+        'created_at': notification.created_at.isoformat(),
+        'is_read': getattr(notification, 'is_read', False),
+    }
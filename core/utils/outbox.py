@@ -0,0 +1,249 @@
+"""
+Email outbox
+Hàng đợi email gửi đi lưu trong database (OutboundEmail), gửi bằng lệnh send_outbox.
+
+- enqueue_email / enqueue_bulk / enqueue_templated chỉ ghi dòng vào outbox (bulk_create cho gửi
+  hàng loạt), nên import tài khoản, duyệt yêu cầu và scheduler nhắc việc không phải chờ SMTP
+- Worker nhận từng lô OUTBOX_BATCH_SIZE dòng bằng một UPDATE có claim token (nhiều worker chạy
+  song song không gửi trùng), gửi cả lô qua một kết nối SMTP với tốc độ tối đa OUTBOX_RATE
+  email/giây; hạn giữ chỗ của lô gồm thời gian gửi cả lô cộng OUTBOX_CLAIM_TIMEOUT
+- Email lỗi được thử lại sau OUTBOX_RETRY_BACKOFF * 2^(lần thử - 1) giây, tối đa
+  OUTBOX_MAX_ATTEMPTS lần; sau đó chuyển sang 'failed'
+- Mẫu email (templates/emails/<kind>_subject.txt, <kind>.txt) được biên dịch một lần cho mỗi
+  loại và dùng lại cho mọi email cùng loại
+"""
+import logging
+import time
+import uuid
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.template.loader import get_template
+from django.utils import timezone
+
+from core.models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# XẾP HÀNG
+# =============================================================================
+
+def enqueue_email(kind, to_email, context=None, subject='', body='', from_email=None):
+    """
+    Xếp một email vào outbox (không gửi ngay)
+
+    Args:
+        kind: loại email có mẫu trong templates/emails, hoặc 'custom' với subject/body soạn sẵn
+        context: dữ liệu cho mẫu (phải serialize được sang JSON)
+
+    Returns:
+        OutboundEmail hoặc None nếu không có địa chỉ nhận
+    """
+    if not to_email:
+        return None
+    return OutboundEmail.objects.create(
+        kind=kind, to_email=to_email, context=context or {}, subject=subject, body=body,
+        from_email=from_email or '',
+    )
+
+
+def _bulk_enqueue(emails):
+    OutboundEmail.objects.bulk_create(emails, batch_size=getattr(settings, 'OUTBOX_BATCH_SIZE', 100) * 10)
+    return len(emails)
+
+
+def enqueue_bulk(recipients, subject, body, from_email=None):
+    """
+    Xếp cùng một email soạn sẵn cho nhiều người nhận (bulk_create theo lô)
+
+    Returns:
+        số email đã xếp hàng
+    """
+    return _bulk_enqueue([
+        OutboundEmail(kind='custom', to_email=email, subject=subject, body=body, from_email=from_email or '')
+        for email in sorted({email for email in recipients if email})
+    ])
+
+
+def enqueue_templated(kind, recipients, from_email=None):
+    """
+    Xếp email theo mẫu kind cho nhiều người nhận, mỗi người một context (bulk_create theo lô)
+
+    Args:
+        recipients: các cặp (địa chỉ, context); địa chỉ trống được bỏ qua
+
+    Returns:
+        số email đã xếp hàng
+    """
+    return _bulk_enqueue([
+        OutboundEmail(kind=kind, to_email=email, context=context, from_email=from_email or '')
+        for email, context in recipients if email
+    ])
+
+
+# =============================================================================
+# RENDER
+# =============================================================================
+
+@lru_cache(maxsize=None)
+def _templates(kind):
+    """Mẫu tiêu đề và nội dung đã biên dịch của một loại email (cache theo tiến trình)"""
+    return get_template(f'emails/{kind}_subject.txt'), get_template(f'emails/{kind}.txt')
+
+
+def render_email(email):
+    """(subject, body) của một OutboundEmail"""
+    if email.kind == 'custom':
+        return email.subject, email.body
+    subject_template, body_template = _templates(email.kind)
+    subject = ' '.join(subject_template.render(email.context).split())
+    return subject, body_template.render(email.context)
+
+
+def build_message(email, connection=None):
+    subject, body = render_email(email)
+    return EmailMessage(
+        subject, body, email.from_email or settings.DEFAULT_FROM_EMAIL, [email.to_email],
+        connection=connection,
+    )
+
+
+# =============================================================================
+# GỬI
+# =============================================================================
+
+def retry_delay(attempts):
+    """Thời gian chờ trước lần thử kế tiếp (lũy thừa 2, tối đa một ngày)"""
+    base = getattr(settings, 'OUTBOX_RETRY_BACKOFF', 60)
+    return timedelta(seconds=min(base * 2 ** max(attempts - 1, 0), 86400))
+
+
+def claim_timeout(limit, rate=None):
+    """
+    Hạn giữ chỗ của một lô: thời gian gửi cả lô ở tốc độ rate cộng OUTBOX_CLAIM_TIMEOUT, để
+    worker khác không nhận lại các dòng vẫn đang được gửi khi rate thấp
+    """
+    rate = getattr(settings, 'OUTBOX_RATE', 10) if rate is None else rate
+    seconds = getattr(settings, 'OUTBOX_CLAIM_TIMEOUT', 600) + (limit / rate if rate else 0)
+    return timedelta(seconds=seconds)
+
+
+def claim_batch(limit, now=None, rate=None):
+    """
+    Nhận tối đa limit email đến lượt gửi (kể cả dòng 'sending' quá hạn giữ chỗ của worker đã chết)
+
+    Returns:
+        danh sách OutboundEmail đã nhận, theo thứ tự xếp hàng
+    """
+    now = now or timezone.now()
+    ready = Q(status__in=('pending', 'sending'), next_attempt_at__lte=now)
+    ids = list(OutboundEmail.objects.filter(ready).order_by('next_attempt_at', 'id').values_list('pk', flat=True)[:limit])
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    # UPDATE có điều kiện: dòng đã bị worker khác nhận không còn khớp ready
+    OutboundEmail.objects.filter(ready, pk__in=ids).update(
+        status='sending', claim_token=token, next_attempt_at=now + claim_timeout(len(ids), rate),
+    )
+    return list(OutboundEmail.objects.filter(claim_token=token, status='sending').order_by('id'))
+
+
+def _mark_failed(email, error, now):
+    email.attempts += 1
+    email.last_error = str(error)[:2000]
+    email.claim_token = ''
+    if email.attempts >= getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 5):
+        email.status = 'failed'
+        logger.error(f"Outbox email {email.pk} to {email.to_email} failed permanently: {email.last_error}")
+    else:
+        email.status = 'pending'
+        email.next_attempt_at = now + retry_delay(email.attempts)
+    email.save(update_fields=['attempts', 'last_error', 'claim_token', 'status', 'next_attempt_at'])
+
+
+def send_batch(emails, rate=None, stop_event=None):
+    """
+    Gửi một lô email đã nhận qua một kết nối, giới hạn tốc độ rate email/giây (0 = không giới hạn)
+
+    Email chưa gửi khi stop_event được set được trả lại hàng đợi.
+
+    Returns:
+        {'sent': ..., 'retried': ..., 'failed': ...}
+    """
+    rate = getattr(settings, 'OUTBOX_RATE', 10) if rate is None else rate
+    interval = 1 / rate if rate else 0
+    stats = {'sent': 0, 'retried': 0, 'failed': 0}
+    sent_ids = []
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        # Máy chủ mail không kết nối được: cả lô chờ thử lại
+        logger.warning(f"Outbox could not open mail connection: {str(e)}")
+        for email in emails:
+            _mark_failed(email, e, timezone.now())
+            stats['failed' if email.status == 'failed' else 'retried'] += 1
+        return stats
+    try:
+        next_send = time.monotonic()
+        for index, email in enumerate(emails):
+            delay = next_send - time.monotonic()
+            if stop_event is not None and stop_event.wait(max(delay, 0)):
+                OutboundEmail.objects.filter(pk__in=[e.pk for e in emails[index:]]).update(
+                    status='pending', claim_token='', next_attempt_at=timezone.now()
+                )
+                break
+            if stop_event is None and delay > 0:
+                time.sleep(delay)
+            next_send = max(next_send, time.monotonic()) + interval
+            try:
+                build_message(email, connection).send()
+            except Exception as e:
+                _mark_failed(email, e, timezone.now())
+                stats['failed' if email.status == 'failed' else 'retried'] += 1
+                # Kết nối có thể đã hỏng: mở lại cho các email còn lại của lô
+                connection.close()
+                try:
+                    connection.open()
+                except Exception as open_error:
+                    logger.warning(f"Outbox could not reopen mail connection: {str(open_error)}")
+                continue
+            sent_ids.append(email.pk)
+    finally:
+        connection.close()
+        if sent_ids:
+            OutboundEmail.objects.filter(pk__in=sent_ids).update(
+                status='sent', sent_at=timezone.now(), claim_token='', context={}, body='', last_error='',
+            )
+    stats['sent'] = len(sent_ids)
+    return stats
+
+
+def send_pending(batch_size=None, rate=None, max_batches=None, stop_event=None):
+    """
+    Gửi các email đến lượt cho đến khi hết hàng đợi (hoặc max_batches / stop_event)
+
+    Returns:
+        {'sent', 'retried', 'failed', 'batches', 'elapsed'}
+    """
+    batch_size = batch_size or getattr(settings, 'OUTBOX_BATCH_SIZE', 100)
+    totals = {'sent': 0, 'retried': 0, 'failed': 0, 'batches': 0}
+    started = time.perf_counter()
+    while max_batches is None or totals['batches'] < max_batches:
+        if stop_event is not None and stop_event.is_set():
+            break
+        with transaction.atomic():
+            emails = claim_batch(batch_size, rate=rate)
+        if not emails:
+            break
+        for key, value in send_batch(emails, rate=rate, stop_event=stop_event).items():
+            totals[key] += value
+        totals['batches'] += 1
+    totals['elapsed'] = time.perf_counter() - started
+    return totals
@@ -0,0 +1,195 @@
+"""
+Document preview pipeline
+Sinh ảnh thu nhỏ (Pillow) và trích đoạn văn bản (PDF/TXT) cho tài liệu.
+Kết quả được cache trên đĩa theo mã băm nội dung file nên các file trùng nhau
+chỉ phải xử lý một lần.
+"""
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_TYPES = {'png', 'jpg', 'jpeg', 'gif'}
+TEXT_TYPES = {'txt'}
+PDF_TYPES = {'pdf'}
+
+THUMBNAIL_SIZE = (320, 320)
+EXCERPT_LENGTH = 500
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_preview_root():
+    """Thư mục cache bản xem trước"""
+    return str(getattr(settings, 'DOCUMENT_PREVIEW_ROOT', os.path.join(settings.MEDIA_ROOT, 'previews')))
+
+
+def get_preview_path(content_hash, extension):
+    """Đường dẫn cache: <root>/ab/abcdef....<extension>"""
+    return os.path.join(get_preview_root(), content_hash[:2], f"{content_hash}{extension}")
+
+
+def get_thumbnail_path(content_hash):
+    return get_preview_path(content_hash, '.jpg')
+
+
+def compute_content_hash(field_file):
+    """SHA-256 của file, đọc theo từng khối"""
+    digest = hashlib.sha256()
+    with field_file.open('rb') as fh:
+        for chunk in iter(lambda: fh.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_atomic(path, data):
+    """Ghi file cache qua file tạm để request khác không đọc phải file dở dang"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as fh:
+        fh.write(data)
+    os.replace(tmp_path, path)
+
+
+def generate_thumbnail(field_file, content_hash):
+    """Tạo ảnh thu nhỏ JPEG, trả về True nếu thành công"""
+    from io import BytesIO
+    from PIL import Image, ImageOps
+
+    path = get_thumbnail_path(content_hash)
+    if os.path.exists(path):
+        return True
+
+    with field_file.open('rb') as fh:
+        with Image.open(fh) as image:
+            # JPEG có thể giải mã trực tiếp ở độ phân giải thấp
+            image.draft('RGB', THUMBNAIL_SIZE)
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail(THUMBNAIL_SIZE)
+            if image.mode != 'RGB':
+                image = image.convert('RGB')
+            output = BytesIO()
+            image.save(output, format='JPEG', quality=80, optimize=True)
+
+    _write_atomic(path, output.getvalue())
+    return True
+
+
+def _extract_text_file(field_file):
+    with field_file.open('rb') as fh:
+        raw = fh.read(EXCERPT_LENGTH * 4)
+    return raw.decode('utf-8', errors='replace')
+
+
+def _extract_pdf_first_page(field_file):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        logger.info("pypdf is not installed, skipping PDF excerpt")
+        return None
+
+    with field_file.open('rb') as fh:
+        reader = PdfReader(fh)
+        if not reader.pages:
+            return ''
+        return reader.pages[0].extract_text() or ''
+
+
+def generate_excerpt(field_file, file_type, content_hash):
+    """Trích đoạn đầu văn bản, trả về None nếu không hỗ trợ"""
+    path = get_preview_path(content_hash, '.txt')
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as fh:
+            return fh.read()
+
+    if file_type in TEXT_TYPES:
+        text = _extract_text_file(field_file)
+    elif file_type in PDF_TYPES:
+        text = _extract_pdf_first_page(field_file)
+    else:
+        return None
+
+    if text is None:
+        return None
+
+    excerpt = ' '.join(text.split())[:EXCERPT_LENGTH]
+    _write_atomic(path, excerpt.encode('utf-8'))
+    return excerpt
+
+
+def build_document_preview(document_id):
+    """Sinh bản xem trước cho một tài liệu (chạy trong worker)"""
+    from ..models.documents import Document
+
+    try:
+        document = Document.objects.only(
+            'pk', 'file', 'file_type', 'content_hash', 'preview_status'
+        ).get(pk=document_id)
+    except Document.DoesNotExist:
+        return
+
+    if not document.file:
+        Document.objects.filter(pk=document_id).update(preview_status='unsupported')
+        return
+
+    file_name = document.file.name
+    file_type = document.file_type
+    updates = {'has_thumbnail': False, 'preview_text': ''}
+    try:
+        content_hash = compute_content_hash(document.file)
+        updates['content_hash'] = content_hash
+
+        if file_type in THUMBNAIL_TYPES:
+            updates['has_thumbnail'] = generate_thumbnail(document.file, content_hash)
+            updates['preview_status'] = 'ready'
+        elif file_type in TEXT_TYPES or file_type in PDF_TYPES:
+            excerpt = generate_excerpt(document.file, file_type, content_hash)
+            if excerpt is None:
+                updates['preview_status'] = 'unsupported'
+            else:
+                updates['preview_text'] = excerpt
+                updates['preview_status'] = 'ready'
+        else:
+            updates['preview_status'] = 'unsupported'
+    except Exception as e:
+        logger.warning(f"Error generating preview for document {document_id}: {str(e)}")
+        updates['preview_status'] = 'failed'
+
+    # Chỉ ghi kết quả nếu file không bị thay trong lúc đang xử lý
+    Document.objects.filter(pk=document_id, file=file_name).update(**updates)
+
+
+def _run_in_worker(document_id):
+    try:
+        build_document_preview(document_id)
+    finally:
+        close_old_connections()
+
+
+def get_executor():
+    """Worker pool dùng chung cho cả process"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'DOCUMENT_PREVIEW_WORKERS', 2),
+                    thread_name_prefix='document-preview'
+                )
+    return _executor
+
+
+def schedule_document_preview(document_id):
+    """Đưa tài liệu vào hàng đợi sinh bản xem trước sau khi transaction commit"""
+    if not getattr(settings, 'DOCUMENT_PREVIEW_ASYNC', True):
+        transaction.on_commit(lambda: build_document_preview(document_id))
+        return
+    transaction.on_commit(lambda: get_executor().submit(_run_in_worker, document_id))
@@ -0,0 +1,198 @@
+"""
+Query instrumentation
+Đo số câu SQL, thời gian SQL, câu query lặp lại (dấu hiệu N+1) và tổng thời
+gian xử lý của từng request, gom theo tên URL (resolver_match.view_name).
+
+- QueryInstrumentationMiddleware (core/middleware.py) ghi lại từng request vào
+  ring buffer trong bộ nhớ của process khi QUERY_INSTRUMENTATION_ENABLED bật
+- summarize(): p50/p95/p99 theo view và danh sách câu query lặp nhiều nhất,
+  dùng cho API admin và lệnh query_report
+- Query budget: số câu query tối đa của một view, khai báo bằng @query_budget
+  hoặc settings.QUERY_BUDGETS; vượt budget thì ghi log, hoặc raise
+  QueryBudgetExceeded khi QUERY_BUDGET_STRICT bật (dùng trong test)
+
+Buffer nằm trong từng process (mỗi worker có buffer riêng). Query chạy trong
+thread khác (view async gọi sync_to_async) không được đếm.
+"""
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from dataclasses import asdict, dataclass, field
+
+from django.conf import settings
+
+# "IN (%s, %s, %s)" -> "IN (...)" để các câu chỉ khác số phần tử có cùng dấu vân tay
+IN_LIST_RE = re.compile(r'\bIN \((?:%s(?:, )?)+\)', re.IGNORECASE)
+WHITESPACE_RE = re.compile(r'\s+')
+
+MAX_DUPLICATES_PER_REQUEST = 5
+
+
+class QueryBudgetExceeded(AssertionError):
+    """View chạy nhiều câu query hơn budget (chỉ raise khi QUERY_BUDGET_STRICT bật)"""
+
+
+def fingerprint(sql):
+    """Câu SQL đã chuẩn hóa; Django truyền tham số riêng nên SQL chỉ chứa %s"""
+    return WHITESPACE_RE.sub(' ', IN_LIST_RE.sub('IN (...)', sql)).strip()
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+class QueryRecorder:
+    """execute_wrapper đếm số câu query, thời gian SQL và dấu vân tay của request"""
+
+    def __init__(self):
+        self.count = 0
+        self.sql_time = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def duplicates(self, limit=MAX_DUPLICATES_PER_REQUEST):
+        """Các câu query chạy nhiều hơn một lần, nhiều nhất trước"""
+        return [(sql, count) for sql, count in self.fingerprints.most_common(limit) if count > 1]
+
+
+@dataclass(frozen=True)
+class RequestMetrics:
+    view: str
+    method: str
+    path: str
+    status: int
+    latency_ms: float
+    queries: int
+    sql_ms: float
+    budget: int = None
+    duplicates: tuple = field(default=())
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def over_budget(self):
+        return self.budget is not None and self.queries > self.budget
+
+
+class MetricsBuffer:
+    """Ring buffer thread-safe giữ các request gần nhất"""
+
+    def __init__(self, max_entries):
+        self._records = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+
+    def record(self, metrics):
+        with self._lock:
+            self._records.append(metrics)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+
+metrics_buffer = MetricsBuffer(getattr(settings, 'QUERY_INSTRUMENTATION_BUFFER_SIZE', 2000))
+
+
+def query_budget(max_queries):
+    """
+    Khai báo số câu query tối đa của view (function view hoặc class view)
+
+    Budget tính cho cả request khi cache trống, gồm cả query của session / auth middleware.
+    Function view có decorator khác thì đặt @query_budget ở ngoài cùng.
+
+        @query_budget(10)
+        class CourseListView(ListView): ...
+    """
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+def get_query_budget(resolver_match):
+    """Budget của view: settings.QUERY_BUDGETS (theo view_name) rồi tới @query_budget"""
+    if resolver_match is None:
+        return None
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    if resolver_match.view_name in budgets:
+        return budgets[resolver_match.view_name]
+    func = resolver_match.func
+    view_class = getattr(func, 'view_class', None) or getattr(func, 'cls', None)
+    return getattr(func, 'query_budget', None) or getattr(view_class, 'query_budget', None)
+
+
+def view_label(request):
+    resolver_match = getattr(request, 'resolver_match', None)
+    if resolver_match is None:
+        return '<unresolved>'
+    return resolver_match.view_name or resolver_match._func_path
+
+
+def summarize(records, top=10):
+    """
+    Thống kê theo view và các câu query lặp nhiều nhất (N+1)
+
+    Returns:
+        {'requests': .., 'views': [...], 'offenders': [...]}
+    """
+    by_view = defaultdict(list)
+    for record in records:
+        by_view[record.view].append(record)
+
+    views = []
+    for view, items in by_view.items():
+        latencies = [item.latency_ms for item in items]
+        queries = [item.queries for item in items]
+        views.append({
+            'view': view,
+            'requests': len(items),
+            'latency_p50_ms': round(percentile(latencies, 50), 2),
+            'latency_p95_ms': round(percentile(latencies, 95), 2),
+            'latency_p99_ms': round(percentile(latencies, 99), 2),
+            'queries_p50': percentile(queries, 50),
+            'queries_p95': percentile(queries, 95),
+            'queries_p99': percentile(queries, 99),
+            'queries_max': max(queries),
+            'sql_ms_avg': round(sum(item.sql_ms for item in items) / len(items), 2),
+            'budget': items[-1].budget,
+            'over_budget': sum(1 for item in items if item.over_budget),
+        })
+    views.sort(key=lambda row: row['queries_p95'], reverse=True)
+
+    offenders = {}
+    for record in records:
+        for sql, count in record.duplicates:
+            key = (record.view, sql)
+            entry = offenders.setdefault(key, {'view': record.view, 'sql': sql, 'max_repeats': 0, 'requests': 0})
+            entry['max_repeats'] = max(entry['max_repeats'], count)
+            entry['requests'] += 1
+    worst = sorted(offenders.values(), key=lambda row: (row['max_repeats'], row['requests']), reverse=True)
+
+    return {
+        'requests': len(records),
+        'views': views,
+        'offenders': worst[:top],
+    }
+
+
+def metrics_to_dict(metrics):
+    data = asdict(metrics)
+    data['duplicates'] = [{'sql': sql, 'count': count} for sql, count in metrics.duplicates]
+    data['over_budget'] = metrics.over_budget
+    return data
@@ -0,0 +1,47 @@
+"""
+Reference data
+Dữ liệu danh mục ít thay đổi (năm học, khoa, danh mục môn học/tài liệu), đọc qua
+tiered cache. Cache bị vô hiệu hóa bởi signal khi các model này thay đổi.
+"""
+from django.db.models import Count
+
+from ..models.academic import AcademicYear, CourseCategory, Department
+from ..models.documents import DocumentCategory
+from .cache import REFERENCE_NAMESPACE, cached
+
+REFERENCE_TIMEOUT = 60 * 60
+
+
+@cached(REFERENCE_NAMESPACE, timeout=REFERENCE_TIMEOUT, key=lambda: 'academic_years')
+def get_academic_years():
+    """Danh sách năm học, mới nhất trước"""
+    return list(AcademicYear.objects.order_by('-start_date'))
+
+
+def get_current_academic_year():
+    """Năm học hiện tại (None nếu chưa thiết lập)"""
+    for year in get_academic_years():
+        if year.is_current:
+            return year
+    return None
+
+
+@cached(REFERENCE_NAMESPACE, timeout=REFERENCE_TIMEOUT, key=lambda: 'departments')
+def get_departments():
+    return list(Department.objects.order_by('name'))
+
+
+@cached(REFERENCE_NAMESPACE, timeout=REFERENCE_TIMEOUT, key=lambda: 'course_categories')
+def get_course_categories():
+    return list(CourseCategory.objects.order_by('category_type', 'name'))
+
+
+@cached(REFERENCE_NAMESPACE, timeout=REFERENCE_TIMEOUT, key=lambda: 'document_categories')
+def get_document_categories():
+    return list(DocumentCategory.objects.order_by('name'))
+
+
+# Số tài liệu thay đổi thường xuyên, chỉ cache ngắn và không invalidate theo Document
+@cached(REFERENCE_NAMESPACE, timeout=5 * 60, key=lambda: 'document_categories_with_counts')
+def get_document_categories_with_counts():
+    return list(DocumentCategory.objects.annotate(document_count=Count('document')).order_by('name'))
@@ -0,0 +1,172 @@
+"""
+Role context
+Thông tin phân quyền gọn, bất biến của user hiện tại (vai trò, profile, khoa và
+danh sách môn đang dạy / đã đăng ký), gắn vào request bởi RoleContextMiddleware.
+
+Mixin, decorator và permission của DRF đọc request.role_context thay vì
+request.user.profile, nên mỗi request chỉ tốn một lần đọc cache; khi cache trống
+context được load bằng một câu query (UNION profile + môn dạy + môn đăng ký).
+
+Cache bị xóa bởi signal khi profile, giảng viên của môn hoặc đăng ký thay đổi;
+thao tác hàng loạt không qua signal (bulk_create, update) chỉ được thấy sau
+ROLE_CONTEXT_CACHE_TIMEOUT giây.
+"""
+import logging
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import CharField, F, IntegerField, Value
+from django.utils.functional import SimpleLazyObject
+
+from core.models import Course, CourseEnrollment, UserProfile
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'role_ctx'
+
+PROFILE_ROW = 'profile'
+TEACHING_ROW = 'teaching'
+ENROLLED_ROW = 'enrolled'
+
+
+@dataclass(frozen=True)
+class RoleContext:
+    """Thông tin phân quyền của một user; course_ids là None khi vượt giới hạn"""
+    user_id: int = None
+    role: str = None
+    profile_id: int = None
+    department: str = None
+    department_id: int = None
+    course_ids: frozenset = field(default=frozenset())
+
+    @property
+    def has_profile(self):
+        return self.profile_id is not None
+
+    @property
+    def is_student(self):
+        return self.role == 'student'
+
+    @property
+    def is_teacher(self):
+        return self.role == 'teacher'
+
+    @property
+    def is_admin(self):
+        return self.role == 'admin'
+
+    def has_role(self, *roles):
+        return self.role in roles
+
+
+ANONYMOUS_CONTEXT = RoleContext()
+
+
+def _cache():
+    return caches[getattr(settings, 'ROLE_CONTEXT_CACHE_ALIAS', 'default')]
+
+
+def _key(user_id):
+    return f"{KEY_PREFIX}:{user_id}"
+
+
+def role_course_ids(user_id, role):
+    """Queryset id môn học theo vai trò: môn đang dạy (teacher), môn đã đăng ký (student)"""
+    if role == 'teacher':
+        return Course.objects.filter(teacher_id=user_id).values_list('id', flat=True)
+    if role == 'student':
+        return CourseEnrollment.objects.filter(student_id=user_id).values_list('course_id', flat=True)
+    return None
+
+
+def _context_rows(user_id):
+    """
+    Một câu query UNION ALL trả về dòng profile và các dòng môn học
+
+    Mỗi dòng có dạng (loại, id, role, department, department_id); vai trò chưa
+    biết trước nên lấy cả môn dạy lẫn môn đăng ký rồi chọn theo vai trò.
+    """
+    def rows(queryset, kind, id_field, role=None, department=None, department_id=None):
+        return queryset.annotate(
+            row_kind=Value(kind, output_field=CharField()),
+            row_id=F(id_field),
+            row_role=role or Value(None, output_field=CharField()),
+            row_department=department or Value(None, output_field=CharField()),
+            row_department_id=department_id or Value(None, output_field=IntegerField()),
+        ).values_list('row_kind', 'row_id', 'row_role', 'row_department', 'row_department_id')
+
+    profile = rows(
+        UserProfile.objects.filter(user_id=user_id), PROFILE_ROW, 'id',
+        role=F('role'), department=F('department'), department_id=F('academic_department_id'),
+    )
+    teaching = rows(Course.objects.filter(teacher_id=user_id), TEACHING_ROW, 'id')
+    enrolled = rows(CourseEnrollment.objects.filter(student_id=user_id), ENROLLED_ROW, 'course_id')
+    return profile.order_by().union(teaching.order_by(), enrolled.order_by(), all=True)
+
+
+def load_role_context(user_id):
+    """Đọc RoleContext của user từ database (một query)"""
+    context = {'user_id': user_id}
+    courses = {TEACHING_ROW: set(), ENROLLED_ROW: set()}
+    for kind, row_id, role, department, department_id in _context_rows(user_id):
+        if kind == PROFILE_ROW:
+            context.update(profile_id=row_id, role=role, department=department, department_id=department_id)
+        else:
+            courses[kind].add(row_id)
+
+    role = context.get('role')
+    if role in ('teacher', 'student'):
+        course_ids = courses[TEACHING_ROW if role == 'teacher' else ENROLLED_ROW]
+        limit = getattr(settings, 'ROLE_CONTEXT_COURSE_LIMIT', 200)
+        context['course_ids'] = frozenset(course_ids) if len(course_ids) <= limit else None
+    return RoleContext(**context)
+
+
+def get_role_context(user):
+    """RoleContext của user, đọc từ cache nếu có"""
+    if user is None or not user.is_authenticated:
+        return ANONYMOUS_CONTEXT
+
+    cache = _cache()
+    key = _key(user.id)
+    context = cache.get(key)
+    if context is None:
+        context = load_role_context(user.id)
+        cache.set(key, context, getattr(settings, 'ROLE_CONTEXT_CACHE_TIMEOUT', 300))
+    return context
+
+
+def get_request_role_context(request):
+    """
+    RoleContext của request: dùng request.role_context do middleware gắn,
+    nếu không có (middleware chưa bật, request tạo trong test) thì load và gắn vào
+    """
+    context = getattr(request, 'role_context', None)
+    if context is None:
+        context = get_role_context(request.user)
+        request.role_context = context
+    return context
+
+
+def invalidate_role_context(*user_ids):
+    """Xóa RoleContext trong cache của các user (vai trò, môn dạy hoặc đăng ký thay đổi)"""
+    keys = [_key(user_id) for user_id in user_ids if user_id is not None]
+    if keys:
+        _cache().delete_many(keys)
+
+
+class RoleContextMiddleware:
+    """
+    Gắn request.role_context (lazy) sau AuthenticationMiddleware
+
+    Context chỉ được load khi view/permission dùng tới, và đọc request.user tại
+    thời điểm đó nên cũng đúng với user do DRF xác thực (session hoặc JWT).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.role_context = SimpleLazyObject(lambda: get_role_context(request.user))
+        return self.get_response(request)
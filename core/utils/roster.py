@@ -0,0 +1,122 @@
+"""
+Class rosters
+Thao tác sĩ số của lớp (Class) theo lô: chuyển / xóa nhiều sinh viên và cập nhật
+Class.current_students bằng một số câu lệnh cố định, không phụ thuộc số sinh viên.
+
+- assign_students: đổi class_enrolled của cả lô bằng một UPDATE; chỗ trong lớp đích được
+  giữ bằng một UPDATE có điều kiện (current_students + n <= max_students), nên hai thao tác
+  đồng thời không thể cùng vượt sĩ số tối đa
+- refresh_class_counts: đếm lại sĩ số của các lớp bằng một UPDATE với subquery gom nhóm
+
+Lưu từng UserProfile (form, admin) vẫn giữ đúng sĩ số nhờ signal trong core/signals.py;
+QuerySet.update / bulk_update trên class_enrolled phải tự gọi refresh_class_counts.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from core.models import Class, UserProfile
+
+logger = logging.getLogger(__name__)
+
+
+class RosterError(ValueError):
+    """Thao tác sĩ số không được áp dụng (không sinh viên nào được chuyển)"""
+
+
+class ClassFullError(RosterError):
+    """Lớp đích không đủ chỗ cho cả lô sinh viên"""
+
+
+def _class_full(target_class, count):
+    return ClassFullError(
+        f"Lớp {target_class.name} không đủ chỗ cho {count} sinh viên (tối đa {target_class.max_students})"
+    )
+
+
+def refresh_class_counts(class_ids=None):
+    """
+    Đếm lại current_students của các lớp (mọi lớp nếu class_ids là None) trong một câu lệnh
+
+    Returns:
+        số lớp được cập nhật
+    """
+    student_counts = UserProfile.objects.filter(
+        role='student', class_enrolled=OuterRef('pk')
+    ).order_by().values('class_enrolled').annotate(count=Count('pk')).values('count')
+    classes = Class.objects.all()
+    if class_ids is not None:
+        class_ids = set(class_ids) - {None}
+        if not class_ids:
+            return 0
+        classes = classes.filter(pk__in=class_ids)
+    return classes.update(
+        current_students=Coalesce(Subquery(student_counts, output_field=IntegerField()), Value(0))
+    )
+
+
+def assign_students(student_ids, target_class, from_class=None):
+    """
+    Chuyển các sinh viên vào target_class (None = xóa khỏi lớp hiện tại)
+
+    Sinh viên đã ở target_class được bỏ qua. Cả lô được áp dụng trong một transaction:
+    id không phải sinh viên hoặc lớp đích không đủ chỗ thì không sinh viên nào bị chuyển.
+
+    Args:
+        student_ids: id của User (sinh viên)
+        target_class: Class hoặc None
+        from_class: nếu có, mọi sinh viên phải đang ở lớp này
+
+    Returns:
+        {'moved': số sinh viên đã chuyển, 'current_students': sĩ số mới của lớp đích (None nếu xóa)}
+
+    Raises:
+        RosterError: có id không phải sinh viên (hoặc không ở from_class)
+        ClassFullError: lớp đích không đủ chỗ
+    """
+    student_ids = set(student_ids)
+    target_id = target_class.pk if target_class is not None else None
+    with transaction.atomic():
+        profiles = list(UserProfile.objects.filter(user_id__in=student_ids).values_list(
+            'user_id', 'role', 'class_enrolled_id'
+        ))
+        invalid = sorted(student_ids - {user_id for user_id, role, _ in profiles if role == 'student'})
+        if invalid:
+            raise RosterError(f"Chỉ có thể xếp lớp cho sinh viên: {invalid}")
+        if from_class is not None:
+            outside = sorted(user_id for user_id, _, class_id in profiles if class_id != from_class.pk)
+            if outside:
+                raise RosterError(f"Sinh viên không thuộc lớp {from_class.name}: {outside}")
+
+        moving = [(user_id, class_id) for user_id, _, class_id in profiles if class_id != target_id]
+        if not moving:
+            return {'moved': 0, 'current_students': target_class.current_students if target_class else None}
+
+        if target_id is not None:
+            # Giữ chỗ trước khi chuyển: UPDATE có điều kiện khóa dòng của lớp, thao tác đồng thời
+            # phải chờ và đọc lại current_students đã tăng
+            reserved = Class.objects.filter(
+                pk=target_id, current_students__lte=F('max_students') - len(moving)
+            ).update(current_students=F('current_students') + len(moving))
+            if not reserved:
+                raise _class_full(target_class, len(moving))
+
+        UserProfile.objects.filter(user_id__in=[user_id for user_id, _ in moving]).update(class_enrolled=target_id)
+        refresh_class_counts({class_id for _, class_id in moving} | {target_id})
+
+        current_students = None
+        if target_class is not None:
+            # current_students lệch (profile sửa ngoài signal) được đếm lại ở trên: kiểm tra lần cuối
+            target_class.refresh_from_db(fields=['current_students', 'max_students'])
+            current_students = target_class.current_students
+            if current_students > target_class.max_students:
+                raise _class_full(target_class, len(moving))
+    logger.info(f"Moved {len(moving)} students to class {target_class.name if target_class else None}")
+    return {'moved': len(moving), 'current_students': current_students}
+
+
+def remove_students(student_ids, from_class=None):
+    """Xóa các sinh viên khỏi lớp hiện tại của họ (hoặc khỏi from_class, xem assign_students)"""
+    return assign_students(student_ids, None, from_class=from_class)
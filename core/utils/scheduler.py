@@ -0,0 +1,277 @@
+"""
+Reminder scheduler
+Scheduler nhẹ trong project (chạy bằng lệnh run_scheduler) cho các việc phụ thuộc thời hạn
+mà trước đây chỉ được xử lý khi có user quay lại kiểm tra:
+
+- assignment_due: nhắc hạn nộp bài ASSIGNMENT_REMINDER_HOURS giờ trước due_date, chỉ gửi cho
+  sinh viên chưa có AssignmentSubmission (một query anti-join cho mỗi bài tập)
+- password_reset_expiry: xóa token đặt lại mật khẩu đã hết hạn ngay khi hết hạn
+- account_request_reminder: nhắc admin duyệt yêu cầu tạo tài khoản chờ quá
+  ACCOUNT_REQUEST_REMINDER_HOURS giờ
+
+Mỗi job trả về các mốc thời gian sắp tới trong cửa sổ SCHEDULER_HORIZON giây bằng query trên
+cột có index; scheduler giữ chúng trong một min-heap, mỗi lần đến hạn lấy ra mọi mục đã tới
+giờ, gom theo job và chạy mỗi job một lần cho cả lô. Heap được dựng lại mỗi
+SCHEDULER_REFRESH_INTERVAL giây để thấy dữ liệu mới.
+
+Email được xếp vào outbox (core/utils/outbox.py) trong cùng transaction với mốc nhắc, nên một
+mốc chỉ được đánh dấu đã nhắc khi email đã vào hàng đợi; lệnh send_outbox gửi và thử lại khi lỗi.
+"""
+import heapq
+import itertools
+import logging
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import (
+    Assignment, AssignmentReminder, AssignmentSubmission, CourseEnrollment, PasswordReset,
+    StudentAccountRequest
+)
+
+from .notifications import notify_users
+from .outbox import enqueue_templated
+
+logger = logging.getLogger(__name__)
+
+
+def _site_url(path):
+    return f"{getattr(settings, 'FRONTEND_URL', '').rstrip('/')}{path}"
+
+
+class SchedulerJob(ABC):
+    """Một loại việc của scheduler; lớp con đặt name và cài đặt upcoming / run"""
+    name = None
+
+    @abstractmethod
+    def upcoming(self, now, until):
+        """
+        Các (thời điểm đến hạn, key) trong khoảng [.., until]; mục đã quá hạn mà chưa xử lý
+        trả về với thời điểm cũ và được chạy ngay
+        """
+
+    @abstractmethod
+    def run(self, keys, now):
+        """Xử lý một lô key đã đến hạn; trả về dict số liệu"""
+
+
+class AssignmentDueJob(SchedulerJob):
+    """Nhắc hạn nộp bài cho sinh viên chưa nộp"""
+    name = 'assignment_due'
+
+    def __init__(self, hours=None):
+        self.hours = sorted(hours if hours is not None else settings.ASSIGNMENT_REMINDER_HOURS)
+
+    def upcoming(self, now, until):
+        for hours in self.hours:
+            offset = timedelta(hours=hours)
+            # Một query trên index due_date cho mỗi mốc; bài đã nhắc ở mốc này bị loại bằng anti-join
+            assignments = Assignment.objects.filter(
+                status='active', is_visible_to_students=True,
+                due_date__gt=now, due_date__lte=until + offset,
+            ).exclude(
+                Exists(AssignmentReminder.objects.filter(assignment=OuterRef('pk'), hours_before=hours))
+            ).values_list('pk', 'due_date')
+            for assignment_id, due_date in assignments:
+                yield due_date - offset, (assignment_id, hours)
+
+    def recipients(self, assignment):
+        """Một query anti-join: sinh viên đang học môn và chưa có bài nộp"""
+        return list(CourseEnrollment.objects.filter(
+            course_id=assignment.course_id, status='enrolled',
+        ).filter(
+            ~Exists(AssignmentSubmission.objects.filter(assignment=assignment, student=OuterRef('student_id')))
+        ).values_list('student_id', 'student__email', 'student__first_name', 'student__last_name'))
+
+    def claim(self, assignment, hours, now):
+        """Giữ mốc nhắc (assignment, hours); None nếu scheduler khác đã giữ"""
+        try:
+            with transaction.atomic():
+                return AssignmentReminder.objects.create(assignment=assignment, hours_before=hours, sent_at=now)
+        except IntegrityError:
+            return None
+
+    def run(self, keys, now):
+        marks = defaultdict(list)
+        for assignment_id, hours in keys:
+            marks[assignment_id].append(hours)
+        assignments = Assignment.objects.select_related('course').in_bulk(marks)
+        stats = {'assignments': 0, 'students': 0, 'emails': 0}
+        for assignment_id in sorted(marks):
+            assignment = assignments.get(assignment_id)
+            if assignment is None or not assignment.is_published or assignment.due_date <= now:
+                continue
+            # Nhiều mốc cùng đến hạn (bài công bố sát hạn, scheduler ngừng chạy một thời gian):
+            # chỉ gửi theo mốc gần hạn nhất, các mốc xa hơn chỉ được đánh dấu với recipient_count=0.
+            # Mốc nhắc, thông báo và email được ghi cùng một transaction: lỗi ở bất kỳ bước nào
+            # thì mốc chưa được đánh dấu và được chạy lại ở lần sau
+            closest, *earlier = sorted(marks[assignment_id])
+            with transaction.atomic():
+                for hours in earlier:
+                    self.claim(assignment, hours, now)
+                reminder = self.claim(assignment, closest, now)
+                if reminder is None:
+                    continue
+
+                students = self.recipients(assignment)
+                if students:
+                    stats['emails'] += self.remind(assignment, students)
+                    reminder.recipient_count = len(students)
+                    reminder.save(update_fields=['recipient_count'])
+            stats['assignments'] += 1
+            stats['students'] += len(students)
+        return stats
+
+    def remind(self, assignment, students):
+        """Thông báo và xếp email nhắc cho các sinh viên chưa nộp; trả về số email đã xếp hàng"""
+        due = f"{timezone.localtime(assignment.due_date):%d/%m/%Y %H:%M}"
+        path = reverse('dashboards:student:assignment_detail', args=[assignment.pk])
+        notify_users(
+            [student_id for student_id, *_ in students],
+            'assignment_due',
+            f"Sắp đến hạn nộp: {assignment.title}",
+            message=f"Hạn nộp {due} - môn {assignment.course.name}",
+            url=path,
+            assignment=assignment,
+        )
+        return enqueue_templated('assignment_due', [
+            (email, {
+                'full_name': f'{first_name} {last_name}'.strip(),
+                'title': assignment.title,
+                'course_code': assignment.course.code,
+                'course_name': assignment.course.name,
+                'due': due,
+                'url': _site_url(path),
+            })
+            for _, email, first_name, last_name in students
+        ])
+
+
+class PasswordResetExpiryJob(SchedulerJob):
+    """Xóa token đặt lại mật khẩu chưa dùng khi hết hạn"""
+    name = 'password_reset_expiry'
+
+    def upcoming(self, now, until):
+        expiries = PasswordReset.objects.filter(
+            used=False, expires_at__lte=until
+        ).order_by('expires_at').values_list('expires_at', flat=True).distinct()
+        for expires_at in expiries:
+            yield expires_at, expires_at
+
+    def run(self, keys, now):
+        deleted, _ = PasswordReset.objects.filter(used=False, expires_at__lte=now).delete()
+        return {'deleted': deleted}
+
+
+class AccountRequestReminderJob(SchedulerJob):
+    """Nhắc admin các yêu cầu tạo tài khoản chờ duyệt quá lâu (một email tổng hợp mỗi admin)"""
+    name = 'account_request_reminder'
+
+    def __init__(self, hours=None):
+        self.hours = hours if hours is not None else settings.ACCOUNT_REQUEST_REMINDER_HOURS
+
+    def pending(self):
+        return StudentAccountRequest.objects.filter(status='pending', reminded_at__isnull=True)
+
+    def upcoming(self, now, until):
+        offset = timedelta(hours=self.hours)
+        for request_id, created_at in self.pending().filter(
+            created_at__lte=until - offset
+        ).values_list('pk', 'created_at'):
+            yield created_at + offset, request_id
+
+    def run(self, keys, now):
+        overdue = self.pending().filter(created_at__lte=now - timedelta(hours=self.hours))
+        with transaction.atomic():
+            requests = list(overdue.order_by('created_at').values_list('pk', 'student_id', 'first_name', 'last_name'))
+            if not requests:
+                return {'requests': 0, 'emails': 0}
+            StudentAccountRequest.objects.filter(pk__in=[pk for pk, *_ in requests]).update(reminded_at=now)
+
+            admins = list(User.objects.filter(
+                Q(is_superuser=True) | Q(profile__role='admin'), is_active=True
+            ).values_list('pk', 'email').distinct())
+            path = reverse('admin:core_studentaccountrequest_changelist') + '?status__exact=pending'
+            notify_users(
+                [admin_id for admin_id, _ in admins],
+                'announcement',
+                f"{len(requests)} yêu cầu tạo tài khoản chờ duyệt quá {self.hours} giờ",
+                url=path,
+            )
+            context = {
+                'hours': self.hours,
+                'requests': [
+                    {'student_id': student_id, 'name': f'{first_name} {last_name}'}
+                    for _, student_id, first_name, last_name in requests
+                ],
+                'url': _site_url(path),
+            }
+            emails = enqueue_templated('account_request_digest', [(email, context) for _, email in admins])
+        return {'requests': len(requests), 'emails': emails}
+
+
+def default_jobs():
+    return [AssignmentDueJob(), PasswordResetExpiryJob(), AccountRequestReminderJob()]
+
+
+class ReminderScheduler:
+    """
+    Min-heap các mốc (thời điểm, thứ tự, job, key)
+
+    refresh dựng lại heap từ các job; run_due lấy mọi mục đã đến hạn và chạy mỗi job một lần
+    cho lô key của nó.
+    """
+
+    def __init__(self, jobs=None, horizon=None, dry_run=False):
+        self.jobs = {job.name: job for job in (jobs if jobs is not None else default_jobs())}
+        self.horizon = timedelta(seconds=horizon if horizon is not None else settings.SCHEDULER_HORIZON)
+        self.dry_run = dry_run
+        self.heap = []
+        self._counter = itertools.count()
+
+    def refresh(self, now=None):
+        """Dựng lại heap với các mốc từ giờ đến now + horizon"""
+        now = now or timezone.now()
+        entries = [
+            (when, next(self._counter), name, key)
+            for name, job in self.jobs.items()
+            for when, key in job.upcoming(now, now + self.horizon)
+        ]
+        heapq.heapify(entries)
+        self.heap = entries
+        return len(entries)
+
+    def next_due(self):
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, now):
+        """Lấy mọi mục đã đến hạn, gom key theo job (trùng key chỉ giữ một)"""
+        due = defaultdict(set)
+        while self.heap and self.heap[0][0] <= now:
+            _, _, name, key = heapq.heappop(self.heap)
+            due[name].add(key)
+        return due
+
+    def run_due(self, now=None):
+        """
+        Chạy các job đã đến hạn
+
+        Returns:
+            {tên job: số liệu} của các job đã chạy
+        """
+        now = now or timezone.now()
+        results = {}
+        for name, keys in self.pop_due(now).items():
+            if self.dry_run:
+                results[name] = {'due': len(keys)}
+                continue
+            results[name] = self.jobs[name].run(keys, now)
+            logger.info(f"Scheduler job {name}: {results[name]}")
+        return results
@@ -0,0 +1,75 @@
+"""
+Session cleanup
+Xóa session hết hạn khỏi bảng django_session theo từng lô nhỏ (theo khóa chính),
+nghỉ giữa các lô, để không giữ lock lâu trên bảng mà request đăng nhập cũng
+đang ghi vào.
+
+Được chạy bởi lệnh cleanup_sessions (một lần hoặc --loop); request không bao
+giờ tự xóa session hết hạn.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def delete_expired_sessions(cutoff=None, batch_size=None, pause=None, max_batches=None,
+                            stop_event=None, on_batch=None):
+    """
+    Xóa các session có expire_date < cutoff theo lô
+
+    Args:
+        cutoff: Mốc thời gian, mặc định là hiện tại
+        batch_size: Số session mỗi lô (SESSION_CLEANUP_BATCH_SIZE)
+        pause: Số giây nghỉ giữa hai lô (SESSION_CLEANUP_PAUSE)
+        max_batches: Dừng sau số lô này (None = đến khi hết)
+        stop_event: threading.Event, dừng sau lô hiện tại khi được set
+        on_batch: Hàm gọi sau mỗi lô với (số lô, số session đã xóa trong lô)
+
+    Returns:
+        {'deleted': .., 'batches': .., 'elapsed': .., 'rate': session/giây}
+    """
+    cutoff = cutoff or timezone.now()
+    batch_size = batch_size or getattr(settings, 'SESSION_CLEANUP_BATCH_SIZE', 1000)
+    pause = getattr(settings, 'SESSION_CLEANUP_PAUSE', 0.1) if pause is None else pause
+
+    expired = Session.objects.filter(expire_date__lt=cutoff)
+    deleted = 0
+    batches = 0
+    started = time.perf_counter()
+
+    while max_batches is None or batches < max_batches:
+        if stop_event is not None and stop_event.is_set():
+            break
+        # Đọc khóa chính qua index expire_date, sau đó xóa đúng các khóa đó
+        keys = list(expired.order_by('expire_date').values_list('session_key', flat=True)[:batch_size])
+        if not keys:
+            break
+        # Kiểm tra lại expire_date: session có thể vừa được gia hạn giữa hai câu lệnh
+        count, _ = Session.objects.filter(session_key__in=keys, expire_date__lt=cutoff).delete()
+        deleted += count
+        batches += 1
+        if on_batch is not None:
+            on_batch(batches, count)
+        if len(keys) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    elapsed = time.perf_counter() - started
+    stats = {
+        'deleted': deleted,
+        'batches': batches,
+        'elapsed': elapsed,
+        'rate': deleted / elapsed if elapsed > 0 else 0.0,
+    }
+    if deleted:
+        logger.info(
+            f"Deleted {deleted} expired sessions in {batches} batches "
+            f"({elapsed:.2f}s, {stats['rate']:.0f} sessions/s)"
+        )
+    return stats
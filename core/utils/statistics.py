@@ -0,0 +1,56 @@
+"""
+Statistics helpers
+Các hàm dùng chung cho thống kê (phiên bản sync và async)
+"""
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+# Khoảng điểm hệ 10 (nhãn, cận dưới, cận trên) của phân bố điểm - core/utils/analytics.py
+GRADE_BUCKETS = [
+    ('A+ (9.0-10)', 9.0, None),
+    ('A (8.0-8.9)', 8.0, 9.0),
+    ('B+ (7.0-7.9)', 7.0, 8.0),
+    ('B (6.0-6.9)', 6.0, 7.0),
+    ('C+ (5.0-5.9)', 5.0, 6.0),
+    ('C (4.0-4.9)', 4.0, 5.0),
+    ('D+ (3.0-3.9)', 3.0, 4.0),
+    ('D (2.0-2.9)', 2.0, 3.0),
+    ('F (0-1.9)', None, 2.0),
+]
+
+
+def day_range(days):
+    """
+    (start_date, end_date, start_datetime) cho N ngày gần nhất
+    start_datetime là mốc aware để filter trực tiếp trên cột datetime (dùng được index)
+    """
+    end_date = timezone.localdate()
+    start_date = end_date - timedelta(days=days)
+    start_datetime = timezone.make_aware(datetime.combine(start_date, time.min))
+    return start_date, end_date, start_datetime
+
+
+def fill_daily_series(rows, start_date, end_date, key):
+    """Chuyển kết quả group theo ngày thành chuỗi liên tục (ngày trống = 0)"""
+    counts = {row['day']: row['count'] for row in rows}
+    data = []
+    current_date = start_date
+    while current_date <= end_date:
+        data.append({'date': current_date.strftime('%Y-%m-%d'), key: counts.get(current_date, 0)})
+        current_date += timedelta(days=1)
+    return data
+
+
+def fill_daily_rows(rows, start_date, end_date, fields):
+    """Như fill_daily_series nhưng giữ nhiều cột số liệu cho mỗi ngày"""
+    by_day = {row['day']: row for row in rows}
+    data = []
+    current_date = start_date
+    while current_date <= end_date:
+        row = by_day.get(current_date, {})
+        item = {'date': current_date.strftime('%Y-%m-%d')}
+        item.update({field: row.get(field) or 0 for field in fields})
+        data.append(item)
+        current_date += timedelta(days=1)
+    return data
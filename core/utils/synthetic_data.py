@@ -0,0 +1,403 @@
+"""
+Synthetic data
+Sinh dữ liệu giả (khoa, chuyên ngành, lớp, giảng viên, sinh viên, môn học, đăng
+ký, bài tập, bài nộp, điểm, ghi chú, tài liệu) để benchmark và load test.
+
+- Ghi bằng bulk_create theo lô, lô được đẩy xuống database ngay khi đầy nên bộ
+  nhớ không tăng theo số dòng; không chạy full_clean()/save() và không phát
+  signal, nên profile được tạo trực tiếp thay vì qua signal create_user_profile
+- Mọi user dùng chung một password hash tính sẵn một lần
+- Cùng seed cho ra cùng dữ liệu (random.Random riêng, không phụ thuộc thời gian
+  ngoài mốc ngày gốc truyền vào)
+"""
+import logging
+import random
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Max
+from django.utils import timezone
+
+from core.models import (
+    AcademicYear, Class, Course, CourseEnrollment, Department, Document, Grade, Major, Note,
+    StudentClass, UserProfile
+)
+from core.models.assignment import Assignment, AssignmentSubmission
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PASSWORD = 'benchmark123'
+
+SUBJECTS = [
+    'Lập trình', 'Cơ sở dữ liệu', 'Mạng máy tính', 'Kinh tế vi mô', 'Toán cao cấp',
+    'Xác suất thống kê', 'Tiếng Anh', 'Kế toán', 'Hệ điều hành', 'Trí tuệ nhân tạo',
+]
+FACULTIES = [
+    'Công nghệ thông tin', 'Kinh tế', 'Ngoại ngữ', 'Kế toán', 'Quản trị kinh doanh',
+    'Khoa học', 'Giáo dục', 'Y tế', 'Xã hội học', 'Luật',
+]
+LAST_NAMES = ['Nguyễn', 'Trần', 'Lê', 'Phạm', 'Hoàng', 'Vũ', 'Đặng', 'Bùi', 'Đỗ', 'Hồ']
+FIRST_NAMES = ['An', 'Bình', 'Chi', 'Dũng', 'Giang', 'Hà', 'Hùng', 'Lan', 'Minh', 'Nam', 'Phương', 'Quân', 'Trang', 'Vy']
+DEPARTMENT_CODES = ['cntt', 'kt', 'nn', 'sk', 'khac']
+CLASS_DEPARTMENTS = [code for code, _ in Class.DEPARTMENT_CHOICES]
+NOTE_PRIORITIES = ['low', 'medium', 'medium', 'high', 'urgent']
+
+# File PDF tối thiểu dùng chung cho tài liệu giả
+FAKE_PDF = b'%PDF-1.4\n1 0 obj<</Type/Catalog>>endobj\ntrailer<</Root 1 0 R>>\n%%EOF\n'
+
+
+class SyntheticDataGenerator:
+    """
+    Tạo dữ liệu giả theo từng bước; mỗi hàm create_* trả về id của object đã tạo
+
+        generator = SyntheticDataGenerator(seed=42, prefix='bench')
+        teachers = generator.create_users(10, 'teacher')
+        courses = generator.create_courses(20, teachers)
+
+    progress: hàm gọi sau mỗi lô với (tên model, tổng số dòng đã tạo của model)
+    """
+
+    def __init__(self, seed=42, prefix='synth', batch_size=2000, password=DEFAULT_PASSWORD,
+                 today=None, progress=None):
+        self.random = random.Random(seed)
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.password_hash = make_password(password)
+        self.today = today or timezone.localdate()
+        self.progress = progress
+        self.counts = {}
+
+    def bulk_create(self, model, objects):
+        """bulk_create theo lô, trả về các object đã có pk"""
+        created = []
+        for start in range(0, len(objects), self.batch_size):
+            batch = objects[start:start + self.batch_size]
+            created.extend(model.objects.bulk_create(batch))
+            self.counts[model.__name__] = self.counts.get(model.__name__, 0) + len(batch)
+            if self.progress is not None:
+                self.progress(model.__name__, self.counts[model.__name__])
+        return created
+
+    def stream_create(self, model, objects):
+        """bulk_create từ iterator, mỗi lần đủ batch_size object; trả về số dòng đã tạo"""
+        total = 0
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                total += len(self.bulk_create(model, batch))
+                batch = []
+        if batch:
+            total += len(self.bulk_create(model, batch))
+        return total
+
+    def aware(self, day, hour=9):
+        return timezone.make_aware(datetime.combine(day, time(hour)))
+
+    def course_teachers(self, course_ids):
+        """{course_id: teacher_id}, đọc theo lô để không vượt giới hạn tham số của SQLite"""
+        teachers = {}
+        for start in range(0, len(course_ids), self.batch_size):
+            chunk = course_ids[start:start + self.batch_size]
+            teachers.update(Course.objects.filter(pk__in=chunk).values_list('id', 'teacher_id'))
+        return teachers
+
+    @property
+    def code_prefix(self):
+        return self.prefix[:4].upper()
+
+    # -------------------------------------------------------------------------
+    # Cơ cấu đào tạo: khoa, chuyên ngành, lớp
+    # -------------------------------------------------------------------------
+
+    def get_academic_year(self):
+        """Năm học chứa ngày gốc (dùng chung, tạo nếu chưa có)"""
+        start_year = self.today.year if self.today.month >= 9 else self.today.year - 1
+        academic_year, _ = AcademicYear.objects.get_or_create(
+            name=f'{start_year}-{start_year + 1}',
+            defaults={'start_date': date(start_year, 9, 1), 'end_date': date(start_year + 1, 6, 30)},
+        )
+        return academic_year
+
+    def create_faculties(self, count, majors_per_faculty):
+        """Tạo khoa và chuyên ngành; trả về [(major_id, department_id)]"""
+        departments = self.bulk_create(Department, [
+            Department(name=f'Khoa {FACULTIES[i % len(FACULTIES)]} {i + 1}', code=f'{self.code_prefix}K{i:03d}')
+            for i in range(count)
+        ])
+        majors = self.bulk_create(Major, [
+            Major(
+                name=f'Chuyên ngành {number + 1} - {department.name}',
+                code=f'{self.code_prefix}M{index * majors_per_faculty + number:04d}',
+                department_id=department.pk,
+            )
+            for index, department in enumerate(departments)
+            for number in range(majors_per_faculty)
+        ])
+        return [(major.pk, major.department_id) for major in majors]
+
+    def create_classes(self, count, majors, class_size=40, students=None):
+        """
+        Tạo lớp sinh hoạt (StudentClass) và lớp hành chính (Class) tương ứng;
+        students là tổng số sinh viên sẽ được xếp lớp (để tính sĩ số hiện tại)
+
+        Returns:
+            [(student_class_id, class_id, major_id, department_id)]
+        """
+        academic_year = self.get_academic_year()
+        # (năm, khoa, số thứ tự lớp) là unique: đánh số tiếp sau các lớp đã có
+        first_number = (Class.objects.aggregate(last=Max('class_number'))['last'] or 0) + 1
+        students = count * class_size if students is None else students
+        student_classes = []
+        admin_classes = []
+        for number in range(count):
+            major_id, _ = majors[number % len(majors)]
+            year_of_study = self.random.randint(1, 4)
+            student_classes.append(StudentClass(
+                name=f'{self.code_prefix}L{number:05d}',
+                major_id=major_id,
+                academic_year_id=academic_year.pk,
+                year_of_study=year_of_study,
+                max_students=class_size,
+            ))
+            admin_classes.append(Class(
+                name=f'{self.code_prefix}C{number:05d}',
+                display_name=f'Lớp {number + 1}',
+                academic_year=min(2030, max(2020, self.today.year - year_of_study + 1)),
+                department=CLASS_DEPARTMENTS[number % len(CLASS_DEPARTMENTS)],
+                class_number=first_number + number,
+                max_students=class_size,
+                current_students=max(0, min(class_size, students - number * class_size)),
+            ))
+        student_classes = self.bulk_create(StudentClass, student_classes)
+        admin_classes = self.bulk_create(Class, admin_classes)
+        return [
+            (student_class.pk, admin_class.pk, majors[number % len(majors)][0], majors[number % len(majors)][1])
+            for number, (student_class, admin_class) in enumerate(zip(student_classes, admin_classes))
+        ]
+
+    # -------------------------------------------------------------------------
+    # Users
+    # -------------------------------------------------------------------------
+
+    def create_users(self, count, role, profile_fields=None):
+        """
+        Tạo user và profile với vai trò role, trả về danh sách user id
+
+        profile_fields: hàm (số thứ tự) -> dict trường bổ sung cho profile
+        """
+        offset = self.counts.get(f'user:{role}', 0)
+        ids = []
+        for start in range(0, count, self.batch_size):
+            numbers = range(start, min(count, start + self.batch_size))
+            usernames = [f'{self.prefix}_{role}{offset + number:06d}' for number in numbers]
+            users = self.bulk_create(User, [
+                User(
+                    username=username,
+                    email=f'{username}@example.com',
+                    first_name=self.random.choice(FIRST_NAMES),
+                    last_name=self.random.choice(LAST_NAMES),
+                    password=self.password_hash,
+                    is_staff=role == 'admin',
+                )
+                for username in usernames
+            ])
+            if all(user.pk for user in users):
+                batch_ids = [user.pk for user in users]
+            else:
+                # Backend không trả pk sau bulk_create: đọc lại theo username
+                user_ids = dict(User.objects.filter(username__in=usernames).values_list('username', 'id'))
+                batch_ids = [user_ids[username] for username in usernames]
+
+            self.bulk_create(UserProfile, [
+                UserProfile(
+                    user_id=user_id,
+                    role=role,
+                    student_id=f'SV{user_id:07d}' if role == 'student' else None,
+                    department=self.random.choice(DEPARTMENT_CODES),
+                    year_of_study=self.random.randint(1, 4) if role == 'student' else None,
+                    **(profile_fields(number) if profile_fields else {}),
+                )
+                for number, user_id in zip(numbers, batch_ids)
+            ])
+            ids.extend(batch_ids)
+
+        self.counts[f'user:{role}'] = offset + count
+        return ids
+
+    def create_students(self, count, classes, class_size=40):
+        """Sinh viên được xếp lần lượt vào các lớp, mỗi lớp class_size người"""
+        def profile_fields(number):
+            student_class_id, class_id, major_id, department_id = classes[(number // class_size) % len(classes)]
+            return {
+                'student_class_id': student_class_id,
+                'class_enrolled_id': class_id,
+                'major_id': major_id,
+                'academic_department_id': department_id,
+            }
+        return self.create_users(count, 'student', profile_fields if classes else None)
+
+    # -------------------------------------------------------------------------
+    # Courses
+    # -------------------------------------------------------------------------
+
+    def create_courses(self, count, teacher_ids, department_ids=None, **fields):
+        offset = self.counts.get('Course', 0)
+        start = self.today - timedelta(days=30)
+        courses = [
+            Course(
+                name=f'{self.random.choice(SUBJECTS)} {offset + i + 1}',
+                code=f'{self.prefix.upper()}{offset + i:05d}',
+                semester=self.random.choice(['1', '2']),
+                start_date=start,
+                end_date=start + timedelta(days=120),
+                teacher_id=teacher_ids[i % len(teacher_ids)],
+                department_id=department_ids[i % len(department_ids)] if department_ids else None,
+                max_students=self.random.choice([40, 60, 80, 120]),
+                status='active',
+                **fields,
+            )
+            for i in range(count)
+        ]
+        return [course.pk for course in self.bulk_create(Course, courses)]
+
+    def create_enrollments(self, student_ids, course_ids, per_student):
+        """Mỗi sinh viên đăng ký per_student môn khác nhau; trả về [(student_id, course_id)]"""
+        per_student = min(per_student, len(course_ids))
+        pairs = [
+            (student_id, course_id)
+            for student_id in student_ids
+            for course_id in self.random.sample(course_ids, per_student)
+        ]
+        self.stream_create(CourseEnrollment, (
+            CourseEnrollment(student_id=student_id, course_id=course_id) for student_id, course_id in pairs
+        ))
+        return pairs
+
+    # -------------------------------------------------------------------------
+    # Assignments, submissions, grades
+    # -------------------------------------------------------------------------
+
+    def create_assignments(self, course_ids, per_course):
+        """Trả về danh sách (assignment_id, course_id, teacher_id)"""
+        teachers = self.course_teachers(course_ids)
+        assignments = []
+        for course_id in course_ids:
+            for number in range(per_course):
+                due = self.today + timedelta(days=self.random.randint(-30, 30))
+                assignments.append(Assignment(
+                    course_id=course_id,
+                    title=f'Bài tập {number + 1}',
+                    description='Bài tập sinh tự động',
+                    created_by_id=teachers[course_id],
+                    due_date=self.aware(due, 23),
+                    status='active',
+                    is_visible_to_students=True,
+                ))
+        created = self.bulk_create(Assignment, assignments)
+        return [(assignment.pk, assignment.course_id, assignment.created_by_id) for assignment in created]
+
+    def create_submissions(self, assignments, enrollments, ratio=0.8, graded_ratio=0.6):
+        """
+        Bài nộp cho ratio số (sinh viên, bài tập) của môn đã đăng ký; graded_ratio
+        số bài nộp được chấm và có Grade tương ứng
+
+        Returns:
+            Số bài nộp đã tạo
+        """
+        students_by_course = {}
+        for student_id, course_id in enrollments:
+            students_by_course.setdefault(course_id, []).append(student_id)
+
+        now = timezone.now()
+        submissions = []
+        grades = []
+        total = 0
+        for assignment_id, course_id, teacher_id in assignments:
+            for student_id in students_by_course.get(course_id, []):
+                if self.random.random() >= ratio:
+                    continue
+                graded = self.random.random() < graded_ratio
+                score = Decimal(self.random.randint(0, 100)) / 10 if graded else None
+                submissions.append(AssignmentSubmission(
+                    assignment_id=assignment_id,
+                    student_id=student_id,
+                    status='graded' if graded else 'submitted',
+                    grade=score,
+                    graded_by_id=teacher_id if graded else None,
+                    graded_at=now if graded else None,
+                ))
+                if graded:
+                    grades.append(Grade(
+                        student_id=student_id,
+                        course_id=course_id,
+                        assignment_id=assignment_id,
+                        score=score,
+                        date=self.today,
+                        created_by_id=teacher_id,
+                    ))
+            if len(submissions) >= self.batch_size:
+                total += len(self.bulk_create(AssignmentSubmission, submissions))
+                self.bulk_create(Grade, grades)
+                submissions, grades = [], []
+
+        total += len(self.bulk_create(AssignmentSubmission, submissions))
+        self.bulk_create(Grade, grades)
+        return total
+
+    # -------------------------------------------------------------------------
+    # Notes, documents
+    # -------------------------------------------------------------------------
+
+    def create_notes(self, user_ids, per_user, enrollments=None):
+        """Ghi chú cá nhân, gắn với một môn đã đăng ký nếu có; trả về số ghi chú"""
+        courses_by_student = {}
+        for student_id, course_id in enrollments or []:
+            courses_by_student.setdefault(student_id, []).append(course_id)
+
+        def notes():
+            for user_id in user_ids:
+                courses = courses_by_student.get(user_id)
+                for number in range(per_user):
+                    yield Note(
+                        user_id=user_id,
+                        title=f'Ghi chú {number + 1}',
+                        content='Nội dung ghi chú sinh tự động. ' * self.random.randint(1, 5),
+                        priority=self.random.choice(NOTE_PRIORITIES),
+                        is_pinned=self.random.random() < 0.1,
+                        course_id=self.random.choice(courses) if courses else None,
+                    )
+        return self.stream_create(Note, notes())
+
+    def create_documents(self, course_ids, per_course, distinct_files=5):
+        """
+        Tài liệu với file PDF nhỏ; distinct_files file thật được ghi vào storage
+        và dùng chung cho mọi tài liệu
+        """
+        paths = []
+        for number in range(distinct_files):
+            name = f'documents/{self.prefix}/sample_{number}.pdf'
+            if not default_storage.exists(name):
+                name = default_storage.save(name, ContentFile(FAKE_PDF + b'%' + str(number).encode() + b'\n'))
+            paths.append(name)
+
+        teachers = self.course_teachers(course_ids)
+        documents = []
+        for course_id in course_ids:
+            for number in range(per_course):
+                path = paths[self.random.randrange(len(paths))]
+                documents.append(Document(
+                    title=f'Tài liệu {number + 1}',
+                    course_id=course_id,
+                    file=path,
+                    file_name=path.rsplit('/', 1)[-1],
+                    file_size=len(FAKE_PDF),
+                    file_type='pdf',
+                    uploaded_by_id=teachers[course_id],
+                    preview_status='unsupported',
+                ))
+        return [document.pk for document in self.bulk_create(Document, documents)]
@@ -0,0 +1,56 @@
+"""
+JWT revocation
+Danh sách token bị thu hồi nằm trong cache dùng chung thay vì bảng blacklist, nên
+mỗi request API chỉ tốn một lần đọc cache (không query database):
+
+- revoke_token: thu hồi một token theo jti (đăng xuất), giữ tới khi token hết hạn
+- revoke_user_tokens: thu hồi mọi token của user được cấp trước thời điểm gọi
+  (đổi mật khẩu, khóa tài khoản, đổi vai trò)
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+KEY_PREFIX = 'jwt'
+
+
+def _cache():
+    return caches[getattr(settings, 'JWT_REVOCATION_CACHE_ALIAS', 'default')]
+
+
+def _token_key(jti):
+    return f"{KEY_PREFIX}:revoked:{jti}"
+
+
+def _user_key(user_id):
+    return f"{KEY_PREFIX}:revoked_user:{user_id}"
+
+
+def revoke_token(jti, exp):
+    """Thu hồi token có jti cho tới thời điểm hết hạn exp (unix timestamp)"""
+    timeout = int(exp - time.time()) + 1
+    if jti and timeout > 0:
+        _cache().set(_token_key(jti), 1, timeout)
+
+
+def revoke_user_tokens(user_id):
+    """Thu hồi mọi access/refresh token của user đã được cấp tới thời điểm này"""
+    lifetime = max(
+        settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME'],
+        settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME'],
+    )
+    _cache().set(_user_key(user_id), time.time(), int(lifetime.total_seconds()) + 1)
+
+
+def is_token_revoked(payload, user_id_claim='user_id'):
+    """Kiểm tra payload của token (một lần get_many trên cache)"""
+    jti = payload.get('jti')
+    user_id = payload.get(user_id_claim)
+    keys = [_token_key(jti), _user_key(user_id)]
+    revoked = _cache().get_many(keys)
+    if keys[0] in revoked:
+        return True
+    revoked_at = revoked.get(keys[1])
+    # iat là giây nguyên: token cấp trong cùng giây với lần thu hồi cũng bị từ chối
+    return revoked_at is not None and payload.get('iat', 0) < revoked_at
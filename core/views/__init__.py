@@ -7,7 +7,7 @@ from .main_views import (
     
     # Document views
     document_list, document_upload, document_detail, document_download,
-    document_edit, document_delete, document_categories, document_statistics,
+    document_thumbnail, document_edit, document_delete, document_categories, document_statistics,
     document_my_uploads, document_my_downloads,
     
     # Admin course management
@@ -38,7 +38,7 @@ __all__ = [
     
     # Document views
     'document_list', 'document_upload', 'document_detail', 'document_download',
-    'document_edit', 'document_delete', 'document_categories', 'document_statistics',
+    'document_thumbnail', 'document_edit', 'document_delete', 'document_categories', 'document_statistics',
     'document_my_uploads', 'document_my_downloads',
     
     # Admin course management
@@ -5,7 +5,7 @@ Views cho hệ thống bài tập (dành cho giáo viên)
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.http import HttpResponse, JsonResponse, Http404
+from django.http import JsonResponse, Http404, FileResponse
 from django.core.paginator import Paginator
 from django.db.models import Q, Count
 from django.utils import timezone
@@ -239,7 +239,7 @@ def assignment_submission_list(request, assignment_pk):
             raise PermissionDenied("Bạn không có quyền xem bài tập này.")
         
         # Lấy danh sách bài nộp
-        submissions = assignment.submissions.select_related('student').order_by('-submitted_at')
+        submissions = assignment.submissions.select_related('student').prefetch_related('files').order_by('-submitted_at')
         
         # Form tìm kiếm
         search_form = AssignmentSubmissionSearchForm(request.GET)
@@ -268,10 +268,16 @@ def assignment_submission_list(request, assignment_pk):
                     submissions = submissions.filter(status__in=['submitted', 'late'])
         
         # Thống kê
-        total_submissions = submissions.count()
-        graded_count = submissions.filter(status='graded').count()
-        pending_count = submissions.filter(status__in=['submitted', 'late']).count()
-        late_count = submissions.filter(status='late').count()
+        stats = submissions.aggregate(
+            total_submissions=Count('id'),
+            graded_count=Count('id', filter=Q(status='graded')),
+            pending_count=Count('id', filter=Q(status__in=['submitted', 'late'])),
+            late_count=Count('id', filter=Q(status='late')),
+        )
+        total_submissions = stats['total_submissions']
+        graded_count = stats['graded_count']
+        pending_count = stats['pending_count']
+        late_count = stats['late_count']
         
         # Phân trang
         paginator = Paginator(submissions, 12)
@@ -315,11 +321,13 @@ def assignment_file_download(request, file_pk):
         if not os.path.exists(assignment_file.file.path):
             raise Http404("File không tồn tại.")
         
-        # Tải file
-        with open(assignment_file.file.path, 'rb') as f:
-            response = HttpResponse(f.read(), content_type='application/octet-stream')
-            response['Content-Disposition'] = f'attachment; filename="{assignment_file.file_name}"'
-            return response
+        # Tải file (stream theo từng khối, không đọc toàn bộ vào bộ nhớ)
+        return FileResponse(
+            assignment_file.file.open('rb'),
+            as_attachment=True,
+            filename=assignment_file.file_name,
+            content_type='application/octet-stream'
+        )
             
     except PermissionDenied:
         messages.error(request, 'Bạn không có quyền tải file này.')
@@ -0,0 +1,362 @@
+"""
+Async views
+Phiên bản async (ASGI) của các endpoint JSON chỉ đọc: thống kê admin,
+dữ liệu hoạt động, analytics môn học, các API tìm kiếm (typeahead) và stream
+thông báo (Server-Sent Events).
+
+Các aggregate độc lập được chạy song song bằng asyncio.gather. Khi chạy dưới
+ASGI, worker không bị chặn trong lúc chờ database nên một process phục vụ được
+nhiều request I/O-bound cùng lúc.
+"""
+import asyncio
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+
+from ..db_router import read_replica
+from ..models.assignment import Assignment
+from ..models.study import Class, Course, Grade
+from ..models.user import UserProfile
+from ..utils.analytics import grade_summary
+from ..utils.login_rollups import ROLLUP_FIELDS, login_activity_range, login_activity_rows
+from ..utils.notifications import (
+    audience_stamps, enrolled_courses, latest_notification_id, notifications_after,
+    serialize_notification, unread_count
+)
+from ..utils.statistics import (
+    day_range, fill_daily_rows, fill_daily_series
+)
+
+async def get_request_user(request):
+    """Lấy user của request trong ngữ cảnh async"""
+    if hasattr(request, 'auser'):
+        return await request.auser()
+
+    def load_user():
+        # Truy cập một thuộc tính để SimpleLazyObject được load trong sync context
+        request.user.is_authenticated
+        return request.user
+
+    return await sync_to_async(load_user)()
+
+
+async def get_user_role(user):
+    """Role của user (không kích hoạt lazy load profile)"""
+    if user.is_superuser:
+        return 'admin'
+    return await UserProfile.objects.filter(user_id=user.pk).values_list('role', flat=True).afirst()
+
+
+def async_role_required(*roles):
+    """
+    Decorator cho async view chỉ đọc: chỉ nhận GET/HEAD, yêu cầu đăng nhập
+    và có role phù hợp (lỗi trả về dạng JSON)
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        async def _wrapped_view(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return JsonResponse({'error': 'Method not allowed.'}, status=405)
+            user = await get_request_user(request)
+            if not user.is_authenticated:
+                return JsonResponse({'error': 'Bạn cần đăng nhập.'}, status=401)
+            role = await get_user_role(user)
+            if roles and role not in roles:
+                return JsonResponse({'error': 'Không có quyền truy cập.'}, status=403)
+            request.async_user = user
+            request.async_role = role
+            return await view_func(request, *args, **kwargs)
+        return _wrapped_view
+    return decorator
+
+
+# =============================================================================
+# ADMIN STATS
+# =============================================================================
+
+async def get_overview_data():
+    users, courses, assignments, grades = await asyncio.gather(
+        User.objects.aaggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(is_active=True)),
+        ),
+        Course.objects.aaggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(status='active')),
+        ),
+        Assignment.objects.acount(),
+        Grade.objects.acount(),
+    )
+    return {
+        'total_users': users['total'],
+        'active_users': users['active'],
+        'total_courses': courses['total'],
+        'active_courses': courses['active'],
+        'total_assignments': assignments,
+        'total_grades': grades,
+    }
+
+
+async def get_user_growth_data(days=30):
+    start_date, end_date, start_datetime = day_range(days)
+    rows = User.objects.filter(
+        date_joined__gte=start_datetime
+    ).annotate(day=TruncDate('date_joined')).values('day').annotate(count=Count('id')).order_by('day')
+    return fill_daily_series([row async for row in rows], start_date, end_date, 'count')
+
+
+async def get_course_status_data():
+    rows = Course.objects.values('status').annotate(count=Count('id')).order_by('status')
+    return [row async for row in rows]
+
+
+async def get_grade_distribution_data():
+    summary = await sync_to_async(grade_summary)('all')
+    return summary['distribution']
+
+
+@async_role_required('admin')
+@read_replica
+async def admin_stats_api(request):
+    """Async version of AdminStatsAPIView"""
+    stats_type = request.GET.get('type', 'overview')
+
+    if stats_type == 'user_growth':
+        return JsonResponse({'data': await get_user_growth_data()})
+    elif stats_type == 'course_status':
+        return JsonResponse({'data': await get_course_status_data()})
+    elif stats_type == 'grade_distribution':
+        return JsonResponse({'data': await get_grade_distribution_data()})
+    elif stats_type == 'all':
+        overview, user_growth, course_status, grade_distribution = await asyncio.gather(
+            get_overview_data(),
+            get_user_growth_data(),
+            get_course_status_data(),
+            get_grade_distribution_data(),
+        )
+        return JsonResponse({'data': {
+            'overview': overview,
+            'user_growth': user_growth,
+            'course_status': course_status,
+            'grade_distribution': grade_distribution,
+        }})
+    return JsonResponse({'data': await get_overview_data()})
+
+
+@async_role_required('admin')
+@read_replica
+async def admin_activity_data_api(request):
+    """Async version of AdminActivityDataAPIView (một query trên bảng rollup)"""
+    try:
+        days = int(request.GET.get('days', 7))
+    except ValueError:
+        days = 7
+    start_date, end_date = login_activity_range(days)
+
+    rows = login_activity_rows(start_date, end_date)
+    login_data = fill_daily_rows([row async for row in rows], start_date, end_date, ROLLUP_FIELDS)
+    return JsonResponse({'login_activity': login_data})
+
+
+# =============================================================================
+# COURSE ANALYTICS
+# =============================================================================
+
+@async_role_required()
+@read_replica
+async def course_analytics(request, pk):
+    """Async version of the course_analytics API"""
+    course = await Course.objects.filter(pk=pk).only('id', 'teacher_id').afirst()
+    if course is None:
+        return JsonResponse({'error': 'Không tìm thấy course.'}, status=404)
+
+    user = request.async_user
+    role = request.async_role
+    if role == 'teacher' and course.teacher_id != user.pk:
+        return JsonResponse({'error': 'Không có quyền truy cập.'}, status=403)
+    if role == 'student' and not await course.enrollments.filter(student_id=user.pk).aexists():
+        return JsonResponse({'error': 'Không có quyền truy cập.'}, status=403)
+
+    enrollments, grades, assignment_count = await asyncio.gather(
+        course.enrollments.aaggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(status='enrolled')),
+            completed=Count('id', filter=Q(status='completed')),
+            dropped=Count('id', filter=Q(status='dropped')),
+        ),
+        sync_to_async(grade_summary)('course', course.pk),
+        course.assignments.acount(),
+    )
+
+    total_students = enrollments['total']
+    completion_rate = 0
+    if total_students > 0:
+        completion_rate = enrollments['completed'] / total_students * 100
+
+    return JsonResponse({
+        'total_students': total_students,
+        'active_students': enrollments['active'],
+        'completed_students': enrollments['completed'],
+        'dropped_students': enrollments['dropped'],
+        'average_grade': f"{grades['weighted_mean']:.2f}",
+        'median_grade': f"{grades['median']:.2f}",
+        'grade_std_dev': f"{grades['std']:.2f}",
+        'pass_rate': f"{grades['pass_rate']:.2f}",
+        'quantiles': grades['quantiles'],
+        'grade_distribution': grades['distribution'],
+        'assignment_count': assignment_count,
+        'completion_rate': f"{completion_rate:.2f}",
+    })
+
+
+# =============================================================================
+# TYPEAHEAD SEARCH
+# =============================================================================
+
+@async_role_required('admin')
+async def user_search_api(request):
+    """Async version of user_search_api (Select2)"""
+    query = request.GET.get('q', '')
+    role = request.GET.get('role', '')
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+
+    if not query or len(query) < 2:
+        return JsonResponse({'results': [], 'pagination': {'more': False}})
+
+    users = User.objects.all()
+    if role:
+        users = users.filter(profile__role=role)
+    users = users.filter(
+        Q(first_name__icontains=query) |
+        Q(last_name__icontains=query) |
+        Q(username__icontains=query) |
+        Q(email__icontains=query)
+    ).order_by('first_name', 'last_name').values(
+        'id', 'username', 'first_name', 'last_name', 'email', 'profile__department'
+    )
+
+    # Lấy thừa một dòng để biết còn trang sau hay không, thay vì COUNT(*)
+    per_page = 20
+    start = (page - 1) * per_page
+    rows = [row async for row in users[start:start + per_page + 1]]
+
+    results = []
+    for row in rows[:per_page]:
+        full_name = f"{row['first_name']} {row['last_name']}".strip() or row['username']
+        email = row['email'] or 'Không có email'
+        department = row['profile__department'] or ''
+        text = f"{full_name} ({email}) - {department}" if department else f"{full_name} ({email})"
+        results.append({'id': row['id'], 'text': text})
+
+    return JsonResponse({'results': results, 'pagination': {'more': len(rows) > per_page}})
+
+
+@async_role_required('admin')
+async def admin_search_classes(request):
+    """Async version of admin_search_classes"""
+    query = request.GET.get('q', '')
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+
+    if not query:
+        return JsonResponse({'results': [], 'pagination': {'more': False}})
+
+    classes = Class.objects.filter(
+        Q(name__icontains=query) |
+        Q(display_name__icontains=query) |
+        Q(department__icontains=query) |
+        Q(academic_year__icontains=query)
+    ).filter(status='active').order_by('-academic_year', 'department', 'class_number')
+
+    per_page = 10
+    start = (page - 1) * per_page
+    rows = [class_obj async for class_obj in classes[start:start + per_page + 1]]
+
+    results = [{
+        'id': class_obj.id,
+        'text': f"{class_obj.name} - {class_obj.display_name} ({class_obj.get_department_display()})"
+    } for class_obj in rows[:per_page]]
+
+    return JsonResponse({'results': results, 'pagination': {'more': len(rows) > per_page}})
+
+
+# =============================================================================
+# NOTIFICATION STREAM
+# =============================================================================
+
+STREAM_PAGE_SIZE = 50
+
+
+def _sse(event, data, event_id=None):
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += [f"event: {event}", f"data: {json.dumps(data, ensure_ascii=False)}"]
+    return "\n".join(lines) + "\n\n"
+
+
+@async_role_required()
+async def notification_stream(request):
+    """
+    Thông báo mới theo thời gian thực (text/event-stream)
+
+    Mỗi NOTIFICATION_STREAM_INTERVAL giây chỉ đọc stamp của các nhóm người nhận trong cache;
+    database chỉ được query khi stamp thay đổi. Kết nối đóng sau NOTIFICATION_STREAM_TIMEOUT
+    giây, EventSource tự kết nối lại và gửi Last-Event-ID để không mất thông báo.
+
+    Dưới WSGI response bị gom hết rồi mới gửi và giữ một thread của worker suốt thời gian đó,
+    nên trả về 204 (EventSource không kết nối lại) trừ khi chạy ASGI.
+    """
+    if settings.SERVER_MODE != 'asgi':
+        return HttpResponse(status=204)
+    user_id = request.async_user.pk
+    courses = await sync_to_async(enrolled_courses)(user_id)
+    after = request.headers.get('Last-Event-ID') or request.GET.get('after') or ''
+    if after.isdigit():
+        after = int(after)
+    else:
+        after = await sync_to_async(latest_notification_id)(user_id, courses)
+
+    async def events():
+        last_id = after
+        stamps = None
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.NOTIFICATION_STREAM_TIMEOUT
+        yield f"retry: {int(settings.NOTIFICATION_STREAM_INTERVAL * 1000)}\n\n"
+        while loop.time() < deadline:
+            current = await sync_to_async(audience_stamps)(user_id, courses)
+            if current != stamps:
+                stamps = current
+                # Đọc hết các trang mới (mỗi trang STREAM_PAGE_SIZE dòng) trước khi chờ stamp đổi tiếp
+                sent = False
+                while True:
+                    notifications = await sync_to_async(notifications_after)(
+                        user_id, last_id, courses, limit=STREAM_PAGE_SIZE
+                    )
+                    for notification in notifications:
+                        last_id = notification.id
+                        yield _sse('notification', serialize_notification(notification), last_id)
+                    sent = sent or bool(notifications)
+                    if len(notifications) < STREAM_PAGE_SIZE:
+                        break
+                if sent:
+                    count = await sync_to_async(unread_count)(user_id)
+                    yield _sse('unread', {'unread_count': count})
+            else:
+                yield ": keepalive\n\n"
+            await asyncio.sleep(settings.NOTIFICATION_STREAM_INTERVAL)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Nginx không buffer response của stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -5,9 +5,10 @@ Views chính cho ứng dụng
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.http import HttpResponse, JsonResponse, Http404
+from django.http import HttpResponse, JsonResponse, Http404, FileResponse
+from django.utils.cache import patch_cache_control
 from django.core.paginator import Paginator
-from django.db.models import Q, Count
+from django.db.models import Q
 from django.utils import timezone
 from django.contrib.auth.models import User
 from django.core.exceptions import PermissionDenied
@@ -28,6 +29,10 @@ from ..forms import (
 from ..admin_views import is_admin
 from ..dashboards.admin.forms import AdminCourseForm, AdminClassForm, ClassSearchForm, BulkClassCreationForm
 from ..models.study import CourseEnrollment
+from ..utils.cache import COURSE_NAMESPACE, cache_get_or_set
+from ..utils.previews import get_thumbnail_path
+from ..utils.query_metrics import query_budget
+from ..utils.reference_data import get_document_categories, get_document_categories_with_counts
 
 
 def can_upload_documents(user):
@@ -111,23 +116,21 @@ def profile_page(request):
     return render(request, 'core/auth/profile.html', context)
 
 
+@query_budget(5)
 def course_list(request):
     """API danh sách khóa học"""
-    courses = Course.objects.all()  # Lấy tất cả courses thay vì chỉ active
-    data = [{
-        'id': course.id,
-        'name': course.name,
-        'code': course.code,
-        'description': course.description,
-        'credits': course.credits,
-        'status': course.status
-    } for course in courses]
+    def load_courses():
+        # Lấy tất cả courses thay vì chỉ active
+        return list(Course.objects.values('id', 'name', 'code', 'description', 'credits', 'status'))
+
+    data = cache_get_or_set(COURSE_NAMESPACE, 'course_list', load_courses, timeout=10 * 60)
     return JsonResponse({'courses': data})
 
 
+@query_budget(5)
 def assignment_list(request):
     """API danh sách bài tập"""
-    assignments = Assignment.objects.all()
+    assignments = Assignment.objects.select_related('course')
     data = [{
         'id': assignment.id,
         'title': assignment.title,
@@ -141,14 +144,15 @@ def assignment_list(request):
 
 
 # Document views
+@query_budget(10)
 @login_required
 def document_list(request):
     """Danh sách tài liệu"""
     documents = Document.objects.filter(
         status='active',
         visibility__in=['public', 'course_only']
-    ).order_by('-created_at')
-    categories = DocumentCategory.objects.all()
+    ).select_related('course', 'uploaded_by').order_by('-created_at')
+    categories = get_document_categories()
     
     # Search functionality
     search_form = DocumentSearchForm(request.GET)
@@ -257,9 +261,8 @@ def document_download(request, pk):
         ip_address=request.META.get('REMOTE_ADDR')
     )
     
-    # Update download count
-    document.download_count += 1
-    document.save()
+    # Update download count (UPDATE trực tiếp, không lưu lại cả document)
+    document.increment_download_count()
     
     # Serve file
     file_path = document.file.path
@@ -272,6 +275,22 @@ def document_download(request, pk):
         raise Http404("File not found")
 
 
+@login_required
+def document_thumbnail(request, pk, content_hash):
+    """Ảnh thu nhỏ của tài liệu - URL gắn với mã băm nên cache được lâu dài"""
+    document = get_object_or_404(
+        Document, pk=pk, status='active', content_hash=content_hash, has_thumbnail=True
+    )
+    
+    thumbnail_path = get_thumbnail_path(document.content_hash)
+    if not os.path.exists(thumbnail_path):
+        raise Http404("Thumbnail not found")
+    
+    response = FileResponse(open(thumbnail_path, 'rb'), content_type='image/jpeg')
+    patch_cache_control(response, private=True, max_age=365 * 24 * 60 * 60, immutable=True)
+    return response
+
+
 @login_required
 def document_edit(request, pk):
     """Chỉnh sửa tài liệu"""
@@ -318,9 +337,7 @@ def document_delete(request, pk):
 @login_required
 def document_categories(request):
     """Danh sách danh mục tài liệu"""
-    categories = DocumentCategory.objects.annotate(
-        document_count=Count('document')
-    ).order_by('name')
+    categories = get_document_categories_with_counts()
     
     context = {
         'categories': categories
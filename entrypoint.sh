@@ -1,21 +1,39 @@
 #!/bin/bash
+set -e
 
-# Đợi database sẵn sàng
-echo "Waiting for database..."
-until pg_isready -h db -p 5432 -U postgres; do
-  echo "Database is not ready - waiting..."
-  sleep 2
-done
-echo "Database is ready!"
+# Chế độ chạy:
+#   web     - gunicorn (WSGI, gthread) cho production (mặc định)
+#   asgi    - gunicorn + uvicorn worker
+#   dev     - runserver của Django, dùng khi phát triển
+#   migrate - chỉ chạy migrations rồi thoát
+#   session-cleanup - chạy liên tục, xóa session hết hạn theo lô
+#   outbox  - worker gửi email trong hàng đợi OutboundEmail
+#   scheduler - chạy liên tục, xếp email / thông báo nhắc hạn nộp bài
+# Các lệnh khác được chạy trực tiếp, ví dụ: ./entrypoint.sh python manage.py shell
+MODE=${1:-web}
 
-# Chạy migrations
-echo "Running migrations..."
-python manage.py makemigrations
-python manage.py migrate
+wait_for_db() {
+  if [ -n "$DB_HOST" ] || [ "$WAIT_FOR_DB" = "1" ]; then
+    echo "Waiting for database..."
+    until pg_isready -h "${DB_HOST:-db}" -p "${DB_PORT:-5432}" -U "${DB_USER:-postgres}"; do
+      echo "Database is not ready - waiting..."
+      sleep 2
+    done
+    echo "Database is ready!"
+  fi
+}
 
-# Tạo superuser nếu chưa có
-echo "Creating superuser if not exists..."
-python manage.py shell -c "
+# Migrations được tạo sẵn trong repo, container chỉ áp dụng chúng
+run_migrations() {
+  if [ "${RUN_MIGRATIONS:-1}" = "1" ]; then
+    echo "Running migrations..."
+    python manage.py migrate --noinput
+  fi
+}
+
+create_dev_superuser() {
+  echo "Creating superuser if not exists..."
+  python manage.py shell -c "
 from django.contrib.auth.models import User
 if not User.objects.filter(username='admin').exists():
     User.objects.create_superuser('admin', 'admin@example.com', 'admin123')
@@ -23,11 +41,48 @@ if not User.objects.filter(username='admin').exists():
 else:
     print('Superuser already exists')
 "
+}
 
-# Collect static files
-echo "Collecting static files..."
-python manage.py collectstatic --noinput
-
-# Start server
-echo "Starting Django server..."
-python manage.py runserver 0.0.0.0:8000 
\ No newline at end of file
+case "$MODE" in
+  web)
+    wait_for_db
+    run_migrations
+    echo "Starting gunicorn (WSGI)..."
+    exec env SERVER_MODE=wsgi gunicorn -c gunicorn.conf.py
+    ;;
+  asgi)
+    wait_for_db
+    run_migrations
+    echo "Starting gunicorn (ASGI)..."
+    exec env SERVER_MODE=asgi gunicorn -c gunicorn.conf.py
+    ;;
+  dev)
+    wait_for_db
+    run_migrations
+    create_dev_superuser
+    echo "Starting Django development server..."
+    exec python manage.py runserver 0.0.0.0:8000
+    ;;
+  migrate)
+    wait_for_db
+    python manage.py migrate --noinput
+    ;;
+  session-cleanup)
+    wait_for_db
+    echo "Starting expired session cleanup loop..."
+    exec python manage.py cleanup_sessions --loop
+    ;;
+  outbox)
+    wait_for_db
+    echo "Starting outbox email worker..."
+    exec python manage.py send_outbox --loop
+    ;;
+  scheduler)
+    wait_for_db
+    echo "Starting reminder scheduler..."
+    exec python manage.py run_scheduler --loop
+    ;;
+  *)
+    exec "$@"
+    ;;
+esac
@@ -0,0 +1,62 @@
+"""
+Gunicorn config cho môi trường production
+Mọi tham số đều đọc từ biến môi trường để chỉnh theo số CPU/RAM của container.
+
+    SERVER_MODE=wsgi   -> worker gthread (mặc định)
+    SERVER_MODE=asgi   -> worker uvicorn, dùng cho các endpoint /api/async/
+"""
+import multiprocessing
+import os
+
+
+def env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def env_bool(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+server_mode = os.environ.get('SERVER_MODE', 'wsgi').lower()
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+# Số process: mặc định 2 * CPU + 1
+workers = env_int('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1)
+
+if server_mode == 'asgi':
+    wsgi_app = 'study_management.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'study_management.wsgi:application'
+    worker_class = 'gthread'
+    threads = env_int('GUNICORN_THREADS', 4)
+
+# Load Django một lần ở master rồi fork, worker khởi động nhanh và chia sẻ bộ nhớ
+preload_app = env_bool('GUNICORN_PRELOAD', True)
+
+# Tái tạo worker sau một số request để tránh rò rỉ bộ nhớ; jitter để các worker
+# không restart cùng lúc
+max_requests = env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+timeout = env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = env_int('GUNICORN_KEEPALIVE', 5)
+
+# /dev/shm tránh chặn heartbeat khi /tmp nằm trên overlayfs của Docker
+worker_tmp_dir = os.environ.get('GUNICORN_WORKER_TMP_DIR', '/dev/shm' if os.path.isdir('/dev/shm') else None)
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    """Không dùng chung kết nối database mở ở master (preload) giữa các worker"""
+    from django.db import connections
+    connections.close_all()